@@ -8,6 +8,8 @@ import os
 from PIL import Image, ImageTk, ImageDraw
 import math
 import colorsys
+from assistant.modules.tracing import tracer
+from assistant.modules.config_handler import config
 
 class ModernFloatingAssistant:
     def __init__(self, root):
@@ -205,6 +207,9 @@ class ModernFloatingAssistant:
 
     def keyboard_listener(self):
         """Listen for keyboard events"""
+        # In wake word mode the global P hook can be turned off
+        if not config.get_nested("wake_word.hotkey", True):
+            return
         keyboard.on_press_key('p', self.on_p_press)
         keyboard.on_release_key('p', self.on_p_release)
         keyboard.wait()
@@ -216,8 +221,11 @@ class ModernFloatingAssistant:
             self.status_var.set("🎤 Listening...")
             self.status_label.configure(fg=self.highlight_color)
             
+            # The trace for this command starts at the key press
+            trace = tracer.start_trace("voice_command", source="gui")
+            
             # Run the speak command in a separate thread
-            thread = threading.Thread(target=self._run_speak_command)
+            thread = threading.Thread(target=self._run_speak_command, args=(trace,))
             thread.daemon = True
             thread.start()
 
@@ -229,10 +237,11 @@ class ModernFloatingAssistant:
                 self.stop_command(silent=True)
             self._reset_status()
 
-    def _run_speak_command(self):
+    def _run_speak_command(self, trace=None):
         """Run the speak command in a separate thread"""
         try:
-            self.speak_command()
+            with tracer.activate(trace):
+                self.speak_command()
         finally:
             self.root.after(0, self._reset_status)
 
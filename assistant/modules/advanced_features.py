@@ -11,6 +11,8 @@ import threading
 from datetime import datetime
 from ..modules.speech_utils import speak
 from ..modules.web_search import search_web
+from ..modules.process_inspector import get_process_inspector
+from ..modules.screenshot_service import get_screenshot_service
 import re
 import platform
 import logging
@@ -56,14 +58,7 @@ class AdvancedFeatures:
     
     def _is_media_player_running(self):
         """Check if any known media player is running"""
-        for proc in psutil.process_iter(['name']):
-            try:
-                process_name = proc.info['name'].lower()
-                if any(player.lower() in process_name for player in self.media_players):
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return False
+        return get_process_inspector().is_running(*self.media_players)
     
     def _ensure_media_player_running(self):
         """Ensure a media player is running, launch one if needed"""
@@ -87,13 +82,7 @@ class AdvancedFeatures:
         if os.name != 'nt':  # Only for Windows
             return False
             
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'].lower() == 'wmplayer.exe':
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return False
+        return get_process_inspector().is_running('wmplayer.exe')
     
     def _focus_media_player(self):
         """Focus the media player window to ensure commands are received"""
@@ -135,14 +124,7 @@ class AdvancedFeatures:
     
     def _is_vlc_player_running(self):
         """Check if VLC Player is running"""
-        for proc in psutil.process_iter(['name']):
-            try:
-                process_name = proc.info['name'].lower()
-                if 'vlc' in process_name:
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return False
+        return get_process_inspector().is_running('vlc')
 
     def _create_vlc_playlist(self, directory, file_extensions, random_selection=False, max_items=10):
         """Create a VLC playlist with all media files in the directory or a random selection
@@ -671,9 +653,8 @@ class AdvancedFeatures:
     def take_screenshot(self):
         """Take a screenshot"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = os.path.join(self.screenshot_dir, f"screenshot_{timestamp}.png")
-            pyautogui.screenshot(screenshot_path)
+            # Saved in the background by the shared screenshot service
+            get_screenshot_service().take()
             speak("Screenshot taken successfully")
             return True
         except Exception as e:
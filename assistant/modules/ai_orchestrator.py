@@ -24,7 +24,11 @@ import subprocess
 from .system_controls import SystemControls
 from .media_controls import MediaControls
 from .web_search import WebSearch
+from .command_router import CommandRouter
+from .screen_recorder import RECORDING_KEYWORDS
+from .screenshot_library import LIBRARY_KEYWORDS
 from .speech_utils import speak
+from .telemetry import latest_sample
 from .config_handler import ConfigHandler
 
 logger = logging.getLogger(__name__)
@@ -59,6 +63,7 @@ class AIOrchestrator:
         self.web_search = WebSearch()
         self.config_handler = ConfigHandler()
         self.config = self.config_handler.config
+        self.router = self._build_router()
         
         # Initialize modules status
         self.modules_status = {
@@ -71,56 +76,85 @@ class AIOrchestrator:
     
     def preprocess_command(self, command_text):
         """Preprocess and categorize a command"""
-        try:
-            if not command_text:
-                return {
-                    "command": "",
-                    "category": "web_search",
-                    "confidence": 0.0
-                }
+        return self.preprocess_commands([command_text])[0]
             
-            # Clean and normalize the command
-            command = command_text.strip().lower()
+    def preprocess_commands(self, command_texts):
+        """
+        Preprocess and categorize several commands with one classifier call
             
-            # Check for YouTube commands first
-            if any(word in command for word in ["youtube", "video", "play", "watch"]):
-                if "search" in command or "find" in command:
-                    return {
-                        "command": command,
-                        "category": "youtube_search",
-                        "confidence": 0.9
+        Args:
+            command_texts (list): Command texts
+        
+        Returns:
+            list: {"command", "category", "confidence"} for each command
+        """
+        results = [None] * len(command_texts)
+        pending = []
+        for i, command_text in enumerate(command_texts):
+            try:
+                if not command_text:
+                    results[i] = {
+                        "command": "",
+                        "category": "web_search",
+                        "confidence": 0.0
                     }
-                elif "play" in command:
-                    return {
+                    continue
+                
+                # Clean and normalize the command
+                command = command_text.strip().lower()
+                
+                # Check for YouTube commands first
+                if any(word in command for word in ["youtube", "video", "play", "watch"]):
+                    if "search" in command or "find" in command:
+                        results[i] = {
+                            "command": command,
+                            "category": "youtube_search",
+                            "confidence": 0.9
+                        }
+                        continue
+                    elif "play" in command:
+                        results[i] = {
+                            "command": command,
+                            "category": "youtube_play",
+                            "confidence": 0.9
+                        }
+                        continue
+                
+                # Check for screenshot commands
+                if any(word in command for word in ["screenshot", "capture screen", "grab screen", "screen recording",
+                                                    "record the screen", "record my screen", "record screen"]):
+                    results[i] = {
                         "command": command,
-                        "category": "youtube_play",
+                        "category": "screenshot",
                         "confidence": 0.9
                     }
+                    continue
             
-            # Check for screenshot commands
-            if any(word in command for word in ["screenshot", "capture screen", "grab screen"]):
-                return {
-                    "command": command,
-                    "category": "screenshot",
-                    "confidence": 0.9
-                }
-            
-            # Get category predictions
-            category, confidence = self.command_learner.predict_category(command)
+                pending.append((i, command))
+            except Exception as e:
+                logger.error(f"Error in command preprocessing: {e}")
             
-            return {
+        # Get category predictions for the rest in one batch
+        try:
+            predictions = self.command_learner.predict_categories([command for _, command in pending])
+        except Exception as e:
+            logger.error(f"Error in command preprocessing: {e}")
+            predictions = [("web_search", 0.3)] * len(pending)
+        for (i, command), (category, confidence) in zip(pending, predictions):
+            results[i] = {
                 "command": command,
                 "category": category,
                 "confidence": confidence
             }
             
-        except Exception as e:
-            logger.error(f"Error in command preprocessing: {e}")
-            return {
-                "command": command_text,
-                "category": "web_search",
-                "confidence": 0.3
-            }
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = {
+                    "command": command_texts[i],
+                    "category": "web_search",
+                    "confidence": 0.3
+                }
+        return results
     
     def enhance_command(self, command, category):
         """Enhance a command with additional context"""
@@ -323,6 +357,38 @@ class AIOrchestrator:
         except Exception as e:
             logger.error(f"Error in AI Orchestrator cleanup: {e}")
     
+    def _build_router(self) -> CommandRouter:
+        """Register the process_command handlers by category"""
+        router = CommandRouter("orchestrator")
+        youtube = lambda match: self.web_search.handle_youtube_command(match.command)
+        
+        router.register("system_control", lambda match: self.system_controls.control_system(match.command),
+                        categories=["system_control"])
+        router.register("media_control", lambda match: self.media_controls.process_media_command(match.command),
+                        categories=["media_control"])
+        router.register("system_info", lambda match: self.get_system_info(match.command),
+                        categories=["system_info"])
+        router.register("screen_recording", lambda match: self.system_controls.screen_recording(match.command),
+                        categories=["screenshot"], keywords=RECORDING_KEYWORDS)
+        router.register("screenshot_library", lambda match: self.system_controls.screenshot_library(match.command),
+                        categories=["screenshot"], keywords=LIBRARY_KEYWORDS)
+        router.register("screenshot", lambda match: self.system_controls.take_screenshot(match.command),
+                        categories=["screenshot"])
+        # Video commands that are really YouTube searches
+        router.register("youtube", youtube, categories=["video_control"],
+                        keywords=["youtube", "search", "find", "watch"])
+        router.register("video_control", lambda match: self.web_search.youtube_handler.control_playback(match.command),
+                        categories=["video_control"])
+        router.register("youtube", youtube, categories=["youtube_search", "youtube_play"])
+        # Misclassified YouTube commands
+        router.register("youtube", youtube, categories=["web_search"], keywords=["youtube"])
+        router.register("web_search", lambda match: self.web_search.search_web(match.command),
+                        categories=["web_search"])
+        router.register("youtube", youtube, keywords=["youtube"])
+        router.register("uncertain", lambda match: self.process_uncertain_command(match.command))
+        router.compile()
+        return router
+    
     def process_command(self, command: str, category: str) -> bool:
         """Process a command with a known category"""
         try:
@@ -330,66 +396,7 @@ class AIOrchestrator:
                 return False
                 
             logger.info(f"Processing command: '{command}' in category: {category}")
-            
-            # Process by category
-            if category == "system_control":
-                return self.system_controls.control_system(command)
-                
-            elif category == "media_control":
-                if hasattr(self.media_controls, "handle_media") and callable(getattr(self.media_controls, "handle_media")):
-                    return self.media_controls.process_media_command(command)
-                elif hasattr(self.media_controls, "process_media_command") and callable(getattr(self.media_controls, "process_media_command")):
-                    return self.media_controls.process_media_command(command)
-                else:
-                    logger.error("MediaControls class doesn't have a valid media command handling method")
-                    return False
-                
-            elif category == "system_info":
-                return self.get_system_info(command)
-                
-            elif category == "screenshot":
-                return self.system_controls.take_screenshot()
-                
-            elif category == "video_control":
-                # Check if this might be a YouTube search instead of actual video control
-                if any(word in command.lower() for word in ["youtube", "search", "find", "watch"]):
-                    if "play" in command.lower():
-                        # Likely a "play X on YouTube" command
-                        return self.web_search.handle_youtube_command(command)
-                    else:
-                        # Other YouTube-related command
-                        return self.web_search.handle_youtube_command(command)
-                    
-                # If it's an actual control command, use control_playback
-                return self.web_search.youtube_handler.control_playback(command)
-                
-            elif category == "youtube_search" or "youtube" in command.lower():
-                # Handle YouTube specific commands
-                if "play" in command.lower():
-                    search_query = command.lower().replace("play", "").replace("youtube", "").replace("on", "").strip()
-                    return self.web_search.handle_youtube_command(command)
-                else:
-                    search_query = command.lower().replace("search", "").replace("youtube", "").replace("for", "").strip()
-                    return self.web_search.handle_youtube_command(command)
-                
-            elif category == "youtube_play":
-                search_query = command.lower().replace("play", "").replace("youtube", "").replace("on", "").strip()
-                return self.web_search.handle_youtube_command(command)
-                
-            elif category == "web_search":
-                # If command contains YouTube but was misclassified
-                if "youtube" in command.lower():
-                    if "play" in command.lower():
-                        search_query = command.lower().replace("play", "").replace("youtube", "").replace("on", "").strip()
-                        return self.web_search.handle_youtube_command(command)
-                    else:
-                        search_query = command.lower().replace("search", "").replace("youtube", "").replace("for", "").strip()
-                        return self.web_search.handle_youtube_command(command)
-                else:
-                    return self.web_search.search_web(command)
-                
-            else:
-                return self.process_uncertain_command(command)
+            return self.router.route(command, category)
                 
         except Exception as e:
             logger.error(f"Error in process_command: {e}")
@@ -433,7 +440,8 @@ class AIOrchestrator:
         try:
             # CPU usage
             if command and any(word in command.lower() for word in ["cpu", "processor"]):
-                cpu_percent = psutil.cpu_percent(interval=1)
+                sample = latest_sample()
+                cpu_percent = round(sample["cpu_percent"], 1) if sample else psutil.cpu_percent(interval=1)
                 print(f"CPU Usage: {cpu_percent}%")
                 speak(f"CPU usage is {cpu_percent} percent")
                 return True
@@ -0,0 +1,493 @@
+#!/usr/bin/env python
+"""
+Application Index for AI Desktop Assistant
+
+launch_application() used to map spoken names through the hard-coded
+WINDOWS_APPS dictionary and then search for the executable on every launch,
+walking all of Program Files, which is slow on a cold disk and finds nothing
+on Linux. Installed applications are now indexed in the background from:
+
+- PATH (executables) and .desktop files on Linux
+- The Start Menu shortcuts and Program Files executables on Windows
+- User aliases from `apps.aliases` and the built-in names in WINDOWS_APPS
+
+The index is saved to `apps.index_file`. On start it is loaded from there
+and refreshed incrementally: a directory whose modification time has not
+changed is not listed again. Spoken names are resolved with a trie: exact
+name, then the shortest name with it as a prefix ("visual studio" ->
+"visual studio code"), then a name one letter away, found through an index
+of one-letter deletions ("crome" -> "chrome").
+"""
+
+import json
+import logging
+import os
+import re
+import shlex
+import threading
+import time
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Which source wins when two of them index the same name
+KIND_PRIORITY = {"alias": 4, "start_menu": 3, "desktop": 3, "path": 2, "program_files": 1}
+
+# Executables in Program Files that are not applications
+SKIP_EXECUTABLE = re.compile(r"unins|setup|install|update|crash|helper|report|elevat|notif", re.IGNORECASE)
+
+# Desktop entry launch arguments such as %u and %F
+FIELD_CODE = re.compile(r"\s*%[a-zA-Z]")
+
+def normalize_name(name):
+    """
+    Normalize an application name for lookup
+    
+    Args:
+        name (str): File name, display name or spoken name
+    
+    Returns:
+        str: Lowercase words separated by single spaces, e.g.
+            "Google-Chrome.exe" -> "google chrome"
+    """
+    name = re.sub(r"\.(exe|lnk|url|desktop|appref-ms)$", "", name.strip().lower())
+    return " ".join(re.sub(r"[^a-z0-9+]+", " ", name).split())
+
+class _TrieNode:
+    __slots__ = ("children", "value", "shortest")
+    
+    def __init__(self):
+        self.children = {}
+        self.value = None  # (name, target) of a name ending here
+        self.shortest = None  # Shortest name below this node
+
+class NameTrie:
+    """Character trie over normalized names with prefix and fuzzy search"""
+    
+    def __init__(self):
+        self.root = _TrieNode()
+        self.size = 0
+        self._values = {}  # name -> value
+        self._deletes = {}  # one-letter deletion -> names
+    
+    def insert(self, name, value):
+        """Add a name; an existing name keeps its value"""
+        node = self.root
+        path = [node]
+        for char in name:
+            node = node.children.setdefault(char, _TrieNode())
+            path.append(node)
+        if node.value is not None:
+            return
+        node.value = value
+        self.size += 1
+        self._values[name] = value
+        for variant in deletions(name):
+            self._deletes.setdefault(variant, []).append(name)
+        for parent in path:
+            if parent.shortest is None or len(name) < len(parent.shortest[0]):
+                parent.shortest = (name, value)
+    
+    def _node(self, key):
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+    
+    def exact(self, key):
+        """Value of exactly this name, or None"""
+        node = self._node(key)
+        return node.value if node is not None else None
+    
+    def prefix(self, key):
+        """Value of the shortest name starting with key, or None"""
+        node = self._node(key)
+        return node.shortest[1] if node is not None and node.shortest else None
+    
+    def fuzzy(self, key):
+        """
+        Find the closest name one typing or recognition error away
+        
+        Every name is also stored under each of its one-letter deletions, so
+        an inserted, missing, wrong or swapped letter is found with a few
+        dictionary lookups instead of a scan.
+        
+        Args:
+            key (str): Name to look for
+        
+        Returns:
+            tuple: (distance, name, value) of the closest name, shortest
+                first on ties, or None
+        """
+        candidates = set(self._deletes.get(key, ()))
+        for variant in deletions(key):
+            candidates.update(self._deletes.get(variant, ()))
+            if variant in self._values:
+                candidates.add(variant)
+        best = None
+        for name in candidates:
+            distance = edit_distance(key, name)
+            if distance <= 2 and (best is None or (distance, len(name)) < best[:2]):
+                best = (distance, len(name), name)
+        return (best[0], best[2], self._values[best[2]]) if best else None
+
+def deletions(word):
+    """Every string made by deleting one character from word"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def edit_distance(a, b):
+    """Levenshtein distance, counting a swap of neighbouring letters as one edit"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+def default_sources():
+    """
+    Directories to index on this platform
+    
+    Returns:
+        list: (directory, kind, depth) tuples; depth is how many levels of
+            subdirectories are searched
+    """
+    sources = []
+    path_dirs = [d for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+    if os.name == "nt":
+        for base in (os.environ.get("ProgramData"), os.environ.get("APPDATA")):
+            if base:
+                sources.append((os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"), "start_menu", 3))
+        for variable in ("ProgramFiles", "ProgramFiles(x86)", "LOCALAPPDATA"):
+            base = os.environ.get(variable)
+            if base:
+                base = os.path.join(base, "Programs") if variable == "LOCALAPPDATA" else base
+                sources.append((base, "program_files", 2))
+        sources.extend((d, "path", 0) for d in path_dirs)
+    else:
+        data_dirs = os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+        data_dirs.insert(0, os.path.join(os.path.expanduser("~"), ".local", "share"))
+        data_dirs.append("/var/lib/flatpak/exports/share")
+        sources.extend((os.path.join(d, "applications"), "desktop", 1) for d in data_dirs if d)
+        sources.extend((d, "path", 0) for d in path_dirs)
+    return sources
+
+def read_desktop_entry(path):
+    """
+    Read the name and command of a .desktop file
+    
+    Args:
+        path (str): .desktop file
+    
+    Returns:
+        tuple: (name, command), or None for hidden or non-application entries
+    """
+    values = {}
+    in_entry = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                if in_entry:
+                    break
+                in_entry = line == "[Desktop Entry]"
+            elif in_entry and "=" in line:
+                key, value = line.split("=", 1)
+                values.setdefault(key.strip(), value.strip())
+    if values.get("Type", "Application") != "Application" or not values.get("Exec"):
+        return None
+    if values.get("NoDisplay", "").lower() == "true" or values.get("Hidden", "").lower() == "true":
+        return None
+    return values.get("Name", os.path.basename(path)), FIELD_CODE.sub("", values["Exec"]).strip()
+
+class AppIndex:
+    """Persistent index of installed applications by spoken name"""
+    
+    def __init__(self, index_file="cache/app_index.json", sources=None, aliases=None,
+                 builtin=None, refresh_interval=600):
+        """Initialize the index
+        
+        Args:
+            index_file (str): Where the index is saved between runs
+            sources (list, optional): (directory, kind, depth) tuples.
+                Defaults to default_sources().
+            aliases (dict, optional): Spoken name -> application name or path
+            builtin (dict, optional): Built-in spoken names, e.g. WINDOWS_APPS.
+                User aliases take precedence.
+            refresh_interval (float): Seconds between background refreshes;
+                0 refreshes only once at start
+        """
+        self.index_file = index_file
+        self.sources = default_sources() if sources is None else sources
+        self.aliases = dict(builtin or {})
+        self.aliases.update(aliases or {})
+        self.refresh_interval = float(refresh_interval)
+        self.rescanned = 0  # Directories listed in the last refresh
+        self._dirs = {}  # directory -> {"mtime", "kind", "depth", "entries", "subdirs"}
+        self._names = {}
+        self._trie = NameTrie()
+        self._resolved = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = threading.Event()
+        self._rebuild()
+    
+    # Scanning
+    
+    def _scan_dir(self, directory, kind, depth, mtime):
+        """List one directory"""
+        entries, subdirs = [], []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        if depth > 0:
+                            subdirs.append(entry.path)
+                        continue
+                    found = self._read_entry(entry, kind)
+                except OSError:
+                    continue
+                if found:
+                    entries.append(found)
+        self.rescanned += 1
+        return {"mtime": mtime, "kind": kind, "depth": depth, "entries": entries, "subdirs": subdirs}
+    
+    @staticmethod
+    def _read_entry(entry, kind):
+        """(display name, target) for an application file, or None"""
+        name = entry.name
+        lower = name.lower()
+        if kind == "desktop":
+            return read_desktop_entry(entry.path) if lower.endswith(".desktop") else None
+        if kind == "start_menu":
+            return (name, entry.path) if lower.endswith((".lnk", ".url", ".appref-ms")) else None
+        if kind == "program_files":
+            if lower.endswith(".exe") and not SKIP_EXECUTABLE.search(lower):
+                return name, entry.path
+            return None
+        # PATH
+        if os.name == "nt":
+            return (name, entry.path) if lower.endswith((".exe", ".bat", ".cmd")) else None
+        return (name, entry.path) if os.access(entry.path, os.X_OK) else None
+    
+    def _refresh_dir(self, directory, kind, depth, fresh):
+        if directory in fresh:
+            return
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return
+        cached = self._dirs.get(directory)
+        if cached is None or cached["mtime"] != mtime or cached["kind"] != kind or cached["depth"] != depth:
+            try:
+                cached = self._scan_dir(directory, kind, depth, mtime)
+            except OSError as e:
+                logger.debug(f"Cannot list {directory}: {e}")
+                return
+        fresh[directory] = cached
+        for subdir in cached["subdirs"]:
+            self._refresh_dir(subdir, kind, depth - 1, fresh)
+    
+    def refresh(self):
+        """
+        Bring the index up to date, listing only directories that changed
+        
+        Returns:
+            int: Number of directories that were listed
+        """
+        self.rescanned = 0
+        fresh = {}
+        for directory, kind, depth in self.sources:
+            self._refresh_dir(directory, kind, depth, fresh)
+        changed = self.rescanned or fresh.keys() != self._dirs.keys()
+        self._dirs = fresh
+        if changed:
+            self._rebuild()
+        return self.rescanned
+    
+    def _rebuild(self):
+        """Merge the directory listings and aliases into the lookup structures"""
+        names = {}
+        for listing in self._dirs.values():
+            priority = KIND_PRIORITY.get(listing["kind"], 0)
+            for display, target in listing["entries"]:
+                key = normalize_name(display)
+                if key and (key not in names or names[key][0] < priority):
+                    names[key] = (priority, target)
+        # Aliases point at an indexed name, or are a command themselves
+        for alias, value in self.aliases.items():
+            key = normalize_name(value)
+            target = names[key][1] if key in names else value
+            names[normalize_name(alias)] = (KIND_PRIORITY["alias"], target)
+        
+        trie = NameTrie()
+        # Full names first, so they win over trailing words of other names
+        ordered = sorted(names.items(), key=lambda item: -item[1][0])
+        for key, (_, target) in ordered:
+            trie.insert(key, (key, target))
+        # Trailing words: "firefox web browser" can be asked for as "web browser"
+        for key, (_, target) in ordered:
+            words = key.split()
+            for i in range(1, len(words)):
+                trie.insert(" ".join(words[i:]), (key, target))
+        
+        with self._lock:
+            self._names = {key: target for key, (_, target) in names.items()}
+            self._trie = trie
+            self._resolved = {}
+    
+    # Persistence
+    
+    def load(self):
+        """
+        Load the saved index
+        
+        Returns:
+            bool: True if a saved index was loaded
+        """
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") != INDEX_VERSION:
+                return False
+            self._dirs = {d: dict(listing, entries=[tuple(e) for e in listing["entries"]])
+                          for d, listing in saved["dirs"].items()}
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Error loading application index: {e}")
+            return False
+        self._rebuild()
+        return True
+    
+    def save(self):
+        """Save the index for the next start"""
+        try:
+            directory = os.path.dirname(self.index_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp = self.index_file + ".tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "dirs": self._dirs}, f)
+            os.replace(temp, self.index_file)
+        except Exception as e:
+            logger.error(f"Error saving application index: {e}")
+    
+    # Background refresh
+    
+    def _run(self):
+        while True:
+            try:
+                started = time.perf_counter()
+                listed = self.refresh()
+                if listed:
+                    self.save()
+                logger.info(f"Application index: {len(self._names)} names, {listed} directories listed "
+                            f"in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"Error refreshing application index: {e}")
+            self.ready.set()
+            if self.refresh_interval <= 0 or self._stop.wait(self.refresh_interval):
+                return
+    
+    def start(self):
+        """Load the saved index and refresh it in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="app-index", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop refreshing"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    # Lookup
+    
+    def resolve(self, spoken):
+        """
+        Find the application for a spoken name
+        
+        Args:
+            spoken (str): Name as recognized, e.g. "google chrome"
+        
+        Returns:
+            tuple: (indexed name, target) where target is a path or a command
+                line, or None if nothing is close enough
+        """
+        key = normalize_name(spoken)
+        if not key:
+            return None
+        with self._lock:
+            trie, resolved = self._trie, self._resolved
+        if key in resolved:
+            return resolved[key]
+        
+        found = trie.exact(key) or trie.prefix(key + " ")
+        if found is None and len(key) >= 4:
+            found = trie.prefix(key)
+        if found is None and len(key) >= 3:
+            match = trie.fuzzy(key)
+            found = match[2] if match else None
+        resolved[key] = found
+        return found
+    
+    def __len__(self):
+        return len(self._names)
+
+def launch_command(target):
+    """
+    Turn an index target into an argument list for subprocess
+    
+    Args:
+        target (str): Executable path or desktop entry command line
+    
+    Returns:
+        list: Arguments
+    """
+    if os.path.exists(target):
+        return [target]
+    try:
+        return shlex.split(target)
+    except ValueError:
+        return [target]
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_app_index(builtin=None):
+    """
+    Return the process-wide application index, starting it on first use
+    
+    Args:
+        builtin (dict, optional): Built-in spoken names used when the index
+            is created
+    
+    Returns:
+        AppIndex: The index configured in `apps`
+    """
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            extra = [(d, "program_files", 2) for d in config.get_nested("apps.extra_dirs", [])]
+            _shared_index = AppIndex(
+                index_file=config.get_nested("apps.index_file", "cache/app_index.json"),
+                sources=default_sources() + extra,
+                aliases=config.get_nested("apps.aliases", {}),
+                builtin=builtin,
+                refresh_interval=config.get_nested("apps.refresh_interval", 600)
+            )
+            _shared_index.start()
+        return _shared_index
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+"""
+Speech Recognition Backends for AI Desktop Assistant
+
+Recognition used to be hard-wired to the Google web API, so every command
+paid a network round trip and nothing worked offline. Backends share one
+interface instead:
+
+- recognize(audio): batch recognition of a finished utterance
+- recognize_nbest(audio, n): the n most likely transcripts with confidences
+- stream(chunks): optional partial results while audio is still arriving
+
+Available backends:
+
+- google: the Google web speech API through speech_recognition. Audio is
+  trimmed, resampled to 16 kHz and FLAC encoded before upload
+  (audio_preprocess.py).
+- vosk: offline recognition on the CPU. The model is loaded once and stays
+  resident for the lifetime of the process.
+- stub: deterministic stand-in for tests and benchmarks
+
+The backend is selected with `asr.backend` in config.json.
+"""
+
+import json
+import logging
+import threading
+import time
+
+import speech_recognition as sr
+
+from .audio_preprocess import AudioPreprocessor
+from .config_handler import config
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Confidence given to an alternative the recognizer did not score, relative
+# to the alternative ranked above it
+ALTERNATIVE_DECAY = 0.8
+
+def rank_alternatives(alternatives, n):
+    """
+    Turn recognizer alternatives into (text, confidence) pairs
+    
+    Args:
+        alternatives (list): (text, confidence) pairs, best first; the
+            confidence may be None
+        n (int): Most alternatives to keep
+    
+    Returns:
+        list: Up to n (text, confidence) pairs with unique, non-empty text
+    """
+    ranked = []
+    seen = set()
+    previous = 1.0
+    for text, confidence in alternatives:
+        text = (text or "").strip()
+        confidence = previous * ALTERNATIVE_DECAY if confidence is None and ranked else confidence
+        previous = 1.0 if confidence is None else float(confidence)
+        if not text or text.lower() in seen:
+            continue
+        seen.add(text.lower())
+        ranked.append((text, previous))
+        if len(ranked) >= n:
+            break
+    return ranked
+
+class ASRBackend:
+    """Base class for speech recognition backends"""
+    
+    name = "base"
+    sample_rate = 16000
+    
+    def load(self):
+        """
+        Load models or open connections ahead of the first command
+        
+        Returns:
+            bool: True if the backend is ready, False otherwise
+        """
+        return True
+    
+    def recognize(self, audio):
+        """
+        Recognize a finished utterance
+        
+        Args:
+            audio (sr.AudioData): Captured audio
+        
+        Returns:
+            str: Recognized text, or None if nothing was understood
+        """
+        raise NotImplementedError
+    
+    def recognize_nbest(self, audio, n=5):
+        """
+        Recognize a finished utterance and return alternative transcripts
+        
+        Backends without alternatives return the single best transcript.
+        
+        Args:
+            audio (sr.AudioData): Captured audio
+            n (int): Most alternatives to return
+        
+        Returns:
+            list: (text, confidence) pairs, best first; empty if nothing
+                was understood
+        """
+        text = self.recognize(audio)
+        return [(text, 1.0)] if text else []
+    
+    def stream(self, chunks):
+        """
+        Recognize audio while it is still arriving
+        
+        Backends without streaming support recognize the whole utterance
+        once the chunks run out and yield a single final result.
+        
+        Args:
+            chunks (iterable): 16-bit mono PCM byte strings at sample_rate
+        
+        Yields:
+            tuple: (text, final) pairs; final is True for the last result
+        """
+        data = b"".join(chunks)
+        yield self.recognize(sr.AudioData(data, self.sample_rate, 2)), True
+
+class GoogleBackend(ASRBackend):
+    """Google web speech API"""
+    
+    name = "google"
+    
+    def __init__(self, language="en-US", preprocessor=None):
+        """Initialize the backend
+        
+        Args:
+            language (str): Recognition language, e.g. "en-US" or "en-IN"
+            preprocessor (AudioPreprocessor, optional): Shrinks the audio
+                before upload. The audio is uploaded as captured without one.
+        """
+        self.language = language
+        self.recognizer = sr.Recognizer()
+        self.preprocessor = preprocessor
+        self.last_upload = None  # Sizes and timing of the latest request
+    
+    def _request(self, audio, **kwargs):
+        """
+        Upload an utterance and record how much was sent and how long it took
+        
+        Args:
+            audio (sr.AudioData): Captured audio
+            **kwargs: Passed on to recognize_google()
+        
+        Returns:
+            The result of recognize_google()
+        """
+        input_bytes = len(audio.get_raw_data())
+        upload_bytes = None
+        if self.preprocessor is not None:
+            with tracer.span("preprocess"):
+                audio = self.preprocessor.process(audio)
+                # Encoded here once; recognize_google() reuses the encoding
+                upload_bytes = len(audio.get_flac_data())
+        self.last_upload = {
+            "input_bytes": input_bytes,
+            "upload_bytes": upload_bytes,
+            "bytes_saved": input_bytes - upload_bytes if upload_bytes is not None else None,
+            "sample_rate": audio.sample_rate,
+            "upload_ms": None
+        }
+        started = time.perf_counter()
+        try:
+            with tracer.span("upload", bytes=upload_bytes, saved=self.last_upload["bytes_saved"]):
+                return self.recognizer.recognize_google(audio, language=self.language, **kwargs)
+        finally:
+            self.last_upload["upload_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if upload_bytes is not None:
+                logger.info(f"Uploaded {upload_bytes} bytes of FLAC instead of {input_bytes} bytes "
+                            f"of captured audio in {self.last_upload['upload_ms']:.0f}ms")
+    
+    def recognize(self, audio):
+        """Send the utterance to Google and return the transcript"""
+        try:
+            return self._request(audio)
+        except sr.UnknownValueError:
+            return None
+    
+    def recognize_nbest(self, audio, n=5):
+        """Return Google's alternative transcripts from a single request"""
+        try:
+            result = self._request(audio, show_all=True)
+        except sr.UnknownValueError:
+            return []
+        if not isinstance(result, dict):
+            return []  # Nothing was understood
+        # Google only scores the first alternative
+        return rank_alternatives(
+            [(item.get("transcript"), item.get("confidence")) for item in result.get("alternative", [])], n)
+
+class VoskBackend(ASRBackend):
+    """Offline recognition with a Vosk (Kaldi) model on the CPU"""
+    
+    name = "vosk"
+    
+    # Models are large, so each one is loaded once per process
+    _models = {}
+    _models_lock = threading.Lock()
+    
+    def __init__(self, model_path, sample_rate=16000):
+        """Initialize the backend
+        
+        Args:
+            model_path (str): Directory of an unpacked Vosk model
+            sample_rate (int): Sample rate audio is converted to
+        """
+        self.model_path = model_path
+        self.sample_rate = int(sample_rate)
+        self.model = None
+    
+    def load(self):
+        """Load the model, reusing it if it is already resident"""
+        if self.model is not None:
+            return True
+        try:
+            import vosk
+        except ImportError:
+            logger.error("Vosk is not installed. Install it with: pip install vosk")
+            return False
+        
+        try:
+            with self._models_lock:
+                model = self._models.get(self.model_path)
+                if model is None:
+                    vosk.SetLogLevel(-1)
+                    start = time.perf_counter()
+                    model = vosk.Model(self.model_path)
+                    self._models[self.model_path] = model
+                    logger.info(f"Loaded Vosk model {self.model_path} in {time.perf_counter() - start:.1f}s")
+            self.model = model
+            return True
+        except Exception as e:
+            logger.error(f"Error loading Vosk model {self.model_path}: {e}")
+            return False
+    
+    def _recognizer(self):
+        import vosk
+        if not self.load():
+            raise RuntimeError(f"Vosk model {self.model_path} is not available")
+        return vosk.KaldiRecognizer(self.model, self.sample_rate)
+    
+    @staticmethod
+    def _text(result):
+        return json.loads(result).get("text", "").strip()
+    
+    def recognize(self, audio):
+        """Recognize the utterance locally"""
+        recognizer = self._recognizer()
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        return self._text(recognizer.FinalResult()) or None
+    
+    def recognize_nbest(self, audio, n=5):
+        """Recognize the utterance locally and return Vosk's alternatives"""
+        recognizer = self._recognizer()
+        recognizer.SetMaxAlternatives(n)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        alternatives = json.loads(recognizer.FinalResult()).get("alternatives", [])
+        # Vosk scores are unnormalized likelihoods, so only their order is used
+        return rank_alternatives([(item.get("text"), None) for item in alternatives], n)
+    
+    def stream(self, chunks):
+        """Yield partial transcripts as chunks arrive, then the final one"""
+        recognizer = self._recognizer()
+        for chunk in chunks:
+            if recognizer.AcceptWaveform(chunk):
+                text = self._text(recognizer.Result())
+            else:
+                text = json.loads(recognizer.PartialResult()).get("partial", "").strip()
+            if text:
+                yield text, False
+        yield self._text(recognizer.FinalResult()) or None, True
+
+class StubBackend(ASRBackend):
+    """Deterministic recognizer for tests and benchmarks"""
+    
+    name = "stub"
+    
+    def __init__(self, text=None, latency=0.0, alternatives=None):
+        """Initialize the backend
+        
+        Args:
+            text (str, optional): Transcript returned for every utterance
+            latency (float): Seconds each recognition takes
+            alternatives (list, optional): (text, confidence) pairs returned
+                by recognize_nbest(). Defaults to the transcript alone.
+        """
+        self.text = text
+        self.latency = latency
+        self.alternatives = alternatives
+        self.calls = []
+    
+    def recognize(self, audio):
+        """Return the configured transcript"""
+        self.calls.append(len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
+        if self.latency:
+            time.sleep(self.latency)
+        return self.text or None
+    
+    def recognize_nbest(self, audio, n=5):
+        """Return the configured alternatives"""
+        if self.alternatives is None:
+            return super().recognize_nbest(audio, n)
+        self.recognize(audio)
+        return rank_alternatives(self.alternatives, n)
+    
+    def stream(self, chunks):
+        """Yield the transcript one word at a time once the audio has arrived"""
+        data = b"".join(chunks)
+        words = (self.text or "").split()
+        for i in range(1, len(words)):
+            yield " ".join(words[:i]), False
+        yield self.recognize(sr.AudioData(data, self.sample_rate, 2)), True
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "stub": StubBackend
+}
+
+def create_backend(name=None):
+    """
+    Create a backend from the `asr` section of the configuration
+    
+    A backend that fails to load falls back to `asr.fallback`.
+    
+    Args:
+        name (str, optional): Backend name. Defaults to `asr.backend`.
+    
+    Returns:
+        ASRBackend: The loaded backend
+    """
+    name = (name or config.get_nested("asr.backend", "google")).lower()
+    if name == "vosk":
+        backend = VoskBackend(
+            model_path=config.get_nested("asr.vosk.model_path", "models/vosk-model-small-en-us-0.15"),
+            sample_rate=config.get_nested("asr.vosk.sample_rate", 16000)
+        )
+    elif name == "stub":
+        backend = StubBackend(text=config.get_nested("asr.stub.text", None))
+    else:
+        if name not in BACKENDS:
+            logger.warning(f"Unknown ASR backend '{name}', using Google")
+        preprocessor = None
+        if config.get_nested("asr.preprocess.enabled", True):
+            preprocessor = AudioPreprocessor(
+                sample_rate=config.get_nested("asr.preprocess.sample_rate", 16000),
+                trim=config.get_nested("asr.preprocess.trim", True)
+            )
+        backend = GoogleBackend(language=config.get_nested("asr.language", "en-US"), preprocessor=preprocessor)
+    
+    if backend.load():
+        logger.info(f"Speech recognition backend: {backend.name}")
+        return backend
+    
+    fallback = config.get_nested("asr.fallback", "google")
+    if fallback and fallback.lower() != name:
+        logger.warning(f"ASR backend '{name}' could not be loaded, falling back to '{fallback}'")
+        return create_backend(fallback)
+    return backend
+
+_shared_backend = None
+_shared_lock = threading.Lock()
+
+def get_backend():
+    """
+    Return the process-wide backend, creating it on first use
+    
+    Returns:
+        ASRBackend: The configured backend
+    """
+    global _shared_backend
+    with _shared_lock:
+        if _shared_backend is None:
+            _shared_backend = create_backend()
+        return _shared_backend
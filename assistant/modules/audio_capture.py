@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+"""
+Audio Capture Engine for AI Desktop Assistant
+
+Opening the microphone and calibrating for ambient noise on every key press
+takes a quarter of a second or more, and the first syllable of the command
+is often lost in that time. The capture engine instead keeps a single input
+stream open in a background thread and writes every frame into a fixed-size
+ring buffer:
+
+- A rolling noise floor is estimated from recent frames, so no calibration
+  is needed before listening
+- mark() records the position in the stream when P is pressed; recording
+  starts from a short pre-roll before that position
+- The ring buffer stores every sample twice (a mirrored buffer), so any
+  window of recent audio is a contiguous, zero-copy numpy view
+- Utterance boundaries come from the endpointer (endpointing.py), and
+  recording stops as soon as P is released
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .config_handler import config
+from .endpointing import Endpointer
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+class RingBuffer:
+    """Fixed-size ring buffer of 16-bit samples with zero-copy windows"""
+    
+    def __init__(self, capacity):
+        """Initialize the buffer
+        
+        Args:
+            capacity (int): Number of samples kept
+        """
+        self.capacity = int(capacity)
+        # Every sample is written at i and i + capacity, so a window that
+        # wraps around the end of the ring is still one contiguous slice
+        self._data = np.zeros(self.capacity * 2, dtype=np.int16)
+        self.total = 0  # Samples written since the buffer was created
+    
+    def write(self, samples):
+        """
+        Append samples, overwriting the oldest ones
+        
+        Args:
+            samples (np.ndarray): 16-bit samples
+        """
+        count = len(samples)
+        if count > self.capacity:
+            self.total += count - self.capacity
+            samples = samples[-self.capacity:]
+            count = self.capacity
+        
+        pos = self.total % self.capacity
+        first = min(count, self.capacity - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[pos + self.capacity:pos + self.capacity + first] = samples[:first]
+        rest = count - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+        self.total += count
+    
+    def window(self, start, end=None):
+        """
+        Return recent samples as a view into the buffer
+        
+        Args:
+            start (int): Stream position of the first sample. Positions that
+                have already been overwritten are clamped to the oldest sample.
+            end (int, optional): Stream position after the last sample.
+                Defaults to the newest sample.
+        
+        Returns:
+            np.ndarray: Read-only view of the samples (no copy is made)
+        """
+        total = self.total
+        end = total if end is None else min(end, total)
+        start = max(start, total - self.capacity, 0)
+        if end <= start:
+            return self._data[:0]
+        offset = start % self.capacity
+        view = self._data[offset:offset + end - start]
+        view.flags.writeable = False
+        return view
+
+def frame_rms(samples):
+    """
+    Return the RMS energy of a block of samples
+    
+    Args:
+        samples (np.ndarray): 16-bit samples
+    
+    Returns:
+        float: RMS energy on the same scale as speech_recognition's thresholds
+    """
+    if len(samples) == 0:
+        return 0.0
+    values = samples.astype(np.float32)
+    return float(np.sqrt(np.mean(values * values)))
+
+class PyAudioSource:
+    """Microphone frame source backed by a PyAudio input stream"""
+    
+    def __init__(self, sample_rate, frame_size, device_index=None):
+        """Initialize the source
+        
+        Args:
+            sample_rate (int): Samples per second
+            frame_size (int): Samples returned by each read()
+            device_index (int, optional): Input device, or None for the default
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.device_index = device_index
+        self._audio = None
+        self._stream = None
+    
+    def open(self):
+        """Open the input stream"""
+        import pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_size
+        )
+    
+    def read(self):
+        """Return the next frame of 16-bit PCM bytes"""
+        return self._stream.read(self.frame_size, exception_on_overflow=False)
+    
+    def close(self):
+        """Close the input stream"""
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        finally:
+            if self._audio is not None:
+                self._audio.terminate()
+            self._stream = None
+            self._audio = None
+
+class AudioCaptureEngine:
+    """Keeps the microphone open and records utterances from a ring buffer"""
+    
+    def __init__(self, sample_rate=16000, frame_ms=20, buffer_seconds=30, pre_roll_ms=300,
+                 noise_window_seconds=3.0, endpointer=None, device_index=None):
+        """Initialize the engine
+        
+        Args:
+            sample_rate (int): Samples per second
+            frame_ms (int): Length of one frame in milliseconds
+            buffer_seconds (float): Audio kept in the ring buffer
+            pre_roll_ms (int): Audio kept from before the key press
+            noise_window_seconds (float): Recent audio the noise floor is
+                estimated from
+            endpointer (Endpointer, optional): Decides where utterances start
+                and end. Defaults to an Endpointer with default settings.
+            device_index (int, optional): Input device, or None for the default
+        """
+        self.sample_rate = int(sample_rate)
+        self.frame_size = max(1, self.sample_rate * int(frame_ms) // 1000)
+        self.pre_roll = self.sample_rate * int(pre_roll_ms) // 1000
+        self.endpointer = endpointer or Endpointer(sample_rate=self.sample_rate, frame_ms=frame_ms)
+        self.device_index = device_index
+        self.buffer = RingBuffer(int(self.sample_rate * buffer_seconds))
+        
+        # Per-frame energy of recent audio for the noise floor
+        noise_frames = max(1, int(noise_window_seconds * 1000 / frame_ms))
+        self._energies = np.zeros(noise_frames, dtype=np.float32)
+        self._energy_count = 0
+        
+        self._new_audio = threading.Condition()
+        self._thread = None
+        self._source = None
+        self.running = False
+    
+    # Stream
+    
+    def start(self, source=None):
+        """
+        Open the input stream and start filling the ring buffer
+        
+        Args:
+            source (object, optional): Frame source with open(), read() and
+                close(). Defaults to the microphone through PyAudio.
+        
+        Returns:
+            bool: True if the stream is running, False otherwise
+        """
+        if self.running:
+            return True
+        self._source = source or PyAudioSource(self.sample_rate, self.frame_size, self.device_index)
+        try:
+            self._source.open()
+        except Exception as e:
+            logger.error(f"Error opening audio input stream: {e}")
+            self._source = None
+            return False
+        
+        self.running = True
+        self._thread = threading.Thread(target=self._read_loop, name="audio-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Audio capture started at {self.sample_rate} Hz")
+        return True
+    
+    def stop(self):
+        """Stop the background thread and close the input stream"""
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._new_audio:
+            self._new_audio.notify_all()
+    
+    def _read_loop(self):
+        try:
+            while self.running:
+                data = self._source.read()
+                self.feed(np.frombuffer(data, dtype=np.int16))
+        except Exception as e:
+            logger.error(f"Audio capture stopped: {e}")
+        finally:
+            self.running = False
+            try:
+                self._source.close()
+            except Exception as e:
+                logger.error(f"Error closing audio input stream: {e}")
+            with self._new_audio:
+                self._new_audio.notify_all()
+    
+    def feed(self, samples):
+        """
+        Append captured samples to the ring buffer
+        
+        Called by the capture thread for every frame read from the stream.
+        
+        Args:
+            samples (np.ndarray): 16-bit samples
+        """
+        self.buffer.write(samples)
+        slot = self._energy_count % len(self._energies)
+        self._energies[slot] = frame_rms(samples)
+        self._energy_count += 1
+        with self._new_audio:
+            self._new_audio.notify_all()
+    
+    # Levels
+    
+    @property
+    def noise_floor(self):
+        """Rolling estimate of the background noise energy"""
+        count = min(self._energy_count, len(self._energies))
+        if count == 0:
+            return 0.0
+        # The quiet end of recent frames; speech rarely fills the whole window
+        return float(np.percentile(self._energies[:count], 20))
+    
+    def speech_threshold(self):
+        """Return the energy above which a frame counts as speech"""
+        return self.endpointer.threshold(self.noise_floor)
+    
+    # Recording
+    
+    def mark(self):
+        """
+        Return the current position in the stream
+        
+        Call this when P is pressed and pass the result to record().
+        
+        Returns:
+            int: Stream position in samples
+        """
+        return self.buffer.total
+    
+    def _wait_for(self, position, timeout):
+        """Wait until the stream has reached a position"""
+        with self._new_audio:
+            return self._new_audio.wait_for(
+                lambda: self.buffer.total >= position or not self.running, timeout=timeout)
+    
+    def record(self, start=None, timeout=5, phrase_limit=None, released=None):
+        """
+        Record one utterance
+        
+        The endpointer decides where speech starts and ends. Recording also
+        stops as soon as `released` is set, and leading and trailing silence
+        is trimmed from the result.
+        
+        Args:
+            start (int, optional): Stream position from mark(). Defaults to now.
+            timeout (float): Seconds to wait for speech to start
+            phrase_limit (float, optional): Longest utterance in seconds
+            released (threading.Event, optional): Set when the user releases P
+        
+        Returns:
+            np.ndarray: View of the trimmed utterance, or None if no speech
+                was heard
+        """
+        if start is None:
+            start = self.mark()
+        begin = max(start - self.pre_roll, self.buffer.total - self.buffer.capacity, 0)
+        tracker = self.endpointer.tracker(self.noise_floor, timeout=timeout, phrase_limit=phrase_limit)
+        frame = self.frame_size
+        position = begin
+        # Guard against a stalled stream in addition to the sample-based limits
+        deadline = time.monotonic() + timeout + (phrase_limit or timeout) + 1
+        
+        while not tracker.done:
+            frames = (self.buffer.total - position) // frame
+            if frames:
+                # Classify everything that arrived since the last pass at once
+                consumed = tracker.push(self.buffer.window(position, position + frames * frame))
+                position += consumed * frame
+                continue
+            if released is not None and released.is_set():
+                break
+            if not self.running or time.monotonic() > deadline:
+                break
+            self._wait_for(position + frame, 0.05)
+            
+        bounds = tracker.speech_bounds()
+        if bounds is None:
+            return None
+        return self.buffer.window(begin + bounds[0], begin + bounds[1])
+            
+    def capture(self, start=None, timeout=5, phrase_limit=None, released=None):
+        """
+        Record one utterance as audio for speech_recognition
+        
+        Args:
+            start (int, optional): Stream position from mark(). Defaults to now.
+            timeout (float): Seconds to wait for speech to start
+            phrase_limit (float, optional): Longest utterance in seconds
+            released (threading.Event, optional): Set when the user releases P
+        
+        Returns:
+            sr.AudioData: Captured audio, or None if no speech was heard
+        """
+        import speech_recognition as sr
+        
+        samples = self.record(start=start, timeout=timeout, phrase_limit=phrase_limit, released=released)
+        if samples is None or len(samples) == 0:
+            return None
+        # The ring keeps being written, so the recognizer gets its own copy
+        return sr.AudioData(samples.tobytes(), self.sample_rate, SAMPLE_WIDTH)
+
+def create_capture_engine():
+    """
+    Create a capture engine from the `audio_capture` and `endpointing`
+    sections of the configuration
+    
+    Returns:
+        AudioCaptureEngine: The engine; call start() to open the stream
+    """
+    sample_rate = config.get_nested("audio_capture.sample_rate", 16000)
+    frame_ms = config.get_nested("audio_capture.frame_ms", 20)
+    return AudioCaptureEngine(
+        sample_rate=sample_rate,
+        frame_ms=frame_ms,
+        buffer_seconds=config.get_nested("audio_capture.buffer_seconds", 30),
+        pre_roll_ms=config.get_nested("audio_capture.pre_roll_ms", 300),
+        noise_window_seconds=config.get_nested("audio_capture.noise_window_seconds", 3),
+        endpointer=Endpointer(
+            sample_rate=sample_rate,
+            frame_ms=frame_ms,
+            speech_ratio=config.get_nested("endpointing.speech_ratio", 2.5),
+            min_energy=config.get_nested("endpointing.min_energy", 100),
+            zcr_threshold=config.get_nested("endpointing.zcr_threshold", 0.3),
+            pause_ms=config.get_nested("endpointing.pause_ms", 400),
+            padding_ms=config.get_nested("endpointing.padding_ms", 100)
+        ),
+        device_index=config.get_nested("audio_capture.device_index", None)
+    )
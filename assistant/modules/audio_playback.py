@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Audio Playback for AI Desktop Assistant
+
+Plays WAV audio from a file or straight from a memory buffer, so cached and
+synthesized speech never has to go through a temp file or an external
+player. Playback is written to a PyAudio output stream a chunk at a time
+and can be cut off between chunks with stop(). The output stream is kept
+open between clips of the same format, so a clip starts without paying for
+device setup.
+
+On Windows without PyAudio, winsound is used instead; it cannot be stopped
+part way through a clip.
+"""
+
+import io
+import logging
+import threading
+import wave
+
+logger = logging.getLogger(__name__)
+
+class AudioPlayer:
+    """Plays WAV clips from files or bytes"""
+    
+    def __init__(self, chunk_frames=1024, device_index=None):
+        """Initialize the player
+        
+        Args:
+            chunk_frames (int): Frames written per chunk; stop() takes
+                effect at the next chunk
+            device_index (int, optional): Output device, or None for the default
+        """
+        self.chunk_frames = chunk_frames
+        self.device_index = device_index
+        self._audio = None
+        self._stream = None
+        self._format = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+    
+    def play(self, source):
+        """
+        Play a WAV clip, blocking until it ends or stop() is called
+        
+        Args:
+            source (str | bytes): Path of a WAV file, or WAV data in memory
+        
+        Returns:
+            bool: True if the clip played to the end, False otherwise
+        """
+        self._stop.clear()
+        try:
+            clip = wave.open(source if isinstance(source, str) else io.BytesIO(source), "rb")
+        except Exception as e:
+            logger.error(f"Error reading audio clip: {e}")
+            return False
+        
+        with self._lock, clip:
+            try:
+                stream = self._open_stream(clip.getsampwidth(), clip.getnchannels(), clip.getframerate())
+            except ImportError:
+                return self._play_winsound(source)
+            except Exception as e:
+                logger.error(f"Error opening audio output: {e}")
+                return False
+            
+            try:
+                while not self._stop.is_set():
+                    data = clip.readframes(self.chunk_frames)
+                    if not data:
+                        return True
+                    stream.write(data)
+                return False
+            except Exception as e:
+                logger.error(f"Error playing audio: {e}")
+                self._close_stream()
+                return False
+    
+    def stop(self):
+        """Cut off the clip that is playing"""
+        self._stop.set()
+    
+    def close(self):
+        """Release the output device"""
+        with self._lock:
+            self._close_stream()
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+    
+    def _open_stream(self, width, channels, rate):
+        """Return an output stream for the format, reusing the open one"""
+        import pyaudio
+        fmt = (width, channels, rate)
+        if self._stream is not None and self._format == fmt:
+            return self._stream
+        self._close_stream()
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            output_device_index=self.device_index,
+            frames_per_buffer=self.chunk_frames
+        )
+        self._format = fmt
+        return self._stream
+    
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.error(f"Error closing audio output: {e}")
+        self._stream = None
+        self._format = None
+    
+    def _play_winsound(self, source):
+        try:
+            import winsound
+        except ImportError:
+            logger.error("No audio output available. Install it with: pip install pyaudio")
+            return False
+        flags = winsound.SND_FILENAME if isinstance(source, str) else winsound.SND_MEMORY
+        winsound.PlaySound(source, flags)
+        return True
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Audio Pre-processing for AI Desktop Assistant
+
+The Google recognizer uploads the utterance exactly as it was recorded.
+sr.Microphone opens the device at its default rate, usually 44.1 or 48 kHz,
+and Recognizer.listen() keeps `non_speaking_duration` of silence on both
+sides, so most of the upload is bandwidth the recognizer does not need.
+Before upload the audio is now:
+
+- Downmixed to mono (interleaved multi-channel input only; AudioData from
+  speech_recognition is already mono)
+- Trimmed to the speech plus a little padding
+- Low-pass filtered and resampled to 16 kHz, the rate the recognizer works at
+- Encoded to FLAC once; the encoding is reused by the upload
+
+Every upload records the captured size, the uploaded size and how long the
+request took, so the savings can be checked on a real network.
+"""
+
+import logging
+
+import numpy as np
+import speech_recognition as sr
+
+from .endpointing import Endpointer
+
+logger = logging.getLogger(__name__)
+
+# Taps on each side of the low-pass filter used before downsampling
+FILTER_HALF_WIDTH = 16
+
+def downmix(samples, channels):
+    """
+    Average interleaved channels into mono
+    
+    Args:
+        samples (np.ndarray): Interleaved 16-bit samples
+        channels (int): Number of channels
+    
+    Returns:
+        np.ndarray: Mono 16-bit samples
+    """
+    if channels <= 1:
+        return samples
+    frames = len(samples) // channels
+    mixed = samples[:frames * channels].reshape(frames, channels).mean(axis=1)
+    return np.round(mixed).astype(np.int16)
+
+def resample(samples, rate, target_rate):
+    """
+    Resample 16-bit audio
+    
+    Downsampling first removes everything above the new Nyquist frequency
+    with a windowed-sinc filter, so higher frequencies do not alias into
+    the speech band.
+    
+    Args:
+        samples (np.ndarray): Mono 16-bit samples
+        rate (int): Sample rate of the samples
+        target_rate (int): Sample rate to convert to
+    
+    Returns:
+        np.ndarray: Mono 16-bit samples at target_rate
+    """
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    signal = samples.astype(np.float32)
+    if target_rate < rate:
+        cutoff = 0.5 * target_rate / rate
+        taps = np.arange(-FILTER_HALF_WIDTH, FILTER_HALF_WIDTH + 1)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        signal = np.convolve(signal, kernel / kernel.sum(), mode="same")
+    count = int(round(len(samples) * target_rate / rate))
+    positions = np.arange(count) * (rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(signal)), signal)
+    return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+
+class PreparedAudio(sr.AudioData):
+    """16-bit mono audio whose FLAC encoding is computed only once"""
+    
+    def __init__(self, frame_data, sample_rate, input_bytes):
+        """Initialize the audio
+        
+        Args:
+            frame_data (bytes): 16-bit mono samples
+            sample_rate (int): Sample rate of the samples
+            input_bytes (int): Size of the audio as it was captured
+        """
+        super().__init__(frame_data, sample_rate, 2)
+        self.input_bytes = input_bytes
+        self._flac = None
+    
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        """Return the FLAC encoding, reusing it when no conversion is asked for"""
+        if convert_rate not in (None, self.sample_rate) or convert_width not in (None, 2):
+            return super().get_flac_data(convert_rate, convert_width)
+        if self._flac is None:
+            self._flac = super().get_flac_data()
+        return self._flac
+
+class AudioPreprocessor:
+    """Shrinks captured audio before it is uploaded for recognition"""
+    
+    def __init__(self, sample_rate=16000, trim=True):
+        """Initialize the preprocessor
+        
+        Args:
+            sample_rate (int): Sample rate of the uploaded audio
+            trim (bool): Whether to cut the silence around the speech
+        """
+        self.sample_rate = int(sample_rate)
+        self.trim = trim
+    
+    def process_samples(self, samples, sample_rate, channels=1):
+        """
+        Downmix, trim and resample raw samples
+        
+        Args:
+            samples (np.ndarray): Interleaved 16-bit samples
+            sample_rate (int): Sample rate of the samples
+            channels (int): Number of interleaved channels
+        
+        Returns:
+            np.ndarray: Mono 16-bit samples at the target rate
+        """
+        samples = downmix(samples, channels)
+        if self.trim:
+            trimmed = Endpointer(sample_rate=sample_rate).trim(samples)
+            # Keep everything if no speech was found; the recognizer decides
+            if len(trimmed):
+                samples = trimmed
+        return resample(samples, sample_rate, self.sample_rate)
+    
+    def process(self, audio):
+        """
+        Prepare captured audio for upload
+        
+        Args:
+            audio (sr.AudioData): Captured audio
+        
+        Returns:
+            PreparedAudio: 16-bit mono audio at the target rate
+        """
+        if isinstance(audio, PreparedAudio):
+            return audio
+        raw = audio.get_raw_data(convert_width=2)
+        samples = self.process_samples(np.frombuffer(raw, dtype=np.int16), audio.sample_rate)
+        return PreparedAudio(samples.tobytes(), self.sample_rate, len(audio.get_raw_data()))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+Cloud Text-to-Speech for AI Desktop Assistant
+
+speak_google() used to create a new TextToSpeechClient for every call,
+synthesize the whole response, write it to temp_audio/output.mp3 and start
+it with os.system("start ..."), which spawned a process and only worked on
+Windows. CloudSpeaker replaces it:
+
+- One client, and so one gRPC channel, is shared for the whole process
+- Responses are split into sentences that are synthesized concurrently
+- Each sentence is requested as LINEAR16 WAV and played from memory as
+  soon as it and the sentences before it are ready, so the first audio
+  waits for the first sentence only, not the whole response
+
+`tts.google.endpoint` points the client at a plain gRPC server instead of
+the Google API, e.g. a local stand-in for tests.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Sentence boundaries: end punctuation followed by whitespace
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(endpoint=None):
+    """
+    Return the shared TextToSpeechClient for an endpoint, creating it once
+    
+    Args:
+        endpoint (str, optional): host:port of an insecure gRPC server to
+            use instead of the Google API
+    
+    Returns:
+        TextToSpeechClient: The pooled client
+    """
+    with _clients_lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            from google.cloud import texttospeech
+            if endpoint:
+                import grpc
+                from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcTransport
+                transport = TextToSpeechGrpcTransport(channel=grpc.insecure_channel(endpoint))
+                client = texttospeech.TextToSpeechClient(transport=transport)
+            else:
+                client = texttospeech.TextToSpeechClient()
+            _clients[endpoint] = client
+        return client
+
+def split_sentences(text, min_chars=20):
+    """
+    Split a response into sentences for synthesis
+    
+    Very short sentences ("Okay.") are joined to the next one, so no
+    request is spent on a single word.
+    
+    Args:
+        text (str): Response to speak
+        min_chars (int): Shortest sentence sent on its own
+    
+    Returns:
+        list: Sentences in order
+    """
+    sentences = []
+    pending = ""
+    for part in SENTENCE_END.split(text.strip()):
+        pending = f"{pending} {part}".strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+class CloudSpeaker:
+    """Speaks through Google Cloud TTS, one sentence at a time"""
+    
+    def __init__(self, player, voice="en-IN-Standard-A", language="en-IN", rate=1.0, volume=1.0,
+                 sample_rate=24000, endpoint=None, max_workers=4, fallback=None):
+        """Initialize the speaker
+        
+        Args:
+            player (AudioPlayer): Plays the synthesized audio
+            voice (str): Google voice name
+            language (str): Language code of the voice
+            rate (float): Speaking rate; 1.0 is the voice's normal speed
+            volume (float): Volume from 0.0 to 1.0
+            sample_rate (int): Sample rate of the synthesized audio
+            endpoint (str, optional): host:port of a stand-in gRPC server
+            max_workers (int): Sentences synthesized at the same time
+            fallback (object, optional): Local speaker used when the cloud
+                cannot be reached
+        """
+        self.player = player
+        self.voice = voice
+        self.language = language
+        self.rate = rate
+        self.volume = volume
+        self.sample_rate = sample_rate
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        self.fallback = fallback
+        self.client = None
+        self.first_audio_time = None  # Seconds from speak() to the first audio
+        self._executor = None
+        self._stop_requested = False
+    
+    def open(self):
+        """Connect the shared client and start the synthesis threads"""
+        self.client = get_client(self.endpoint)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cloud-tts")
+        if self.fallback is not None:
+            try:
+                self.fallback.open()
+            except Exception as e:
+                logger.error(f"Error initializing fallback speech engine: {e}")
+                self.fallback = None
+    
+    def synthesize(self, text):
+        """
+        Synthesize text
+        
+        Args:
+            text (str): Text to synthesize
+        
+        Returns:
+            bytes: WAV audio (LINEAR16 with a header)
+        """
+        from google.cloud import texttospeech
+        gain = 20 * math.log10(self.volume) if self.volume > 0 else -96.0
+        response = self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=texttospeech.VoiceSelectionParams(language_code=self.language, name=self.voice),
+            audio_config=texttospeech.AudioConfig(
+                audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+                sample_rate_hertz=self.sample_rate,
+                speaking_rate=self.rate,
+                volume_gain_db=max(-96.0, min(16.0, gain))
+            )
+        )
+        return response.audio_content
+    
+    def speak(self, text):
+        """Synthesize the sentences concurrently and play them in order"""
+        self._stop_requested = False
+        started = time.perf_counter()
+        self.first_audio_time = None
+        sentences = split_sentences(text)
+        futures = [self._executor.submit(self.synthesize, sentence) for sentence in sentences]
+        try:
+            for i, future in enumerate(futures):
+                if self._stop_requested:
+                    return
+                try:
+                    audio = future.result()
+                except Exception as e:
+                    if self.fallback is None:
+                        raise
+                    logger.error(f"Error with Google TTS, speaking locally: {e}")
+                    self.fallback.speak(" ".join(sentences[i:]))
+                    return
+                if self.first_audio_time is None:
+                    self.first_audio_time = time.perf_counter() - started
+                    logger.debug(f"First audio after {self.first_audio_time * 1000:.0f}ms")
+                self.player.play(audio)
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def render(self, text, path):
+        """Synthesize text into a WAV file"""
+        audio = self.synthesize(text)
+        with open(path, "wb") as f:
+            f.write(audio)
+    
+    def stop(self):
+        """Cut off the current response"""
+        self._stop_requested = True
+        self.player.stop()
+        if self.fallback is not None:
+            self.fallback.stop()
+    
+    def close(self):
+        """Stop the synthesis threads and release the audio output"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.player.close()
+        if self.fallback is not None:
+            self.fallback.close()
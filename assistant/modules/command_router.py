@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+"""
+Command Router for AI Desktop Assistant
+
+Handlers register the intent they serve together with the keywords that
+select it, the slots they extract from the command, and the shared
+resources they touch. The registry is compiled into a single keyword
+regex, so a command is lowercased and scanned once, and the first route
+whose requirements are met handles it.
+
+Keywords match at the start of a word, so "temp" also matches
+"temperature" but "start" no longer matches inside "restart".
+
+Routes are tried in registration order. A route registered without
+categories applies to every category, so global overrides (such as YouTube
+commands or locking the computer) are registered first and per-category
+defaults (routes without keywords) last.
+
+Every intent keeps call counts, error counts and a latency histogram.
+"""
+
+import logging
+import re
+import threading
+import time
+
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the handler latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class HandlerMetrics:
+    """Call count, error count and latency histogram for one intent"""
+    
+    def __init__(self):
+        """Initialize empty metrics"""
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+    
+    def record(self, elapsed, error=False):
+        """
+        Record one handler call
+        
+        Args:
+            elapsed (float): Handler run time in seconds
+            error (bool): Whether the handler raised or reported failure
+        """
+        bucket = len(LATENCY_BUCKETS)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                bucket = i
+                break
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.total_time += elapsed
+            self.histogram[bucket] += 1
+    
+    def snapshot(self):
+        """Return the metrics as a plain dictionary"""
+        with self._lock:
+            labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "mean_time": round(self.total_time / self.calls, 4) if self.calls else 0.0,
+                "histogram": dict(zip(labels, self.histogram))
+            }
+
+class Route:
+    """A registered handler and the conditions that select it"""
+    
+    def __init__(self, intent, handler, categories=None, keywords=(), require_all=(),
+                 slots=None, required_slots=(), resources=()):
+        self.intent = intent
+        self.handler = handler
+        self.categories = frozenset(categories) if categories else None
+        self.keywords = tuple(keywords)
+        self.require_all = tuple(require_all)
+        self.slots = {name: re.compile(pattern) for name, pattern in (slots or {}).items()}
+        self.required_slots = tuple(required_slots)
+        self.resources = frozenset(resources)
+    
+    def accepts(self, hits):
+        """Check the keyword requirements against the keywords found in a command"""
+        if self.keywords and hits.isdisjoint(self.keywords):
+            return False
+        return all(word in hits for word in self.require_all)
+    
+    def extract_slots(self, text):
+        """
+        Extract the slot values from a lowercased command
+        
+        Returns:
+            dict: Slot values, or None if a required slot is missing
+        """
+        values = {}
+        for name, pattern in self.slots.items():
+            match = pattern.search(text)
+            value = match.group(name) if match else None
+            if value:
+                values[name] = value.strip()
+        if any(name not in values for name in self.required_slots):
+            return None
+        return values
+
+class RouteMatch:
+    """The routing decision for one command"""
+    
+    def __init__(self, route, command, text, category, hits, slots):
+        self.route = route
+        self.command = command
+        self.text = text
+        self.category = category
+        self.hits = hits
+        self.slots = slots
+    
+    @property
+    def intent(self):
+        """Intent of the selected route, or None if no route matched"""
+        return self.route.intent if self.route else None
+    
+    @property
+    def resources(self):
+        """Shared resources claimed by the selected route"""
+        return self.route.resources if self.route else frozenset()
+    
+    def first_hit(self, words):
+        """Return the first of the given keywords found in the command, or None"""
+        return next((word for word in words if word in self.hits), None)
+
+    def first_word(self, words):
+        """
+        Return the first of the given words found whole in the command text
+        
+        Unlike first_hit(), the words need not be route keywords, so a
+        handler can tell "volume up" from "volume down" itself.
+        """
+        return next((word for word in words if re.search(r"\b" + re.escape(word) + r"\b", self.text)), None)
+
+class CommandRouter:
+    """Declarative routing registry compiled into one dispatch decision per command"""
+    
+    def __init__(self, name="commands"):
+        """Initialize an empty router
+        
+        Args:
+            name (str): Router name used in log messages
+        """
+        self.name = name
+        self.routes = []
+        self._metrics = {}
+        self._pattern = None
+        self._implied = {}
+        self._candidates = {}
+        self._global = []
+    
+    def register(self, intent, handler, categories=None, keywords=(), require_all=(),
+                 slots=None, required_slots=(), resources=()):
+        """
+        Register a handler
+        
+        Args:
+            intent (str): Intent name; routes sharing an intent share metrics
+            handler (callable): handler(match) called with the RouteMatch
+            categories (iterable, optional): Command categories the route
+                applies to. None applies it to every category.
+            keywords (iterable): At least one must appear in the command.
+                Empty makes the route the default for its categories.
+            require_all (iterable): Keywords that must all appear
+            slots (dict, optional): Slot name -> regex with a group of the
+                same name, applied to the lowercased command
+            required_slots (iterable): Slots that must be extracted for the
+                route to match
+            resources (iterable): Shared resources the handler touches
+        
+        Returns:
+            Route: The registered route
+        """
+        route = Route(intent, handler, categories, keywords, require_all, slots, required_slots, resources)
+        self.routes.append(route)
+        self._metrics.setdefault(intent, HandlerMetrics())
+        self._pattern = None
+        return route
+    
+    def compile(self):
+        """Build the keyword regex and the per-category candidate lists"""
+        vocabulary = sorted(
+            {word for route in self.routes for word in route.keywords + route.require_all},
+            key=len, reverse=True
+        )
+        # Longer keywords win the alternation, so remember the shorter
+        # keywords they contain as a prefix (e.g. "lock computer" -> "lock")
+        self._implied = {
+            word: frozenset(other for other in vocabulary if word.startswith(other))
+            for word in vocabulary
+        }
+        if vocabulary:
+            self._pattern = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in vocabulary) + ")")
+        else:
+            self._pattern = re.compile(r"(?!)")
+        
+        categories = {category for route in self.routes if route.categories for category in route.categories}
+        self._candidates = {
+            category: [route for route in self.routes if route.categories is None or category in route.categories]
+            for category in categories
+        }
+        self._global = [route for route in self.routes if route.categories is None]
+        logger.info(f"Compiled {self.name} router: {len(self.routes)} routes, {len(vocabulary)} keywords")
+    
+    def resolve(self, command, category=None):
+        """
+        Pick the route for a command
+        
+        Args:
+            command (str): Command text
+            category (str, optional): Predicted command category
+        
+        Returns:
+            RouteMatch: The routing decision; its route is None if nothing matched
+        """
+        if self._pattern is None:
+            self.compile()
+        
+        text = (command or "").strip().lower()
+        hits = set()
+        for match in self._pattern.finditer(text):
+            hits |= self._implied[match.group(0)]
+        
+        for route in self._candidates.get(category, self._global):
+            if not route.accepts(hits):
+                continue
+            slots = route.extract_slots(text)
+            if slots is None:
+                continue
+            return RouteMatch(route, command, text, category, hits, slots)
+        
+        return RouteMatch(None, command, text, category, hits, {})
+    
+    def dispatch(self, match):
+        """
+        Run the handler selected by resolve()
+        
+        Exceptions are counted against the intent and re-raised.
+        
+        Args:
+            match (RouteMatch): Routing decision
+        
+        Returns:
+            The handler result, or False if no route matched
+        """
+        if match.route is None:
+            logger.warning(f"No {self.name} route for command: {match.command}")
+            return False
+        
+        metrics = self._metrics[match.intent]
+        start = time.perf_counter()
+        try:
+            with tracer.span("handler", intent=match.intent, router=self.name):
+                result = match.route.handler(match)
+        except Exception:
+            metrics.record(time.perf_counter() - start, error=True)
+            raise
+        metrics.record(time.perf_counter() - start, error=result is False)
+        return result
+    
+    def route(self, command, category=None):
+        """Resolve and dispatch a command in one call"""
+        return self.dispatch(self.resolve(command, category))
+    
+    def metrics(self):
+        """Return the metrics of every intent"""
+        return {intent: metrics.snapshot() for intent, metrics in self._metrics.items()}
@@ -100,6 +100,185 @@ class ConfigHandler:
                 "weather": "",
                 "news": "",
                 "google_speech": ""
+            },
+            "pipeline": {
+                "queue_size": 2
+            },
+            "execution": {
+                "max_workers": 4
+            },
+            "tracing": {
+                "enabled": False,
+                "file": "traces/commands.jsonl",
+                "max_bytes": 5242880,
+                "backup_count": 3
+            },
+            "result_cache": {
+                "queries": {
+                    "cpu": {
+                        "ttl": 3,
+                        "max_stale": 30
+                    },
+                    "memory": {
+                        "ttl": 3,
+                        "max_stale": 30
+                    },
+                    "disk": {
+                        "ttl": 60,
+                        "max_stale": 600
+                    },
+                    "battery": {
+                        "ttl": 10,
+                        "max_stale": 60
+                    },
+                    "wifi": {
+                        "ttl": 10,
+                        "max_stale": 60
+                    },
+                    "temperature": {
+                        "ttl": 5,
+                        "max_stale": 30
+                    },
+                    "location": {
+                        "ttl": 3600,
+                        "max_stale": 86400
+                    },
+                    "weather": {
+                        "ttl": 600,
+                        "max_stale": 1800
+                    }
+                }
+            },
+            "audio_capture": {
+                "enabled": True,
+                "sample_rate": 16000,
+                "frame_ms": 20,
+                "buffer_seconds": 30,
+                "pre_roll_ms": 300,
+                "noise_window_seconds": 3,
+                "device_index": None
+            },
+            "endpointing": {
+                "speech_ratio": 2.5,
+                "min_energy": 100,
+                "zcr_threshold": 0.3,
+                "pause_ms": 400,
+                "padding_ms": 100
+            },
+            "asr": {
+                "backend": "google",
+                "fallback": "google",
+                "language": "en-US",
+                "nbest": 5,
+                "preprocess": {
+                    "enabled": True,
+                    "sample_rate": 16000,
+                    "trim": True
+                },
+                "vosk": {
+                    "model_path": "models/vosk-model-small-en-us-0.15",
+                    "sample_rate": 16000
+                },
+                "stub": {
+                    "text": ""
+                }
+            },
+            "tts": {
+                "engine": "local",
+                "rate": 150,
+                "queue_size": 8,
+                "google": {
+                    "voice": "en-IN-Standard-A",
+                    "language": "en-IN",
+                    "speaking_rate": 1.0,
+                    "sample_rate": 24000,
+                    "max_workers": 4,
+                    "endpoint": None
+                },
+                "cache": {
+                    "enabled": True,
+                    "directory": "cache/tts",
+                    "max_mb": 50,
+                    "memory_items": 32,
+                    "warm": True
+                }
+            },
+            "wake_word": {
+                "enabled": False,
+                "hotkey": True,
+                "templates": "models/wake_word",
+                "threshold": 2.0,
+                "pause_ms": 200,
+                "cooldown_ms": 1500,
+                "interval_ms": 100,
+                "cpu_budget": 3.0
+            },
+            "telemetry": {
+                "enabled": True,
+                "interval": 1.0,
+                "length": 900,
+                "store": {
+                    "enabled": True,
+                    "directory": "telemetry",
+                    "segment_kb": 1024,
+                    "max_segments": 8
+                }
+            },
+            "apps": {
+                "index_file": "cache/app_index.json",
+                "refresh_interval": 600,
+                "aliases": {},
+                "extra_dirs": []
+            },
+            "network": {
+                "cache_ttl": 2.0,
+                "netlink": True,
+                "subprocess_timeout": 2.0,
+                "sys_root": "/sys",
+                "proc_root": "/proc"
+            },
+            "sensors": {
+                "enabled": True,
+                "interval": 5.0,
+                "timeout": 2.0,
+                "sys_root": "/sys"
+            },
+            "disk_usage": {
+                "workers": 4,
+                "timeout": 1.0,
+                "deadline": 2.0,
+                "ttl": 30.0,
+                "retry_after": 300.0
+            },
+            "processes": {
+                "min_interval": 1.0,
+                "refresh_interval": 5.0,
+                "max_baseline_age": 10.0
+            },
+            "screenshots": {
+                "directory": "",
+                "format": "png",
+                "png_level": 1,
+                "jpeg_quality": 85,
+                "webp_quality": 80,
+                "webp_lossless": False,
+                "workers": 2,
+                "delay": 0.0,
+                "burst_interval": 0.5,
+                "open_after": True
+            },
+            "screen_recording": {
+                "directory": "",
+                "fps": 5.0,
+                "tile": 32,
+                "max_seconds": 600,
+                "format": "auto",
+                "max_width": 1280
+            },
+            "screenshot_library": {
+                "enabled": True,
+                "database": "",
+                "thumbnail_size": 256
             }
         }
         
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+"""
+Disk Usage for AI Desktop Assistant
+
+The disk branch of get_system_info() called psutil.disk_usage() on every
+mounted partition in turn. A stale NFS or SMB mount, or a USB drive that has
+to spin up, blocked the whole command for as long as the kernel waited,
+possibly forever. Disk statistics are now gathered by a small pool of
+worker threads:
+
+- Every mount is measured concurrently, and each has `disk_usage.timeout`
+  seconds to answer
+- The whole collection returns within `disk_usage.deadline` seconds, however
+  many mounts there are; a mount that has not answered by then is reported
+  from its last reading, if any
+- Readings are cached per mount for `disk_usage.ttl` seconds
+- A mount that times out or fails is marked unreachable and skipped for
+  `disk_usage.retry_after` seconds. Its stuck call is never submitted twice,
+  and the pool starts a replacement worker so healthy mounts are not
+  starved.
+
+Workers are daemon threads, so a call stuck in the kernel cannot keep the
+assistant from exiting.
+"""
+
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import psutil
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+class MountUsage(NamedTuple):
+    device: str
+    mountpoint: str
+    fstype: str
+    percent: Optional[float]
+    used: Optional[int]  # Bytes
+    total: Optional[int]  # Bytes
+    reachable: bool
+    stale: bool  # From an earlier collection because this one ran out of time
+
+class WorkerPool:
+    """Daemon worker threads that can write off a worker stuck in a call"""
+    
+    def __init__(self, size=4, name="disk-usage"):
+        self.size = size
+        self.name = name
+        self.tasks = queue.Queue()
+        self.threads = 0
+        self.abandoned = 0
+        self._written_off = set()  # Futures whose worker has been replaced
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._spawn()
+    
+    def _spawn(self):
+        with self._lock:
+            self.threads += 1
+            number = self.threads
+        threading.Thread(target=self._work, name=f"{self.name}-{number}", daemon=True).start()
+    
+    def _work(self):
+        while True:
+            function, future = self.tasks.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function())
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._lock:
+                # A written-off worker that finally returns makes way for its replacement
+                if future in self._written_off:
+                    self._written_off.discard(future)
+                    self.threads -= 1
+                    return
+    
+    def submit(self, function):
+        """
+        Run a function on a worker
+        
+        Args:
+            function (callable): Called without arguments
+        
+        Returns:
+            concurrent.futures.Future: Its result
+        """
+        future = concurrent.futures.Future()
+        self.tasks.put((function, future))
+        return future
+    
+    def abandon(self, future):
+        """
+        Start a replacement for the worker stuck running a future
+        
+        Args:
+            future (concurrent.futures.Future): The call that did not return
+        """
+        with self._lock:
+            if future.done() or future in self._written_off:
+                return
+            self._written_off.add(future)
+            self.abandoned += 1
+        self._spawn()
+
+class _Mount:
+    __slots__ = ("usage", "fetched_at", "future", "submitted_at", "unreachable_until", "error")
+    
+    def __init__(self):
+        self.usage = None
+        self.fetched_at = 0.0
+        self.future = None
+        self.submitted_at = 0.0
+        self.unreachable_until = 0.0
+        self.error = None
+
+class DiskUsageCollector:
+    """Measures mounted partitions concurrently within a deadline"""
+    
+    def __init__(self, workers=4, timeout=1.0, deadline=2.0, ttl=30.0, retry_after=300.0,
+                 partitions=None, usage=None):
+        """
+        Initialize the collector
+        
+        Args:
+            workers (int): Worker threads
+            timeout (float): Seconds one mount has to answer
+            deadline (float): Seconds a whole collection may take
+            ttl (float): Seconds a mount's reading is reused
+            retry_after (float): Seconds an unreachable mount is skipped
+            partitions (callable, optional): Lists partitions; defaults to
+                psutil.disk_partitions
+            usage (callable, optional): usage(mountpoint) -> object with
+                percent, used and total; defaults to psutil.disk_usage
+        """
+        self.timeout = timeout
+        self.deadline = deadline
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.list_partitions = partitions or psutil.disk_partitions
+        self.usage = usage or psutil.disk_usage
+        self.pool = WorkerPool(workers)
+        
+        self._mounts = {}  # Mount point -> _Mount
+        self._partitions = None
+        self._partitions_at = 0.0
+        self._listing = None
+        self._lock = threading.Lock()
+    
+    def _partitions_within(self, end):
+        """List partitions through the pool so a hung listing cannot block"""
+        now = time.monotonic()
+        if self._partitions is not None and now - self._partitions_at <= self.ttl:
+            return self._partitions
+        if self._listing is None or self._listing.done():
+            self._listing = self.pool.submit(self.list_partitions)
+        try:
+            self._partitions = [p for p in self._listing.result(timeout=max(0.0, end - now)) if p.fstype]
+            self._partitions_at = time.monotonic()
+        except concurrent.futures.TimeoutError:
+            logger.warning("Listing partitions timed out, using the previous list")
+        except Exception as e:
+            logger.error(f"Error listing partitions: {e}")
+        return self._partitions or []
+    
+    def _finished(self, mountpoint, future):
+        """Record a measurement, including one that arrives after its timeout"""
+        with self._lock:
+            mount = self._mounts[mountpoint]
+            try:
+                mount.usage = future.result()
+                mount.fetched_at = time.monotonic()
+                mount.unreachable_until = 0.0
+                mount.error = None
+            except Exception as e:
+                mount.error = str(e)
+                mount.unreachable_until = time.monotonic() + self.retry_after
+                logger.warning(f"Disk usage of {mountpoint} failed: {e}")
+    
+    def collect(self, deadline=None):
+        """
+        Measure every mounted partition
+        
+        Args:
+            deadline (float, optional): Seconds to wait at most; defaults to
+                the configured deadline
+        
+        Returns:
+            list: MountUsage for every partition, unreachable ones included
+                with reachable=False
+        """
+        started = time.monotonic()
+        end = started + (self.deadline if deadline is None else deadline)
+        partitions = self._partitions_within(end)
+        
+        waiting, submitted = [], []
+        with self._lock:
+            for partition in partitions:
+                mount = self._mounts.setdefault(partition.mountpoint, _Mount())
+                if mount.unreachable_until > started:
+                    continue
+                if mount.usage is not None and started - mount.fetched_at <= self.ttl:
+                    continue
+                if mount.future is None or mount.future.done():
+                    # Claimed under the lock, so a concurrent collect() waits
+                    # for this call instead of submitting its own
+                    mount.submitted_at = started
+                    mount.future = self.pool.submit(lambda mountpoint=partition.mountpoint: self.usage(mountpoint))
+                    submitted.append((partition.mountpoint, mount.future))
+                waiting.append((mount.future, mount.submitted_at))
+        # Outside the lock, which the callback takes (it runs at once if the
+        # call has already finished)
+        for mountpoint, future in submitted:
+            future.add_done_callback(lambda f, mountpoint=mountpoint: self._finished(mountpoint, f))
+        
+        if waiting:
+            futures = [future for future, _ in waiting]
+            latest = max(submitted_at for _, submitted_at in waiting) + self.timeout
+            concurrent.futures.wait(futures, timeout=max(0.0, min(end, latest) - time.monotonic()))
+        
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            for partition in partitions:
+                mount = self._mounts[partition.mountpoint]
+                pending = mount.future is not None and not mount.future.done()
+                if pending and now - mount.submitted_at >= self.timeout and mount.unreachable_until <= now:
+                    # Stuck in the kernel: skip it until retry_after has passed
+                    mount.unreachable_until = now + self.retry_after
+                    mount.error = f"no answer within {self.timeout}s"
+                    self.pool.abandon(mount.future)
+                    logger.warning(f"Disk usage of {partition.mountpoint} timed out, skipping it")
+                if mount.unreachable_until > now or mount.usage is None:
+                    results.append(MountUsage(partition.device, partition.mountpoint, partition.fstype,
+                                              None, None, None, False, False))
+                    continue
+                usage = mount.usage
+                results.append(MountUsage(partition.device, partition.mountpoint, partition.fstype,
+                                          usage.percent, usage.used, usage.total, True,
+                                          pending and now - mount.fetched_at > self.ttl))
+        return results
+    
+    def stats(self):
+        """Mount counters for the log"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "mounts": len(self._mounts),
+                "unreachable": sorted(m for m, state in self._mounts.items() if state.unreachable_until > now),
+                "workers": self.pool.threads,
+                "abandoned": self.pool.abandoned
+            }
+
+_shared_collector = None
+_shared_lock = threading.Lock()
+
+def get_disk_usage():
+    """
+    Return the process-wide disk usage collector
+    
+    Returns:
+        DiskUsageCollector: The collector configured in `disk_usage`
+    """
+    global _shared_collector
+    with _shared_lock:
+        if _shared_collector is None:
+            _shared_collector = DiskUsageCollector(
+                workers=config.get_nested("disk_usage.workers", 4),
+                timeout=config.get_nested("disk_usage.timeout", 1.0),
+                deadline=config.get_nested("disk_usage.deadline", 2.0),
+                ttl=config.get_nested("disk_usage.ttl", 30.0),
+                retry_after=config.get_nested("disk_usage.retry_after", 300.0)
+            )
+        return _shared_collector
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+"""
+Voice Activity Endpointing for AI Desktop Assistant
+
+Decides where an utterance starts and ends from the audio itself. Frames
+are classified as speech with two vectorized features computed over all
+frames at once:
+
+- Energy (RMS) above a threshold derived from the noise floor catches
+  voiced sounds
+- A high zero-crossing rate at a lower energy catches unvoiced sounds such
+  as "s" and "f", which are quiet but noisy
+
+The utterance ends after a short pause, at the phrase limit or when the
+caller says so (the user released P). Leading and trailing silence is
+trimmed before the audio is sent to the recognizer.
+"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class Endpointer:
+    """Energy and zero-crossing voice activity detection"""
+    
+    def __init__(self, sample_rate=16000, frame_ms=20, speech_ratio=2.5, min_energy=100,
+                 zcr_threshold=0.3, pause_ms=400, padding_ms=100):
+        """Initialize the endpointer
+        
+        Args:
+            sample_rate (int): Samples per second
+            frame_ms (int): Length of one analysis frame in milliseconds
+            speech_ratio (float): How far above the noise floor a frame must
+                be to count as voiced speech
+            min_energy (float): Lowest energy that counts as speech
+            zcr_threshold (float): Zero crossings per sample above which a
+                quieter frame counts as unvoiced speech
+            pause_ms (int): Silence that ends an utterance
+            padding_ms (int): Silence kept on both sides of trimmed speech
+        """
+        self.sample_rate = int(sample_rate)
+        self.frame_ms = int(frame_ms)
+        self.frame_size = max(2, self.sample_rate * self.frame_ms // 1000)
+        self.speech_ratio = float(speech_ratio)
+        self.min_energy = float(min_energy)
+        self.zcr_threshold = float(zcr_threshold)
+        self.pause_frames = max(1, -(-int(pause_ms) // self.frame_ms))
+        self.padding = self.sample_rate * int(padding_ms) // 1000
+    
+    def features(self, samples):
+        """
+        Compute per-frame energy and zero-crossing rate
+        
+        Args:
+            samples (np.ndarray): 16-bit samples; a trailing partial frame
+                is ignored
+        
+        Returns:
+            tuple: (energy, zcr) arrays with one value per frame
+        """
+        count = len(samples) // self.frame_size
+        frames = np.asarray(samples[:count * self.frame_size]).reshape(count, self.frame_size)
+        values = frames.astype(np.float32)
+        energy = np.sqrt(np.mean(values * values, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+        return energy, zcr
+    
+    def estimate_noise_floor(self, energy):
+        """
+        Estimate the noise floor from frame energies
+        
+        Args:
+            energy (np.ndarray): Per-frame energy
+        
+        Returns:
+            float: Energy of the quiet end of the frames
+        """
+        if len(energy) == 0:
+            return 0.0
+        return float(np.percentile(energy, 20))
+    
+    def threshold(self, noise_floor):
+        """Return the energy above which a frame counts as voiced speech"""
+        return max(noise_floor * self.speech_ratio, self.min_energy)
+    
+    def speech_frames(self, samples, noise_floor=None):
+        """
+        Classify frames as speech or silence
+        
+        Args:
+            samples (np.ndarray): 16-bit samples
+            noise_floor (float, optional): Background energy. Estimated from
+                the samples when not given.
+        
+        Returns:
+            np.ndarray: Boolean array, True for speech frames
+        """
+        energy, zcr = self.features(samples)
+        if noise_floor is None:
+            noise_floor = self.estimate_noise_floor(energy)
+        threshold = self.threshold(noise_floor)
+        voiced = energy > threshold
+        unvoiced = (energy > max(threshold * 0.6, self.min_energy)) & (zcr > self.zcr_threshold)
+        return voiced | unvoiced
+    
+    def trim(self, samples, noise_floor=None):
+        """
+        Trim leading and trailing silence
+        
+        Args:
+            samples (np.ndarray): 16-bit samples
+            noise_floor (float, optional): Background energy. Estimated from
+                the samples when not given.
+        
+        Returns:
+            np.ndarray: View of the speech with padding_ms of silence on
+                each side, or an empty view if there is no speech
+        """
+        hits = np.flatnonzero(self.speech_frames(samples, noise_floor))
+        if hits.size == 0:
+            return samples[:0]
+        begin = max(hits[0] * self.frame_size - self.padding, 0)
+        end = min((hits[-1] + 1) * self.frame_size + self.padding, len(samples))
+        return samples[begin:end]
+    
+    def tracker(self, noise_floor, timeout=None, phrase_limit=None):
+        """
+        Start tracking an utterance in a stream of audio
+        
+        Args:
+            noise_floor (float): Background energy when recording started
+            timeout (float, optional): Seconds to wait for speech to start
+            phrase_limit (float, optional): Longest utterance in seconds
+        
+        Returns:
+            UtteranceTracker: Tracker to push audio into
+        """
+        return UtteranceTracker(self, noise_floor, timeout, phrase_limit)
+
+class UtteranceTracker:
+    """Finds the end of one utterance in audio pushed block by block"""
+    
+    def __init__(self, endpointer, noise_floor, timeout=None, phrase_limit=None):
+        """Initialize the tracker
+        
+        Args:
+            endpointer (Endpointer): Frame classifier and pause length
+            noise_floor (float): Background energy when recording started
+            timeout (float, optional): Seconds to wait for speech to start
+            phrase_limit (float, optional): Longest utterance in seconds
+        """
+        self.endpointer = endpointer
+        self.noise_floor = noise_floor
+        frames_per_second = 1000 / endpointer.frame_ms
+        self.timeout_frames = int(timeout * frames_per_second) if timeout else None
+        self.limit_frames = int(phrase_limit * frames_per_second) if phrase_limit else None
+        
+        self.frames = 0           # Frames consumed so far
+        self.speech_start = None  # First speech frame
+        self.last_speech = None   # Last speech frame
+        self.done = False
+    
+    def push(self, samples):
+        """
+        Consume whole frames of audio
+        
+        Args:
+            samples (np.ndarray): 16-bit samples, a multiple of the frame size
+        
+        Returns:
+            int: Frames consumed; fewer than pushed once the utterance ended
+        """
+        mask = self.endpointer.speech_frames(samples, self.noise_floor)
+        count = len(mask)
+        index = np.arange(self.frames, self.frames + count)
+        hits = np.flatnonzero(mask)
+        
+        if self.speech_start is None:
+            first = int(index[hits[0]]) if hits.size else None
+            timeout = self.timeout_frames
+            if timeout is not None and self.frames + count >= timeout and (first is None or first >= timeout):
+                consumed = max(0, timeout - self.frames)
+                self.frames += consumed
+                self.done = True
+                return consumed
+            if first is None:
+                self.frames += count
+                return count
+            self.speech_start = first
+        
+        # Index of the most recent speech frame at every frame of the block
+        prior = self.last_speech if self.last_speech is not None else self.speech_start
+        last = np.maximum.accumulate(np.where(mask, index, prior))
+        ended = index - last >= self.endpointer.pause_frames
+        if self.limit_frames is not None:
+            ended |= index - self.speech_start + 1 >= self.limit_frames
+        
+        stops = np.flatnonzero(ended)
+        consumed = int(stops[0]) + 1 if stops.size else count
+        self.last_speech = int(last[consumed - 1])
+        self.frames += consumed
+        self.done = stops.size > 0
+        return consumed
+    
+    @property
+    def heard_speech(self):
+        """Whether any speech frame has been seen"""
+        return self.speech_start is not None
+    
+    def speech_bounds(self):
+        """
+        Return the speech part of the consumed audio
+        
+        Returns:
+            tuple: (begin, end) sample offsets with padding, or None if no
+                speech was heard
+        """
+        if self.speech_start is None:
+            return None
+        size = self.endpointer.frame_size
+        begin = max(self.speech_start * size - self.endpointer.padding, 0)
+        end = min((self.last_speech + 1) * size + self.endpointer.padding, self.frames * size)
+        return begin, end
+
+def trim_audio(audio, endpointer=None):
+    """
+    Trim leading and trailing silence from recorded audio
+    
+    Args:
+        audio (sr.AudioData): 16-bit audio, e.g. from Recognizer.listen()
+        endpointer (Endpointer, optional): Endpointer to use. Defaults to one
+            at the audio's sample rate.
+    
+    Returns:
+        sr.AudioData: Trimmed audio, or the original audio if it is not
+            16-bit or no speech was found in it
+    """
+    if audio is None or audio.sample_width != 2:
+        return audio
+    endpointer = endpointer or Endpointer(sample_rate=audio.sample_rate)
+    samples = np.frombuffer(audio.get_raw_data(), dtype=np.int16)
+    trimmed = endpointer.trim(samples)
+    if len(trimmed) == 0 or len(trimmed) == len(samples):
+        return audio
+    return type(audio)(trimmed.tobytes(), audio.sample_rate, audio.sample_width)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Execution Planner for compound commands
+
+A compound command such as "check battery and open chrome and search
+youtube for lofi" is split and classified up front. Each fragment then
+declares which shared resources its handler touches, as listed on the
+route it resolved to, and fragments that do not share a resource run at
+the same time on a small worker pool. Fragments that do share a resource
+keep their spoken order.
+
+Speech produced while a fragment runs is buffered and released strictly in
+fragment order, so the user hears results in the order they asked for them.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .speech_utils import redirect_speech, speak
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Shared resources a handler may claim
+AUDIO_OUTPUT = "audio_output"
+FOREGROUND_WINDOW = "foreground_window"
+BROWSER = "browser"
+SCREEN = "screen"
+ALL_RESOURCES = frozenset([AUDIO_OUTPUT, FOREGROUND_WINDOW, BROWSER, SCREEN])
+
+class ExecutionPlanner:
+    """Runs independent command fragments concurrently in spoken order"""
+    
+    def __init__(self, resource_claims, max_workers=4):
+        """Initialize the planner
+        
+        Args:
+            resource_claims (callable): resource_claims(step) -> set of
+                resource names, usually the resolved route's resources
+            max_workers (int): Size of the fragment worker pool
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.resource_claims = resource_claims
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fragment")
+        self._lock = threading.Lock()
+    
+    def plan(self, steps):
+        """
+        Build the dependency graph for a list of classified steps
+        
+        A step depends on every earlier step that claims one of its resources.
+        
+        Args:
+            steps (list): Classified steps from classify_command
+        
+        Returns:
+            list: For each step, the indexes of the earlier steps it waits for
+        """
+        claims = [frozenset(self.resource_claims(step)) for step in steps]
+        return [
+            [j for j in range(i) if claims[j] & claims[i]]
+            for i in range(len(steps))
+        ]
+    
+    def _run_fragment(self, index, step, execute_step, dependencies, output, trace):
+        # Fragments are submitted in order and the pool is FIFO, so every
+        # dependency is already running or finished when we start waiting
+        if dependencies:
+            wait(dependencies)
+        start = time.perf_counter()
+        with tracer.activate(trace), tracer.span("fragment", index=index + 1), redirect_speech(lambda text, **options: output.append((text, options))):
+            execute_step(step)
+        logger.info(f"Fragment {index + 1} '{step.get('text', '')}' finished in {time.perf_counter() - start:.2f}s")
+    
+    def run(self, steps, execute_step):
+        """
+        Execute steps concurrently where their resources allow it
+        
+        Speech from each step is replayed through speak() in step order as
+        soon as the step and all steps before it have finished.
+        
+        Args:
+            steps (list): Classified steps from classify_command
+            execute_step (callable): Runs a single step
+        """
+        dependencies = self.plan(steps)
+        outputs = [[] for _ in steps]
+        futures = []
+        trace = tracer.current()
+        
+        with self._lock:
+            for i, step in enumerate(steps):
+                futures.append(self._executor.submit(
+                    self._run_fragment, i, step, execute_step,
+                    [futures[j] for j in dependencies[i]], outputs[i], trace
+                ))
+        
+        # Release speech in the order the user asked for it
+        for i, future in enumerate(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error executing fragment {i + 1}: {e}")
+            for text, options in outputs[i]:
+                speak(text, **options)
+    
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=False)
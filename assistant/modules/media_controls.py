@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 import os
 import pyautogui
-import psutil
 import subprocess
 import glob
 import time
@@ -10,6 +9,8 @@ import logging
 import random
 from pathlib import Path
 from ..modules.speech_utils import speak
+from ..modules.tracing import tracer
+from ..modules.process_inspector import get_process_inspector
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -52,14 +53,7 @@ class MediaControls:
         
     def _is_media_player_running(self):
         """Check if any known media player is running"""
-        for proc in psutil.process_iter(['name']):
-            try:
-                process_name = proc.info['name'].lower()
-                if any(player.lower() in process_name for player in self.media_players):
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return False
+        return get_process_inspector().is_running(*self.media_players)
     
     def _ensure_media_player(self):
         """Ensure a media player is running"""
@@ -71,7 +65,8 @@ class MediaControls:
                     subprocess.Popen([self.default_audio_player], 
                                    stdout=subprocess.DEVNULL, 
                                    stderr=subprocess.DEVNULL)
-                time.sleep(2)  # Wait for player to start
+                with tracer.span("sleep", reason="media player startup"):
+                    time.sleep(2)  # Wait for player to start
                 return True
             except Exception as e:
                 logger.error(f"Error launching media player: {e}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+N-best Rescoring for AI Desktop Assistant
+
+Recognition used to keep only the recognizer's top transcript, so a near
+miss like "open crow" for "open chrome" went straight to the classifier and
+usually ended up as a web search. The recognizer now returns up to
+`asr.nbest` alternatives and they are rescored before anything runs:
+
+- Every alternative is split into command fragments, and the fragments of
+  all alternatives are classified together in one batched classifier call
+- Each alternative scores its ASR confidence times the mean classifier
+  confidence of its fragments
+- The best scoring alternative is executed
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Hypothesis:
+    """One recognizer alternative and how the classifier sees it"""
+    
+    def __init__(self, text, asr_confidence, fragments):
+        """Initialize a hypothesis
+        
+        Args:
+            text (str): Transcript
+            asr_confidence (float): Recognizer confidence from 0.0 to 1.0
+            fragments (list): Command fragments of the transcript
+        """
+        self.text = text
+        self.asr_confidence = asr_confidence
+        self.fragments = fragments
+        self.results = []
+    
+    @property
+    def classifier_confidence(self):
+        """Mean classifier confidence of the fragments"""
+        if not self.results:
+            return 0.0
+        return sum(result.get("confidence", 0.0) for result in self.results) / len(self.results)
+    
+    @property
+    def score(self):
+        """Combined ASR and classifier confidence"""
+        return self.asr_confidence * self.classifier_confidence
+    
+    def __repr__(self):
+        return f"Hypothesis({self.text!r}, asr={self.asr_confidence:.2f}, score={self.score:.2f})"
+
+def rank_hypotheses(hypotheses, classify_batch, split=None):
+    """
+    Rescore recognizer alternatives with the command classifier
+    
+    Args:
+        hypotheses (list): (text, asr_confidence) pairs from recognize_nbest()
+        classify_batch (callable): classify_batch(fragments) -> list of result
+            dictionaries with at least a confidence, one per fragment
+        split (callable, optional): split(text) -> list of command fragments.
+            Defaults to the whole text as one fragment.
+    
+    Returns:
+        list: Hypothesis objects with their classifier results, best first
+    """
+    split = split or (lambda text: [text])
+    ranked = [Hypothesis(text, confidence, split(text) or [text]) for text, confidence in hypotheses]
+    if not ranked:
+        return []
+    
+    # One classifier call for every fragment of every alternative
+    fragments = [fragment for hypothesis in ranked for fragment in hypothesis.fragments]
+    results = classify_batch(fragments)
+    offset = 0
+    for hypothesis in ranked:
+        hypothesis.results = results[offset:offset + len(hypothesis.fragments)]
+        offset += len(hypothesis.fragments)
+    
+    # sorted() is stable, so ties keep the recognizer's order
+    ranked = sorted(ranked, key=lambda hypothesis: hypothesis.score, reverse=True)
+    if ranked[0].text != hypotheses[0][0]:
+        logger.info(f"Rescoring picked {ranked[0]!r} over the top transcript {hypotheses[0][0]!r}")
+    return ranked
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+"""
+Network Status for AI Desktop Assistant
+
+On Linux, get_wifi_info() used to run nmcli, then ip addr, then iwconfig for
+every question, which spends tens to hundreds of milliseconds starting
+processes and waits forever if NetworkManager hangs. The link is now read
+from the kernel directly:
+
+- /sys/class/net/<iface>/wireless marks wireless interfaces and operstate
+  says whether the link is up
+- /proc/net/wireless has the link quality and signal level
+- The SSID comes from the SIOCGIWESSID ioctl
+- Addresses come from psutil.net_if_addrs()
+
+Readings are cached for `network.cache_ttl` seconds. Where netlink is
+available a background thread listens for link and address changes
+(RTMGRP_LINK) and drops the cached reading as soon as something changes, so
+a short cache never reports a stale connection. The old commands are only
+run, with a timeout, when the SSID cannot be read natively or when sysfs is
+missing.
+
+The proc and sys roots are configurable so the provider can be tested
+against a fake tree.
+"""
+
+import logging
+import os
+import socket
+import struct
+import subprocess
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import psutil
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+# Netlink groups for link state and address changes
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+# Wireless extensions ioctl that reads the ESSID
+SIOCGIWESSID = 0x8B1B
+ESSID_MAX = 32
+
+# Quality in /proc/net/wireless is out of 70 for almost every driver
+QUALITY_MAX = 70.0
+
+class LinkStatus(NamedTuple):
+    interface: str
+    connected: bool
+    operstate: str
+    ssid: Optional[str]
+    quality: Optional[int]  # Percent
+    signal_dbm: Optional[float]
+    addresses: tuple
+
+def read_text(path, default=None):
+    """Read a small sysfs or procfs file, stripped"""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+def parse_proc_wireless(text):
+    """
+    Parse /proc/net/wireless
+    
+    Args:
+        text (str): File contents
+    
+    Returns:
+        dict: Interface -> (quality percent, signal level in dBm or None)
+    """
+    links = {}
+    for line in text.splitlines()[2:]:
+        if ":" not in line:
+            continue
+        name, values = line.split(":", 1)
+        fields = values.split()
+        if len(fields) < 3:
+            continue
+        try:
+            link = float(fields[1].rstrip("."))
+            level = float(fields[2].rstrip("."))
+        except ValueError:
+            continue
+        quality = int(max(0, min(100, round(link / QUALITY_MAX * 100))))
+        # Drivers that report a relative level use positive numbers
+        links[name.strip()] = (quality, level if level < 0 else None)
+    return links
+
+def ioctl_essid(interface):
+    """
+    Read the SSID of an interface with the wireless extensions ioctl
+    
+    Args:
+        interface (str): Interface name, e.g. "wlan0"
+    
+    Returns:
+        str: SSID, "" if not associated, or None if the ioctl is unavailable
+    """
+    try:
+        import array
+        import fcntl
+    except ImportError:
+        return None
+    buffer = array.array("B", bytes(ESSID_MAX + 1))
+    request = struct.pack("16sPHH", interface.encode()[:15], buffer.buffer_info()[0], len(buffer), 0)
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            result = fcntl.ioctl(sock.fileno(), SIOCGIWESSID, request)
+    except OSError:
+        return None
+    length = struct.unpack("16sPHH", result)[2]
+    return buffer.tobytes()[:min(length, ESSID_MAX)].rstrip(b"\0").decode("utf-8", "replace")
+
+class NetworkStatus:
+    """Wireless link status read from sysfs, procfs and netlink"""
+    
+    def __init__(self, sys_root="/sys", proc_root="/proc", ttl=2.0, subprocess_timeout=2.0, ssid_reader=None):
+        """
+        Initialize the provider
+        
+        Args:
+            sys_root (str): Root of sysfs
+            proc_root (str): Root of procfs
+            ttl (float): Seconds a reading is reused
+            subprocess_timeout (float): Limit for the fallback commands
+            ssid_reader (callable, optional): ssid_reader(interface) -> str or
+                None; defaults to the ioctl
+        """
+        self.net_dir = os.path.join(sys_root, "class", "net")
+        self.proc_wireless = os.path.join(proc_root, "net", "wireless")
+        self.ttl = ttl
+        self.subprocess_timeout = subprocess_timeout
+        self.ssid_reader = ssid_reader or ioctl_essid
+        
+        self._cached = None
+        self._cached_at = 0.0
+        self._generation = 0  # Bumped by invalidate()
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._counts = {"reads": 0, "hits": 0, "events": 0, "fallbacks": 0}
+    
+    @property
+    def available(self):
+        """Whether sysfs lists network interfaces"""
+        return os.path.isdir(self.net_dir)
+    
+    def wireless_interfaces(self):
+        """
+        List wireless interfaces
+        
+        Returns:
+            list: Interface names with a wireless or phy80211 entry, sorted
+        """
+        try:
+            names = os.listdir(self.net_dir)
+        except OSError:
+            return []
+        return sorted(
+            name for name in names
+            if os.path.exists(os.path.join(self.net_dir, name, "wireless"))
+            or os.path.exists(os.path.join(self.net_dir, name, "phy80211"))
+        )
+    
+    def _addresses(self, interface):
+        try:
+            addresses = psutil.net_if_addrs().get(interface, [])
+        except Exception as e:
+            logger.debug(f"Could not read addresses of {interface}: {e}")
+            return ()
+        ipv4 = [a.address for a in addresses if a.family == socket.AF_INET]
+        ipv6 = [a.address.split("%")[0] for a in addresses if a.family == getattr(socket, "AF_INET6", None)]
+        return tuple(ipv4 + ipv6)
+    
+    def _ssid(self, interface):
+        ssid = self.ssid_reader(interface)
+        if ssid is None:
+            ssid = self._ssid_from_command(interface)
+        return ssid or None
+    
+    def _ssid_from_command(self, interface):
+        """Slow path: ask iwgetid or NetworkManager, with a timeout"""
+        commands = (
+            ["iwgetid", "-r", interface],
+            ["nmcli", "-t", "-g", "GENERAL.CONNECTION", "device", "show", interface]
+        )
+        for command in commands:
+            self._counts["fallbacks"] += 1
+            try:
+                output = subprocess.run(
+                    command, capture_output=True, text=True, timeout=self.subprocess_timeout
+                ).stdout.strip()
+            except (OSError, subprocess.SubprocessError):
+                continue
+            if output:
+                return output
+        return None
+    
+    def _read_interface(self, interface, links):
+        operstate = read_text(os.path.join(self.net_dir, interface, "operstate"), "unknown")
+        quality, signal = links.get(interface, (None, None))
+        connected = operstate == "up" or (operstate == "unknown" and interface in links)
+        return LinkStatus(
+            interface=interface,
+            connected=connected,
+            operstate=operstate,
+            ssid=self._ssid(interface) if connected else None,
+            quality=quality if connected else None,
+            signal_dbm=signal if connected else None,
+            addresses=self._addresses(interface) if connected else ()
+        )
+    
+    def read(self, max_age=None):
+        """
+        Return the status of the wireless link
+        
+        Args:
+            max_age (float, optional): Oldest cached reading to accept;
+                defaults to the configured TTL
+        
+        Returns:
+            LinkStatus: The connected interface, else the first wireless one,
+                or None if there is no wireless interface
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            self._counts["reads"] += 1
+            if self._cached_at and time.monotonic() - self._cached_at <= max_age:
+                self._counts["hits"] += 1
+                return self._cached
+            generation = self._generation
+        
+        links = parse_proc_wireless(read_text(self.proc_wireless, ""))
+        statuses = [self._read_interface(name, links) for name in self.wireless_interfaces()]
+        status = next((s for s in statuses if s.connected), statuses[0] if statuses else None)
+        
+        with self._lock:
+            # A link change during the read may have made it out of date; the
+            # caller still gets it, but the next read looks again
+            if self._generation == generation:
+                self._cached = status
+                self._cached_at = time.monotonic()
+        return status
+    
+    def invalidate(self):
+        """Drop the cached reading and tell the listeners"""
+        with self._lock:
+            self._cached_at = 0.0
+            self._generation += 1
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Error in network status listener: {e}")
+    
+    def add_listener(self, listener):
+        """
+        Call a function whenever the link or addresses change
+        
+        Args:
+            listener (callable): listener(), called on the netlink thread
+        """
+        self._listeners.append(listener)
+    
+    # Change notifications
+    
+    def _open_netlink(self):
+        netlink = getattr(socket, "AF_NETLINK", None)
+        if netlink is None:
+            return None
+        try:
+            sock = socket.socket(netlink, socket.SOCK_RAW, getattr(socket, "NETLINK_ROUTE", 0))
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+            sock.settimeout(0.5)
+            return sock
+        except OSError as e:
+            logger.info(f"Netlink unavailable, network status relies on its TTL: {e}")
+            return None
+    
+    def _run(self, sock):
+        with sock:
+            while not self._stop.is_set():
+                try:
+                    if not sock.recv(65536):
+                        continue
+                except socket.timeout:
+                    continue
+                except OSError as e:
+                    logger.error(f"Error reading netlink: {e}")
+                    return
+                self._counts["events"] += 1
+                self.invalidate()
+    
+    def start(self):
+        """
+        Listen for link changes in a background thread
+        
+        Returns:
+            bool: Whether change notifications are active
+        """
+        if self._thread and self._thread.is_alive():
+            return True
+        sock = self._open_netlink()
+        if sock is None:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(sock,), name="network-status", daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self):
+        """Stop listening"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    @property
+    def listening(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def stats(self):
+        """Read counters for the log"""
+        return dict(self._counts, listening=self.listening)
+
+_shared_status = None
+_shared_lock = threading.Lock()
+
+def get_network_status():
+    """
+    Return the process-wide network status provider, starting it on first use
+    
+    Returns:
+        NetworkStatus: The provider configured in `network`
+    """
+    global _shared_status
+    with _shared_lock:
+        if _shared_status is None:
+            _shared_status = NetworkStatus(
+                sys_root=config.get_nested("network.sys_root", "/sys"),
+                proc_root=config.get_nested("network.proc_root", "/proc"),
+                ttl=config.get_nested("network.cache_ttl", 2.0),
+                subprocess_timeout=config.get_nested("network.subprocess_timeout", 2.0)
+            )
+            if config.get_nested("network.netlink", True):
+                _shared_status.start()
+        return _shared_status
@@ -62,7 +62,11 @@ class CommandLearner:
                     "screenshot please",
                     "take screenshot",
                     "grab screenshot",
-                    "save screen"
+                    "save screen",
+                    "start screen recording",
+                    "stop screen recording",
+                    "show my last screenshot",
+                    "delete duplicate screenshots"
                 ],
                 "youtube_search": [
                     "search youtube for",
@@ -97,7 +101,8 @@ class CommandLearner:
                     "show memory",
                     "battery status",
                     "system information",
-                    "show temperature"
+                    "show temperature",
+                    "top processes"
                 ],
                 "web_search": [
                     "search for",
@@ -198,81 +203,109 @@ class CommandLearner:
     
     def predict_category(self, command):
         """Predict category for a command"""
-        try:
-            if not command or not isinstance(command, str):
-                return "web_search", 0.3
-            
-            # Clean command
-            command = command.lower().strip()
+        return self.predict_categories([command])[0]
             
-            # Direct category assignments with high confidence
+    def predict_categories(self, commands):
+        """
+        Predict categories for several commands with a single model call
             
-            # System power control commands
-            if any(phrase in command for phrase in ["lock computer", "lock system", "lock pc", "shutdown", "restart computer", "restart system", "restart pc", "power off", "turn off computer"]):
-                return "system_control", 0.95
+        Commands that match a rule are answered directly; the rest are
+        vectorized and classified together.
             
-            # Time and date commands
-            if any(phrase in command for phrase in ["what time", "current time", "what's the time", "tell me the time"]):
-                return "system_info", 0.95
+        Args:
+            commands (list): Command texts
             
-            if any(phrase in command for phrase in ["what date", "current date", "what's the date", "today's date", "what day"]):
-                return "system_info", 0.95
+        Returns:
+            list: (category, confidence) for each command
+        """
+        results = [("web_search", 0.3)] * len(commands)
+        pending = []
+        for i, command in enumerate(commands):
+            try:
+                if not command or not isinstance(command, str):
+                    continue
+            
+                # Clean command
+                command = command.lower().strip()
+                rule = self._rule_category(command)
+                if rule is not None:
+                    results[i] = rule
+                else:
+                    pending.append((i, command))
+            except Exception as e:
+                logger.error(f"Error predicting category: {e}")
             
-            # System info commands with direct matches
-            if any(phrase in command for phrase in ["battery", "cpu", "memory", "ram", "disk space", "wifi", "system information", "system info"]):
-                return "system_info", 0.95
+        # Use model for other cases
+        if pending and self.model and self.vectorizer:
+            try:
+                X = self.vectorizer.transform([command for _, command in pending])
+                for (i, _), probabilities in zip(pending, self.model.predict_proba(X)):
+                    confidence = float(probabilities.max())
             
-            # Window control commands
-            if any(phrase in command for phrase in ["minimize window", "minimise window", "maximize window", "maximise window", "restore window", "minimize", "minimise", "maximize", "maximise"]):
-                return "system_control", 0.95
+                    # If confidence is very low, default to web search
+                    if confidence < 0.3:
+                        results[i] = ("web_search", 0.5)
+                    else:
+                        results[i] = (self.model.classes_[probabilities.argmax()], confidence)
+            except Exception as e:
+                logger.error(f"Error predicting category: {e}")
+        return results
                 
-            # Volume and brightness control
-            if any(phrase in command for phrase in ["volume up", "volume down", "increase volume", "decrease volume", "set volume", "mute", "unmute"]):
-                return "system_control", 0.95
+    def _rule_category(self, command):
+        """Return (category, confidence) for commands matched by a rule, or None"""
+        # Direct category assignments with high confidence
                 
-            if any(phrase in command for phrase in ["brightness up", "brightness down", "increase brightness", "decrease brightness", "set brightness"]):
-                return "system_control", 0.95
+        # System power control commands
+        if any(phrase in command for phrase in ["lock computer", "lock system", "lock pc", "shutdown", "restart computer", "restart system", "restart pc", "power off", "turn off computer"]):
+            return "system_control", 0.95
             
-            # Check for direct matches from training data
-            for category, commands in self.training_data.items():
-                if any(isinstance(cmd, str) and cmd.lower() == command for cmd in commands):
-                    return category, 0.95  # Exact match has high confidence
-                elif any(isinstance(cmd, str) and cmd.lower() in command for cmd in commands):
-                    return category, 0.9   # Partial match has slightly lower confidence
-            
-            # YouTube specific checks with improved patterns
-            youtube_pattern = re.compile(r'(youtube|video|play|watch)', re.IGNORECASE)
-            search_pattern = re.compile(r'(search|find|look)', re.IGNORECASE)
-            
-            if youtube_pattern.search(command):
-                if search_pattern.search(command):
-                    return "youtube_search", 0.9
-                elif "play" in command:
-                    return "youtube_play", 0.9
-                else:
-                    return "video_control", 0.8
+        # Time and date commands
+        if any(phrase in command for phrase in ["what time", "current time", "what's the time", "tell me the time"]):
+            return "system_info", 0.95
             
-            # Screenshot specific checks
-            if any(word in command for word in ["screenshot", "capture screen", "grab screen"]):
-                return "screenshot", 0.9
+        if any(phrase in command for phrase in ["what date", "current date", "what's the date", "today's date", "what day"]):
+            return "system_info", 0.95
             
-            # Use model for other cases
-            if self.model and self.vectorizer:
-                X = self.vectorizer.transform([command])
-                category = self.model.predict(X)[0]
-                confidence = max(self.model.predict_proba(X)[0])
-                
-                # If confidence is very low, default to web search
-                if confidence < 0.3:
-                    return "web_search", 0.5
-                    
-                return category, confidence
+        # System info commands with direct matches
+        if any(phrase in command for phrase in ["battery", "cpu", "memory", "ram", "disk space", "wifi", "system information", "system info", "processes"]):
+            return "system_info", 0.95
             
-            return "web_search", 0.3
+        # Window control commands
+        if any(phrase in command for phrase in ["minimize window", "minimise window", "maximize window", "maximise window", "restore window", "minimize", "minimise", "maximize", "maximise"]):
+            return "system_control", 0.95
             
-        except Exception as e:
-            logger.error(f"Error predicting category: {e}")
-            return "web_search", 0.3
+        # Volume and brightness control
+        if any(phrase in command for phrase in ["volume up", "volume down", "increase volume", "decrease volume", "set volume", "mute", "unmute"]):
+            return "system_control", 0.95
+                
+        if any(phrase in command for phrase in ["brightness up", "brightness down", "increase brightness", "decrease brightness", "set brightness"]):
+            return "system_control", 0.95
+                    
+        # Check for direct matches from training data
+        for category, commands in self.training_data.items():
+            if any(isinstance(cmd, str) and cmd.lower() == command for cmd in commands):
+                return category, 0.95  # Exact match has high confidence
+            elif any(isinstance(cmd, str) and cmd.lower() in command for cmd in commands):
+                return category, 0.9   # Partial match has slightly lower confidence
+            
+        # YouTube specific checks with improved patterns
+        youtube_pattern = re.compile(r'(youtube|video|play|watch)', re.IGNORECASE)
+        search_pattern = re.compile(r'(search|find|look)', re.IGNORECASE)
+            
+        if youtube_pattern.search(command):
+            if search_pattern.search(command):
+                return "youtube_search", 0.9
+            elif "play" in command:
+                return "youtube_play", 0.9
+            else:
+                return "video_control", 0.8
+        
+        # Screenshot specific checks
+        if any(word in command for word in ["screenshot", "capture screen", "grab screen", "screen recording",
+                                            "record the screen", "record my screen", "record screen"]):
+            return "screenshot", 0.9
+        
+        return None
     
     def add_command(self, command, category):
         """Add a new command to the training data"""
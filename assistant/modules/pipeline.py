@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+"""
+Command Pipeline for AI Desktop Assistant
+
+Runs voice commands through an explicit stage graph instead of one thread
+doing everything in sequence:
+    
+    capture -> asr -> classify -> execute -> speech
+
+Every stage is an asyncio task that hands its blocking work to a dedicated
+worker thread, and neighbouring stages are connected by bounded queues.
+While the speech stage is still talking about command N, the capture and
+asr stages are already free to work on command N+1, so the time between
+commands is limited by the slowest stage rather than the sum of all of them.
+
+Full queues push back on the stage feeding them: a stage waits until the
+next one has room, and new key presses are refused while the capture queue
+is full.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .speech_utils import redirect_speech, speak
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Sentinel passed down the graph to shut stages down in order
+_STOP = None
+
+class PipelineJob:
+    """A single voice command travelling through the pipeline"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, timeout=None, trace=None, listen=None):
+        """Initialize a job
+        
+        Args:
+            timeout (int, optional): Seconds the capture stage may listen for
+            trace (Trace, optional): Trace the stages record their spans in
+            listen (dict, optional): Extra keyword arguments for capture
+        """
+        self.id = next(self._ids)
+        self.timeout = timeout
+        self.listen = listen or {}
+        self.trace = trace
+        self.created = time.perf_counter()
+        self.audio = None
+        self.text = None
+        self.plan = None
+        self.timings = {}
+
+class PipelineStage:
+    """A pipeline stage that consumes one queue and feeds the next"""
+    
+    def __init__(self, name, func, inbox, outbox=None):
+        """Initialize the stage
+        
+        Args:
+            name (str): Stage name used for logging and stats
+            func (callable): Blocking work, called with one item. Returning
+                None drops the item instead of forwarding it.
+            inbox (asyncio.Queue): Queue the stage reads from
+            outbox (asyncio.Queue, optional): Queue the stage writes to
+        """
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pipeline-{name}")
+        
+        # Stage statistics
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.blocked_time = 0.0
+    
+    async def run(self):
+        """Process items until the stop sentinel arrives"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.inbox.get()
+            if item is _STOP:
+                self.inbox.task_done()
+                if self.outbox is not None:
+                    await self.outbox.put(_STOP)
+                break
+            
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self.executor, self.func, item)
+            except Exception as e:
+                logger.error(f"Error in pipeline stage '{self.name}': {e}")
+                self.errors += 1
+                result = None
+            finally:
+                elapsed = time.perf_counter() - start
+                self.busy_time += elapsed
+                self.processed += 1
+                if isinstance(item, PipelineJob):
+                    item.timings[self.name] = elapsed
+                self.inbox.task_done()
+            
+            if result is None or self.outbox is None:
+                continue
+            
+            # Waiting here is the backpressure from the downstream stage
+            start = time.perf_counter()
+            await self.outbox.put(result)
+            self.blocked_time += time.perf_counter() - start
+        
+        self.executor.shutdown(wait=False)
+    
+    def stats(self):
+        """Return statistics for this stage"""
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy_time": round(self.busy_time, 3),
+            "blocked_time": round(self.blocked_time, 3),
+            "queue_depth": self.inbox.qsize(),
+            "queue_size": self.inbox.maxsize
+        }
+
+class CommandPipeline:
+    """Event-driven voice command pipeline with bounded stage queues"""
+    
+    STAGES = ("capture", "asr", "classify", "execute", "speech")
+    
+    def __init__(self, capture, recognize, classify, execute, speak_func=None, queue_size=2):
+        """Initialize the pipeline
+        
+        Args:
+            capture (callable): capture(timeout, **listen) -> audio or None,
+                where listen holds the extra keyword arguments given to submit()
+            recognize (callable): recognize(audio) -> text, a list of
+                (text, confidence) alternatives best first, or None
+            classify (callable): classify(text) -> execution plan or None,
+                given whatever recognize() returned
+            execute (callable): execute(plan); anything it passes to speak()
+                is handed to the speech stage
+            speak_func (callable, optional): TTS call used by the speech
+                stage. Defaults to speech_utils.speak, which returns a handle
+                without waiting for the speech to finish.
+            queue_size (int): Capacity of every queue between stages
+        """
+        self._capture = capture
+        self._recognize = recognize
+        self._classify = classify
+        self._execute = execute
+        self._speak = speak_func or speak
+        self._last_speech = {}  # id(trace) -> last speech handle
+        self.queue_size = max(1, int(queue_size))
+        
+        self.stages = []
+        self.queues = {}
+        self.rejected = 0
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+    
+    # Stage work
+    
+    def _capture_stage(self, job):
+        job.audio = self._capture(job.timeout, **job.listen)
+        return job if job.audio is not None else self._drop(job)
+    
+    def _asr_stage(self, job):
+        job.text = self._recognize(job.audio)
+        job.audio = None  # Release audio memory as early as possible
+        if not job.text or (isinstance(job.text, str) and not job.text.strip()):
+            logger.info(f"Pipeline job {job.id}: no speech recognized")
+            return self._drop(job)
+        return job
+    
+    def _classify_stage(self, job):
+        job.plan = self._classify(job.text)
+        return job if job.plan is not None else self._drop(job)
+    
+    def _execute_stage(self, job):
+        try:
+            with tracer.activate(job.trace):
+                with tracer.span("execute", job=job.id), redirect_speech(self.say):
+                    self._execute(job.plan)
+        finally:
+            # The trace is finished once the speech stage reaches this marker
+            if job.trace is not None:
+                self._queue_speech(None, job.trace)
+        total = time.perf_counter() - job.created
+        logger.info(f"Pipeline job {job.id} executed in {total:.2f}s {job.timings}")
+        return None
+    
+    def _speech_stage(self, item):
+        text, trace, options = item
+        if text is None:
+            # Finish the trace once its last message has actually been spoken
+            handle = self._last_speech.pop(id(trace), None)
+            if handle is not None and hasattr(handle, "add_done_callback") and not handle.done:
+                handle.add_done_callback(lambda: tracer.finish(trace))
+            else:
+                tracer.finish(trace)
+            return None
+        with tracer.activate(trace), tracer.span("speech", chars=len(text)):
+            handle = self._speak(text, **options)
+        if trace is not None:
+            self._last_speech[id(trace)] = handle
+        return None
+    
+    def _drop(self, job):
+        """Finish the trace of a job that stops early"""
+        tracer.finish(job.trace)
+        return None
+    
+    def _traced(self, name, func):
+        """Run a job stage with the job's trace active and time it as a span"""
+        def run(job):
+            try:
+                with tracer.activate(job.trace), tracer.span(name, job=job.id):
+                    return func(job)
+            except Exception:
+                tracer.finish(job.trace)
+                raise
+        return run
+    
+    # Lifecycle
+    
+    async def _main(self):
+        self.queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in self.STAGES}
+        work = {
+            "capture": self._traced("capture", self._capture_stage),
+            "asr": self._traced("asr", self._asr_stage),
+            "classify": self._traced("classify", self._classify_stage),
+            "execute": self._execute_stage,
+            "speech": self._speech_stage
+        }
+        # The execute stage feeds the speech queue through say(), but it also
+        # forwards the stop sentinel so the speech stage shuts down last
+        self.stages = []
+        for i, name in enumerate(self.STAGES):
+            outbox = self.queues[self.STAGES[i + 1]] if i + 1 < len(self.STAGES) else None
+            self.stages.append(PipelineStage(name, work[name], self.queues[name], outbox))
+        
+        tasks = [asyncio.create_task(stage.run(), name=f"pipeline-{stage.name}") for stage in self.stages]
+        self._ready.set()
+        await asyncio.gather(*tasks)
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        except Exception as e:
+            logger.error(f"Command pipeline stopped with an error: {e}")
+        finally:
+            self._loop.close()
+    
+    def start(self):
+        """Start the pipeline event loop in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="command-pipeline", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        logger.info(f"Command pipeline started: {' -> '.join(self.STAGES)}")
+    
+    def stop(self, timeout=5):
+        """Let queued commands drain, then stop every stage
+        
+        Args:
+            timeout (float): Seconds to wait for the stages to finish
+        """
+        if not self.running:
+            return
+        asyncio.run_coroutine_threadsafe(self.queues["capture"].put(_STOP), self._loop)
+        self._thread.join(timeout)
+    
+    @property
+    def running(self):
+        """Whether the pipeline event loop is running"""
+        return self._thread is not None and self._thread.is_alive() and self._ready.is_set()
+    
+    # Producers
+    
+    async def _offer(self, job):
+        try:
+            self.queues["capture"].put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    def submit(self, timeout=None, trace=None, **listen):
+        """Queue a new voice command for capture
+        
+        Args:
+            timeout (int, optional): Seconds the capture stage may listen for
+            trace (Trace, optional): Trace for the command. Defaults to the
+                active trace, or a new one if there is none.
+            **listen: Passed on to capture, e.g. start (the audio stream
+                position when P was pressed, so a command queued behind
+                another one keeps its first words) and released (an event set
+                when P is released)
+        
+        Returns:
+            bool: True if accepted, False if the pipeline is full or stopped
+        """
+        if not self.running:
+            return False
+        trace = trace or tracer.current() or tracer.start_trace("voice_command")
+        job = PipelineJob(timeout=timeout, trace=trace, listen=listen)
+        accepted = asyncio.run_coroutine_threadsafe(self._offer(job), self._loop).result()
+        if not accepted:
+            self.rejected += 1
+            logger.warning("Command pipeline is busy; ignoring new voice command")
+            tracer.finish(trace)
+        return accepted
+    
+    def say(self, text, **options):
+        """Queue text for the speech stage
+        
+        Blocks the caller only while the speech queue is full; the speech
+        stage hands text to the TTS worker without waiting for it to be spoken.
+        
+        Args:
+            text (str): Text to speak
+            **options: priority and key, passed on to speak()
+        """
+        if not self.running:
+            self._speak(text, **options)
+            return
+        self._queue_speech(text, tracer.current(), options)
+    
+    def _queue_speech(self, text, trace, options=None):
+        item = (text, trace, options or {})
+        asyncio.run_coroutine_threadsafe(self.queues["speech"].put(item), self._loop).result()
+    
+    # Introspection
+    
+    def describe(self):
+        """Return the stage graph as a list of (stage, next_stage) edges"""
+        return [(self.STAGES[i], self.STAGES[i + 1]) for i in range(len(self.STAGES) - 1)]
+    
+    def stats(self):
+        """Return per-stage statistics, including queue depth for backpressure"""
+        stats = {stage.name: stage.stats() for stage in self.stages}
+        stats["rejected"] = self.rejected
+        return stats
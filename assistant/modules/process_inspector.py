@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+"""
+Process Inspector for AI Desktop Assistant
+
+Answers "what's eating my CPU" and "which app uses the most memory". Every
+process is read inside Process.oneshot(), so its /proc files (or the
+Windows process information) are read once for the whole attribute set,
+and only the attributes needed are requested: name, CPU times, memory and
+I/O counters.
+
+CPU and I/O rates are the differences between two cached snapshots, so a
+query never sleeps to measure. The inspector keeps its latest snapshot and:
+
+- Reuses it for queries less than `processes.min_interval` seconds apart
+- Otherwise takes a new one and compares it with the previous snapshot
+- A background thread rescans every `processes.refresh_interval` seconds,
+  so the previous snapshot is recent even after the assistant sat idle
+- A previous snapshot older than `processes.max_baseline_age` seconds is
+  not used, since rates over an hour of idle time would hide a process
+  that just started spinning; without a recent one, rates are averages
+  since each process started
+
+Snapshots also answer "is VLC running" for the media controls without
+another process walk. A scan of 500 processes takes a few tens of
+milliseconds.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import psutil
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+# Ways to rank processes
+METRICS = ("cpu", "memory", "io")
+
+PROCESS_QUERY = re.compile(
+    r"eating|hogging|using (?:the )?most|uses (?:the )?most|most (?:cpu|memory|ram|disk)|"
+    r"top (?:\w+ )?(?:processes|apps|programs)|heaviest|(?:which|what) (?:app|apps|process|processes|program|programs)"
+)
+NUMBER = re.compile(r"\btop (\d+|three|five|ten)\b")
+NUMBER_WORDS = {"three": 3, "five": 5, "ten": 10}
+
+class ProcessUsage(NamedTuple):
+    name: str
+    pids: tuple
+    cpu_percent: float  # Of the whole machine
+    rss: int  # Bytes
+    memory_percent: float
+    io_bps: Optional[float]  # Read and written per second, None if not available
+
+class _Sample(NamedTuple):
+    name: str
+    cpu: float  # Seconds of CPU time
+    rss: int
+    io: Optional[int]  # Bytes read and written
+    started: float
+
+def parse_process_query(command):
+    """
+    Recognize a question about which processes use the most resources
+    
+    Args:
+        command (str): Lowercased command
+    
+    Returns:
+        tuple: (metric, count) with metric one of METRICS, or None
+    """
+    if not PROCESS_QUERY.search(command):
+        return None
+    if any(word in command for word in ("memory", "ram")):
+        metric = "memory"
+    elif any(word in command for word in ("disk", "i/o", " io", "reading", "writing")):
+        metric = "io"
+    else:
+        metric = "cpu"
+    match = NUMBER.search(command)
+    count = 3
+    if match:
+        count = NUMBER_WORDS.get(match.group(1)) or int(match.group(1))
+    return metric, max(1, min(count, 20))
+
+def describe_bytes(count):
+    """Bytes in the largest unit that keeps the number above one, e.g. 1.2 GB"""
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "bytes" else f"{count:.1f} {unit}"
+        count /= 1024.0
+
+class ProcessInspector:
+    """Ranks processes by CPU, memory or I/O from cached snapshots"""
+    
+    def __init__(self, min_interval=1.0, max_baseline_age=10.0):
+        """
+        Initialize the inspector
+        
+        Args:
+            min_interval (float): Seconds a snapshot is reused for
+            max_baseline_age (float): Oldest snapshot rates are measured from
+        """
+        self.min_interval = min_interval
+        self.max_baseline_age = max_baseline_age
+        self.cores = psutil.cpu_count() or 1
+        self.memory_total = psutil.virtual_memory().total
+        self.own_pid = psutil.Process().pid
+        
+        self._previous = None  # (time, {(pid, started): _Sample})
+        self._current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.scans = 0
+        self.scan_time = 0.0
+    
+    def scan(self):
+        """
+        Read every process once
+        
+        Returns:
+            tuple: (time, {(pid, create time): _Sample})
+        """
+        started = time.perf_counter()
+        samples = {}
+        for process in psutil.process_iter():
+            try:
+                with process.oneshot():
+                    created = process.create_time()
+                    cpu = process.cpu_times()
+                    memory = process.memory_info()
+                    try:
+                        io = process.io_counters()
+                        io_total = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+                        io_total = None
+                    name = process.name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            samples[(process.pid, created)] = _Sample(name, cpu.user + cpu.system, memory.rss, io_total, created)
+        now = time.time()
+        elapsed = time.perf_counter() - started
+        self.scans += 1
+        self.scan_time += elapsed
+        logger.debug(f"Scanned {len(samples)} processes in {elapsed * 1000:.1f} ms")
+        return now, samples
+    
+    def snapshot(self, max_age=None, rates=True):
+        """
+        Return the latest snapshot and the one to compare it with
+        
+        Args:
+            max_age (float, optional): Oldest snapshot to reuse; defaults to
+                min_interval
+            rates (bool): Keep the replaced snapshot as the baseline for
+                rates; False when only the process list matters, so the
+                baseline is left as it was
+        
+        Returns:
+            tuple: (current, previous), each (time, samples); previous is
+                None when there is no baseline within max_baseline_age of
+                the current snapshot
+        """
+        max_age = self.min_interval if max_age is None else max_age
+        with self._lock:
+            if self._current is None or time.time() - self._current[0] > max_age:
+                if rates:
+                    self._previous, self._current = self._current, self.scan()
+                else:
+                    self._current = self.scan()
+            previous = self._previous
+            if previous is not None and self._current[0] - previous[0] > self.max_baseline_age:
+                # Rates over the idle time would hide what is busy now
+                previous = None
+            return self._current, previous
+    
+    def start(self, interval=5.0):
+        """
+        Rescan in the background so the baseline stays recent
+        
+        Args:
+            interval (float): Seconds between scans
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        
+        def run():
+            self.snapshot(max_age=0)
+            while not self._stop.wait(interval):
+                try:
+                    self.snapshot(max_age=0)
+                except Exception as e:
+                    logger.error(f"Error refreshing process snapshot: {e}")
+        
+        self._thread = threading.Thread(target=run, name="process-refresh", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background rescans"""
+        self._stop.set()
+    
+    def usage(self, group=True):
+        """
+        Resource usage of every process
+        
+        Args:
+            group (bool): Add up processes with the same name, so a browser
+                counts once rather than per tab
+        
+        Returns:
+            list: ProcessUsage, unsorted
+        """
+        (now, samples), previous = self.snapshot()
+        before, interval = ({}, None) if previous is None else (previous[1], now - previous[0])
+        
+        totals = {}
+        for key, sample in samples.items():
+            if key[0] == self.own_pid:
+                continue
+            old = before.get(key)
+            if old is not None and interval:
+                cpu_rate = (sample.cpu - old.cpu) / interval
+                io_rate = (sample.io - old.io) / interval if sample.io is not None and old.io is not None else None
+            else:
+                # Average since the process started instead of waiting for a second snapshot
+                lifetime = max(now - sample.started, 1.0)
+                cpu_rate = sample.cpu / lifetime
+                io_rate = sample.io / lifetime if sample.io is not None else None
+            name = sample.name if group else f"{sample.name} ({key[0]})"
+            entry = totals.setdefault(name, [sample.name, [], 0.0, 0, None])
+            entry[1].append(key[0])
+            entry[2] += max(cpu_rate, 0.0)
+            entry[3] += sample.rss
+            if io_rate is not None:
+                entry[4] = (entry[4] or 0.0) + max(io_rate, 0.0)
+        
+        return [
+            ProcessUsage(
+                name=name,
+                pids=tuple(pids),
+                cpu_percent=round(cpu / self.cores * 100, 1),
+                rss=rss,
+                memory_percent=round(rss / self.memory_total * 100, 1),
+                io_bps=io
+            )
+            for name, pids, cpu, rss, io in totals.values()
+        ]
+    
+    def top(self, metric="cpu", count=3, group=True):
+        """
+        Return the processes using the most of a resource
+        
+        Args:
+            metric (str): "cpu", "memory" or "io"
+            count (int): Number of processes
+            group (bool): Add up processes with the same name
+        
+        Returns:
+            list: ProcessUsage, highest first
+        """
+        key = {
+            "cpu": lambda p: p.cpu_percent,
+            "memory": lambda p: p.rss,
+            "io": lambda p: p.io_bps or 0.0
+        }[metric]
+        return sorted(self.usage(group), key=key, reverse=True)[:count]
+    
+    def is_running(self, *names, max_age=1.0):
+        """
+        Check whether a process with one of these names is running
+        
+        Args:
+            names (str): Name fragments, matched case-insensitively
+            max_age (float): Oldest snapshot to trust
+        
+        Returns:
+            bool: Whether any process name contains one of the fragments
+        """
+        fragments = [name.lower() for name in names]
+        (_, samples), _ = self.snapshot(max_age, rates=False)
+        return any(f in sample.name.lower() for sample in samples.values() for f in fragments)
+    
+    def stats(self):
+        """Scan counters for the log"""
+        return {
+            "scans": self.scans,
+            "processes": len(self._current[1]) if self._current else 0,
+            "mean_scan_ms": round(self.scan_time / self.scans * 1000, 1) if self.scans else None
+        }
+
+_shared_inspector = None
+_shared_lock = threading.Lock()
+
+def get_process_inspector():
+    """
+    Return the process-wide inspector, rescanning in the background
+    
+    Returns:
+        ProcessInspector: The inspector configured in `processes`
+    """
+    global _shared_inspector
+    with _shared_lock:
+        if _shared_inspector is None:
+            _shared_inspector = ProcessInspector(
+                min_interval=config.get_nested("processes.min_interval", 1.0),
+                max_baseline_age=config.get_nested("processes.max_baseline_age", 10.0)
+            )
+            # Keeps a recent baseline for the first question after an idle spell
+            _shared_inspector.start(config.get_nested("processes.refresh_interval", 5.0))
+        return _shared_inspector
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Result Cache for AI Desktop Assistant
+
+Information queries such as CPU usage, WiFi status or the weather are
+answered from psutil, subprocesses or HTTP calls that can take a second or
+more. The same question is often asked again a few seconds later ("cpu
+usage and memory usage", or the user repeating themselves), so readings
+are cached per query with two time limits:
+
+- ttl: the reading is fresh and is returned as is
+- max_stale: for this long after the ttl the old reading is still returned
+  instantly, while a background refresh fetches a new one
+
+Older readings are fetched again before answering. Concurrent requests for
+the same key share a single fetch. A fetch that was already running when
+its key was invalidated is returned to its caller but not cached.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class CacheEntry:
+    """A cached reading and the time it was fetched"""
+    
+    __slots__ = ("value", "fetched_at", "refreshing")
+    
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.refreshing = False
+
+class ResultCache:
+    """TTL cache with stale-while-revalidate refresh"""
+    
+    def __init__(self, default_ttl=5.0, default_max_stale=0.0, max_workers=2, clock=time.monotonic):
+        """Initialize the cache
+        
+        Args:
+            default_ttl (float): Seconds a reading stays fresh for queries
+                without their own policy
+            default_max_stale (float): Seconds after the ttl a stale reading
+                may still be served while it is refreshed
+            max_workers (int): Background refresh threads
+            clock (callable): Monotonic time source
+        """
+        self.default_ttl = default_ttl
+        self.default_max_stale = default_max_stale
+        self._clock = clock
+        self._policies = {}
+        self._entries = {}
+        self._loading = {}
+        self._generations = {}  # Key -> number of times it was invalidated
+        self._epoch = 0  # Number of times everything was invalidated
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        
+        # Statistics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+    
+    def set_policy(self, query, ttl, max_stale=0.0):
+        """
+        Set the time limits for a query
+        
+        Args:
+            query (str): Query name, e.g. "cpu" or "weather"
+            ttl (float): Seconds a reading stays fresh
+            max_stale (float): Seconds after the ttl a stale reading may be
+                served while it is refreshed in the background
+        """
+        self._policies[query] = (float(ttl), float(max_stale))
+    
+    def _generation(self, key):
+        """Changes whenever the key is invalidated; call with the lock held"""
+        return self._epoch, self._generations.get(key, 0)
+    
+    def _policy(self, key):
+        query = key[0] if isinstance(key, tuple) else key
+        return self._policies.get(query, (self.default_ttl, self.default_max_stale))
+    
+    def get(self, key, loader):
+        """
+        Return the reading for a key, fetching it only when needed
+        
+        Args:
+            key (str or tuple): Query name, or a tuple starting with the query
+                name for parameterised queries (e.g. ("weather", "London"))
+            loader (callable): Fetches a new reading. Exceptions are passed to
+                the caller and nothing is cached.
+        
+        Returns:
+            The cached or newly fetched reading
+        """
+        ttl, max_stale = self._policy(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self._clock() - entry.fetched_at
+                if age < ttl:
+                    self.hits += 1
+                    return entry.value
+                if age < ttl + max_stale:
+                    self.stale_hits += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self._executor.submit(self._refresh, key, loader, self._generation(key))
+                    return entry.value
+            
+            # Share one fetch between concurrent callers
+            pending = self._loading.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._loading[key] = pending
+                self.misses += 1
+                generation = self._generation(key)
+        
+        if not owner:
+            return pending.result()
+        
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                del self._loading[key]
+            pending.set_exception(e)
+            raise
+        
+        with self._lock:
+            if self._generation(key) == generation:
+                self._entries[key] = CacheEntry(value, self._clock())
+            del self._loading[key]
+        pending.set_result(value)
+        return value
+    
+    def _refresh(self, key, loader, generation):
+        """Fetch a new reading for a stale entry in the background"""
+        try:
+            value = loader()
+        except Exception as e:
+            logger.error(f"Error refreshing cached result for {key}: {e}")
+            with self._lock:
+                self.errors += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        
+        with self._lock:
+            self.refreshes += 1
+            # A reading taken before an invalidation must not come back as fresh
+            if self._generation(key) == generation:
+                self._entries[key] = CacheEntry(value, self._clock())
+    
+    def invalidate(self, key=None):
+        """
+        Drop cached readings
+        
+        Args:
+            key (str or tuple, optional): Key to drop. Drops everything if None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+    
+    def stats(self):
+        """Return cache statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors
+            }
+    
+    def shutdown(self):
+        """Stop the background refresh threads"""
+        self._executor.shutdown(wait=False)
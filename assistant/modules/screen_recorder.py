@@ -0,0 +1,454 @@
+#!/usr/bin/env python
+"""
+Screen Recorder for AI Desktop Assistant
+
+"Start screen recording" captures frames through the screenshot service's
+grabber at `screen_recording.fps` on a background thread, and "stop screen
+recording" turns them into a video. Most of the screen is static most of the
+time, so frames are not stored whole:
+
+- Each frame is cut into `screen_recording.tile` pixel tiles and every tile
+  is hashed with one vectorised NumPy pass
+- Only tiles whose hash changed since the previous frame are appended to a
+  spool file, so a static screen costs a hash per frame and a few bytes of
+  disk instead of a full frame
+- After stop, a separate process rebuilds the frames from the spool and
+  encodes an MP4 with ffmpeg when it is installed, or an animated WebP or
+  GIF with Pillow; unchanged frames become longer frame durations
+
+The command thread only starts and stops the capture thread, so the
+assistant stays responsive while recording and encoding.
+
+Spool layout: a header (magic, version, width, height, tile, fps), then per
+frame its time, the number of changed tiles, their indices (uint32) and
+their pixels (tile x tile x RGB each).
+"""
+
+import itertools
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ZREC"
+VERSION = 1
+HEADER = struct.Struct("<4sBIIHf")
+FRAME = struct.Struct("<dI")
+
+# Phrases that start or stop a recording
+RECORDING_KEYWORDS = ["screen recording", "record the screen", "record my screen", "record screen", "recording"]
+
+class TileHasher:
+    """Hashes fixed-size tiles of RGB frames to find the ones that changed"""
+    
+    def __init__(self, width, height, tile=32):
+        """
+        Initialize the hasher
+        
+        Args:
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+            tile (int): Tile edge in pixels, a multiple of 4
+        """
+        if tile % 4:
+            raise ValueError("The tile size must be a multiple of 4")
+        self.width, self.height, self.tile = width, height, tile
+        self.rows = -(-height // tile)
+        self.cols = -(-width // tile)
+        words = tile * tile * 3 // 8
+        # Odd 64-bit multipliers; the weighted sum wraps modulo 2**64
+        self.weights = np.random.default_rng(0x5EED).integers(0, 2 ** 63, size=words, dtype=np.uint64) * 2 + 1
+        self._padded = np.zeros((self.rows * tile, self.cols * tile, 3), dtype=np.uint8)
+        self.previous = None
+    
+    def tiles(self, frame):
+        """
+        Cut a frame into tiles
+        
+        Args:
+            frame (numpy.ndarray): height x width x 3 uint8 frame
+        
+        Returns:
+            numpy.ndarray: (rows * cols, tile, tile, 3) contiguous tiles
+        """
+        height, width = min(frame.shape[0], self.height), min(frame.shape[1], self.width)
+        padded = self._padded
+        padded[:height, :width] = frame[:height, :width]
+        tile = self.tile
+        grid = padded.reshape(self.rows, tile, self.cols, tile, 3).swapaxes(1, 2)
+        return np.ascontiguousarray(grid).reshape(self.rows * self.cols, tile, tile, 3)
+    
+    def hashes(self, tiles):
+        """One 64-bit hash per tile"""
+        words = tiles.reshape(len(tiles), -1).view(np.uint64)
+        return (words * self.weights).sum(axis=1, dtype=np.uint64)
+    
+    def changed(self, frame):
+        """
+        Find the tiles that differ from the previous frame
+        
+        Args:
+            frame (numpy.ndarray): height x width x 3 uint8 frame
+        
+        Returns:
+            tuple: (indices, tiles) of the changed tiles; every tile for the
+                first frame
+        """
+        tiles = self.tiles(frame)
+        hashes = self.hashes(tiles)
+        if self.previous is None:
+            indices = np.arange(len(tiles), dtype=np.uint32)
+        else:
+            indices = np.flatnonzero(hashes != self.previous).astype(np.uint32)
+        self.previous = hashes
+        return indices, tiles[indices]
+
+def read_spool(path):
+    """
+    Rebuild the frames stored in a spool file
+    
+    Args:
+        path (str): Spool file written by ScreenRecorder
+    
+    Yields:
+        tuple: (time, frame, changed tile count); the frame array is reused,
+            so copy it to keep it
+    """
+    with open(path, "rb") as f:
+        magic, version, width, height, tile, fps = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a screen recording spool: {path}")
+        rows, cols = -(-height // tile), -(-width // tile)
+        canvas = np.zeros((rows * tile, cols * tile, 3), dtype=np.uint8)
+        grid = canvas.reshape(rows, tile, cols, tile, 3).swapaxes(1, 2)
+        tile_bytes = tile * tile * 3
+        while True:
+            head = f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                return
+            stamp, count = FRAME.unpack(head)
+            indices = np.frombuffer(f.read(4 * count), dtype=np.uint32)
+            data = f.read(tile_bytes * count)
+            if len(indices) < count or len(data) < tile_bytes * count:
+                return  # Truncated by a crash; keep what is complete
+            if count:
+                grid[indices // cols, indices % cols] = np.frombuffer(data, dtype=np.uint8).reshape(count, tile, tile, 3)
+            yield stamp, canvas[:height, :width], count
+
+def spool_info(path):
+    """Return (width, height, tile, fps) from a spool header"""
+    with open(path, "rb") as f:
+        _, _, width, height, tile, fps = HEADER.unpack(f.read(HEADER.size))
+    return width, height, tile, fps
+
+def assemble_recording(spool_path, output_path, fmt, max_width=1280, keep_spool=False):
+    """
+    Encode a spool into a video or an animated image
+    
+    Runs in a separate process started when a recording stops (see the
+    command line at the end of this module).
+    
+    Args:
+        spool_path (str): Spool file
+        output_path (str): File to write
+        fmt (str): "mp4" (needs ffmpeg), "webp" or "gif"
+        max_width (int): Animated images wider than this are scaled down
+        keep_spool (bool): Keep the spool file after encoding
+    
+    Returns:
+        str: output_path
+    """
+    width, height, _, fps = spool_info(spool_path)
+    partial = output_path + ".part"
+    if fmt == "mp4":
+        # Constant frame rate: a frame is repeated for as long as it was on screen
+        even = (width - width % 2, height - height % 2)
+        encoder = subprocess.Popen(
+            [shutil.which("ffmpeg") or "ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-", "-vf", f"crop={even[0]}:{even[1]}:0:0",
+             "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-f", "mp4", partial],
+            stdin=subprocess.PIPE
+        )
+        previous = None
+        for stamp, frame, _ in read_spool(spool_path):
+            if previous is not None:
+                for _ in range(max(1, round((stamp - previous[0]) * fps))):
+                    encoder.stdin.write(previous[1])
+            previous = (stamp, frame.tobytes())
+        if previous is not None:
+            encoder.stdin.write(previous[1])
+        encoder.stdin.close()
+        if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with {encoder.returncode}")
+    else:
+        scale = min(1.0, max_width / width)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        frames, stamps = [], []
+        for stamp, frame, count in read_spool(spool_path):
+            if frames and count == 0:
+                continue  # Shown for longer instead of stored again
+            image = Image.fromarray(frame.copy())
+            frames.append(image.resize(size, Image.BILINEAR) if scale < 1.0 else image)
+            stamps.append(stamp)
+        if not frames:
+            raise ValueError("The recording has no frames")
+        durations = [max(20, int((b - a) * 1000)) for a, b in zip(stamps, stamps[1:])] + [int(1000 / fps)]
+        options = {"save_all": True, "append_images": frames[1:], "duration": durations, "loop": 0}
+        if fmt == "webp":
+            options.update(format="WEBP", quality=80, method=4)
+        else:
+            options.update(format="GIF", optimize=False)
+        frames[0].save(partial, **options)
+    os.replace(partial, output_path)
+    if not keep_spool:
+        os.remove(spool_path)
+    return output_path
+
+class _Recording:
+    """State of one recording, kept until it is encoded"""
+    
+    def __init__(self, spool_path, output_path, on_done):
+        self.spool_path = spool_path
+        self.output_path = output_path
+        self.on_done = on_done
+        self.capturing = threading.Event()  # Cleared as soon as stop() is called
+        self.stop = threading.Event()
+        self.thread = None
+        self.process = None
+        self.counts = {"frames": 0, "tiles": 0, "changed": 0, "bytes": 0, "cpu": 0.0, "started": time.time()}
+
+class ScreenRecorder:
+    """Records the screen as changed tiles and encodes the result after stop"""
+    
+    def __init__(self, service, directory=None, fps=5.0, tile=32, max_seconds=600, fmt="auto", max_width=1280):
+        """
+        Initialize the recorder
+        
+        Args:
+            service (ScreenshotService): Provides the screen grabber and the
+                default directory
+            directory (str, optional): Where recordings are saved
+            fps (float): Frames captured per second
+            tile (int): Tile edge in pixels, a multiple of 4
+            max_seconds (float): Recording stops by itself after this long
+            fmt (str): "mp4", "webp", "gif", or "auto" for mp4 when ffmpeg is
+                installed and webp otherwise
+            max_width (int): Widest animated image; videos keep full size
+        """
+        self.service = service
+        self.directory = directory or service.directory
+        self.fps = fps
+        self.tile = tile
+        self.max_seconds = max_seconds
+        self.fmt = ("mp4" if shutil.which("ffmpeg") else "webp") if fmt == "auto" else fmt
+        self.max_width = max_width
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._current = None  # The latest recording, capturing or not
+        self._encoding = []  # Recordings captured but not yet encoded
+    
+    @property
+    def recording(self):
+        """Whether the screen is being captured; encoding does not count"""
+        current = self._current
+        return current is not None and current.capturing.is_set()
+    
+    @property
+    def encoding(self):
+        """Whether an earlier recording is still being encoded"""
+        with self._lock:
+            return any(not r.capturing.is_set() and r.thread.is_alive() for r in self._encoding)
+    
+    @property
+    def output_path(self):
+        """File the latest recording is saved to"""
+        return self._current.output_path if self._current else None
+    
+    def start(self, monitor=None, region=None, on_done=None):
+        """
+        Start recording on a background thread
+        
+        A new recording can start while the previous one is still encoding.
+        
+        Args:
+            monitor (int, optional): 1-based monitor number; None for all
+            region (tuple, optional): (left, top, width, height) fractions
+            on_done (callable, optional): on_done(path or None) once the
+                recording is encoded or has failed
+        
+        Returns:
+            str: The file the recording will be saved to, or None if a
+                recording is already running
+        """
+        with self._lock:
+            if self.recording:
+                return None
+            bounds = self.service.grabber.bounds(monitor, region)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}_{next(self._sequence):03d}"
+            recording = _Recording(
+                os.path.join(self.directory, f".recording_{name}.spool"),
+                os.path.join(self.directory, f"recording_{name}.{self.fmt}"),
+                on_done
+            )
+            recording.capturing.set()
+            recording.thread = threading.Thread(target=self._run, args=(recording, bounds),
+                                                name="screen-recorder", daemon=True)
+            self._current = recording
+            self._encoding = [r for r in self._encoding if r.thread.is_alive()] + [recording]
+            recording.thread.start()
+            logger.info(f"Screen recording started at {self.fps} fps to {recording.output_path}")
+            return recording.output_path
+    
+    def _run(self, recording, bounds):
+        grabber = self.service.grabber
+        interval = 1.0 / self.fps
+        counts = recording.counts
+        try:
+            frame = np.asarray(grabber.grab(bounds).convert("RGB"))
+            hasher = TileHasher(frame.shape[1], frame.shape[0], self.tile)
+            with open(recording.spool_path, "wb") as spool:
+                spool.write(HEADER.pack(MAGIC, VERSION, hasher.width, hasher.height, self.tile, self.fps))
+                started = time.monotonic()
+                next_frame = started
+                while True:
+                    cpu = time.thread_time()
+                    indices, tiles = hasher.changed(frame)
+                    spool.write(FRAME.pack(time.time(), len(indices)))
+                    spool.write(indices.tobytes())
+                    spool.write(tiles.tobytes())
+                    counts["frames"] += 1
+                    counts["tiles"] += hasher.rows * hasher.cols
+                    counts["changed"] += len(indices)
+                    counts["bytes"] += FRAME.size + indices.nbytes + tiles.nbytes
+                    counts["cpu"] += time.thread_time() - cpu
+                    
+                    # Skip frames rather than fall behind
+                    now = time.monotonic()
+                    next_frame += interval
+                    if next_frame < now:
+                        next_frame = now + interval - (now - next_frame) % interval
+                    if now - started >= self.max_seconds:
+                        logger.info("Screen recording reached its time limit")
+                        break
+                    if recording.stop.wait(next_frame - now):
+                        break
+                    cpu = time.thread_time()
+                    frame = np.asarray(grabber.grab(bounds).convert("RGB"))
+                    counts["cpu"] += time.thread_time() - cpu
+        except Exception as e:
+            logger.error(f"Error recording the screen: {e}")
+            if counts["frames"] == 0:
+                recording.capturing.clear()
+                self._finish(recording, None)
+                return
+        recording.capturing.clear()
+        self._assemble(recording)
+    
+    def _assemble(self, recording):
+        """Encode the spool in a separate process and wait for it here"""
+        logger.info(f"Screen recording stopped: {self.stats(recording)}")
+        # A fresh interpreter running this module, so encoding never competes
+        # with the assistant for the GIL
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        recording.process = subprocess.Popen(
+            [sys.executable, "-m", __name__, recording.spool_path, recording.output_path, self.fmt,
+             str(self.max_width)],
+            cwd=root
+        )
+        if recording.process.wait() == 0:
+            logger.info(f"Screen recording saved to {recording.output_path}")
+            self._finish(recording, recording.output_path)
+        else:
+            logger.error(f"Encoding the screen recording failed; frames kept in {recording.spool_path}")
+            self._finish(recording, None)
+    
+    def _finish(self, recording, path):
+        if recording.on_done is not None:
+            try:
+                recording.on_done(path)
+            except Exception as e:
+                logger.error(f"Error in screen recording callback: {e}")
+    
+    def stop(self):
+        """
+        Stop capturing; encoding continues in the background
+        
+        Returns:
+            str: The file the recording will be saved to, or None if nothing
+                was recording
+        """
+        with self._lock:
+            recording = self._current
+            if recording is None or not recording.capturing.is_set():
+                return None
+            recording.capturing.clear()
+            recording.stop.set()
+            return recording.output_path
+    
+    def wait(self, timeout=None):
+        """Wait until every recording is captured and encoded"""
+        with self._lock:
+            threads = [r.thread for r in self._encoding]
+        for thread in threads:
+            thread.join(timeout)
+    
+    def stats(self, recording=None):
+        """Counters of a recording, by default the latest, for the log"""
+        recording = recording or self._current
+        if recording is None:
+            return {}
+        counts = dict(recording.counts)
+        elapsed = max(time.time() - counts.pop("started"), 1e-6)
+        return {
+            "frames": counts["frames"],
+            "changed_tiles_percent": round(counts["changed"] / counts["tiles"] * 100, 1) if counts["tiles"] else None,
+            "spool_bytes": counts["bytes"],
+            "cpu_percent": round(counts["cpu"] / elapsed * 100, 1)
+        }
+
+_shared_recorder = None
+_shared_lock = threading.Lock()
+
+def get_screen_recorder(service):
+    """
+    Return the process-wide screen recorder
+    
+    Args:
+        service (ScreenshotService): Provides the grabber and directory
+    
+    Returns:
+        ScreenRecorder: The recorder configured in `screen_recording`
+    """
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = ScreenRecorder(
+                service,
+                directory=os.path.expanduser(config.get_nested("screen_recording.directory", "")) or None,
+                fps=config.get_nested("screen_recording.fps", 5.0),
+                tile=config.get_nested("screen_recording.tile", 32),
+                max_seconds=config.get_nested("screen_recording.max_seconds", 600),
+                fmt=config.get_nested("screen_recording.format", "auto"),
+                max_width=config.get_nested("screen_recording.max_width", 1280)
+            )
+        return _shared_recorder
+
+if __name__ == "__main__":
+    # python -m assistant.modules.screen_recorder SPOOL OUTPUT FORMAT MAX_WIDTH
+    logging.basicConfig(level=logging.INFO)
+    try:
+        assemble_recording(sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    except Exception as e:
+        logger.error(f"Error assembling screen recording: {e}")
+        sys.exit(1)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+"""
+Screenshot Library for AI Desktop Assistant
+
+Screenshots used to be plain files in the screenshot directory, so finding
+the latest one meant listing the folder and comparing duplicates meant
+decoding every image. The library keeps a small SQLite index next to them
+(`.library/index.sqlite`) with one row per screenshot: file name, time,
+size, dimensions, a 64-bit perceptual hash and a SHA-1 digest of the
+pixels, plus a JPEG thumbnail in `.library/thumbnails`.
+
+- The screenshot service calls add() with every image it saves, so a new
+  screenshot is hashed and thumbnailed from the image already in memory
+- sync() brings the index up to date with files added, changed or deleted
+  behind the assistant's back. It lists the folder once and only decodes
+  files whose size or modification time differ from their row, so a
+  folder of tens of thousands of screenshots costs one directory scan
+- "Show my last screenshot" is an indexed ORDER BY ... LIMIT query
+- "Delete duplicate screenshots" finds candidates by grouping rows by
+  hash in SQL, then keeps only those with the same dimensions and pixel
+  digest. The oldest screenshot of each group stays; the others are moved
+  to `.library/trash`, not deleted.
+
+The hash is a difference hash of a 9x8 grayscale copy: each bit says
+whether a pixel is brighter than its right neighbour. Screens that differ
+in a line of text often hash the same, which is why the hash only finds
+candidates and the pixel digest decides.
+"""
+
+import hashlib
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the table or the hash changes; the index is rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenshots (
+    name TEXT PRIMARY KEY,
+    taken REAL NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS screenshots_taken ON screenshots (taken);
+CREATE INDEX IF NOT EXISTS screenshots_hash ON screenshots (hash);
+"""
+
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Commands about screenshots already taken rather than a new one
+LIBRARY_KEYWORDS = ["last screenshot", "latest screenshot", "recent screenshot", "previous screenshot",
+                    "duplicate screenshot"]
+
+class LibraryEntry(NamedTuple):
+    path: str
+    taken: float  # Modification time
+    size: int  # Bytes
+    width: int
+    height: int
+    hash: int  # Unsigned 64-bit perceptual hash
+    digest: str  # SHA-1 of the RGB pixels
+    thumbnail: str
+
+COLUMNS = "name, taken, size, width, height, hash, digest"
+
+def perceptual_hash(image):
+    """
+    Difference hash of an image
+    
+    Args:
+        image (PIL.Image.Image): Any size; the library hashes thumbnails so
+            every screenshot is reduced the same way
+    
+    Returns:
+        int: Unsigned 64-bit hash
+    """
+    pixels = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = np.packbits(pixels[:, 1:] > pixels[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+def pixel_digest(image):
+    """SHA-1 of an image's RGB pixels, the same for any lossless encoding"""
+    return hashlib.sha1(image.convert("RGB").tobytes()).hexdigest()
+
+def hamming(a, b):
+    """Number of bits two hashes differ in"""
+    return bin(a ^ b).count("1")
+
+def _signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def is_screenshot(name):
+    """Whether a file name is one of the screenshots the library indexes"""
+    lower = name.lower()
+    return lower.startswith("screenshot") and lower.endswith(EXTENSIONS)
+
+class ScreenshotLibrary:
+    """SQLite index and thumbnails of the screenshot directory"""
+    
+    def __init__(self, directory, database=None, thumbnail_size=256):
+        """
+        Initialize the library; the index is opened on first use
+        
+        Args:
+            directory (str): Screenshot directory
+            database (str, optional): Index file; defaults to
+                .library/index.sqlite in the directory
+            thumbnail_size (int): Longest thumbnail edge in pixels
+        """
+        self.directory = directory
+        self.thumbnails = os.path.join(directory, ".library", "thumbnails")
+        self.trash = os.path.join(directory, ".library", "trash")
+        self.database = database or os.path.join(directory, ".library", "index.sqlite")
+        self.thumbnail_size = thumbnail_size
+        self._db = None
+        self._lock = threading.RLock()
+        self.counts = {"indexed": 0, "removed": 0, "syncs": 0, "sync_time": 0.0}
+    
+    def _connection(self):
+        """Open the index, rebuilding it if it was written by another version"""
+        if self._db is None:
+            os.makedirs(self.thumbnails, exist_ok=True)
+            db = sqlite3.connect(self.database, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.execute("DROP TABLE IF EXISTS screenshots")
+                db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            db.executescript(SCHEMA)
+            db.commit()
+            self._db = db
+        return self._db
+    
+    def _thumbnail_path(self, name):
+        return os.path.join(self.thumbnails, name + ".jpg")
+    
+    def _entry(self, row):
+        name, taken, size, width, height, value, digest = row
+        return LibraryEntry(os.path.join(self.directory, name), taken, size, width, height,
+                            _unsigned(value), digest, self._thumbnail_path(name))
+    
+    def add(self, path, image=None):
+        """
+        Index a screenshot and write its thumbnail
+        
+        Matches the ScreenshotService listener signature.
+        
+        Args:
+            path (str): Saved screenshot
+            image (PIL.Image.Image, optional): Its image, if already in memory;
+                otherwise the file is decoded
+        
+        Returns:
+            LibraryEntry: The new row
+        """
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        if image is None:
+            with Image.open(path) as source:
+                image = source.convert("RGB")
+        width, height = image.size
+        digest = pixel_digest(image)
+        thumbnail = image.convert("RGB")
+        thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.BILINEAR, reducing_gap=2.0)
+        value = perceptual_hash(thumbnail)
+        
+        target = self._thumbnail_path(name)
+        with self._lock:
+            db = self._connection()
+        partial = f"{target}.{threading.get_ident()}.part"
+        thumbnail.save(partial, "JPEG", quality=80)
+        os.replace(partial, target)
+        with self._lock:
+            db.execute("INSERT OR REPLACE INTO screenshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (name, stat.st_mtime, stat.st_size, width, height, _signed(value), digest))
+            db.commit()
+            self.counts["indexed"] += 1
+        return LibraryEntry(path, stat.st_mtime, stat.st_size, width, height, value, digest, target)
+    
+    def forget(self, names):
+        """
+        Drop screenshots from the index and delete their thumbnails
+        
+        Args:
+            names (iterable): File names or paths
+        """
+        names = [os.path.basename(name) for name in names]
+        if not names:
+            return
+        with self._lock:
+            db = self._connection()
+            db.executemany("DELETE FROM screenshots WHERE name = ?", [(name,) for name in names])
+            db.commit()
+            self.counts["removed"] += len(names)
+        for name in names:
+            try:
+                os.remove(self._thumbnail_path(name))
+            except FileNotFoundError:
+                pass
+    
+    def sync(self):
+        """
+        Bring the index up to date with the screenshot directory
+        
+        Returns:
+            dict: Numbers of screenshots added or updated, and removed
+        """
+        started = time.perf_counter()
+        with self._lock:
+            known = {name: (size, taken) for name, size, taken in
+                     self._connection().execute("SELECT name, size, taken FROM screenshots")}
+        present, changed = set(), []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not is_screenshot(entry.name) or not entry.is_file():
+                        continue
+                    present.add(entry.name)
+                    stat = entry.stat()
+                    if known.get(entry.name) != (stat.st_size, stat.st_mtime):
+                        changed.append(entry.path)
+        except OSError as e:
+            logger.error(f"Error listing screenshots: {e}")
+            return {"updated": 0, "removed": 0}
+        
+        gone = [name for name in known if name not in present]
+        self.forget(gone)
+        updated = 0
+        for path in changed:
+            try:
+                self.add(path)
+                updated += 1
+            except Exception as e:
+                logger.warning(f"Could not index screenshot {path}: {e}")
+        
+        elapsed = time.perf_counter() - started
+        self.counts["syncs"] += 1
+        self.counts["sync_time"] += elapsed
+        logger.info(f"Screenshot library synced in {elapsed * 1000:.0f} ms: "
+                    f"{len(present)} screenshots, {updated} indexed, {len(gone)} removed")
+        return {"updated": updated, "removed": len(gone)}
+    
+    def latest(self, count=1):
+        """
+        Return the most recent screenshots
+        
+        Rows whose file has been deleted are dropped on the way.
+        
+        Args:
+            count (int): Number of screenshots
+        
+        Returns:
+            list: LibraryEntry, newest first
+        """
+        while True:
+            with self._lock:
+                rows = self._connection().execute(
+                    f"SELECT {COLUMNS} FROM screenshots ORDER BY taken DESC LIMIT ?",
+                    (count,)
+                ).fetchall()
+            entries = [self._entry(row) for row in rows]
+            missing = [entry.path for entry in entries if not os.path.exists(entry.path)]
+            if not missing:
+                return entries
+            self.forget(missing)
+    
+    def duplicates(self):
+        """
+        Find groups of screenshots with exactly the same picture
+        
+        Rows with the same perceptual hash are candidates; within them only
+        screenshots with the same dimensions and pixel digest are grouped.
+        
+        Returns:
+            list: Groups of LibraryEntry, oldest first, each with at least two
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {COLUMNS} FROM screenshots WHERE hash IN "
+                "(SELECT hash FROM screenshots GROUP BY hash HAVING COUNT(*) > 1) ORDER BY hash, taken"
+            ).fetchall()
+        groups = []
+        for _, candidates in itertools.groupby((self._entry(row) for row in rows), key=lambda entry: entry.hash):
+            same = {}
+            for entry in candidates:
+                same.setdefault((entry.width, entry.height, entry.digest), []).append(entry)
+            groups.extend(group for group in same.values() if len(group) > 1)
+        return groups
+    
+    def _unchanged(self, entry):
+        """Whether a file is still the one that was indexed"""
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime) == (entry.size, entry.taken)
+    
+    def _trash_path(self, name):
+        """A free name in the trash folder"""
+        target = os.path.join(self.trash, name)
+        stem, extension = os.path.splitext(name)
+        for number in itertools.count(1):
+            if not os.path.exists(target):
+                return target
+            target = os.path.join(self.trash, f"{stem}_{number}{extension}")
+    
+    def remove_duplicates(self):
+        """
+        Move every duplicate screenshot except the oldest of each group to
+        the trash folder
+        
+        A file modified since it was indexed is left alone, and so is a
+        group whose oldest screenshot has gone.
+        
+        Returns:
+            tuple: (screenshots moved, bytes freed)
+        """
+        moved, freed, names = 0, 0, []
+        os.makedirs(self.trash, exist_ok=True)
+        for group in self.duplicates():
+            if not self._unchanged(group[0]):
+                continue
+            for entry in group[1:]:
+                if not self._unchanged(entry):
+                    continue
+                try:
+                    os.replace(entry.path, self._trash_path(os.path.basename(entry.path)))
+                except OSError as e:
+                    logger.error(f"Could not move duplicate screenshot {entry.path}: {e}")
+                    continue
+                moved += 1
+                freed += entry.size
+                names.append(entry.path)
+        self.forget(names)
+        logger.info(f"Moved {moved} duplicate screenshots ({freed} bytes) to {self.trash}")
+        return moved, freed
+    
+    def stats(self):
+        """Index counters for the log"""
+        with self._lock:
+            total = self._connection().execute("SELECT COUNT(*) FROM screenshots").fetchone()[0]
+        counts = dict(self.counts)
+        return {
+            "screenshots": total,
+            "indexed": counts["indexed"],
+            "removed": counts["removed"],
+            "mean_sync_ms": round(counts["sync_time"] / counts["syncs"] * 1000, 1) if counts["syncs"] else None
+        }
+    
+    def close(self):
+        """Close the index"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_shared_library = None
+_shared_lock = threading.Lock()
+
+def get_screenshot_library(service):
+    """
+    Return the process-wide screenshot library, indexing new screenshots
+    from the service and syncing the directory in the background
+    
+    Args:
+        service (ScreenshotService): Saves the screenshots to index
+    
+    Returns:
+        ScreenshotLibrary: The library configured in `screenshot_library`,
+            or None if it is disabled
+    """
+    global _shared_library
+    with _shared_lock:
+        if _shared_library is None:
+            if not config.get_nested("screenshot_library.enabled", True):
+                return None
+            _shared_library = ScreenshotLibrary(
+                service.directory,
+                database=os.path.expanduser(config.get_nested("screenshot_library.database", "")) or None,
+                thumbnail_size=config.get_nested("screenshot_library.thumbnail_size", 256)
+            )
+            service.add_listener(_shared_library.add)
+            threading.Thread(target=_shared_library.sync, name="screenshot-library-sync", daemon=True).start()
+        return _shared_library
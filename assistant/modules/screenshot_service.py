@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+"""
+Screenshot Service for AI Desktop Assistant
+
+SystemControls.take_screenshot() slept half a second, grabbed the screen,
+compressed a full PNG with default settings and waited for the image viewer
+to start, all on the command thread. AdvancedFeatures.take_screenshot() was
+a second, separate path. Both now use this service, which:
+
+- Captures into an in-memory image on the calling thread and returns at once
+- Encodes and saves on a small pool of background workers, so back-to-back
+  screenshots are captured immediately instead of queueing behind PNG
+  compression (Pillow releases the GIL while compressing)
+- Saves as PNG (with a configurable, fast compression level by default),
+  WebP or JPEG, writing to a temporary name and renaming so nothing ever
+  sees a half-written file
+- Captures the whole desktop, one monitor, or a region such as "the left
+  half", and takes bursts of several screenshots at an interval
+
+The grab uses mss when it is installed (fast, and it knows the monitor
+layout), then Pillow's ImageGrab, then pyautogui. Listeners added with
+add_listener() are called with every saved file and its image.
+"""
+
+import concurrent.futures
+import itertools
+import logging
+import os
+import platform
+import re
+import subprocess
+import threading
+import time
+from typing import NamedTuple
+
+from PIL import Image
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+FORMATS = {"png": ("PNG", ".png"), "jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+FORMAT_NAMES = {"png": "png", "jpeg": "jpeg", "jpg": "jpeg", "webp": "webp"}
+
+# Spoken regions as (left, top, width, height) fractions of the monitor
+REGIONS = {
+    "left half": (0.0, 0.0, 0.5, 1.0),
+    "right half": (0.5, 0.0, 0.5, 1.0),
+    "top half": (0.0, 0.0, 1.0, 0.5),
+    "bottom half": (0.0, 0.5, 1.0, 0.5),
+    "center": (0.25, 0.25, 0.5, 0.5),
+    "centre": (0.25, 0.25, 0.5, 0.5)
+}
+
+ORDINALS = {"first": 1, "primary": 1, "main": 1, "second": 2, "third": 3, "fourth": 4}
+NUMBERS = {"two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+MONITOR = re.compile(r"\b(?:(first|primary|main|second|third|fourth) (?:monitor|screen|display)|"
+                     r"(?:monitor|screen|display) (\d|one|two|three|four))\b")
+BURST = re.compile(r"\b(\d+|two|three|four|five|six|seven|eight|nine|ten) screenshots\b|\bburst\b")
+FORMAT = re.compile(r"\b(?:as|in) (?:a )?(png|jpeg|jpg|webp)\b")
+
+class PendingScreenshot(NamedTuple):
+    path: str
+    future: concurrent.futures.Future  # Resolves to the path once saved
+
+def parse_screenshot_command(command):
+    """
+    Read capture options from a spoken command
+    
+    Args:
+        command (str): Lowercased command, e.g. "take three screenshots of
+            the second monitor as jpeg"
+    
+    Returns:
+        dict: region (fractions or None), monitor (1-based or None), count
+            and fmt (or None for the configured format)
+    """
+    options = {"region": None, "monitor": None, "count": 1, "fmt": None}
+    for name, region in REGIONS.items():
+        if name in command:
+            options["region"] = region
+            break
+    match = MONITOR.search(command)
+    if match:
+        word = match.group(1) or match.group(2)
+        options["monitor"] = ORDINALS.get(word) or NUMBERS.get(word) or (1 if word == "one" else int(word))
+    match = BURST.search(command)
+    if match:
+        word = match.group(1)
+        options["count"] = 5 if word is None else NUMBERS.get(word) or int(word)
+    match = FORMAT.search(command)
+    if match:
+        options["fmt"] = FORMAT_NAMES[match.group(1)]
+    return options
+
+def encode_options(fmt, png_level=1, jpeg_quality=85, webp_quality=80, webp_lossless=False):
+    """
+    Pillow save arguments for a format
+    
+    Args:
+        fmt (str): "png", "jpeg" or "webp"
+    
+    Returns:
+        dict: Keyword arguments for Image.save
+    """
+    if fmt == "png":
+        return {"format": "PNG", "compress_level": png_level}
+    if fmt == "jpeg":
+        return {"format": "JPEG", "quality": jpeg_quality}
+    if fmt == "webp":
+        return {"format": "WEBP", "quality": webp_quality, "lossless": webp_lossless, "method": 4}
+    raise ValueError(f"Unsupported screenshot format: {fmt}")
+
+class ScreenGrabber:
+    """Grabs the screen with the fastest backend available"""
+    
+    def __init__(self):
+        self._local = threading.local()  # mss handles belong to one thread
+    
+    def _mss(self):
+        if mss is None:
+            return None
+        handle = getattr(self._local, "mss", None)
+        if handle is None:
+            handle = self._local.mss = mss.mss()
+        return handle
+    
+    def monitors(self):
+        """
+        Monitor geometry
+        
+        Returns:
+            list: (left, top, width, height) per monitor, primary first. Without
+                mss only the whole desktop is known.
+        """
+        handle = self._mss()
+        if handle is not None:
+            return [(m["left"], m["top"], m["width"], m["height"]) for m in handle.monitors[1:]]
+        import pyautogui
+        width, height = pyautogui.size()
+        return [(0, 0, width, height)]
+    
+    def bounds(self, monitor=None, region=None):
+        """
+        Screen rectangle for a monitor and a fractional region
+        
+        Args:
+            monitor (int, optional): 1-based monitor number; None for all
+            region (tuple, optional): (left, top, width, height) fractions
+        
+        Returns:
+            tuple: (left, top, width, height) in pixels, or None for the whole
+                desktop
+        """
+        if monitor is None and region is None:
+            return None
+        monitors = self.monitors()
+        if monitor is not None and not 1 <= monitor <= len(monitors):
+            raise ValueError(f"There is no monitor {monitor}; found {len(monitors)}")
+        left, top, width, height = monitors[(monitor or 1) - 1]
+        if region is not None:
+            x, y, w, h = region
+            left, top = left + int(x * width), top + int(y * height)
+            width, height = max(1, int(w * width)), max(1, int(h * height))
+        return left, top, width, height
+    
+    def grab(self, bounds=None):
+        """
+        Capture the screen into memory
+        
+        Args:
+            bounds (tuple, optional): (left, top, width, height); None for the
+                whole desktop
+        
+        Returns:
+            PIL.Image.Image: RGB image
+        """
+        handle = self._mss()
+        if handle is not None:
+            area = handle.monitors[0] if bounds is None else dict(zip(("left", "top", "width", "height"), bounds))
+            shot = handle.grab(area)
+            return Image.frombuffer("RGB", shot.size, shot.rgb, "raw", "RGB", 0, 1)
+        box = None if bounds is None else (bounds[0], bounds[1], bounds[0] + bounds[2], bounds[1] + bounds[3])
+        try:
+            from PIL import ImageGrab
+            return ImageGrab.grab(bbox=box, all_screens=True)
+        except (ImportError, OSError) as e:
+            logger.debug(f"ImageGrab unavailable, using pyautogui: {e}")
+        import pyautogui
+        return pyautogui.screenshot(region=bounds)
+
+def open_file(path):
+    """Open a file in the default viewer without waiting for it"""
+    if os.name == "nt":
+        os.startfile(path)
+    elif platform.system() == "Darwin":
+        subprocess.Popen(["open", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        subprocess.Popen(["xdg-open", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+class ScreenshotService:
+    """Captures on the calling thread, encodes and saves in the background"""
+    
+    def __init__(self, directory, fmt="png", png_level=1, jpeg_quality=85, webp_quality=80,
+                 webp_lossless=False, workers=2, grabber=None, opener=open_file):
+        """
+        Initialize the service
+        
+        Args:
+            directory (str): Where screenshots are saved
+            fmt (str): Default format: "png", "jpeg" or "webp"
+            png_level (int): zlib level 0-9; 1 is faster than Pillow's default
+                of 6 for slightly larger files
+            jpeg_quality (int): JPEG quality 1-95
+            webp_quality (int): WebP quality 0-100
+            webp_lossless (bool): Lossless WebP
+            workers (int): Encoding threads
+            grabber (ScreenGrabber, optional): Screen capture backend
+            opener (callable, optional): opener(path) to show a saved file
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        self.options = {"png_level": png_level, "jpeg_quality": jpeg_quality,
+                        "webp_quality": webp_quality, "webp_lossless": webp_lossless}
+        self.grabber = grabber or ScreenGrabber()
+        self.opener = opener
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self._listeners = []
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self.counts = {"captured": 0, "saved": 0, "failed": 0, "capture_time": 0.0, "encode_time": 0.0, "bytes": 0}
+        os.makedirs(directory, exist_ok=True)
+    
+    def add_listener(self, listener):
+        """
+        Call a function with every saved screenshot
+        
+        Args:
+            listener (callable): listener(path, image), called on an encoding
+                thread
+        """
+        self._listeners.append(listener)
+    
+    def _path(self, fmt):
+        """A new file name; the sequence number keeps a burst from colliding"""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.directory, f"screenshot_{stamp}_{next(self._sequence):03d}{FORMATS[fmt][1]}")
+    
+    def capture(self, monitor=None, region=None):
+        """
+        Capture the screen into memory
+        
+        Args:
+            monitor (int, optional): 1-based monitor number; None for all
+            region (tuple, optional): (left, top, width, height) fractions
+        
+        Returns:
+            PIL.Image.Image: The captured image
+        """
+        started = time.perf_counter()
+        image = self.grabber.grab(self.grabber.bounds(monitor, region))
+        with self._lock:
+            self.counts["captured"] += 1
+            self.counts["capture_time"] += time.perf_counter() - started
+        return image
+    
+    def _save(self, image, path, fmt, open_after):
+        started = time.perf_counter()
+        options = encode_options(fmt, **self.options)
+        if fmt == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        partial = path + ".part"
+        try:
+            image.save(partial, **options)
+            os.replace(partial, path)
+        except Exception:
+            with self._lock:
+                self.counts["failed"] += 1
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        with self._lock:
+            self.counts["saved"] += 1
+            self.counts["encode_time"] += time.perf_counter() - started
+            self.counts["bytes"] += os.path.getsize(path)
+        logger.info(f"Screenshot saved to {path} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        for listener in self._listeners:
+            try:
+                listener(path, image)
+            except Exception as e:
+                logger.error(f"Error in screenshot listener: {e}")
+        if open_after and self.opener is not None:
+            try:
+                self.opener(path)
+            except Exception as e:
+                logger.error(f"Failed to open screenshot: {e}")
+        return path
+    
+    def save(self, image, fmt=None, open_after=False):
+        """
+        Encode and save an image in the background
+        
+        Args:
+            image (PIL.Image.Image): Captured image
+            fmt (str, optional): Format; defaults to the configured one
+            open_after (bool): Open the file in the default viewer once saved
+        
+        Returns:
+            PendingScreenshot: The file name and a future for the save
+        """
+        fmt = fmt or self.fmt
+        path = self._path(fmt)
+        return PendingScreenshot(path, self.pool.submit(self._save, image, path, fmt, open_after))
+    
+    def take(self, monitor=None, region=None, fmt=None, open_after=False):
+        """
+        Capture now and save in the background
+        
+        Returns:
+            PendingScreenshot: The file name and a future for the save
+        """
+        return self.save(self.capture(monitor, region), fmt, open_after)
+    
+    def burst(self, count, interval=0.5, monitor=None, region=None, fmt=None):
+        """
+        Take several screenshots at an interval on a background thread
+        
+        Args:
+            count (int): Number of screenshots
+            interval (float): Seconds between captures
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the list of saved paths
+        """
+        result = concurrent.futures.Future()
+        
+        def run():
+            pending = []
+            try:
+                for i in range(count):
+                    if i:
+                        time.sleep(interval)
+                    pending.append(self.take(monitor, region, fmt))
+                result.set_result([shot.future.result() for shot in pending])
+            except Exception as e:
+                logger.error(f"Error taking screenshot burst: {e}")
+                result.set_exception(e)
+        
+        threading.Thread(target=run, name="screenshot-burst", daemon=True).start()
+        return result
+    
+    def stats(self):
+        """Counters for the log"""
+        with self._lock:
+            counts = dict(self.counts)
+        captured, saved = counts.pop("captured"), counts.pop("saved")
+        return {
+            "captured": captured,
+            "saved": saved,
+            "failed": counts["failed"],
+            "mean_capture_ms": round(counts["capture_time"] / captured * 1000, 1) if captured else None,
+            "mean_encode_ms": round(counts["encode_time"] / saved * 1000, 1) if saved else None,
+            "bytes": counts["bytes"]
+        }
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+def default_directory():
+    return os.path.join(os.path.expanduser("~"), "Pictures", "AI_Assistant_Screenshots")
+
+def get_screenshot_service():
+    """
+    Return the process-wide screenshot service
+    
+    Returns:
+        ScreenshotService: The service configured in `screenshots`
+    """
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = ScreenshotService(
+                directory=os.path.expanduser(config.get_nested("screenshots.directory", "") or default_directory()),
+                fmt=config.get_nested("screenshots.format", "png"),
+                png_level=config.get_nested("screenshots.png_level", 1),
+                jpeg_quality=config.get_nested("screenshots.jpeg_quality", 85),
+                webp_quality=config.get_nested("screenshots.webp_quality", 80),
+                webp_lossless=config.get_nested("screenshots.webp_lossless", False),
+                workers=config.get_nested("screenshots.workers", 2)
+            )
+        return _shared_service
@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+"""
+Hardware Sensors for AI Desktop Assistant
+
+get_temperature() used to open two new WMI connections and start nvidia-smi
+for every question, and on Linux it parsed the output of `sensors`. The
+temperature branch of get_system_info() separately called
+psutil.sensors_temperatures() and spoke whichever entry came first. Both now
+read one sensor provider.
+
+The provider probes the available sources once and keeps their handles:
+
+- Linux: hwmon and thermal zone files in sysfs, opened once and re-read
+  with pread
+- Windows: one WMI connection, to Open Hardware Monitor if it is running,
+  else to the ACPI thermal zones
+- NVIDIA GPUs: NVML handles when pynvml is installed, else nvidia-smi with
+  a timeout
+- macOS: osx-cpu-temp or iStats, whichever is installed, with a timeout
+- Elsewhere: psutil.sensors_temperatures()
+
+When no source has sensors, temperature questions are answered with
+"not available" without trying anything else.
+
+A background thread samples every `sensors.interval` seconds, and queries
+return the latest readings grouped as CPU, GPU and System. The sysfs root
+is configurable so the Linux sources can be tested against a fake tree.
+"""
+
+import glob
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import NamedTuple
+
+import psutil
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("CPU", "GPU", "System")
+
+# hwmon chip drivers by what they measure
+CPU_CHIPS = {"coretemp", "k10temp", "k8temp", "zenpower", "cpu_thermal", "cpu-thermal", "soc_thermal", "x86_pkg_temp"}
+GPU_CHIPS = {"amdgpu", "radeon", "nouveau", "i915", "xe"}
+
+class SensorReading(NamedTuple):
+    name: str
+    category: str  # "CPU", "GPU" or "System"
+    celsius: float
+    source: str
+
+def categorize(chip, label=""):
+    """
+    Decide what a temperature sensor measures
+    
+    Args:
+        chip (str): Driver or device name, e.g. "coretemp" or "acpitz"
+        label (str): Sensor label, e.g. "Package id 0"
+    
+    Returns:
+        str: "CPU", "GPU" or "System"
+    """
+    chip, label = chip.lower(), label.lower()
+    if chip in GPU_CHIPS or "gpu" in chip or "gpu" in label:
+        return "GPU"
+    if chip in CPU_CHIPS or "cpu" in chip or any(word in label for word in ("cpu", "core", "package", "tctl", "tdie")):
+        return "CPU"
+    return "System"
+
+def read_text(path, default=""):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+class SysfsSource:
+    """Temperature files in sysfs, kept open and re-read from the start"""
+    
+    name = "sysfs"
+    
+    def __init__(self, sys_root="/sys"):
+        self.sys_root = sys_root
+        self._sensors = []  # (fd, name, category)
+    
+    def _find(self):
+        """Yield (path, name, category) for each temperature file"""
+        raise NotImplementedError
+    
+    def probe(self):
+        """
+        Open the temperature files
+        
+        Returns:
+            bool: Whether any sensor was found
+        """
+        self.close()
+        for path, name, category in self._find():
+            try:
+                self._sensors.append((os.open(path, os.O_RDONLY), name, category))
+            except OSError:
+                continue
+        return bool(self._sensors)
+    
+    def read(self):
+        readings = []
+        for fd, name, category in self._sensors:
+            try:
+                value = os.pread(fd, 32, 0)
+                readings.append(SensorReading(name, category, int(value) / 1000.0, self.name))
+            except (OSError, ValueError):
+                # Sensors that are asleep or disconnected fail until they return
+                continue
+        return readings
+    
+    def close(self):
+        for fd, _, _ in self._sensors:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._sensors = []
+
+class HwmonSource(SysfsSource):
+    """Linux /sys/class/hwmon/hwmon*/temp*_input"""
+    
+    name = "hwmon"
+    
+    def _find(self):
+        for device in sorted(glob.glob(os.path.join(self.sys_root, "class", "hwmon", "hwmon*"))):
+            chip = read_text(os.path.join(device, "name"), os.path.basename(device))
+            inputs = glob.glob(os.path.join(device, "temp*_input"))
+            for path in sorted(inputs, key=lambda p: int(os.path.basename(p)[4:-6] or 0)):
+                sensor = os.path.basename(path)[:-6]
+                label = read_text(os.path.join(device, sensor + "_label"), sensor)
+                yield path, f"{chip} {label}", categorize(chip, label)
+
+class ThermalZoneSource(SysfsSource):
+    """Linux /sys/class/thermal/thermal_zone*/temp"""
+    
+    name = "thermal"
+    
+    def _find(self):
+        zones = glob.glob(os.path.join(self.sys_root, "class", "thermal", "thermal_zone*"))
+        for zone in sorted(zones, key=lambda z: int(z.rsplit("thermal_zone", 1)[1] or 0)):
+            kind = read_text(os.path.join(zone, "type"), os.path.basename(zone))
+            yield os.path.join(zone, "temp"), kind, categorize(kind)
+
+class NvidiaSource:
+    """NVIDIA GPUs through NVML, or nvidia-smi when pynvml is not installed"""
+    
+    name = "nvidia"
+    
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self._nvml = None
+        self._handles = []
+        self._smi = None
+    
+    def probe(self):
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+            self._nvml = pynvml
+            return bool(self._handles)
+        except Exception:
+            self._nvml = None
+        self._smi = shutil.which("nvidia-smi")
+        return self._smi is not None
+    
+    def read(self):
+        if self._nvml is not None:
+            return [
+                SensorReading(f"NVIDIA GPU {i}", "GPU",
+                              float(self._nvml.nvmlDeviceGetTemperature(handle, self._nvml.NVML_TEMPERATURE_GPU)),
+                              self.name)
+                for i, handle in enumerate(self._handles)
+            ]
+        output = subprocess.run(
+            [self._smi, "--query-gpu=temperature.gpu", "--format=csv,noheader"],
+            capture_output=True, text=True, timeout=self.timeout
+        ).stdout
+        return [
+            SensorReading(f"NVIDIA GPU {i}", "GPU", float(line), self.name)
+            for i, line in enumerate(output.split()) if line.strip()
+        ]
+    
+    def close(self):
+        if self._nvml is not None:
+            try:
+                self._nvml.nvmlShutdown()
+            except Exception:
+                pass
+            self._nvml = None
+
+class WmiSource:
+    """Windows temperatures over one WMI connection"""
+    
+    name = "wmi"
+    
+    def __init__(self):
+        self._connection = None
+        self._hardware_monitor = False
+    
+    def probe(self):
+        try:
+            import wmi
+        except ImportError:
+            return False
+        try:
+            connection = wmi.WMI(namespace="root\\OpenHardwareMonitor")
+            connection.Sensor()
+            self._connection, self._hardware_monitor = connection, True
+            return True
+        except Exception:
+            pass
+        try:
+            connection = wmi.WMI(namespace="root\\wmi")
+            connection.MSAcpi_ThermalZoneTemperature()
+            self._connection, self._hardware_monitor = connection, False
+            return True
+        except Exception:
+            return False
+    
+    def read(self):
+        if self._hardware_monitor:
+            return [
+                SensorReading(sensor.Name, categorize(sensor.Name, sensor.Name), float(sensor.Value), self.name)
+                for sensor in self._connection.Sensor() if sensor.SensorType == "Temperature"
+            ]
+        # Tenths of a kelvin
+        return [
+            SensorReading("System", "System", zone.CurrentTemperature / 10.0 - 273.15, self.name)
+            for zone in self._connection.MSAcpi_ThermalZoneTemperature()
+        ]
+    
+    def close(self):
+        self._connection = None
+
+MAC_TEMPERATURE = re.compile(r"(-?\d+(?:\.\d+)?)\s*°C")
+
+def parse_mac_temperatures(output):
+    """
+    Parse osx-cpu-temp ("61.8°C") or iStats ("CPU temp: 45.25°C") output
+    
+    Returns:
+        list: (name, celsius) pairs
+    """
+    temperatures = []
+    for line in output.splitlines():
+        match = MAC_TEMPERATURE.search(line)
+        if not match:
+            continue
+        name = line.split(":", 1)[0].strip() if ":" in line else "CPU"
+        temperatures.append((name, float(match.group(1))))
+    return temperatures
+
+class MacCommandSource:
+    """macOS temperatures from osx-cpu-temp or iStats"""
+    
+    name = "mac"
+    
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self._command = None
+    
+    def probe(self):
+        for command in (["osx-cpu-temp"], ["istats", "all"]):
+            path = shutil.which(command[0])
+            if path:
+                self._command = [path] + command[1:]
+                return True
+        return False
+    
+    def read(self):
+        output = subprocess.run(self._command, capture_output=True, text=True, timeout=self.timeout).stdout
+        return [
+            SensorReading(name, categorize(name, name), celsius, self.name)
+            for name, celsius in parse_mac_temperatures(output)
+        ]
+    
+    def close(self):
+        pass
+
+class PsutilSource:
+    """psutil.sensors_temperatures(), for platforms without a native source"""
+    
+    name = "psutil"
+    
+    def probe(self):
+        try:
+            return bool(psutil.sensors_temperatures())
+        except (AttributeError, OSError):
+            return False
+    
+    def read(self):
+        return [
+            SensorReading(f"{chip} {entry.label}".strip(), categorize(chip, entry.label), float(entry.current), self.name)
+            for chip, entries in psutil.sensors_temperatures().items() for entry in entries
+        ]
+    
+    def close(self):
+        pass
+
+def default_sources(sys_root="/sys", timeout=2.0):
+    """
+    Candidate sources for this platform, in order of preference
+    
+    Only the first of the hwmon and thermal zone sources that finds sensors
+    is kept, since the thermal zones are usually also listed under hwmon.
+    """
+    system = platform.system()
+    if system == "Linux":
+        return [[HwmonSource(sys_root), ThermalZoneSource(sys_root)], NvidiaSource(timeout)]
+    if system == "Windows":
+        return [WmiSource(), NvidiaSource(timeout)]
+    if system == "Darwin":
+        return [MacCommandSource(timeout), NvidiaSource(timeout)]
+    return [PsutilSource(), NvidiaSource(timeout)]
+
+class SensorProvider:
+    """Probes temperature sources once and samples them in the background"""
+    
+    def __init__(self, sources=None, interval=5.0):
+        """
+        Initialize the provider
+        
+        Args:
+            sources (list, optional): Sources to probe; a nested list means
+                "the first of these that works". Defaults to the platform's.
+            interval (float): Seconds between samples
+        """
+        self.candidates = sources if sources is not None else default_sources()
+        self.interval = interval
+        self.sources = None  # Probed sources, None until probe() runs
+        self._latest = []
+        self._sampled_at = 0.0
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = threading.Event()  # Set once the thread has a first sample
+        self.samples = 0
+        self.sample_time = 0.0
+    
+    def probe(self):
+        """
+        Find the sources that have sensors
+        
+        Returns:
+            list: Names of the sources in use
+        """
+        sources = []
+        for candidate in self.candidates:
+            for source in candidate if isinstance(candidate, list) else [candidate]:
+                try:
+                    if source.probe():
+                        sources.append(source)
+                        break
+                except Exception as e:
+                    logger.debug(f"Sensor source {source.name} unavailable: {e}")
+        self.sources = sources
+        logger.info(f"Temperature sources: {', '.join(s.name for s in sources) or 'none'}")
+        return [source.name for source in sources]
+    
+    def _ensure_probed(self):
+        if self.running and threading.current_thread() is not self._thread:
+            # The thread probes first, so handles are opened on that thread
+            self.ready.wait(self.interval)
+        with self._probe_lock:
+            if self.sources is None:
+                self.probe()
+    
+    @property
+    def available(self):
+        """Whether any source has sensors, probing on first use"""
+        self._ensure_probed()
+        return bool(self.sources)
+    
+    def sample(self):
+        """
+        Read every source now
+        
+        Returns:
+            list: SensorReading for every sensor that answered
+        """
+        self._ensure_probed()
+        started = time.perf_counter()
+        readings = []
+        for source in self.sources:
+            try:
+                readings.extend(source.read())
+            except Exception as e:
+                logger.error(f"Error reading {source.name} sensors: {e}")
+        with self._lock:
+            self._latest = readings
+            self._sampled_at = time.monotonic()
+        self.samples += 1
+        self.sample_time += time.perf_counter() - started
+        return readings
+    
+    def latest(self, max_age=None):
+        """
+        Return the latest readings, sampling only if they are too old
+        
+        While the background thread runs, its sample is returned as is, so
+        the sources are only ever read on that thread.
+        
+        Args:
+            max_age (float, optional): Oldest sample to accept in seconds;
+                defaults to twice the interval
+        
+        Returns:
+            list: SensorReading for every sensor
+        """
+        max_age = 2 * self.interval if max_age is None else max_age
+        if self.running and self.ready.wait(self.interval):
+            with self._lock:
+                return list(self._latest)
+        with self._lock:
+            if self._sampled_at and time.monotonic() - self._sampled_at <= max_age:
+                return list(self._latest)
+        return self.sample()
+    
+    def by_category(self, max_age=None):
+        """
+        Return the latest readings grouped by what they measure
+        
+        Returns:
+            dict: "CPU", "GPU" and "System" -> list of SensorReading
+        """
+        groups = {category: [] for category in CATEGORIES}
+        for reading in self.latest(max_age):
+            groups[reading.category].append(reading)
+        return groups
+    
+    def hottest(self, category=None, max_age=None):
+        """
+        Return the hottest sensor
+        
+        Args:
+            category (str, optional): Only consider "CPU", "GPU" or "System"
+        
+        Returns:
+            SensorReading: The hottest reading, or None without sensors
+        """
+        readings = [r for r in self.latest(max_age) if category is None or r.category == category]
+        return max(readings, key=lambda r: r.celsius, default=None)
+    
+    def _run(self):
+        if platform.system() == "Windows":
+            # WMI connections belong to the thread that opened them
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+        with self._probe_lock:
+            self.probe()
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling sensors: {e}")
+            self.ready.set()
+            if self._stop.wait(self.interval):
+                return
+    
+    def start(self):
+        """Sample in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.ready.clear()
+        self._thread = threading.Thread(target=self._run, name="sensors", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling and release the sensor handles"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for source in self.sources or []:
+            source.close()
+        self.sources = None
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def stats(self):
+        """Sampling counters for the log"""
+        return {
+            "sources": [source.name for source in self.sources or []],
+            "samples": self.samples,
+            "interval": self.interval,
+            "mean_sample_ms": round(self.sample_time / self.samples * 1000, 3) if self.samples else None
+        }
+
+_shared_provider = None
+_shared_lock = threading.Lock()
+
+def get_sensors():
+    """
+    Return the process-wide sensor provider, starting it on first use
+    
+    Returns:
+        SensorProvider: The provider configured in `sensors`, or None if
+            sensors are disabled
+    """
+    global _shared_provider
+    if not config.get_nested("sensors.enabled", True):
+        return None
+    with _shared_lock:
+        if _shared_provider is None:
+            _shared_provider = SensorProvider(
+                sources=default_sources(
+                    sys_root=config.get_nested("sensors.sys_root", "/sys"),
+                    timeout=config.get_nested("sensors.timeout", 2.0)
+                ),
+                interval=config.get_nested("sensors.interval", 5.0)
+            )
+            _shared_provider.start()
+        return _shared_provider
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Speech Front End Benchmark for AI Desktop Assistant
+
+Replays recorded WAV fixtures through the capture engine, the endpointer,
+SpeechRecognizer and an ASR backend, without a microphone or a person.
+Each fixture is opened with sr.AudioFile and fed to the capture engine one
+frame at a time at real-time pace (or faster with --speed), as if the user
+pressed P at the start of the file. For every fixture it reports:
+
+- ttfb_ms: from the key press to the first audio frame in the ring buffer
+- endpoint_ms: from the end of speech in the fixture to the end of capture
+- asr_ms: time spent in the recognition backend
+- total_ms: from the key press to the transcript
+- audio_ms: length of the audio sent to the recognizer
+
+With --speed above 1.0 the parts that follow the audio (endpointing and
+the total) shrink by the same factor.
+
+Run it headless, e.g. in CI, with the deterministic stand-in backend:
+    
+    python -m assistant.modules.speech_benchmark --backend stub tests/fixtures/audio
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from .asr_backends import StubBackend, create_backend
+from .audio_capture import create_capture_engine
+from .speech_recognition_engine import SpeechRecognizer
+
+logger = logging.getLogger(__name__)
+
+class FixtureSource:
+    """Frame source that plays a recorded file at a steady pace"""
+    
+    def __init__(self, path, sample_rate, frame_size, speed=1.0):
+        """Initialize the source
+        
+        Args:
+            path (str): WAV, AIFF or FLAC file readable by sr.AudioFile
+            sample_rate (int): Sample rate of the capture engine
+            frame_size (int): Samples returned by each read()
+            speed (float): Playback speed; 1.0 is real time
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.speed = float(speed)
+        self.samples = None
+        self.delivered = 0
+        self.first_frame_at = None
+        self._delivered_at = []
+        self._started = None
+    
+    def open(self):
+        """Load the file, converted to 16-bit mono at the engine's rate"""
+        with sr.AudioFile(self.path) as source:
+            audio = sr.Recognizer().record(source)
+        raw = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        self.samples = np.frombuffer(raw, dtype=np.int16)
+        self._started = time.perf_counter()
+    
+    def read(self):
+        """Return the next frame once its time has come; silence after the end"""
+        frame_index = self.delivered // self.frame_size
+        due = self._started + frame_index * self.frame_size / self.sample_rate / self.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        
+        frame = self.samples[self.delivered:self.delivered + self.frame_size]
+        if len(frame) < self.frame_size:
+            frame = np.concatenate([frame, np.zeros(self.frame_size - len(frame), dtype=np.int16)])
+        self.delivered += self.frame_size
+        now = time.perf_counter()
+        if self.first_frame_at is None:
+            self.first_frame_at = now
+        self._delivered_at.append(now)
+        return frame.tobytes()
+    
+    def close(self):
+        """Nothing to release"""
+    
+    def delivered_at(self, position):
+        """
+        Return when the frame containing a sample was delivered
+        
+        Args:
+            position (int): Sample position in the file
+        
+        Returns:
+            float: perf_counter() time, or None if not delivered yet
+        """
+        index = position // self.frame_size
+        return self._delivered_at[index] if index < len(self._delivered_at) else None
+
+def expected_transcript(path):
+    """Derive the expected transcript from a fixture name ("check_battery.wav")"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return "" if name == "silence" else name.replace("_", " ")
+
+def speech_end(samples, endpointer):
+    """Return the sample position where speech ends, or None for silence"""
+    hits = np.flatnonzero(endpointer.speech_frames(samples))
+    if hits.size == 0:
+        return None
+    return int(hits[-1] + 1) * endpointer.frame_size
+
+def run_fixture(path, backend, speed=1.0, timeout=5):
+    """
+    Replay one fixture and time each part of the speech front end
+    
+    Args:
+        path (str): Fixture file
+        backend (ASRBackend): Recognition backend
+        speed (float): Playback speed; 1.0 is real time
+        timeout (float): Seconds to wait for speech to start
+    
+    Returns:
+        dict: Timings in milliseconds and the transcript
+    """
+    engine = create_capture_engine()
+    source = FixtureSource(path, engine.sample_rate, engine.frame_size, speed)
+    recognizer = SpeechRecognizer(capture_engine=engine, backend=backend)
+    
+    pressed = time.perf_counter()
+    if not engine.start(source=source):
+        raise RuntimeError(f"Could not open fixture {path}")
+    try:
+        # P is pressed at the start of the file
+        audio = recognizer.capture(timeout=timeout, start=0)
+        captured = time.perf_counter()
+        text = None
+        asr_time = 0.0
+        if audio is not None:
+            start = time.perf_counter()
+            text = recognizer.recognize(audio)
+            asr_time = time.perf_counter() - start
+        done = time.perf_counter()
+    finally:
+        engine.stop()
+    
+    end = speech_end(source.samples, engine.endpointer)
+    end_at = source.delivered_at(end) if end is not None else None
+    return {
+        "fixture": os.path.basename(path),
+        "expected": expected_transcript(path),
+        "text": text,
+        "ttfb_ms": round((source.first_frame_at - pressed) * 1000, 1),
+        "endpoint_ms": round((captured - end_at) * 1000, 1) if end_at else None,
+        "asr_ms": round(asr_time * 1000, 1),
+        "total_ms": round((done - pressed) * 1000, 1),
+        "audio_ms": round(len(audio.frame_data) / (audio.sample_rate * audio.sample_width) * 1000, 1) if audio else 0.0
+    }
+
+def run_benchmark(paths, backend_name="stub", speed=1.0, stub_latency=0.0):
+    """
+    Replay fixtures through the speech front end
+    
+    Args:
+        paths (list): Fixture files
+        backend_name (str): ASR backend; "stub" answers with the transcript
+            expected for each fixture
+        speed (float): Playback speed; 1.0 is real time
+        stub_latency (float): Seconds the stub backend takes per utterance
+    
+    Returns:
+        list: One result dictionary per fixture
+    """
+    results = []
+    shared = None if backend_name == "stub" else create_backend(backend_name)
+    for path in paths:
+        backend = shared or StubBackend(text=expected_transcript(path), latency=stub_latency)
+        results.append(run_fixture(path, backend, speed=speed))
+    return results
+
+def format_results(results, columns=("fixture", "ttfb_ms", "endpoint_ms", "asr_ms", "total_ms", "audio_ms", "text")):
+    """Return the results as a plain-text table"""
+    rows = [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the speech front end with recorded fixtures")
+    parser.add_argument("fixtures", nargs="?", default="tests/fixtures/audio",
+                        help="Fixture file or directory of WAV files")
+    parser.add_argument("--backend", default="stub", help="ASR backend: stub, vosk or google")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (1.0 is real time)")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub backend takes")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    if os.path.isdir(args.fixtures):
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+    else:
+        paths = [args.fixtures]
+    if not paths:
+        print(f"No fixtures found in {args.fixtures}")
+        return 1
+    
+    results = run_benchmark(paths, args.backend, args.speed, args.stub_latency)
+    print(format_results(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
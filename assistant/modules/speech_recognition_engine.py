@@ -1,13 +1,26 @@
 import speech_recognition as sr
 import logging
+from .asr_backends import get_backend
+from .endpointing import trim_audio
+from .tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 class SpeechRecognizer:
     """Handles speech recognition functionality"""
     
-    def __init__(self):
-        """Initialize the speech recognizer"""
+    def __init__(self, capture_engine=None, backend=None):
+        """Initialize the speech recognizer
+        
+        Args:
+            capture_engine (AudioCaptureEngine, optional): Always-open capture
+                engine. Without one, each capture opens the microphone and
+                calibrates for ambient noise first.
+            backend (ASRBackend, optional): Recognition backend. Defaults to
+                the one selected by `asr.backend` in config.json.
+        """
+        self.capture_engine = capture_engine
+        self.backend = backend or get_backend()
         self.recognizer = sr.Recognizer()
         # Adjust recognition parameters
         self.recognizer.energy_threshold = 300  # Minimum audio energy to consider for recording
@@ -16,16 +29,47 @@ class SpeechRecognizer:
         self.recognizer.phrase_threshold = 0.3  # Minimum seconds of speaking audio before we consider the speaking audio a phrase
         self.recognizer.non_speaking_duration = 0.3  # Seconds of non-speaking audio to keep on both sides of the recording
         
-    def listen(self, timeout=5):
+    def mark(self):
         """
-        Listen for speech and convert to text
+        Mark the moment P was pressed
+        
+        Returns:
+            int: Stream position to pass to capture(), or None without a
+                running capture engine
+        """
+        if self.capture_engine is not None and self.capture_engine.running:
+            return self.capture_engine.mark()
+        return None
+    
+    def capture(self, timeout=5, start=None, released=None):
+        """
+        Record a single utterance from the microphone
         
         Args:
             timeout (int): Number of seconds to listen for
+            start (int, optional): Stream position from mark(); recording
+                starts just before it
+            released (threading.Event, optional): Set when the user releases
+                P. Recording stops immediately (capture engine only).
             
         Returns:
-            str: Recognized text, or None if recognition fails
+            sr.AudioData: Captured audio, or None if nothing was heard
         """
+        if self.capture_engine is not None and self.capture_engine.running:
+            # The stream is already open and the noise floor is known
+            with tracer.span("listen", timeout=timeout, engine=True):
+                audio = self.capture_engine.capture(
+                    start=start,
+                    timeout=timeout,
+                    phrase_limit=timeout,
+                    released=released
+                )
+            if audio is None:
+                logger.info("No speech detected within timeout period")
+            else:
+                logger.info("Audio captured")
+            return audio
+        
         try:
             # Create a new microphone instance
             microphone = sr.Microphone()
@@ -33,29 +77,98 @@ class SpeechRecognizer:
             with microphone as source:
                 logger.info("Adjusting for ambient noise...")
                 # Quick ambient noise adjustment
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
+                with tracer.span("calibrate"):
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
                 
                 logger.info("Listening for speech...")
                 try:
                     # Listen for audio input
-                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=timeout)
-                    logger.info("Audio captured, starting recognition...")
-                    
-                    # Try to recognize the speech
-                    text = self.recognizer.recognize_google(audio, language='en-US')
-                    logger.info(f"Successfully recognized: {text}")
-                    return text
+                    with tracer.span("listen", timeout=timeout):
+                        audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=timeout)
+                    logger.info("Audio captured")
+                    # Don't upload the silence around the command
+                    return trim_audio(audio)
                     
                 except sr.WaitTimeoutError:
                     logger.info("No speech detected within timeout period")
                     return None
-                    
-        except sr.UnknownValueError:
-            logger.info("Speech was unintelligible")
+        
+        except Exception as e:
+            logger.error(f"Error capturing audio: {e}")
             return None
+    
+    def recognize(self, audio):
+        """
+        Convert captured audio to text
+        
+        Args:
+            audio (sr.AudioData): Audio returned by capture()
+        
+        Returns:
+            str: Recognized text, or None if recognition fails
+        """
+        if audio is None:
+            return None
+        
+        try:
+            logger.info("Starting recognition...")
+            with tracer.span(f"{self.backend.name}_asr"):
+                text = self.backend.recognize(audio)
+            if not text:
+                logger.info("Speech was unintelligible")
+                return None
+            logger.info(f"Successfully recognized: {text}")
+            return text
+                    
         except sr.RequestError as e:
             logger.error(f"Could not request results from service: {e}")
             return None
         except Exception as e:
             logger.error(f"Error in speech recognition: {e}")
-            return None 
\ No newline at end of file
+            return None 
+    
+    def recognize_nbest(self, audio, n=5):
+        """
+        Convert captured audio to alternative transcripts
+        
+        Args:
+            audio (sr.AudioData): Audio returned by capture()
+            n (int): Most alternatives to return
+        
+        Returns:
+            list: (text, confidence) pairs, best first; empty if recognition
+                fails
+        """
+        if audio is None:
+            return []
+        
+        try:
+            logger.info("Starting recognition...")
+            with tracer.span(f"{self.backend.name}_asr"):
+                hypotheses = self.backend.recognize_nbest(audio, n)
+            if not hypotheses:
+                logger.info("Speech was unintelligible")
+                return []
+            logger.info(f"Successfully recognized: {hypotheses[0][0]} ({len(hypotheses)} alternatives)")
+            return hypotheses
+        
+        except sr.RequestError as e:
+            logger.error(f"Could not request results from service: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Error in speech recognition: {e}")
+            return []
+    
+    def listen(self, timeout=5, start=None, released=None):
+        """
+        Listen for speech and convert to text
+        
+        Args:
+            timeout (int): Number of seconds to listen for
+            start (int, optional): Stream position from mark()
+            released (threading.Event, optional): Set when the user releases P
+        
+        Returns:
+            str: Recognized text, or None if recognition fails
+        """
+        return self.recognize(self.capture(timeout=timeout, start=start, released=released))
@@ -7,6 +7,14 @@ from google.cloud import texttospeech
 from pathlib import Path
 import time
 import threading
+import contextlib
+import contextvars
+from .asr_backends import get_backend
+from .config_handler import config
+from .audio_playback import AudioPlayer
+from .cloud_tts import CloudSpeaker, get_client
+from .tts_cache import CachedSpeaker, PhraseCache, find_phrases, handler_sources
+from .tts_worker import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, Pyttsx3Speaker, TTSWorker
 
 # Set up logging to show only important information
 logging.basicConfig(
@@ -24,43 +32,108 @@ logging.getLogger('comtypes').setLevel(logging.WARNING)
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 
 # Voice settings
-VOICE_TYPE = "local"  # Can be "local" or "google"
+VOICE_TYPE = "local"  # Default for tts.engine; can be "local" or "google"
 GOOGLE_VOICE_NAME = "en-IN-Standard-A"  # Indian English female voice
 GOOGLE_VOICE_GENDER = texttospeech.SsmlVoiceGender.FEMALE
 
-# Global engine instance
-_engine = None
-_speech_lock = threading.Lock()
+# TTS worker that owns the speech engine (started on first use)
+_worker = None
+_worker_lock = threading.Lock()
+
+# Pooled Google TTS speaker used by speak_google()
+_cloud_speaker = None
+
+# Optional per-context destination for speak() output (see redirect_speech)
+_speech_redirect = contextvars.ContextVar("speech_redirect", default=None)
 
 def initialize_speech_engine():
-    """Initialize the speech engine."""
-    global _engine
-    try:
-        _engine = pyttsx3.init()
-        # Set properties
-        _engine.setProperty('rate', 150)  # Speed of speech
+    """
+    Start the TTS worker, which creates the speech engine in its own thread
         
-        # Get available voices
-        voices = _engine.getProperty('voices')
+    Returns:
+        bool: True once the worker is running
+    """
+    get_tts_worker()
+    return True
         
-        # Try to find an Indian English voice
-        indian_voice = None
-        for voice in voices:
-            if "indian" in voice.name.lower() or "hindi" in voice.name.lower():
-                indian_voice = voice.id
-                break
-                
-        # If Indian voice found, set it
-        if indian_voice:
-            _engine.setProperty('voice', indian_voice)
-        # Otherwise use the first voice
-        elif voices:
-            _engine.setProperty('voice', voices[0].id)
-            
-        return True
-    except Exception as e:
-        logger.error(f"Error initializing speech engine: {e}")
-        return False
+def create_cloud_speaker(player, fallback=None):
+    """
+    Create a Google Cloud TTS speaker from `tts.google` in the configuration
+    
+    Args:
+        player (AudioPlayer): Plays the synthesized audio
+        fallback (object, optional): Local speaker used when the cloud
+            cannot be reached
+    
+    Returns:
+        CloudSpeaker: The speaker, not yet opened
+    """
+    return CloudSpeaker(
+        player,
+        voice=config.get_nested("tts.google.voice", GOOGLE_VOICE_NAME),
+        language=config.get_nested("tts.google.language", "en-IN"),
+        rate=config.get_nested("tts.google.speaking_rate", 1.0),
+        sample_rate=config.get_nested("tts.google.sample_rate", 24000),
+        endpoint=config.get_nested("tts.google.endpoint", None),
+        max_workers=config.get_nested("tts.google.max_workers", 4),
+        fallback=fallback
+    )
+
+def create_speaker():
+    """
+    Create the speaker used by the TTS worker from the `tts` configuration
+    
+    tts.engine selects "local" (pyttsx3) or "google" (Google Cloud TTS with
+    pyttsx3 as the fallback).
+    
+    Returns:
+        object: A CachedSpeaker when tts.cache.enabled is set, otherwise the
+            live speaker
+    """
+    player = AudioPlayer()
+    speaker = Pyttsx3Speaker(rate=config.get_nested("tts.rate", 150))
+    if config.get_nested("tts.engine", VOICE_TYPE) == "google":
+        speaker = create_cloud_speaker(player, fallback=speaker)
+    if not config.get_nested("tts.cache.enabled", True):
+        return speaker
+    try:
+        cache = PhraseCache(
+            config.get_nested("tts.cache.directory", "cache/tts"),
+            max_bytes=int(config.get_nested("tts.cache.max_mb", 50) * 1024 * 1024),
+            memory_items=config.get_nested("tts.cache.memory_items", 32)
+        )
+    except OSError as e:
+        logger.error(f"Error opening the phrase cache: {e}")
+        return speaker
+    return CachedSpeaker(speaker, cache, player)
+
+def get_tts_worker():
+    """Return the shared TTS worker, starting it on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker(
+                speaker=create_speaker(),
+                max_queue=config.get_nested("tts.queue_size", 8)
+            )
+            _worker.start()
+        return _worker
+
+def warm_phrase_cache():
+    """
+    Pre-render the fixed phrases used by the handlers in the background
+    
+    Returns:
+        int: Number of phrases queued for rendering
+    """
+    if not config.get_nested("tts.cache.warm", True):
+        return 0
+    worker = get_tts_worker()
+    if not isinstance(worker.speaker, CachedSpeaker):
+        return 0
+    phrases = find_phrases(handler_sources(str(Path(__file__).resolve().parents[2])))
+    worker.speaker.warm(worker, phrases)
+    return len(phrases)
 
 def recognize_speech():
     """Captures voice command and converts it to text"""
@@ -85,17 +158,13 @@ def recognize_speech():
                 print("Processing speech...")
 
                 try:
-                    # Using en-IN for Indian English
-                    text = recognizer.recognize_google(
-                        audio,
-                        language="en-IN",  # Indian English
-                        show_all=False  # Only return most confident result
-                    )
+                    # Uses the backend selected by asr.backend in config.json
+                    text = get_backend().recognize(audio)
+                    if not text:
+                        print("Sorry, I couldn't understand what you said.")
+                        return None
                     print(f"You said: {text}")
                     return text.lower()
-                except sr.UnknownValueError:
-                    print("Sorry, I couldn't understand what you said.")
-                    return None
                 except sr.RequestError as e:
                     print("Could not request results from speech service.")
                     return None
@@ -109,105 +178,99 @@ def recognize_speech():
 
 def speak_google(text):
     """Converts text to speech using Google Cloud TTS"""
+    global _cloud_speaker
     try:
-        # Initialize the client
-        client = texttospeech.TextToSpeechClient()
-
-        # Set the text input to be synthesized
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-        # Build the voice request
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-IN",
-            name=GOOGLE_VOICE_NAME,
-            ssml_gender=GOOGLE_VOICE_GENDER
-        )
-
-        # Select the type of audio file
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=1.0,
-            pitch=0
-        )
-
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-
-        # Create output directory if it doesn't exist
-        output_dir = Path("temp_audio")
-        output_dir.mkdir(exist_ok=True)
-        
-        # Save the audio file
-        output_file = output_dir / "output.mp3"
-        with open(output_file, "wb") as out:
-            out.write(response.audio_content)
-            
-        # Play the audio file using system default player
-        os.system(f'start {output_file}')
-        
+        with _worker_lock:
+            if _cloud_speaker is None:
+                speaker = create_cloud_speaker(AudioPlayer())
+                speaker.open()
+                _cloud_speaker = speaker
+        _cloud_speaker.speak(text)
     except Exception as e:
         print(f"Error with Google TTS: {e}")
         # Fallback to local TTS
         speak_local(text)
 
 def speak_local(text):
-    """Converts text to speech using local Windows TTS"""
-    engine = pyttsx3.init()
-    engine.setProperty("rate", 150)  # Adjust speed
+    """Converts text to speech using the local TTS engine"""
+    return speak(text)
     
-    # Get available voices
-    voices = engine.getProperty('voices')
+def speak(text, priority=PRIORITY_NORMAL, key=None):
+    """
+    Convert text to speech without waiting for it to be spoken
     
-    # Try to find an Indian English voice
-    indian_voice_found = False
-    for voice in voices:
-        if "indian" in voice.name.lower() or "en-in" in voice.id.lower():
-            engine.setProperty('voice', voice.id)
-            indian_voice_found = True
-            break
+    Args:
+        text (str): Text to convert to speech
+        priority (int): PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        key (str, optional): Coalescing key; a message with the same key that
+            is still waiting is replaced (e.g. "volume")
     
-    if not indian_voice_found:
-        print("No Indian English voice found, using default voice")
+    Returns:
+        Utterance: Handle for the queued speech, or None when the text was
+            handed to a redirect
+    """
+    # Hand the text to the active redirect (e.g. the pipeline speech stage)
+    redirect = _speech_redirect.get()
+    if redirect is not None:
+        options = {}
+        if priority != PRIORITY_NORMAL:
+            options["priority"] = priority
+        if key is not None:
+            options["key"] = key
+        redirect(text, **options)
+        return None
     
-    engine.say(text)
-    engine.runAndWait()
+    # Print the text to console as well
+    print(f"[SPEECH]: {text}")
+    try:
+        return get_tts_worker().say(text, priority=priority, key=key)
+    except Exception as e:
+        logger.error(f"Error in text-to-speech: {e}")
+        print(f"[SPEECH ERROR]: {text}")
+        return None
 
-def speak(text):
+def speak_and_wait(text, priority=PRIORITY_NORMAL, key=None, timeout=None):
     """
-    Convert text to speech
+    Convert text to speech and wait until it has been spoken
     
     Args:
         text (str): Text to convert to speech
+        priority (int): PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        key (str, optional): Coalescing key
+        timeout (float, optional): Seconds to wait
+    """
+    utterance = speak(text, priority=priority, key=key)
+    if utterance is not None:
+        utterance.wait(timeout)
+
+def interrupt_speech():
+    """
+    Cut off current speech and drop queued messages (barge-in)
+    
+    Returns:
+        int: Number of messages cut off or dropped
+    """
+    if _worker is None:
+        return 0
+    return _worker.interrupt()
+
+@contextlib.contextmanager
+def redirect_speech(callback):
     """
-    global _engine, _speech_lock
+    Route speak() calls made in the current context to a callback
     
-    # Initialize engine if not already done
-    if _engine is None:
-        if not initialize_speech_engine():
-            print(f"[SPEECH]: {text}")
-            return
+    Used by the command pipeline so handlers that call speak() inline hand
+    their text to the speech stage instead of blocking on the TTS engine.
     
+    Args:
+        callback (callable): Function called with the text to speak, plus
+            priority and key keyword arguments when they are not the defaults
+    """
+    token = _speech_redirect.set(callback)
     try:
-        with _speech_lock:
-            # Print the text to console as well
-            print(f"[SPEECH]: {text}")
-            
-            # Check if engine is busy
-            if _engine._inLoop:
-                # Stop the current speech if it's running
-                _engine.stop()
-                time.sleep(0.1)  # Give a small delay
-            
-            # Say the text
-            _engine.say(text)
-            _engine.runAndWait()
-    except Exception as e:
-        logger.error(f"Error in text-to-speech: {e}")
-        print(f"[SPEECH ERROR]: {text}")
+        yield
+    finally:
+        _speech_redirect.reset(token)
 
 def list_available_voices():
     """Lists all available voices (both local and Google Cloud)"""
@@ -223,7 +286,7 @@ def list_available_voices():
     print("\nGoogle Cloud Voices (Indian English):")
     print("=================================")
     try:
-        client = texttospeech.TextToSpeechClient()
+        client = get_client(config.get_nested("tts.google.endpoint", None))
         voices = client.list_voices(language_code="en-IN")
         for idx, voice in enumerate(voices.voices):
             print(f"{idx + 1}. {voice.name}")
@@ -232,5 +295,3 @@ def list_available_voices():
     except Exception as e:
         print("Error accessing Google Cloud voices. Make sure you have set up Google Cloud credentials.")
 
-# Initialize the speech engine when module is imported
-initialize_speech_engine()
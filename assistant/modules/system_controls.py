@@ -11,6 +11,7 @@ import pyautogui
 import datetime
 import wmi  # For Windows-specific features
 from pathlib import Path
+from typing import NamedTuple, Optional
 import urllib.request
 import glob
 import requests
@@ -26,6 +27,35 @@ except ImportError:
         def speak(text):
             print(f"[SPEECH]: {text}")
 
+try:
+    from assistant.modules.command_router import CommandRouter
+    from assistant.modules.config_handler import config
+    from assistant.modules.result_cache import ResultCache
+    from assistant.modules.telemetry import describe_duration, get_telemetry, latest_sample, parse_duration
+    from assistant.modules.telemetry_store import get_telemetry_store, parse_period
+    from assistant.modules.app_index import get_app_index, launch_command
+    from assistant.modules.network_status import get_network_status
+    from assistant.modules.sensors import get_sensors
+    from assistant.modules.disk_usage import get_disk_usage
+    from assistant.modules.process_inspector import describe_bytes, get_process_inspector, parse_process_query
+    from assistant.modules.screenshot_service import get_screenshot_service, open_file, parse_screenshot_command
+    from assistant.modules.screenshot_library import LIBRARY_KEYWORDS, get_screenshot_library
+    from assistant.modules.screen_recorder import RECORDING_KEYWORDS, get_screen_recorder
+except ImportError:
+    from command_router import CommandRouter
+    from config_handler import config
+    from result_cache import ResultCache
+    from telemetry import describe_duration, get_telemetry, latest_sample, parse_duration
+    from telemetry_store import get_telemetry_store, parse_period
+    from app_index import get_app_index, launch_command
+    from network_status import get_network_status
+    from sensors import get_sensors
+    from disk_usage import get_disk_usage
+    from process_inspector import describe_bytes, get_process_inspector, parse_process_query
+    from screenshot_service import get_screenshot_service, open_file, parse_screenshot_command
+    from screenshot_library import LIBRARY_KEYWORDS, get_screenshot_library
+    from screen_recorder import RECORDING_KEYWORDS, get_screen_recorder
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -77,6 +107,58 @@ APP_PATHS = {
     ]
 }
 
+# "open notepad", "launch the calculator for me", ...
+APP_COMMAND = re.compile(r'\b(?:open|launch|start|run)\s+(.+?)(?:\s+for me|\s+now|\s+please|\s+app|\s+application|$)')
+
+# Peak usage that counts as "high" in history questions
+HIGH_USAGE_PERCENT = 80
+
+# Readings returned by the information queries and kept in the result cache
+class CpuReading(NamedTuple):
+    percent: float
+    logical_cores: int
+    frequency_mhz: Optional[float]
+
+class MemoryReading(NamedTuple):
+    percent: float
+    used_gb: float
+    total_gb: float
+
+class DiskReading(NamedTuple):
+    device: str
+    mountpoint: str
+    percent: Optional[float]
+    used_gb: Optional[float]
+    total_gb: Optional[float]
+    reachable: bool = True
+
+class BatteryReading(NamedTuple):
+    percent: float
+    power_plugged: bool
+    secsleft: int
+    power_plan: str
+
+class WifiReading(NamedTuple):
+    connected: bool
+    report: str
+
+class TemperatureReading(NamedTuple):
+    available: bool
+    report: str
+
+class WeatherReading(NamedTuple):
+    location: str
+    description: str
+    temperature: float
+    feels_like: float
+    humidity: int
+    wind_speed: float
+    sunrise: str
+    sunset: str
+
+class WeatherError(Exception):
+    """Raised when the weather service doesn't return a reading; the message is spoken"""
+
 class SystemControls:
     """Class to handle system control operations like app launching, shutdown, etc."""
     
@@ -98,25 +180,47 @@ class SystemControls:
             except Exception as e:
                 logger.error(f"Error initializing WMI: {e}")
                 self.wmi = None
+        
+        # Cache readings for information queries (see result_cache.py)
+        self.cache = ResultCache()
+        for query, policy in config.get_nested("result_cache.queries", {}).items():
+            self.cache.set_policy(query, policy.get("ttl", 5), policy.get("max_stale", 0))
+        
+        # Installed applications by spoken name, indexed in the background
+        self.app_index = get_app_index(builtin=WINDOWS_APPS if self.os_name == 'Windows' else None)
+        
+        # Linux WiFi status from sysfs; a link change drops the cached reading
+        self.network = get_network_status() if self.os_name == 'Linux' else None
+        if self.network is not None:
+            self.network.add_listener(lambda: self.cache.invalidate("wifi"))
+        
+        # Temperature sources probed once and sampled in the background
+        self.sensors = get_sensors()
+        
+        # Mounts are measured concurrently, each with a timeout
+        self.disk_usage = get_disk_usage()
+        
+        # Per-process CPU, memory and I/O from cached snapshots
+        self.processes = get_process_inspector()
+        
+        # Screenshots are captured here and encoded on background workers
+        self.screenshots = get_screenshot_service()
+        self.recorder = get_screen_recorder(self.screenshots)
+        # Index of saved screenshots, None if turned off
+        self.library = get_screenshot_library(self.screenshots)
+        
+        self.router = self._build_router()
     
     def extract_app_name(self, command):
         """Extract application name from command"""
         command = command.lower()
         
         # Extract application name using regex
-        app_patterns = [
-            r'open\s+(.+?)(?:\s+for me|\s+now|\s+please|\s+app|\s+application|$)',
-            r'launch\s+(.+?)(?:\s+for me|\s+now|\s+please|\s+app|\s+application|$)',
-            r'start\s+(.+?)(?:\s+for me|\s+now|\s+please|\s+app|\s+application|$)',
-            r'run\s+(.+?)(?:\s+for me|\s+now|\s+please|\s+app|\s+application|$)'
-        ]
-        
-        for pattern in app_patterns:
-            match = re.search(pattern, command)
-            if match:
-                app_name = match.group(1).strip()
-                logger.info(f"Extracted app name: '{app_name}' from command: '{command}'")
-                return app_name
+        match = APP_COMMAND.search(command)
+        if match:
+            app_name = match.group(1).strip()
+            logger.info(f"Extracted app name: '{app_name}' from command: '{command}'")
+            return app_name
         
         # If no app name found with regex, check for direct mentions
         for app_name in self.windows_apps:
@@ -134,13 +238,10 @@ class SystemControls:
                 if os.path.exists(path):
                     return path
         
-        # Try to find in PATH
-        if platform.system() == 'Windows':
-            # Windows: Check Program Files directories
-            for program_files in ['C:\\Program Files', 'C:\\Program Files (x86)']:
-                for root, dirs, files in os.walk(program_files):
-                    if executable in files:
-                        return os.path.join(root, executable)
+        # Program Files and PATH are searched by the application index
+        found = self.app_index.resolve(executable)
+        if found:
+            return found[1]
         
         # Return just the executable name and let the system find it
         return executable
@@ -166,65 +267,141 @@ class SystemControls:
             speak(f"It's {date_time_str}")
             return True
     
+    def _read_cpu(self):
+        """Read CPU usage from the telemetry sampler, or measure it for one second"""
+        cpu_freq = psutil.cpu_freq()
+        sample = latest_sample()
+        return CpuReading(
+            percent=round(sample["cpu_percent"], 1) if sample else psutil.cpu_percent(interval=1),
+            logical_cores=psutil.cpu_count(logical=True),
+            frequency_mhz=cpu_freq.current if cpu_freq else None
+        )
+    
+    def _read_memory(self):
+        """Measure memory usage"""
+        memory = psutil.virtual_memory()
+        return MemoryReading(
+            percent=memory.percent,
+            used_gb=memory.used / (1024 * 1024 * 1024),
+            total_gb=memory.total / (1024 * 1024 * 1024)
+        )
+    
+    def _read_disks(self):
+        """Measure usage of every mounted partition within the disk_usage deadline"""
+        readings = []
+        for mount in self.disk_usage.collect():
+            if not mount.reachable:
+                readings.append(DiskReading(mount.device, mount.mountpoint, None, None, None, reachable=False))
+                continue
+            readings.append(DiskReading(
+                device=mount.device,
+                mountpoint=mount.mountpoint,
+                percent=mount.percent,
+                used_gb=mount.used / (1024 * 1024 * 1024),
+                total_gb=mount.total / (1024 * 1024 * 1024)
+            ))
+        return tuple(readings)
+    
+    def _report_top_processes(self, metric, count):
+        """
+        Print and speak the processes using the most of a resource
+        
+        Args:
+            metric (str): "cpu", "memory" or "io"
+            count (int): Number of processes to list
+        
+        Returns:
+            bool: True if any process could be read
+        """
+        processes = self.processes.top(metric, count)
+        if not processes:
+            speak("I couldn't read the running processes")
+            return False
+        
+        for process in processes:
+            io = f"{describe_bytes(process.io_bps)}/s" if process.io_bps is not None else "n/a"
+            print(f"{process.name} ({len(process.pids)} processes): CPU {process.cpu_percent}% | "
+                  f"Memory {describe_bytes(process.rss)} ({process.memory_percent}%) | I/O {io}")
+        
+        top = processes[0]
+        if metric == "memory":
+            speak(f"{top.name} uses the most memory, {describe_bytes(top.rss)}, or {top.memory_percent} percent")
+        elif metric == "io":
+            if not top.io_bps:
+                speak("No process is reading or writing much right now")
+            else:
+                speak(f"{top.name} is doing the most disk and network I/O, {describe_bytes(top.io_bps)} per second")
+        else:
+            speak(f"{top.name} is using the most CPU, {top.cpu_percent} percent")
+        return True
+    
     def get_system_info(self, command):
         """Handle system information requests"""
         print(f"Command: {command} | Category: system_info | Confidence: 0.95")
         try:
             command = command.lower()
             
+            # Trends over the telemetry history
+            seconds = parse_duration(command)
+            if seconds is not None and self._report_trend(command, seconds):
+                return True
+            period = parse_period(command)
+            if period is not None and self._report_history(command, *period[:2], period[2]):
+                return True
+            
+            # Processes using the most CPU, memory or I/O
+            process_query = parse_process_query(command)
+            if process_query is not None:
+                return self._report_top_processes(*process_query)
+            
             # CPU information
             if any(word in command for word in ["cpu", "processor", "processing"]):
-                cpu_percent = psutil.cpu_percent(interval=1)
-                cpu_count = psutil.cpu_count(logical=True)
-                cpu_freq = psutil.cpu_freq()
+                cpu = self.cache.get("cpu", self._read_cpu)
                 
-                print(f"CPU Usage: {cpu_percent}%")
-                print(f"CPU Cores: {cpu_count}")
-                if cpu_freq:
-                    print(f"CPU Frequency: {cpu_freq.current:.2f} MHz")
+                print(f"CPU Usage: {cpu.percent}%")
+                print(f"CPU Cores: {cpu.logical_cores}")
+                if cpu.frequency_mhz:
+                    print(f"CPU Frequency: {cpu.frequency_mhz:.2f} MHz")
                 
-                speak(f"CPU usage is {cpu_percent} percent across {cpu_count} logical cores")
+                speak(f"CPU usage is {cpu.percent} percent across {cpu.logical_cores} logical cores")
                 return True
             
             # Memory information
             elif any(word in command for word in ["memory", "ram", "memory usage"]):
-                memory = psutil.virtual_memory()
-                total_gb = memory.total / (1024 * 1024 * 1024)
-                used_gb = memory.used / (1024 * 1024 * 1024)
+                memory = self.cache.get("memory", self._read_memory)
                 
                 print(f"Memory Usage: {memory.percent}%")
-                print(f"Used: {used_gb:.1f} GB / Total: {total_gb:.1f} GB")
+                print(f"Used: {memory.used_gb:.1f} GB / Total: {memory.total_gb:.1f} GB")
                 
-                speak(f"Memory usage is {memory.percent} percent, using {used_gb:.1f} gigabytes out of {total_gb:.1f}")
+                speak(f"Memory usage is {memory.percent} percent, using {memory.used_gb:.1f} gigabytes out of {memory.total_gb:.1f}")
                 return True
             
             # Disk information
             elif any(word in command for word in ["disk", "storage", "drive", "space"]):
-                partitions = psutil.disk_partitions()
-                for partition in partitions:
-                    if partition.fstype:
-                        usage = psutil.disk_usage(partition.mountpoint)
-                        total_gb = usage.total / (1024 * 1024 * 1024)
-                        used_gb = usage.used / (1024 * 1024 * 1024)
+                for disk in self.cache.get("disk", self._read_disks):
+                    if not disk.reachable:
+                        print(f"\nDrive {disk.device} ({disk.mountpoint}): not responding, skipped")
+                        continue
+                    print(f"\nDrive {disk.device}:")
+                    print(f"Usage: {disk.percent}%")
+                    print(f"Used: {disk.used_gb:.1f} GB / Total: {disk.total_gb:.1f} GB")
                         
-                        print(f"\nDrive {partition.device}:")
-                        print(f"Usage: {usage.percent}%")
-                        print(f"Used: {used_gb:.1f} GB / Total: {total_gb:.1f} GB")
-                        
-                        if partition.device.startswith("C:"):
-                            speak(f"Your main drive is {usage.percent} percent full, using {used_gb:.1f} gigabytes")
+                    if disk.device.startswith("C:"):
+                        speak(f"Your main drive is {disk.percent} percent full, using {disk.used_gb:.1f} gigabytes")
                 return True
             
             # Temperature information (if available)
             elif any(word in command for word in ["temperature", "temp", "heat"]):
                 try:
-                    temperatures = psutil.sensors_temperatures()
-                    if temperatures:
-                        for name, entries in temperatures.items():
-                            for entry in entries:
-                                print(f"{name}: {entry.current}°C")
-                                speak(f"Current temperature is {entry.current:.1f} degrees Celsius")
-                                return True
+                    reading = None
+                    if self.sensors is not None and self.sensors.available:
+                        # Speak the CPU temperature rather than whichever sensor comes first
+                        reading = self.sensors.hottest("CPU") or self.sensors.hottest()
+                    if reading is not None:
+                        print(f"{reading.name}: {reading.celsius:.1f}°C")
+                        part = "system" if reading.category == "System" else reading.category
+                        speak(f"Current {part} temperature is {reading.celsius:.1f} degrees Celsius")
+                        return True
                     speak("Temperature information is not available")
                 except:
                     speak("Temperature information is not available")
@@ -241,10 +418,10 @@ class SystemControls:
                 print(f"Processor: {system.processor}")
                 print(f"Uptime: {uptime.days} days, {uptime.seconds//3600} hours")
                 
-                cpu_percent = psutil.cpu_percent(interval=1)
-                memory = psutil.virtual_memory()
+                cpu = self.cache.get("cpu", self._read_cpu)
+                memory = self.cache.get("memory", self._read_memory)
                 
-                speak(f"You are running {system.system} {system.release}. CPU usage is {cpu_percent} percent and memory usage is {memory.percent} percent")
+                speak(f"You are running {system.system} {system.release}. CPU usage is {cpu.percent} percent and memory usage is {memory.percent} percent")
                 return True
                 
         except Exception as e:
@@ -252,11 +429,120 @@ class SystemControls:
             speak("Sorry, I couldn't retrieve system information")
             return False
     
+    def _trend_metric(self, command):
+        """Pick the telemetry metric a trend question is about, or None"""
+        if any(word in command for word in ["cpu", "processor", "processing"]):
+            return "cpu_percent", "CPU usage"
+        elif "swap" in command:
+            return "swap_percent", "swap usage"
+        elif any(word in command for word in ["memory", "ram"]):
+            return "memory_percent", "memory usage"
+        elif any(word in command for word in ["disk", "drive", "storage"]):
+            return "disk_percent", "disk usage"
+        elif "battery" in command:
+            return "battery_percent", "battery charge"
+        return None
+    
+    def _report_trend(self, command, seconds):
+        """
+        Answer "average CPU over the last five minutes" from the telemetry history
+        
+        Args:
+            command (str): Lowercase command text
+            seconds (float): Duration named in the command
+        
+        Returns:
+            bool: True if the command was answered
+        """
+        metric = self._trend_metric(command)
+        telemetry = get_telemetry()
+        if metric is None or telemetry is None or not telemetry.running:
+            return False
+        metric, label = metric
+        
+        # Periods longer than the ring are read from the history on disk
+        store = get_telemetry_store()
+        if store is not None and seconds > telemetry.history_seconds() * 1.1:
+            now = time.time()
+            return self._report_history(command, now - seconds, now, f"over the last {describe_duration(seconds)}")
+        
+        peak = any(word in command for word in ["max", "peak", "highest"])
+        value = telemetry.maximum(metric, seconds) if peak else telemetry.average(metric, seconds)
+        if value is None:
+            speak(f"I don't have any {label} readings yet")
+            return True
+        
+        covered = min(seconds, telemetry.history_seconds())
+        period = describe_duration(covered if covered < seconds * 0.9 else seconds)
+        kind = "Peak" if peak else "Average"
+        print(f"{kind} {label} over the last {period}: {value:.1f}%")
+        speak(f"{kind} {label} over the last {period} was {value:.1f} percent")
+        return True
+    
+    def _report_history(self, command, start, end, period):
+        """
+        Answer "was memory high this morning?" from the telemetry store
+        
+        Args:
+            command (str): Lowercase command text
+            start (float): Unix time of the start of the period
+            end (float): Unix time of the end of the period
+            period (str): The period in words, e.g. "this morning"
+        
+        Returns:
+            bool: True if the command was answered
+        """
+        metric = self._trend_metric(command)
+        store = get_telemetry_store()
+        if metric is None or store is None:
+            return False
+        metric, label = metric
+        
+        summary = store.summary(metric, start, end) if start < end else None
+        if summary is None:
+            speak(f"I don't have any {label} readings from {period}")
+            return True
+        
+        print(f"{label.capitalize()} {period}: average {summary['mean']:.1f}%, peak {summary['peak']:.1f}%")
+        if "high" in command:
+            if summary["peak"] >= HIGH_USAGE_PERCENT:
+                speak(f"Yes, {label} was high {period}, peaking at {summary['peak']:.0f} percent")
+            else:
+                speak(f"No, {label} stayed below {HIGH_USAGE_PERCENT} percent {period}, peaking at {summary['peak']:.0f} percent")
+        else:
+            speak(f"{label.capitalize()} {period} averaged {summary['mean']:.0f} percent and peaked at {summary['peak']:.0f} percent")
+        return True
+    
+    def _read_battery(self):
+        """Read the battery state, or return None if there is no battery"""
+        battery = psutil.sensors_battery()
+        if not battery:
+            return None
+        
+        # Try to get power plan
+        power_plan = "Unknown"
+        if os.name == 'nt':  # Windows
+            try:
+                result = subprocess.run(["powercfg", "/GETACTIVESCHEME"], 
+                                       capture_output=True, text=True, check=True)
+                power_plan_match = re.search(r'\((.*?)\)$', result.stdout.strip())
+                if power_plan_match:
+                    power_plan = power_plan_match.group(1)
+            except:
+                pass
+        
+        return BatteryReading(
+            percent=battery.percent,
+            power_plugged=battery.power_plugged,
+            secsleft=battery.secsleft,
+            power_plan=power_plan
+        )
+    
     def get_battery_info(self):
         """Get battery information"""
         try:
             print(f"Command: battery | Category: system_info | Confidence: 0.95")
-            battery = psutil.sensors_battery()
+            battery = self.cache.get("battery", self._read_battery)
             
             if not battery:
                 logger.error("Could not retrieve battery information")
@@ -301,24 +587,12 @@ class SystemControls:
             else:
                 health = "Critical"
             
-            # Try to get power plan
-            power_plan = "Unknown"
-            if os.name == 'nt':  # Windows
-                try:
-                    result = subprocess.run(["powercfg", "/GETACTIVESCHEME"], 
-                                           capture_output=True, text=True, check=True)
-                    power_plan_match = re.search(r'\((.*?)\)$', result.stdout.strip())
-                    if power_plan_match:
-                        power_plan = power_plan_match.group(1)
-                except:
-                    pass
-            
             # Format and print information
             logger.info(f"Battery: {percent}% - {status}")
             print(f"Battery: {percent}% ({health}) - {status}")
             if time_left:
                 print(f"{time_left}")
-            print(f"Power Plan: {power_plan}")
+            print(f"Power Plan: {battery.power_plan}")
             
             # Speak basic battery information
             speak(f"Battery is at {percent} percent and is {status.lower()}. Battery health is {health}.")
@@ -330,225 +604,167 @@ class SystemControls:
             speak("I couldn't retrieve battery information")
             return False
     
-    def get_wifi_info(self):
-        """Get detailed WiFi information"""
-        try:
-            print(f"Command: wifi | Category: system_info | Confidence: 0.95")
+    def _report_link(self, link):
+        """
+        Format a wireless link read by NetworkStatus
+        
+        Args:
+            link (LinkStatus): Link status, or None without a wireless interface
+        
+        Returns:
+            WifiReading: Connection flag and printable report
+        """
+        if link is None:
+            logger.info("WiFi: No wireless interface")
+            return WifiReading(False, "WiFi Status: No wireless interface found")
+        if not link.connected:
+            logger.info(f"WiFi: {link.interface} is {link.operstate}")
+            return WifiReading(False, "WiFi Status: Not connected to any network")
+        
+        ssid = link.ssid or "Unknown"
+        color_prefix = ""
+        signal = "Unknown"
+        if link.quality is not None:
+            signal = f"{link.quality}%"
+            if link.signal_dbm is not None:
+                signal += f" ({link.signal_dbm:.0f} dBm)"
+            if link.quality >= 80:
+                color_prefix = "\033[92m"  # Green for excellent
+            elif link.quality >= 50:
+                color_prefix = "\033[93m"  # Yellow for good
+            else:
+                color_prefix = "\033[91m"  # Red for poor
+        ip_address = link.addresses[0] if link.addresses else "Unknown"
+        
+        wifi_status = (
+            f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
+            f"Signal Strength: {signal}\n"
+            f"Interface: {link.interface}\n"
+            f"IP Address: {ip_address}"
+        )
+        logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}, IP: {ip_address}")
+        return WifiReading(True, wifi_status)
+    
+    def _read_wifi(self):
+        """Read the WiFi connection status as a printable report"""
+        # Different approaches based on operating system
+        if platform.system() == 'Windows':
+            # Use netsh to get wifi info on Windows
+            try:
+                wifi_interfaces = subprocess.check_output(
+                    ['netsh', 'wlan', 'show', 'interfaces'], 
+                    universal_newlines=True
+                )
             
-            # Different approaches based on operating system
-            if platform.system() == 'Windows':
-                # Use netsh to get wifi info on Windows
-                try:
-                    wifi_interfaces = subprocess.check_output(
-                        ['netsh', 'wlan', 'show', 'interfaces'], 
+                # Check if connected to WiFi
+                if "State" in wifi_interfaces and "connected" in wifi_interfaces.lower():
+                    # Get detailed network info
+                    wifi_info = subprocess.check_output(
+                        ['netsh', 'wlan', 'show', 'network', 'mode=Bssid'], 
                         universal_newlines=True
                     )
                     
-                    # Check if connected to WiFi
-                    if "State" in wifi_interfaces and "connected" in wifi_interfaces.lower():
-                        # Get detailed network info
-                        wifi_info = subprocess.check_output(
-                            ['netsh', 'wlan', 'show', 'network', 'mode=Bssid'], 
-                            universal_newlines=True
-                        )
-                        
-                        # Extract SSID
-                        ssid_match = re.search(r"SSID\s+\d+\s+:\s(.*)", wifi_interfaces)
-                        ssid = ssid_match.group(1).strip() if ssid_match else "Unknown"
+                    # Extract SSID
+                    ssid_match = re.search(r"SSID\s+\d+\s+:\s(.*)", wifi_interfaces)
+                    ssid = ssid_match.group(1).strip() if ssid_match else "Unknown"
                         
-                        # Extract signal strength
-                        signal_match = re.search(r"Signal\s+:\s(.*)", wifi_interfaces)
-                        signal = signal_match.group(1).strip() if signal_match else "Unknown"
+                    # Extract signal strength
+                    signal_match = re.search(r"Signal\s+:\s(.*)", wifi_interfaces)
+                    signal = signal_match.group(1).strip() if signal_match else "Unknown"
                         
-                        # Extract authentication type
-                        auth_match = re.search(r"Authentication\s+:\s(.*)", wifi_interfaces)
-                        auth = auth_match.group(1).strip() if auth_match else "Unknown"
+                    # Extract authentication type
+                    auth_match = re.search(r"Authentication\s+:\s(.*)", wifi_interfaces)
+                    auth = auth_match.group(1).strip() if auth_match else "Unknown"
                         
-                        # Extract channel
-                        channel_match = re.search(r"Channel\s+:\s(.*)", wifi_interfaces)
-                        channel = channel_match.group(1).strip() if channel_match else "Unknown"
+                    # Extract channel
+                    channel_match = re.search(r"Channel\s+:\s(.*)", wifi_interfaces)
+                    channel = channel_match.group(1).strip() if channel_match else "Unknown"
                         
-                        # Extract radio type (802.11n, ac, etc.)
-                        radio_match = re.search(r"Radio type\s+:\s(.*)", wifi_interfaces)
-                        radio_type = radio_match.group(1).strip() if radio_match else "Unknown"
+                    # Extract radio type (802.11n, ac, etc.)
+                    radio_match = re.search(r"Radio type\s+:\s(.*)", wifi_interfaces)
+                    radio_type = radio_match.group(1).strip() if radio_match else "Unknown"
                         
-                        # Get network speed
-                        speed_match = re.search(r"Receive rate\s*\(Mbps\)\s*:\s(.*)", wifi_interfaces)
-                        speed = speed_match.group(1).strip() if speed_match else "Unknown"
-                        
-                        # Check if internet is actually working
-                        internet_status = "Connected"
-                        try:
-                            # Try to connect to a reliable host
-                            urllib.request.urlopen("https://www.google.com", timeout=3)
-                        except:
-                            internet_status = "Limited or no internet access"
+                    # Get network speed
+                    speed_match = re.search(r"Receive rate\s*\(Mbps\)\s*:\s(.*)", wifi_interfaces)
+                    speed = speed_match.group(1).strip() if speed_match else "Unknown"
                         
-                        # Format the output with color coding for signal strength
-                        color_prefix = ""
-                        if "%" in signal:
-                            signal_percent = int(signal.replace("%", ""))
-                            if signal_percent >= 80:
-                                color_prefix = "\033[92m"  # Green for excellent
-                            elif signal_percent >= 50:
-                                color_prefix = "\033[93m"  # Yellow for good
-                            else:
-                                color_prefix = "\033[91m"  # Red for poor
-                        
-                        # Format and print the WiFi information
-                        wifi_status = (
-                            f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
-                            f"Signal Strength: {signal}\n"
-                            f"Speed: {speed} Mbps\n"
-                            f"Channel: {channel}\n"
-                            f"Radio Type: {radio_type}\n"
-                            f"Authentication: {auth}\n"
-                            f"Internet: {internet_status}"
-                        )
+                    # Check if internet is actually working
+                    internet_status = "Connected"
+                    try:
+                        # Try to connect to a reliable host
+                        urllib.request.urlopen("https://www.google.com", timeout=3)
+                    except:
+                        internet_status = "Limited or no internet access"
                         
-                        print(wifi_status)
-                        logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}, Internet: {internet_status}")
-                        return True
-                    else:
-                        print("WiFi Status: Not connected to any network")
-                        logger.info("WiFi: Not connected")
-                        return False
+                    # Format the output with color coding for signal strength
+                    color_prefix = ""
+                    if "%" in signal:
+                        signal_percent = int(signal.replace("%", ""))
+                        if signal_percent >= 80:
+                            color_prefix = "\033[92m"  # Green for excellent
+                        elif signal_percent >= 50:
+                            color_prefix = "\033[93m"  # Yellow for good
+                        else:
+                            color_prefix = "\033[91m"  # Red for poor
                         
-                except subprocess.SubprocessError as e:
-                    logger.error(f"Error retrieving Windows WiFi information: {e}")
-                    print("WiFi Status: Unable to retrieve information")
-                    return False
-            
-            elif platform.system() == 'Linux':
-                try:
-                    # Try using nmcli first (NetworkManager)
-                    nmcli_output = subprocess.check_output(
-                        ['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL,BARS,SECURITY,DEVICE', 'device', 'wifi'], 
-                        universal_newlines=True
+                    # Format and print the WiFi information
+                    wifi_status = (
+                        f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
+                        f"Signal Strength: {signal}\n"
+                        f"Speed: {speed} Mbps\n"
+                        f"Channel: {channel}\n"
+                        f"Radio Type: {radio_type}\n"
+                        f"Authentication: {auth}\n"
+                        f"Internet: {internet_status}"
                     )
                     
-                    # Find the active connection
-                    for line in nmcli_output.strip().split('\n'):
-                        if line.startswith('yes:'):
-                            parts = line.split(':')
-                            if len(parts) >= 6:
-                                ssid = parts[1]
-                                signal = parts[2] + '%'
-                                bars = parts[3]  # Signal quality indicator
-                                security = parts[4]
-                                device = parts[5]
+                    logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}, Internet: {internet_status}")
+                    return WifiReading(True, wifi_status)
+                else:
+                    logger.info("WiFi: Not connected")
+                    return WifiReading(False, "WiFi Status: Not connected to any network")
                                 
-                                # Get IP information
-                                ip_info = subprocess.check_output(
-                                    ['ip', 'addr', 'show', device], 
-                                    universal_newlines=True
-                                )
+            except subprocess.SubprocessError as e:
+                logger.error(f"Error retrieving Windows WiFi information: {e}")
+                return WifiReading(False, "WiFi Status: Unable to retrieve information")
                                 
-                                ip_match = re.search(r"inet\s([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)", ip_info)
-                                ip_address = ip_match.group(1) if ip_match else "Unknown"
+        elif platform.system() == 'Linux':
+            # Read the link from the kernel (see network_status.py)
+            if self.network is not None and self.network.available:
+                return self._report_link(self.network.read())
+            
+            timeout = config.get_nested("network.subprocess_timeout", 2.0)
+            try:
+                # Without sysfs, fall back to nmcli (NetworkManager)
+                nmcli_output = subprocess.check_output(
+                    ['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL,BARS,SECURITY,DEVICE', 'device', 'wifi'], 
+                    universal_newlines=True,
+                    timeout=timeout
+                )
                                 
-                                # Format the output with color coding
-                                signal_percent = int(signal.replace("%", ""))
-                                if signal_percent >= 80:
-                                    color_prefix = "\033[92m"  # Green for excellent
-                                elif signal_percent >= 50:
-                                    color_prefix = "\033[93m"  # Yellow for good
-                                else:
-                                    color_prefix = "\033[91m"  # Red for poor
+                # Find the active connection
+                for line in nmcli_output.strip().split('\n'):
+                    if line.startswith('yes:'):
+                        parts = line.split(':')
+                        if len(parts) >= 6:
+                            ssid = parts[1]
+                            signal = parts[2] + '%'
+                            bars = parts[3]  # Signal quality indicator
+                            security = parts[4]
+                            device = parts[5]
                                 
-                                wifi_status = (
-                                    f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
-                                    f"Signal Strength: {signal} ({bars})\n"
-                                    f"Security: {security}\n"
-                                    f"Interface: {device}\n"
-                                    f"IP Address: {ip_address}"
-                                )
+                            # Get IP information
+                            ip_info = subprocess.check_output(
+                                ['ip', 'addr', 'show', device], 
+                                universal_newlines=True,
+                                timeout=timeout
+                            )
                                 
-                                print(wifi_status)
-                                logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}, IP: {ip_address}")
-                                return True
-                    
-                    print("WiFi Status: Not connected to any network")
-                    return False
+                            ip_match = re.search(r"inet\s([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)", ip_info)
+                            ip_address = ip_match.group(1) if ip_match else "Unknown"
                     
-                except (subprocess.SubprocessError, FileNotFoundError):
-                    # Fallback to iwconfig if nmcli fails
-                    try:
-                        iwconfig_output = subprocess.check_output(
-                            ['iwconfig'],
-                            universal_newlines=True,
-                            stderr=subprocess.STDOUT
-                        )
-                        
-                        # Parse iwconfig output
-                        ssid_match = re.search(r'ESSID:"([^"]*)"', iwconfig_output)
-                        ssid = ssid_match.group(1) if ssid_match else "Not connected"
-                        
-                        if ssid != "Not connected":
-                            signal_match = re.search(r'Signal level=(.*) dBm', iwconfig_output)
-                            signal = signal_match.group(1) if signal_match else "Unknown"
-                            
-                            # Calculate approximate percentage from dBm
-                            if "dBm" in signal:
-                                try:
-                                    dbm = float(signal.replace("dBm", "").strip())
-                                    # Convert dBm to percentage (approx.): -50dBm→100%, -100dBm→0%
-                                    signal_percent = max(0, min(100, 2 * (dbm + 100)))
-                                    signal = f"{int(signal_percent)}% ({dbm} dBm)"
-                                except:
-                                    pass
-                            
-                            wifi_status = f"WiFi Status: Connected to {ssid}\nSignal Strength: {signal}"
-                            print(wifi_status)
-                            logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}")
-                            return True
-                        else:
-                            print("WiFi Status: Not connected to any network")
-                            return False
-                            
-                    except (subprocess.SubprocessError, FileNotFoundError) as e:
-                        logger.error(f"Error retrieving Linux WiFi information: {e}")
-                        print("WiFi Status: Unable to retrieve information")
-                        return False
-            
-            elif platform.system() == 'Darwin':  # macOS
-                try:
-                    # Get network interface info
-                    airport_path = '/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport'
-                    
-                    # Check if airport command is available
-                    if os.path.exists(airport_path):
-                        airport_output = subprocess.check_output(
-                            [airport_path, '-I'],
-                            universal_newlines=True
-                        )
-                        
-                        # Parse the output
-                        ssid_match = re.search(r'\s+SSID: (.*)', airport_output)
-                        ssid = ssid_match.group(1) if ssid_match else "Not connected"
-                        
-                        if ssid != "Not connected":
-                            # Extract other information
-                            bssid_match = re.search(r'\s+BSSID: (.*)', airport_output)
-                            bssid = bssid_match.group(1) if bssid_match else "Unknown"
-                            
-                            rssi_match = re.search(r'\s+agrCtlRSSI: (.*)', airport_output)
-                            rssi = rssi_match.group(1) if rssi_match else "Unknown"
-                            
-                            channel_match = re.search(r'\s+channel: (.*)', airport_output)
-                            channel = channel_match.group(1) if channel_match else "Unknown"
-                            
-                            # Calculate signal percentage (macOS reports RSSI)
-                            try:
-                                rssi_val = int(rssi)
-                                # Convert RSSI to percentage (approx.): -50→100%, -100→0%
-                                signal_percent = max(0, min(100, 2 * (rssi_val + 100)))
-                                signal = f"{signal_percent}% ({rssi} dBm)"
-                            except:
-                                signal = rssi
-                            
-                            # Format the output with color
-                            color_prefix = ""
+                            # Format the output with color coding
+                            signal_percent = int(signal.replace("%", ""))
                             if signal_percent >= 80:
                                 color_prefix = "\033[92m"  # Green for excellent
                             elif signal_percent >= 50:
@@ -558,58 +774,155 @@ class SystemControls:
                             
                             wifi_status = (
                                 f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
-                                f"Signal Strength: {signal}\n"
-                                f"BSSID: {bssid}\n"
-                                f"Channel: {channel}"
+                                f"Signal Strength: {signal} ({bars})\n"
+                                f"Security: {security}\n"
+                                f"Interface: {device}\n"
+                                f"IP Address: {ip_address}"
                             )
                             
-                            print(wifi_status)
-                            logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}")
-                            return True
+                            logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}, IP: {ip_address}")
+                            return WifiReading(True, wifi_status)
+                
+                return WifiReading(False, "WiFi Status: Not connected to any network")
+            
+            except (subprocess.SubprocessError, FileNotFoundError):
+                # Fallback to iwconfig if nmcli fails
+                try:
+                    iwconfig_output = subprocess.check_output(
+                        ['iwconfig'],
+                        universal_newlines=True,
+                        stderr=subprocess.STDOUT,
+                        timeout=timeout
+                    )
+                    
+                    # Parse iwconfig output
+                    ssid_match = re.search(r'ESSID:"([^"]*)"', iwconfig_output)
+                    ssid = ssid_match.group(1) if ssid_match else "Not connected"
+                    
+                    if ssid != "Not connected":
+                        signal_match = re.search(r'Signal level=(.*) dBm', iwconfig_output)
+                        signal = signal_match.group(1) if signal_match else "Unknown"
+                        
+                        # Calculate approximate percentage from dBm
+                        if "dBm" in signal:
+                            try:
+                                dbm = float(signal.replace("dBm", "").strip())
+                                # Convert dBm to percentage (approx.): -50dBm→100%, -100dBm→0%
+                                signal_percent = max(0, min(100, 2 * (dbm + 100)))
+                                signal = f"{int(signal_percent)}% ({dbm} dBm)"
+                            except:
+                                pass
+                        
+                        wifi_status = f"WiFi Status: Connected to {ssid}\nSignal Strength: {signal}"
+                        logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}")
+                        return WifiReading(True, wifi_status)
+                    else:
+                        return WifiReading(False, "WiFi Status: Not connected to any network")
+                
+                except (subprocess.SubprocessError, FileNotFoundError) as e:
+                    logger.error(f"Error retrieving Linux WiFi information: {e}")
+                    return WifiReading(False, "WiFi Status: Unable to retrieve information")
+        
+        elif platform.system() == 'Darwin':  # macOS
+            try:
+                # Get network interface info
+                airport_path = '/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport'
+                
+                # Check if airport command is available
+                if os.path.exists(airport_path):
+                    airport_output = subprocess.check_output(
+                        [airport_path, '-I'],
+                        universal_newlines=True
+                    )
+                    
+                    # Parse the output
+                    ssid_match = re.search(r'\s+SSID: (.*)', airport_output)
+                    ssid = ssid_match.group(1) if ssid_match else "Not connected"
+                    
+                    if ssid != "Not connected":
+                        # Extract other information
+                        bssid_match = re.search(r'\s+BSSID: (.*)', airport_output)
+                        bssid = bssid_match.group(1) if bssid_match else "Unknown"
+                        
+                        rssi_match = re.search(r'\s+agrCtlRSSI: (.*)', airport_output)
+                        rssi = rssi_match.group(1) if rssi_match else "Unknown"
+                        
+                        channel_match = re.search(r'\s+channel: (.*)', airport_output)
+                        channel = channel_match.group(1) if channel_match else "Unknown"
+                        
+                        # Calculate signal percentage (macOS reports RSSI)
+                        try:
+                            rssi_val = int(rssi)
+                            # Convert RSSI to percentage (approx.): -50→100%, -100→0%
+                            signal_percent = max(0, min(100, 2 * (rssi_val + 100)))
+                            signal = f"{signal_percent}% ({rssi} dBm)"
+                        except:
+                            signal = rssi
+                        
+                        # Format the output with color
+                        color_prefix = ""
+                        if signal_percent >= 80:
+                            color_prefix = "\033[92m"  # Green for excellent
+                        elif signal_percent >= 50:
+                            color_prefix = "\033[93m"  # Yellow for good
                         else:
-                            print("WiFi Status: Not connected to any network")
-                            return False
+                            color_prefix = "\033[91m"  # Red for poor
+                        
+                        wifi_status = (
+                            f"{color_prefix}WiFi Status: Connected to {ssid}\033[0m\n"
+                            f"Signal Strength: {signal}\n"
+                            f"BSSID: {bssid}\n"
+                            f"Channel: {channel}"
+                        )
+                        
+                        logger.info(f"WiFi: Connected to {ssid}, Signal: {signal}")
+                        return WifiReading(True, wifi_status)
                     else:
-                        # Fallback to networksetup if airport command not available
-                        interfaces = subprocess.check_output(
-                            ['networksetup', '-listallhardwareports'],
+                        return WifiReading(False, "WiFi Status: Not connected to any network")
+                else:
+                    # Fallback to networksetup if airport command not available
+                    interfaces = subprocess.check_output(
+                        ['networksetup', '-listallhardwareports'],
+                        universal_newlines=True
+                    )
+                    
+                    # Find Wi-Fi interface
+                    wifi_match = re.search(r'Hardware Port: Wi-Fi\nDevice: (.*)', interfaces)
+                    if wifi_match:
+                        interface = wifi_match.group(1).strip()
+                        
+                        # Get current network
+                        network = subprocess.check_output(
+                            ['networksetup', '-getairportnetwork', interface],
                             universal_newlines=True
                         )
                         
-                        # Find Wi-Fi interface
-                        wifi_match = re.search(r'Hardware Port: Wi-Fi\nDevice: (.*)', interfaces)
-                        if wifi_match:
-                            interface = wifi_match.group(1).strip()
+                        ssid_match = re.search(r'Current Wi-Fi Network: (.*)', network)
+                        ssid = ssid_match.group(1).strip() if ssid_match else "Not connected"
                             
-                            # Get current network
-                            network = subprocess.check_output(
-                                ['networksetup', '-getairportnetwork', interface],
-                                universal_newlines=True
-                            )
+                        if ssid != "Not connected":
+                            wifi_status = f"WiFi Status: Connected to {ssid}"
+                            logger.info(f"WiFi: Connected to {ssid}")
+                            return WifiReading(True, wifi_status)
+                        else:
+                            return WifiReading(False, "WiFi Status: Not connected to any network")
+                    else:
+                        return WifiReading(False, "WiFi Status: No Wi-Fi interface found")
                             
-                            ssid_match = re.search(r'Current Wi-Fi Network: (.*)', network)
-                            ssid = ssid_match.group(1).strip() if ssid_match else "Not connected"
+            except (subprocess.SubprocessError, FileNotFoundError) as e:
+                logger.error(f"Error retrieving macOS WiFi information: {e}")
+                return WifiReading(False, "WiFi Status: Unable to retrieve information")
                             
-                            if ssid != "Not connected":
-                                wifi_status = f"WiFi Status: Connected to {ssid}"
-                                print(wifi_status)
-                                logger.info(f"WiFi: Connected to {ssid}")
-                                return True
-                            else:
-                                print("WiFi Status: Not connected to any network")
-                                return False
-                        else:
-                            print("WiFi Status: No Wi-Fi interface found")
-                            return False
+        else:
+            return WifiReading(False, f"WiFi Status: Unsupported operating system ({platform.system()})")
                 
-                except (subprocess.SubprocessError, FileNotFoundError) as e:
-                    logger.error(f"Error retrieving macOS WiFi information: {e}")
-                    print("WiFi Status: Unable to retrieve information")
-                    return False
-            
-            else:
-                print(f"WiFi Status: Unsupported operating system ({platform.system()})")
-                return False
+    def get_wifi_info(self):
+        """Get detailed WiFi information"""
+        try:
+            print(f"Command: wifi | Category: system_info | Confidence: 0.95")
+            wifi = self.cache.get("wifi", self._read_wifi)
+            print(wifi.report)
+            return wifi.connected
                 
         except Exception as e:
             logger.error(f"Error getting WiFi information: {e}")
@@ -660,11 +973,14 @@ class SystemControls:
         
         if app_name:
             print(f"Command: {command} | Category: system_control | Confidence: 0.85")
-            # Map app name to executable
-            executable = self.windows_apps.get(app_name.lower(), app_name)
-            
-            # Try to find the full path
-            executable_path = self.find_executable_path(executable)
+            # Look the spoken name up in the application index
+            found = self.app_index.resolve(app_name)
+            if found:
+                executable_path = found[1]
+            else:
+                # Map app name to executable
+                executable = self.windows_apps.get(app_name.lower(), app_name)
+                executable_path = self.find_executable_path(executable)
             
             if executable_path:
                 # Launch the application
@@ -672,7 +988,7 @@ class SystemControls:
                     if os.name == 'nt':  # Windows
                         os.startfile(executable_path)
                     else:  # Linux/Mac
-                        subprocess.Popen([executable_path], 
+                        subprocess.Popen(launch_command(executable_path), 
                                         stdout=subprocess.DEVNULL, 
                                         stderr=subprocess.DEVNULL)
                     speak(f"Opening {app_name}")
@@ -748,70 +1064,164 @@ class SystemControls:
         
         return False
 
-    def take_screenshot(self):
-        """Capture a screenshot and save it to the screenshots directory"""
+    def take_screenshot(self, command=""):
+        """
+        Capture a screenshot now and save it in the background
+        
+        Args:
+            command (str): Spoken command, which may ask for a monitor, a region,
+                a format or several screenshots (see screenshot_service.py)
+        
+        Returns:
+            bool: True if the screen was captured
+        """
         try:
-            # Check if pyautogui is properly initialized
-            if not pyautogui.FAILSAFE:
-                pyautogui.FAILSAFE = True
-            
-            # Ensure screenshot directory exists and is writable
-            if not os.path.exists(self.screenshot_dir):
-                os.makedirs(self.screenshot_dir, exist_ok=True)
-                logger.info(f"Created screenshot directory: {self.screenshot_dir}")
-            
-            if not os.access(self.screenshot_dir, os.W_OK):
-                logger.error(f"Screenshot directory is not writable: {self.screenshot_dir}")
+            if not os.access(self.screenshots.directory, os.W_OK):
+                logger.error(f"Screenshot directory is not writable: {self.screenshots.directory}")
                 speak("I don't have permission to save screenshots in the Pictures folder")
                 return False
             
-            # Generate filename with timestamp
-            timestamp = time.strftime("%Y%m%d-%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
-            filepath = os.path.join(self.screenshot_dir, filename)
+            options = parse_screenshot_command(command.lower())
+            delay = config.get_nested("screenshots.delay", 0.0)
+            if delay:
+                # Give spoken prompts and popups time to disappear
+                time.sleep(delay)
+            
+            if options["count"] > 1:
+                burst = self.screenshots.burst(
+                    options["count"], config.get_nested("screenshots.burst_interval", 0.5),
+                    options["monitor"], options["region"], options["fmt"]
+                )
+                burst.add_done_callback(self._burst_saved)
+                speak(f"Taking {options['count']} screenshots")
+                return True
             
-            # Take screenshot with error handling
             try:
-                # Add a small delay to ensure any UI elements are hidden
-                time.sleep(0.5)
-                screenshot = pyautogui.screenshot()
-                if screenshot is None:
-                    raise Exception("Screenshot capture failed")
-            except Exception as e:
+                shot = self.screenshots.take(
+                    options["monitor"], options["region"], options["fmt"],
+                    open_after=config.get_nested("screenshots.open_after", True)
+                )
+            except ValueError as e:
+                # No such monitor
                 logger.error(f"Failed to capture screenshot: {e}")
-                speak("I couldn't capture the screen")
+                speak(str(e))
                 return False
-            
-            # Save screenshot with error handling
-            try:
-                screenshot.save(filepath)
-                logger.info(f"Screenshot saved successfully to: {filepath}")
             except Exception as e:
-                logger.error(f"Failed to save screenshot: {e}")
-                speak("I couldn't save the screenshot")
+                logger.error(f"Failed to capture screenshot: {e}")
+                speak("I couldn't capture the screen")
                 return False
             
-            print(f"Screenshot saved to: {filepath}")
-            speak("Screenshot captured and saved")
-            
-            # Open the screenshot for viewing
-            try:
-                if self.os_name == "Windows":
-                    os.startfile(filepath)
-                elif self.os_name == "Darwin":  # macOS
-                    subprocess.call(["open", filepath])
-                else:  # Linux
-                    subprocess.call(["xdg-open", filepath])
-            except Exception as e:
-                logger.error(f"Failed to open screenshot: {e}")
-                # Don't return False here as the screenshot was still captured successfully
-            
+            shot.future.add_done_callback(self._screenshot_saved)
+            print(f"Saving screenshot to: {shot.path}")
+            speak("Screenshot captured")
             return True
                 
         except Exception as e:
             logger.error(f"Error taking screenshot: {e}")
             speak("I couldn't take a screenshot")
             return False
+    
+    def _screenshot_saved(self, future):
+        """Report a screenshot that could not be saved in the background"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to save screenshot: {error}")
+            speak("I couldn't save the screenshot")
+    
+    def screenshot_library(self, command):
+        """
+        Show the latest screenshot or delete duplicate screenshots
+        
+        Args:
+            command (str): Spoken command, e.g. "show my last screenshot" or
+                "delete duplicate screenshots"
+        
+        Returns:
+            bool: True if the command was carried out
+        """
+        if self.library is None:
+            speak("The screenshot library is turned off")
+            return False
+        try:
+            if "duplicate" in command.lower():
+                moved, freed = self.library.remove_duplicates()
+                if not moved:
+                    speak("I didn't find any duplicate screenshots")
+                    return True
+                print(f"Moved {moved} duplicate screenshots ({describe_bytes(freed)}) to {self.library.trash}")
+                speak(f"Moved {moved} duplicate screenshot{'s' if moved != 1 else ''} to the trash folder")
+                return True
+            
+            latest = self.library.latest()
+            if not latest:
+                speak("You don't have any screenshots yet")
+                return False
+            entry = latest[0]
+            taken = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.taken))
+            print(f"Last screenshot: {entry.path} ({entry.width}x{entry.height}, {taken})")
+            open_file(entry.path)
+            speak("Here's your last screenshot")
+            return True
+        except Exception as e:
+            logger.error(f"Error using the screenshot library: {e}")
+            speak("I couldn't get to your screenshots")
+            return False
+    
+    def screen_recording(self, command):
+        """
+        Start or stop recording the screen
+        
+        Args:
+            command (str): Spoken command, e.g. "start screen recording of the
+                second monitor" or "stop screen recording"
+        
+        Returns:
+            bool: True if recording started or stopped
+        """
+        command = command.lower()
+        if any(word in command for word in ["stop", "end", "finish"]):
+            path = self.recorder.stop()
+            if path is None:
+                if self.recorder.encoding:
+                    speak("The last recording is still being saved")
+                    return True
+                speak("The screen isn't being recorded")
+                return False
+            print(f"Saving screen recording to: {path}")
+            speak("Recording stopped. I'll tell you when the video is saved")
+            return True
+        
+        options = parse_screenshot_command(command)
+        try:
+            path = self.recorder.start(options["monitor"], options["region"], on_done=self._recording_saved)
+        except ValueError as e:
+            # No such monitor
+            speak(str(e))
+            return False
+        if path is None:
+            speak("I'm already recording the screen")
+            return False
+        print(f"Recording the screen to: {path}")
+        speak("Recording the screen")
+        return True
+    
+    def _recording_saved(self, path):
+        """Report a finished screen recording"""
+        if path is None:
+            speak("I couldn't save the screen recording")
+            return
+        print(f"Screen recording saved to: {path}")
+        speak("Your screen recording is saved")
+    
+    def _burst_saved(self, future):
+        """Report the end of a screenshot burst"""
+        error = future.exception()
+        if error is not None:
+            speak("I couldn't finish taking the screenshots")
+            return
+        paths = future.result()
+        print(f"Saved {len(paths)} screenshots to: {self.screenshots.directory}")
+        speak(f"Saved {len(paths)} screenshots")
 
     def adjust_brightness(self, command):
         """Adjust screen brightness"""
@@ -1088,21 +1498,62 @@ class SystemControls:
             print("Could not adjust volume")
             return False
 
+    def _locate(self):
+        """Get the current city from the IP address, or None if it is unknown"""
+        ip_response = requests.get("https://ipinfo.io/json", timeout=5)
+        return ip_response.json().get("city", "") or None
+    
+    def _fetch_weather(self, location):
+        """
+        Fetch the current weather for a location
+        
+        Raises:
+            WeatherError: If the weather service doesn't return a reading
+        """
+        # Use OpenWeatherMap API (free tier)
+        API_KEY = "YOUR_API_KEY"  # User should replace with their own API key
+        
+        # Build the API URL
+        url = f"https://api.openweathermap.org/data/2.5/weather?q={location}&appid={API_KEY}&units=metric"
+        
+        # Make the API request
+        response = requests.get(url, timeout=10)
+        
+        # Check if the request was successful
+        if response.status_code == 200:
+            # Parse the JSON response
+            weather_data = response.json()
+            
+            return WeatherReading(
+                location=location,
+                description=weather_data["weather"][0]["description"],
+                temperature=weather_data["main"]["temp"],
+                feels_like=weather_data["main"]["feels_like"],
+                humidity=weather_data["main"]["humidity"],
+                wind_speed=weather_data["wind"]["speed"],
+                sunrise=datetime.datetime.fromtimestamp(weather_data["sys"]["sunrise"]).strftime("%H:%M"),
+                sunset=datetime.datetime.fromtimestamp(weather_data["sys"]["sunset"]).strftime("%H:%M")
+            )
+        elif response.status_code == 401:
+            logger.error("Invalid API key. Please update your API key in the system_controls.py file.")
+            raise WeatherError("I couldn't access weather data. The API key may be invalid.")
+        elif response.status_code == 404:
+            logger.error(f"Location '{location}' not found")
+            raise WeatherError(f"I couldn't find weather information for {location}. Please check the location name.")
+        else:
+            logger.error(f"API Error: {response.status_code}")
+            raise WeatherError("I couldn't access weather information at the moment.")
+    
     def get_weather(self, location=None):
         """Get current weather information for a location"""
         try:
             print(f"Getting weather information | Category: system_info | Confidence: 0.95")
             
-            # Use OpenWeatherMap API (free tier)
-            API_KEY = "YOUR_API_KEY"  # User should replace with their own API key
-            
             # If no location is provided, attempt to get weather for current location
             if not location:
                 try:
                     # Get IP-based location
-                    ip_response = requests.get("https://ipinfo.io/json")
-                    ip_data = ip_response.json()
-                    location = ip_data.get("city", "")
+                    location = self.cache.get("location", self._locate)
                     if not location:
                         speak("I couldn't determine your location. Please specify a city.")
                         return False
@@ -1111,332 +1562,76 @@ class SystemControls:
                     speak("I couldn't determine your location. Please specify a city.")
                     return False
             
-            # Build the API URL
-            url = f"https://api.openweathermap.org/data/2.5/weather?q={location}&appid={API_KEY}&units=metric"
+            weather = self.cache.get(("weather", location.lower()), lambda: self._fetch_weather(location))
             
-            # Make the API request
-            response = requests.get(url)
+            # Format the weather information
+            weather_info = (
+                f"Weather in {weather.location}: {weather.description}\n"
+                f"Temperature: {weather.temperature}°C (feels like {weather.feels_like}°C)\n"
+                f"Humidity: {weather.humidity}%\n"
+                f"Wind Speed: {weather.wind_speed} m/s\n"
+                f"Sunrise: {weather.sunrise}, Sunset: {weather.sunset}"
+            )
             
-            # Check if the request was successful
-            if response.status_code == 200:
-                # Parse the JSON response
-                weather_data = response.json()
-                
-                # Extract relevant information
-                temp = weather_data["main"]["temp"]
-                feels_like = weather_data["main"]["feels_like"]
-                humidity = weather_data["main"]["humidity"]
-                weather_desc = weather_data["weather"][0]["description"]
-                wind_speed = weather_data["wind"]["speed"]
-                
-                # Get sunrise and sunset times
-                sunrise_time = datetime.fromtimestamp(weather_data["sys"]["sunrise"]).strftime("%H:%M")
-                sunset_time = datetime.fromtimestamp(weather_data["sys"]["sunset"]).strftime("%H:%M")
+            print(weather_info)
+            speak(f"Current weather in {weather.location} is {weather.description} with a temperature of {int(weather.temperature)} degrees Celsius. "
+                  f"Humidity is {weather.humidity} percent.")
                 
-                # Format the weather information
-                weather_info = (
-                    f"Weather in {location}: {weather_desc}\n"
-                    f"Temperature: {temp}°C (feels like {feels_like}°C)\n"
-                    f"Humidity: {humidity}%\n"
-                    f"Wind Speed: {wind_speed} m/s\n"
-                    f"Sunrise: {sunrise_time}, Sunset: {sunset_time}"
-                )
+            return True
                 
-                print(weather_info)
-                speak(f"Current weather in {location} is {weather_desc} with a temperature of {int(temp)} degrees Celsius. "
-                      f"Humidity is {humidity} percent.")
-                      
-                return True
-            elif response.status_code == 401:
-                logger.error("Invalid API key. Please update your API key in the system_controls.py file.")
-                speak("I couldn't access weather data. The API key may be invalid.")
-                return False
-            elif response.status_code == 404:
-                logger.error(f"Location '{location}' not found")
-                speak(f"I couldn't find weather information for {location}. Please check the location name.")
-                return False
-            else:
-                logger.error(f"API Error: {response.status_code}")
-                speak("I couldn't access weather information at the moment.")
-                return False
+        except WeatherError as e:
+            speak(str(e))
+            return False
                 
         except Exception as e:
             logger.error(f"Error getting weather information: {e}")
             speak("I'm sorry, but I couldn't retrieve the weather information.")
             return False
 
+    def _report_temperatures(self, groups):
+        """
+        Format sensor readings grouped by SensorProvider.by_category
+        
+        Args:
+            groups (dict): "CPU", "GPU" and "System" -> list of SensorReading
+        
+        Returns:
+            TemperatureReading: Availability flag and printable report
+        """
+        if not any(groups.values()):
+            logger.info("No temperature information available")
+            return TemperatureReading(False, "Temperature information not available")
+        
+        temperature_status = "Temperature Information:\n"
+        log_temps = []
+        for category, readings in groups.items():
+            if not readings:
+                continue
+            temperature_status += f"\n{category} Temperatures:\n"
+            for reading in readings:
+                color = self._get_temp_color(reading.celsius)
+                temperature_status += f"  {reading.name}: {color}{reading.celsius:.1f}°C\033[0m\n"
+                log_temps.append(f"{reading.name}: {reading.celsius:.1f}°C")
+        
+        logger.info(f"Temperatures: {', '.join(log_temps)}")
+        return TemperatureReading(True, temperature_status)
+    
+    def _read_temperature(self):
+        """Read CPU, GPU and system temperatures as a printable report"""
+        # Every source was probed once at startup (see sensors.py), so no
+        # sensors means there is nothing else worth trying
+        if self.sensors is not None and self.sensors.available:
+            return self._report_temperatures(self.sensors.by_category())
+        logger.info("No temperature sensors available")
+        return TemperatureReading(False, "Temperature information not available")
+    
     def get_temperature(self):
         """Get detailed CPU and GPU temperature information"""
         try:
             print(f"Command: temperature | Category: system_info | Confidence: 0.95")
-            
-            if platform.system() == 'Windows':
-                try:
-                    # Use WMI to get temperature information on Windows
-                    w = wmi.WMI(namespace="root\\wmi")
-                    temperature_info = w.MSAcpi_ThermalZoneTemperature()
-                    
-                    # Initialize temperature data dictionary
-                    temps = {"CPU": [], "GPU": [], "System": []}
-                    gpu_info = ""
-                    
-                    # Try to get CPU temperature using Open Hardware Monitor if available
-                    try:
-                        w = wmi.WMI(namespace="root\\OpenHardwareMonitor")
-                        hardware_temps = w.Sensor()
-                        for sensor in hardware_temps:
-                            if sensor.SensorType == 'Temperature':
-                                if 'cpu' in sensor.Name.lower() or 'core' in sensor.Name.lower():
-                                    temps["CPU"].append((sensor.Name, sensor.Value))
-                                elif 'gpu' in sensor.Name.lower():
-                                    temps["GPU"].append((sensor.Name, sensor.Value))
-                                else:
-                                    temps["System"].append((sensor.Name, sensor.Value))
-                    except Exception:
-                        # If Open Hardware Monitor is not available, use MSAcpi
-                        for temp_info in temperature_info:
-                            # Convert tenths of Kelvin to Celsius
-                            temp_celsius = (temp_info.CurrentTemperature / 10.0) - 273.15
-                            temps["System"].append(("System", temp_celsius))
-                    
-                    # Try to get GPU information using nvidia-smi if available
-                    try:
-                        nvidia_output = subprocess.check_output(
-                            ['nvidia-smi', '--query-gpu=temperature.gpu', '--format=csv,noheader'],
-                            universal_newlines=True
-                        )
-                        for i, temp in enumerate(nvidia_output.strip().split('\n')):
-                            temps["GPU"].append((f"NVIDIA GPU {i}", float(temp)))
-                    except (subprocess.SubprocessError, FileNotFoundError):
-                        # No NVIDIA GPU or nvidia-smi not available
-                        pass
-                    
-                    # Format the temperature information
-                    temperature_status = "Temperature Information:\n"
-                    
-                    # Add CPU temperatures with color coding
-                    if temps["CPU"]:
-                        temperature_status += "\nCPU Temperatures:\n"
-                        for name, temp in temps["CPU"]:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    # Add GPU temperatures with color coding
-                    if temps["GPU"]:
-                        temperature_status += "\nGPU Temperatures:\n"
-                        for name, temp in temps["GPU"]:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    # Add System temperatures with color coding
-                    if temps["System"]:
-                        temperature_status += "\nSystem Temperatures:\n"
-                        for name, temp in temps["System"]:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    if not any(temps.values()):
-                        temperature_status = "Temperature information not available. Try installing Open Hardware Monitor for Windows."
-                    
-                    print(temperature_status)
-                    
-                    # Log a simplified version
-                    log_temps = []
-                    for category, temp_list in temps.items():
-                        for name, temp in temp_list:
-                            log_temps.append(f"{name}: {temp:.1f}°C")
-                    
-                    if log_temps:
-                        logger.info(f"Temperatures: {', '.join(log_temps)}")
-                    else:
-                        logger.info("No temperature information available")
-                    
-                    return True
-                
-                except Exception as e:
-                    logger.error(f"Error retrieving Windows temperature information: {e}")
-                    print("Temperature information not available")
-                    return False
-            
-            elif platform.system() == 'Linux':
-                try:
-                    # Check for lm-sensors
-                    sensors_output = subprocess.check_output(
-                        ['sensors'],
-                        universal_newlines=True
-                    )
-                    
-                    # Parse the sensors output
-                    cpu_temps = []
-                    gpu_temps = []
-                    other_temps = []
-                    
-                    current_device = None
-                    for line in sensors_output.split('\n'):
-                        if line and not line.startswith(' '):
-                            current_device = line.strip(':')
-                        elif 'temp' in line.lower() or 'core' in line.lower():
-                            if '+' in line and '°C' in line:
-                                name_part = line.split(':')[0].strip()
-                                temp_part = line.split(':')[1].strip()
-                                temp_value = float(temp_part.split()[0].replace('+', '').replace('°C', ''))
-                                
-                                if 'cpu' in current_device.lower() or 'core' in name_part.lower():
-                                    cpu_temps.append((f"{current_device} {name_part}", temp_value))
-                                elif 'gpu' in current_device.lower() or 'nvidia' in current_device.lower():
-                                    gpu_temps.append((f"{current_device} {name_part}", temp_value))
-                                else:
-                                    other_temps.append((f"{current_device} {name_part}", temp_value))
-                    
-                    # Try nvidia-smi for GPU if available
-                    try:
-                        nvidia_output = subprocess.check_output(
-                            ['nvidia-smi', '--query-gpu=temperature.gpu', '--format=csv,noheader'],
-                            universal_newlines=True
-                        )
-                        for i, temp in enumerate(nvidia_output.strip().split('\n')):
-                            gpu_temps.append((f"NVIDIA GPU {i}", float(temp)))
-                    except (subprocess.SubprocessError, FileNotFoundError):
-                        # No NVIDIA GPU or nvidia-smi not available
-                        pass
-                    
-                    # Format the temperature information
-                    temperature_status = "Temperature Information:\n"
-                    
-                    # Add CPU temperatures with color coding
-                    if cpu_temps:
-                        temperature_status += "\nCPU Temperatures:\n"
-                        for name, temp in cpu_temps:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    # Add GPU temperatures with color coding
-                    if gpu_temps:
-                        temperature_status += "\nGPU Temperatures:\n"
-                        for name, temp in gpu_temps:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    # Add Other temperatures with color coding
-                    if other_temps:
-                        temperature_status += "\nOther Temperatures:\n"
-                        for name, temp in other_temps:
-                            color = self._get_temp_color(temp)
-                            temperature_status += f"  {name}: {color}{temp:.1f}°C\033[0m\n"
-                    
-                    if not cpu_temps and not gpu_temps and not other_temps:
-                        temperature_status = "No temperature information available. Try installing lm-sensors."
-                    
-                    print(temperature_status)
-                    
-                    # Log a simplified version
-                    log_temps = []
-                    for name, temp in cpu_temps + gpu_temps + other_temps:
-                        log_temps.append(f"{name}: {temp:.1f}°C")
-                    
-                    if log_temps:
-                        logger.info(f"Temperatures: {', '.join(log_temps)}")
-                    else:
-                        logger.info("No temperature information available")
-                    
-                    return True
-                
-                except (subprocess.SubprocessError, FileNotFoundError):
-                    # Alternative method: check thermal zones
-                    try:
-                        thermal_zones = glob.glob('/sys/class/thermal/thermal_zone*/temp')
-                        if thermal_zones:
-                            temperature_status = "Temperature Information:\n\nThermal Zones:\n"
-                            log_temps = []
-                            
-                            for zone_path in thermal_zones:
-                                zone_name = zone_path.split('/')[-2]
-                                with open(zone_path, 'r') as f:
-                                    # Convert millidegrees Celsius to degrees Celsius
-                                    temp = float(f.read().strip()) / 1000.0
-                                
-                                color = self._get_temp_color(temp)
-                                temperature_status += f"  {zone_name}: {color}{temp:.1f}°C\033[0m\n"
-                                log_temps.append(f"{zone_name}: {temp:.1f}°C")
-                            
-                            print(temperature_status)
-                            logger.info(f"Temperatures: {', '.join(log_temps)}")
-                            return True
-                        else:
-                            print("No temperature information available. Try installing lm-sensors.")
-                            logger.info("No temperature information available")
-                            return False
-                    
-                    except Exception as e:
-                        logger.error(f"Error retrieving Linux temperature information: {e}")
-                        print("Temperature information not available")
-                        return False
-            
-            elif platform.system() == 'Darwin':  # macOS
-                try:
-                    # Use osx-cpu-temp or iStats if available
-                    try:
-                        temp_output = subprocess.check_output(
-                            ['osx-cpu-temp'],
-                            universal_newlines=True
-                        )
-                        
-                        # Extract the temperature value
-                        temp_match = re.search(r'(\d+\.\d+).*C', temp_output)
-                        if temp_match:
-                            temp = float(temp_match.group(1))
-                            color = self._get_temp_color(temp)
-                            
-                            temperature_status = f"CPU Temperature: {color}{temp:.1f}°C\033[0m"
-                            print(temperature_status)
-                            logger.info(f"CPU Temperature: {temp:.1f}°C")
-                            return True
-                    except (subprocess.SubprocessError, FileNotFoundError):
-                        # Try iStats
-                        try:
-                            temp_output = subprocess.check_output(
-                                ['istats'],
-                                universal_newlines=True
-                            )
-                            
-                            # Parse istats output
-                            temperatures = []
-                            for line in temp_output.split('\n'):
-                                if '°C' in line:
-                                    parts = line.split(':')
-                                    if len(parts) >= 2:
-                                        name = parts[0].strip()
-                                        temp_match = re.search(r'(\d+\.\d+).*C', parts[1])
-                                        if temp_match:
-                                            temp = float(temp_match.group(1))
-                                            temperatures.append((name, temp))
-                            
-                            if temperatures:
-                                temperature_status = "Temperature Information:\n"
-                                log_temps = []
-                                
-                                for name, temp in temperatures:
-                                    color = self._get_temp_color(temp)
-                                    temperature_status += f"{name}: {color}{temp:.1f}°C\033[0m\n"
-                                    log_temps.append(f"{name}: {temp:.1f}°C")
-                                
-                                print(temperature_status)
-                                logger.info(f"Temperatures: {', '.join(log_temps)}")
-                                return True
-                        except (subprocess.SubprocessError, FileNotFoundError):
-                            # Neither tool is available
-                            print("No temperature information available. Try installing osx-cpu-temp or istats.")
-                            logger.info("No temperature information available")
-                            return False
-                
-                except Exception as e:
-                    logger.error(f"Error retrieving macOS temperature information: {e}")
-                    print("Temperature information not available")
-                    return False
-            
-            else:
-                print(f"Temperature monitoring not supported on {platform.system()}")
-                return False
+            temperature = self.cache.get("temperature", self._read_temperature)
+            print(temperature.report)
+            return temperature.available
         
         except Exception as e:
             logger.error(f"Error getting temperature information: {e}")
@@ -1452,71 +1647,48 @@ class SystemControls:
         else:
             return "\033[91m"  # Red for hot (above 80°C)
 
+    def _build_router(self):
+        """Register the control_system handlers with a command router"""
+        router = CommandRouter("system control")
+        # Before launch_application, which would take "start screen recording"
+        router.register("screen_recording", lambda match: self.screen_recording(match.text),
+                        keywords=RECORDING_KEYWORDS)
+        # Also before launch_application, which would take "open my last screenshot"
+        router.register("screenshot_library", lambda match: self.screenshot_library(match.text),
+                        keywords=LIBRARY_KEYWORDS)
+        router.register("launch_application", self._launch_from_command,
+                        keywords=["open", "launch", "start", "run"])
+        router.register("window_control", lambda match: self.control_window(match.text),
+                        keywords=["minimize", "maximize", "close"])
+        router.register("system_power", lambda match: self.system_power_control(match.text),
+                        keywords=["shutdown", "turn off computer", "shut down computer", "restart", "reboot",
+                                  "log off", "sign out", "lock computer", "lock system", "lock screen"])
+        router.register("volume", lambda match: self.adjust_volume(match.text), keywords=["volume"])
+        router.register("brightness", lambda match: self.adjust_brightness(match.text), keywords=["brightness"])
+        router.register("system_info", lambda match: self.get_system_info(match.text),
+                        keywords=["cpu", "memory", "ram", "disk", "drive", "system info", "temperature"])
+        router.register("screenshot", lambda match: self.take_screenshot(match.command), keywords=["screenshot"])
+        router.register("weather", lambda match: self.get_weather(), keywords=["weather"])
+        router.compile()
+        return router
+    
+    def _launch_from_command(self, match):
+        """Launch the application named in a routed command"""
+        app_name = self.extract_app_name(match.text)
+        if not app_name:
+            return None
+        logger.info(f"Extracted app name: '{app_name}' from command: '{match.text}'")
+        return self.launch_application(match.text)
+    
     def control_system(self, command):
         """Control system functions based on command"""
         try:
-            command = command.lower()
-            
-            # Application commands
-            if any(word in command for word in ["open", "launch", "start", "run"]):
-                # Extract app name from command
-                app_name = self.extract_app_name(command)
-                if app_name:
-                    logger.info(f"Extracted app name: '{app_name}' from command: '{command}'")
-                    return self.launch_application(command)
-            
-            # Window management commands
-            elif "minimize" in command:
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.control_window(command)
-            elif "maximize" in command:
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.control_window(command)
-            elif "close" in command:
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.control_window(command)
-            
-            # System power commands
-            elif any(phrase in command for phrase in ["shutdown", "turn off computer", "shut down computer"]):
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.system_power_control(command)
-            elif any(phrase in command for phrase in ["restart", "reboot"]):
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.system_power_control(command)
-            elif any(phrase in command for phrase in ["log off", "sign out"]):
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.system_power_control(command)
-            elif any(phrase in command for phrase in ["lock computer", "lock system", "lock screen"]):
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.system_power_control(command)
-            
-            # Volume control commands
-            elif "volume" in command:
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.adjust_volume(command)
-            
-            # Brightness control commands
-            elif "brightness" in command:
-                print(f"Command: {command} | Category: system_control | Confidence: 0.95")
-                return self.adjust_brightness(command)
-            
-            # System information commands
-            elif any(word in command for word in ["cpu", "memory", "ram", "disk", "drive", "system info", "temperature"]):
-                return self.get_system_info(command)
-            
-            # Take screenshot command
-            elif "screenshot" in command:
-                return self.take_screenshot()
-            
-            # Weather command
-            elif "weather" in command:
-                return self.get_weather()
-            
-            # Unknown command
-            else:
+            match = self.router.resolve(command)
+            if match.route is None:
                 logger.warning(f"Unknown system control command: {command}")
                 print(f"I don't know how to execute: {command}")
                 return False
+            return self.router.dispatch(match)
                 
         except Exception as e:
             logger.error(f"Error in system control: {e}")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+"""
+System Telemetry for AI Desktop Assistant
+
+Information queries used to measure on demand: psutil.cpu_percent(interval=1)
+blocked every CPU question, and every general "system information" question,
+for a full second. A background sampler now records readings at a fixed
+interval into fixed-size NumPy ring buffers:
+
+- CPU usage, overall and per core
+- Memory and swap usage, and how full the system drive is
+- Disk and network throughput (bytes per second since the previous sample)
+- Battery charge and whether the charger is plugged in
+
+Queries read the latest sample without waiting, and the history answers
+trend questions like "average CPU over the last five minutes". The
+interval and ring length come from the `telemetry` section of config.json.
+Listeners added with add_listener() receive every sample, e.g. the on-disk
+history in telemetry_store.py.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import psutil
+
+from .config_handler import config
+
+logger = logging.getLogger(__name__)
+
+# Columns of the ring buffer, in order
+METRICS = (
+    "cpu_percent",
+    "memory_percent",
+    "memory_used",
+    "swap_percent",
+    "disk_percent",
+    "disk_read_bps",
+    "disk_write_bps",
+    "net_sent_bps",
+    "net_recv_bps",
+    "battery_percent",
+    "power_plugged"
+)
+
+# Drive whose usage is sampled: C:\ on Windows, / elsewhere
+SYSTEM_DRIVE = os.environ.get("SystemDrive", "") + os.sep
+
+# Spoken numbers accepted in durations ("the last five minutes")
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "twenty": 20, "thirty": 30, "forty": 40,
+    "forty five": 45, "sixty": 60, "ninety": 90
+}
+UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+DURATION = re.compile(
+    r"\b(?:last|past)\s+(?:(?P<count>\d+(?:\.\d+)?|forty five|[a-z]+)\s+)?(?P<unit>second|minute|hour)s?\b"
+)
+
+def parse_duration(text):
+    """
+    Find a duration like "last five minutes" or "past hour" in a command
+    
+    Args:
+        text (str): Command text
+    
+    Returns:
+        float: The duration in seconds, or None if the text has none
+    """
+    match = DURATION.search(text.lower())
+    if not match:
+        return None
+    count = match.group("count")
+    if count is None:
+        value = 1
+    elif count[0].isdigit():
+        value = float(count)
+    else:
+        value = NUMBER_WORDS.get(count)
+        if value is None:
+            return None
+    return value * UNIT_SECONDS[match.group("unit")]
+
+class TelemetrySampler:
+    """Samples system metrics in the background into ring buffers"""
+    
+    def __init__(self, interval=1.0, length=900):
+        """Initialize the sampler
+        
+        Args:
+            interval (float): Seconds between samples
+            length (int): Samples kept; older samples are overwritten
+        """
+        self.interval = float(interval)
+        self.length = max(2, int(length))
+        self.cores = psutil.cpu_count(logical=True) or 1
+        self.count = 0  # Samples taken so far
+        self.sample_time = 0.0  # Seconds spent sampling
+        self._times = np.full(self.length, np.nan)
+        self._data = np.full((self.length, len(METRICS)), np.nan)
+        self._per_core = np.full((self.length, self.cores), np.nan, dtype=np.float32)
+        self._columns = {name: i for i, name in enumerate(METRICS)}
+        self._previous = None  # (time, disk counters, network counters)
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _counters(self):
+        """Read the cumulative disk and network counters"""
+        disk = psutil.disk_io_counters()
+        network = psutil.net_io_counters()
+        return (
+            (disk.read_bytes, disk.write_bytes) if disk else None,
+            (network.bytes_sent, network.bytes_recv) if network else None
+        )
+    
+    def sample(self):
+        """
+        Take one sample and store it
+        
+        Returns:
+            dict: The sample, as returned by latest()
+        """
+        started = time.perf_counter()
+        now = time.time()
+        # Non-blocking: usage since the previous call
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        drive = psutil.disk_usage(SYSTEM_DRIVE)
+        disk, network = self._counters()
+        try:
+            battery = psutil.sensors_battery()
+        except Exception:
+            battery = None
+        
+        rates = [np.nan] * 4
+        if self._previous is not None:
+            elapsed = max(now - self._previous[0], 1e-6)
+            if disk and self._previous[1]:
+                rates[0:2] = [(new - old) / elapsed for new, old in zip(disk, self._previous[1])]
+            if network and self._previous[2]:
+                rates[2:4] = [(new - old) / elapsed for new, old in zip(network, self._previous[2])]
+        self._previous = (now, disk, network)
+        
+        row = [
+            float(np.mean(per_core)) if per_core else np.nan,
+            memory.percent,
+            memory.used,
+            swap.percent,
+            drive.percent,
+            *rates,
+            battery.percent if battery else np.nan,
+            float(battery.power_plugged) if battery and battery.power_plugged is not None else np.nan
+        ]
+        with self._lock:
+            i = self.count % self.length
+            self._times[i] = now
+            self._data[i] = row
+            self._per_core[i] = np.nan
+            self._per_core[i, :len(per_core)] = per_core[:self.cores]
+            self.count += 1
+        self.sample_time += time.perf_counter() - started
+        sample = self.latest()
+        for listener in self._listeners:
+            try:
+                listener(sample)
+            except Exception as e:
+                logger.error(f"Error in telemetry listener: {e}")
+        return sample
+    
+    def add_listener(self, listener):
+        """
+        Call a function with every new sample
+        
+        Args:
+            listener (callable): listener(sample), called on the sampling thread
+        """
+        self._listeners.append(listener)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling telemetry: {e}")
+    
+    def start(self):
+        """Start sampling in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        # The first CPU reading only sets the reference point
+        psutil.cpu_percent(interval=None, percpu=True)
+        self._previous = (time.time(), *self._counters())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        logger.info(f"Telemetry sampling every {self.interval}s, keeping {self.length} samples")
+    
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def latest(self, max_age=None):
+        """
+        Return the most recent sample
+        
+        Args:
+            max_age (float, optional): Ignore a sample older than this many
+                seconds
+        
+        Returns:
+            dict: "time", "per_core" and one entry per metric (NaN if the
+                metric is not available), or None if there is no sample
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            i = (self.count - 1) % self.length
+            sample = {"time": float(self._times[i]), "per_core": self._per_core[i].tolist()}
+            sample.update(zip(METRICS, self._data[i].tolist()))
+        if max_age is not None and time.time() - sample["time"] > max_age:
+            return None
+        return sample
+    
+    def window(self, metric, seconds):
+        """
+        Return a metric's samples from the last few seconds
+        
+        Args:
+            metric (str): One of METRICS
+            seconds (float): How far back to look
+        
+        Returns:
+            tuple: (times, values) arrays, oldest first
+        """
+        column = self._columns[metric]
+        with self._lock:
+            times = self._times.copy()
+            values = self._data[:, column].copy()
+        recent = times >= time.time() - seconds
+        order = np.argsort(times[recent])
+        return times[recent][order], values[recent][order]
+    
+    def average(self, metric, seconds):
+        """Mean of a metric over the last few seconds, or None without samples"""
+        _, values = self.window(metric, seconds)
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if values.size else None
+    
+    def maximum(self, metric, seconds):
+        """Highest value of a metric over the last few seconds, or None"""
+        _, values = self.window(metric, seconds)
+        values = values[~np.isnan(values)]
+        return float(values.max()) if values.size else None
+    
+    def history_seconds(self):
+        """Seconds of history currently held in the ring"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            return float(np.nanmax(self._times) - np.nanmin(self._times))
+    
+    def stats(self):
+        """Sampling counters for the log"""
+        return {
+            "samples": self.count,
+            "interval": self.interval,
+            "length": self.length,
+            "mean_sample_ms": round(self.sample_time / self.count * 1000, 3) if self.count else None
+        }
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+def get_telemetry():
+    """
+    Return the process-wide sampler, creating it on first use
+    
+    Returns:
+        TelemetrySampler: The sampler configured in `telemetry`, or None if
+            telemetry is disabled
+    """
+    global _shared_sampler
+    if not config.get_nested("telemetry.enabled", True):
+        return None
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = TelemetrySampler(
+                interval=config.get_nested("telemetry.interval", 1.0),
+                length=config.get_nested("telemetry.length", 900)
+            )
+        return _shared_sampler
+
+def latest_sample():
+    """
+    Return the latest sample of the shared sampler if it is running
+    
+    Returns:
+        dict: The sample, or None if the sampler is not running or its
+            last sample is older than three intervals
+    """
+    sampler = get_telemetry()
+    if sampler is None or not sampler.running:
+        return None
+    return sampler.latest(max_age=3 * sampler.interval)
+
+def describe_duration(seconds):
+    """
+    Put a duration into words for speech
+    
+    Args:
+        seconds (float): Duration
+    
+    Returns:
+        str: e.g. "5 minutes" or "1 hour"
+    """
+    for unit in ("hour", "minute", "second"):
+        value = seconds / UNIT_SECONDS[unit]
+        if value >= 1 or unit == "second":
+            value = round(value, 1) if value < 10 and value != int(value) else int(round(value))
+            return f"{value} {unit}{'' if value == 1 else 's'}"
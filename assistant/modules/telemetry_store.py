@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+"""
+Telemetry History for AI Desktop Assistant
+
+The telemetry ring buffers only hold the last few minutes. To answer "was
+memory high this morning?" and to feed performance dashboards, every sample
+is also appended to a compact on-disk store:
+
+- Records are fixed-width NumPy structured rows (a float64 timestamp and
+  float32 metrics) in memory-mapped segment files, so appending is a slice
+  assignment and a range query reads columns straight from the page cache
+- Samples are rolled up as they arrive: 1 second -> 1 minute -> 1 hour.
+  Rolled-up rows hold the mean of each metric, plus the peak of the metrics
+  in PEAK_METRICS
+- Each resolution is a series of segments of `telemetry.store.segment_kb`;
+  when a segment is full a new one is started and the oldest beyond
+  `telemetry.store.max_segments` is deleted, which bounds disk use
+- Segments are reopened on start, so the history survives restarts
+
+Range queries binary-search the sorted timestamps of each segment and
+aggregate with vectorized NumPy operations.
+"""
+
+import datetime
+import glob
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from .config_handler import config
+from .telemetry import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Metrics whose peak is kept when samples are rolled up
+PEAK_METRICS = ("cpu_percent", "memory_percent", "swap_percent")
+
+RECORD = np.dtype(
+    [("time", "<f8")]
+    + [(name, "<f4") for name in METRICS]
+    + [(f"{name}_peak", "<f4") for name in PEAK_METRICS]
+)
+
+# Resolutions, finest first: (name, seconds per row)
+TIERS = (("1s", 1), ("1m", 60), ("1h", 3600))
+
+# Parts of the day named in commands: (start hour, end hour)
+DAY_PARTS = {
+    "morning": (6, 12),
+    "afternoon": (12, 18),
+    "evening": (18, 24),
+    "tonight": (18, 24)
+}
+
+def parse_period(text, now=None):
+    """
+    Find a named period like "this morning" or "yesterday" in a command
+    
+    Args:
+        text (str): Command text
+        now (datetime.datetime, optional): Current local time
+    
+    Returns:
+        tuple: (start, end, label) with Unix times, the end no later than
+            now, or None if the text names no period
+    """
+    text = text.lower()
+    now = now or datetime.datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = datetime.timedelta(days=1)
+    
+    if "last night" in text:
+        start, end, label = midnight - day + datetime.timedelta(hours=18), midnight + datetime.timedelta(hours=6), "last night"
+    elif "yesterday" in text:
+        start, end, label = midnight - day, midnight, "yesterday"
+    else:
+        match = re.search(r"\bthis (morning|afternoon|evening)\b|\b(tonight)\b", text)
+        if match:
+            part = match.group(1) or match.group(2)
+            first, last = DAY_PARTS[part]
+            start = midnight + datetime.timedelta(hours=first)
+            end = midnight + datetime.timedelta(hours=last)
+            label = match.group(0)
+        elif "today" in text:
+            start, end, label = midnight, now, "today"
+        else:
+            return None
+    return start.timestamp(), min(end, now).timestamp(), label
+
+def rollup(rows, start):
+    """
+    Combine rows into one row of the next resolution
+    
+    Args:
+        rows (np.ndarray): RECORD rows of one bucket
+        start (float): Start time of the bucket
+    
+    Returns:
+        np.ndarray: A single RECORD row holding the means, and the peaks of
+            PEAK_METRICS
+    """
+    combined = np.zeros(1, dtype=RECORD)
+    combined["time"] = start
+    for name in METRICS:
+        values = rows[name].astype(np.float64)
+        valid = ~np.isnan(values)
+        combined[name] = values[valid].mean() if valid.any() else np.nan
+    for name in PEAK_METRICS:
+        values = rows[f"{name}_peak"]
+        valid = ~np.isnan(values)
+        combined[f"{name}_peak"] = values[valid].max() if valid.any() else np.nan
+    return combined
+
+class Segment:
+    """A memory-mapped file of fixed-width records"""
+    
+    def __init__(self, path, capacity):
+        """Open or create a segment
+        
+        Args:
+            path (str): Segment file
+            capacity (int): Records in a new segment
+        """
+        self.path = path
+        if os.path.exists(path):
+            capacity = os.path.getsize(path) // RECORD.itemsize
+            self.data = np.memmap(path, dtype=RECORD, mode="r+", shape=(capacity,))
+            # Unused records are zero-filled; a real timestamp never is
+            empty = np.flatnonzero(self.data["time"] == 0)
+            self.count = int(empty[0]) if empty.size else capacity
+        else:
+            self.data = np.memmap(path, dtype=RECORD, mode="w+", shape=(capacity,))
+            self.count = 0
+    
+    @property
+    def capacity(self):
+        return len(self.data)
+    
+    @property
+    def full(self):
+        return self.count >= self.capacity
+    
+    @property
+    def times(self):
+        return self.data["time"][:self.count]
+    
+    def append(self, rows):
+        """
+        Append as many rows as fit
+        
+        Args:
+            rows (np.ndarray): RECORD rows
+        
+        Returns:
+            int: Rows written
+        """
+        written = min(len(rows), self.capacity - self.count)
+        self.data[self.count:self.count + written] = rows[:written]
+        self.count += written
+        return written
+    
+    def between(self, start, end):
+        """Copy the records with start <= time < end"""
+        times = self.times
+        first, last = np.searchsorted(times, [start, end])
+        return np.array(self.data[first:last])
+    
+    def flush(self):
+        self.data.flush()
+    
+    def close(self):
+        self.data.flush()
+        # Drop the mapping so the file can be deleted on Windows; queries
+        # only ever hold copies
+        self.data = None
+
+class Tier:
+    """All segments of one resolution"""
+    
+    def __init__(self, directory, name, resolution, segment_records, max_segments):
+        """Open the segments of a resolution
+        
+        Args:
+            directory (str): Store directory
+            name (str): Tier name used in segment file names
+            resolution (int): Seconds per record
+            segment_records (int): Records per segment
+            max_segments (int): Segments kept before the oldest is deleted
+        """
+        self.directory = directory
+        self.name = name
+        self.resolution = resolution
+        self.segment_records = segment_records
+        self.max_segments = max(1, int(max_segments))
+        paths = sorted(glob.glob(os.path.join(directory, f"{name}-*.tlm")))
+        self.segments = [Segment(path, segment_records) for path in paths]
+        self._next_index = 1 + max((self._index(path) for path in paths), default=0)
+    
+    @staticmethod
+    def _index(path):
+        return int(os.path.basename(path).split("-")[1].split(".")[0])
+    
+    def _rotate(self):
+        """Start a new segment and delete the oldest ones over the limit"""
+        path = os.path.join(self.directory, f"{self.name}-{self._next_index:06d}.tlm")
+        self._next_index += 1
+        self.segments.append(Segment(path, self.segment_records))
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            oldest.close()
+            os.remove(oldest.path)
+            logger.info(f"Rotated telemetry segment {oldest.path}")
+    
+    def append(self, rows):
+        """Append rows, starting new segments as they fill up"""
+        while len(rows):
+            if not self.segments or self.segments[-1].full:
+                self._rotate()
+            rows = rows[self.segments[-1].append(rows):]
+    
+    def between(self, start, end):
+        """Records with start <= time < end, oldest first"""
+        parts = [segment.between(start, end) for segment in self.segments
+                 if segment.count and segment.times[-1] >= start and segment.times[0] < end]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)
+    
+    def last(self, count=1):
+        """The newest records"""
+        rows = []
+        for segment in reversed(self.segments):
+            rows.insert(0, np.array(segment.data[max(0, segment.count - count):segment.count]))
+            count -= segment.count
+            if count <= 0:
+                break
+        return np.concatenate(rows) if rows else np.zeros(0, dtype=RECORD)
+    
+    @property
+    def first_time(self):
+        for segment in self.segments:
+            if segment.count:
+                return float(segment.times[0])
+        return None
+    
+    def size_bytes(self):
+        return sum(os.path.getsize(segment.path) for segment in self.segments)
+    
+    def flush(self):
+        for segment in self.segments:
+            segment.flush()
+    
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+class TelemetryStore:
+    """Append-only telemetry history with automatic rollups"""
+    
+    def __init__(self, directory="telemetry", segment_kb=1024, max_segments=8, flush_every=60):
+        """Open the store, creating the directory if needed
+        
+        Args:
+            directory (str): Directory of the segment files
+            segment_kb (int): Size of each segment file
+            max_segments (int): Segments kept per resolution
+            flush_every (int): Raw records between flushes to disk
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        segment_records = max(16, int(segment_kb) * 1024 // RECORD.itemsize)
+        self.tiers = [Tier(directory, name, resolution, segment_records, max_segments)
+                      for name, resolution in TIERS]
+        self.flush_every = max(1, int(flush_every))
+        self._pending = [None] * (len(self.tiers) - 1)  # (bucket start, rows) per tier
+        self._unflushed = 0
+        self._lock = threading.Lock()
+        self._restore()
+    
+    def _restore(self):
+        """Rebuild the buckets that were not rolled up before the last exit"""
+        for level, tier in enumerate(self.tiers[:-1]):
+            upper = self.tiers[level + 1]
+            last = tier.last()
+            if not len(last):
+                continue
+            resolution = upper.resolution
+            bucket = np.floor(last["time"][0] / resolution) * resolution
+            rolled = upper.last()
+            if len(rolled) and rolled["time"][0] >= bucket:
+                continue
+            self._pending[level] = (bucket, tier.between(bucket, bucket + resolution))
+    
+    def _append(self, level, rows):
+        self.tiers[level].append(rows)
+        if level >= len(self._pending):
+            return
+        resolution = self.tiers[level + 1].resolution
+        for row in rows:
+            bucket = np.floor(row["time"] / resolution) * resolution
+            pending = self._pending[level]
+            if pending is not None and pending[0] != bucket:
+                self._append(level + 1, rollup(pending[1], pending[0]))
+                pending = None
+            if pending is None:
+                self._pending[level] = (bucket, row[np.newaxis])
+            else:
+                self._pending[level] = (bucket, np.concatenate([pending[1], row[np.newaxis]]))
+    
+    def record(self, sample):
+        """
+        Append a sample from the telemetry sampler
+        
+        Args:
+            sample (dict): "time" and the values of METRICS
+        """
+        row = np.zeros(1, dtype=RECORD)
+        row["time"] = sample["time"]
+        for name in METRICS:
+            row[name] = sample.get(name, np.nan)
+        for name in PEAK_METRICS:
+            row[f"{name}_peak"] = sample.get(name, np.nan)
+        with self._lock:
+            last = self.tiers[0].last()
+            if len(last) and row["time"][0] <= last["time"][0]:
+                return  # Timestamps must increase for the binary search
+            self._append(0, row)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self.flush()
+    
+    def query(self, metric, start, end):
+        """
+        Read a metric over a time range at the finest resolution that covers it
+        
+        Args:
+            metric (str): One of METRICS
+            start (float): Unix time of the start of the range
+            end (float): Unix time of the end of the range
+        
+        Returns:
+            tuple: (times, values, resolution in seconds), oldest first
+        """
+        with self._lock:
+            tier = self._covering_tier(start)
+            rows = tier.between(start, end)
+        return rows["time"], rows[metric].astype(np.float64), tier.resolution
+    
+    def summary(self, metric, start, end):
+        """
+        Mean and peak of a metric over a time range
+        
+        Args:
+            metric (str): One of METRICS
+            start (float): Unix time of the start of the range
+            end (float): Unix time of the end of the range
+        
+        Returns:
+            dict: mean, peak, rows and resolution, or None if there are no
+                readings in the range
+        """
+        with self._lock:
+            tier = self._covering_tier(start)
+            rows = tier.between(start, end)
+        values = rows[metric].astype(np.float64)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return None
+        peaks = rows[f"{metric}_peak"] if metric in PEAK_METRICS else rows[metric]
+        return {
+            "mean": float(values[valid].mean()),
+            "peak": float(np.nanmax(peaks)),
+            "rows": int(valid.sum()),
+            "resolution": tier.resolution
+        }
+    
+    def _covering_tier(self, start):
+        """The finest tier whose history reaches back to start"""
+        for tier in self.tiers:
+            first = tier.first_time
+            if first is not None and first <= start:
+                return tier
+        # Nothing reaches back far enough; use the longest history there is
+        return min(self.tiers, key=lambda tier: tier.first_time if tier.first_time is not None else float("inf"))
+    
+    def stats(self):
+        """Rows and bytes on disk per resolution"""
+        with self._lock:
+            return {tier.name: {"rows": sum(segment.count for segment in tier.segments),
+                                "bytes": tier.size_bytes()} for tier in self.tiers}
+    
+    def flush(self):
+        """Write pending changes to disk"""
+        for tier in self.tiers:
+            tier.flush()
+        self._unflushed = 0
+    
+    def close(self):
+        """Flush and close every segment"""
+        with self._lock:
+            for tier in self.tiers:
+                tier.close()
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_telemetry_store():
+    """
+    Return the process-wide store, opening it on first use
+    
+    Returns:
+        TelemetryStore: The store configured in `telemetry.store`, or None if
+            it is disabled or cannot be opened
+    """
+    global _shared_store
+    if not config.get_nested("telemetry.store.enabled", True):
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            try:
+                _shared_store = TelemetryStore(
+                    directory=config.get_nested("telemetry.store.directory", "telemetry"),
+                    segment_kb=config.get_nested("telemetry.store.segment_kb", 1024),
+                    max_segments=config.get_nested("telemetry.store.max_segments", 8)
+                )
+            except Exception as e:
+                logger.error(f"Error opening telemetry store: {e}")
+                return None
+        return _shared_store
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+"""
+Per-command tracing for AI Desktop Assistant
+
+A trace is started when the user presses P and follows the command through
+every stage: microphone calibration, speech recognition, classification,
+the handler (including the sleeps some handlers make while an application
+starts) and text-to-speech. Code marks the interesting parts with spans:
+    
+    with tracer.span("google_asr"):
+        text = recognizer.recognize_google(audio)
+
+The active trace lives in a context variable. Threads do not inherit it,
+so code that hands work to another thread passes the trace along and
+re-activates it there with tracer.activate(trace).
+
+Finished traces are appended to a rotating JSONL file, one trace per line,
+and can be converted to the Chrome trace format (chrome://tracing or
+Perfetto) with export_chrome(). When tracing is disabled span() returns a
+shared no-op object, so an unused span costs well under a microsecond.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+class _NoopSpan:
+    """Span returned when there is nothing to record"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **attrs):
+        """Ignore span attributes"""
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """A timed section of work inside a trace"""
+    
+    __slots__ = ("trace", "name", "attrs", "start")
+    
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.start = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.trace.spans.append({
+            "name": self.name,
+            "start_us": (self.start - self.trace.start_ns) // 1000,
+            "dur_us": (end - self.start) // 1000,
+            "thread": threading.current_thread().name,
+            "attrs": self.attrs
+        })
+        return False
+    
+    def set(self, **attrs):
+        """Attach attributes to the span"""
+        self.attrs.update(attrs)
+
+class Trace:
+    """All spans recorded for one voice command"""
+    
+    def __init__(self, name, attrs=None):
+        """Initialize a trace
+        
+        Args:
+            name (str): Trace name
+            attrs (dict, optional): Attributes describing the trace
+        """
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs or {}
+        self.wall_start = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.spans = []
+        self.finished = False
+    
+    def to_dict(self):
+        """Return the trace as a JSON-serialisable dictionary"""
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "start": self.wall_start,
+            "duration_us": (time.perf_counter_ns() - self.start_ns) // 1000,
+            "attrs": self.attrs,
+            "spans": list(self.spans)
+        }
+
+class Tracer:
+    """Creates traces and spans and writes finished traces to disk"""
+    
+    def __init__(self):
+        """Initialize a disabled tracer"""
+        self.enabled = False
+        self.path = None
+        self._writer = None
+    
+    def configure(self, enabled=False, path="traces/commands.jsonl", max_bytes=5 * 1024 * 1024, backup_count=3):
+        """
+        Enable or disable tracing
+        
+        Args:
+            enabled (bool): Whether traces are recorded
+            path (str): JSONL file finished traces are appended to
+            max_bytes (int): Size at which the file is rotated
+            backup_count (int): Number of rotated files to keep
+        """
+        if self._writer is not None:
+            for handler in list(self._writer.handlers):
+                self._writer.removeHandler(handler)
+                handler.close()
+            self._writer = None
+        
+        self.enabled = bool(enabled)
+        self.path = path
+        if not self.enabled:
+            return
+        
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._writer = logging.getLogger(f"{__name__}.writer.{id(self)}")
+            self._writer.propagate = False
+            self._writer.setLevel(logging.INFO)
+            self._writer.addHandler(handler)
+            logger.info(f"Command tracing enabled, writing to {path}")
+        except Exception as e:
+            logger.error(f"Error enabling command tracing: {e}")
+            self.enabled = False
+    
+    def start_trace(self, name, **attrs):
+        """
+        Start a new trace and make it the active trace in this context
+        
+        Args:
+            name (str): Trace name
+            **attrs: Attributes describing the trace
+        
+        Returns:
+            Trace: The new trace, or None when tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        trace = Trace(name, attrs)
+        _current_trace.set(trace)
+        return trace
+    
+    def current(self):
+        """Return the active trace in this context, or None"""
+        return _current_trace.get()
+    
+    @contextlib.contextmanager
+    def activate(self, trace):
+        """
+        Make a trace the active trace for a block of code
+        
+        Args:
+            trace (Trace): Trace to activate; None leaves the context as is
+        """
+        if trace is None:
+            yield
+            return
+        token = _current_trace.set(trace)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+    
+    def span(self, name, **attrs):
+        """
+        Time a block of code in the active trace
+        
+        Args:
+            name (str): Span name
+            **attrs: Attributes describing the span
+        
+        Returns:
+            Span: Context manager recording the span, or a shared no-op
+                object when tracing is disabled or no trace is active
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        trace = _current_trace.get()
+        if trace is None or trace.finished:
+            return NOOP_SPAN
+        return Span(trace, name, attrs)
+    
+    def finish(self, trace):
+        """
+        Write a finished trace to the JSONL file
+        
+        Args:
+            trace (Trace): Trace to finish; None and finished traces are ignored
+        """
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        if self._writer is None:
+            return
+        try:
+            self._writer.info(json.dumps(trace.to_dict()))
+        except Exception as e:
+            logger.error(f"Error writing trace {trace.id}: {e}")
+
+def read_traces(path):
+    """
+    Read traces from a JSONL trace file
+    
+    Args:
+        path (str): Path to the JSONL file
+    
+    Returns:
+        list: Trace dictionaries
+    """
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                traces.append(json.loads(line))
+    return traces
+
+def to_chrome_trace(traces):
+    """
+    Convert traces to the Chrome trace event format
+    
+    Each command becomes its own process row, with one thread row per
+    thread that recorded spans.
+    
+    Args:
+        traces (list): Trace dictionaries, as written to the JSONL file
+    
+    Returns:
+        dict: Chrome trace document
+    """
+    events = []
+    for pid, trace in enumerate(traces, start=1):
+        events.append({
+            "name": "process_name", "ph": "M", "pid": pid,
+            "args": {"name": f"{trace['name']} {trace['trace_id']}"}
+        })
+        base_us = int(trace["start"] * 1_000_000)
+        threads = {}
+        for span in trace["spans"]:
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            events.append({
+                "name": span["name"],
+                "ph": "X",
+                "ts": base_us + span["start_us"],
+                "dur": span["dur_us"],
+                "pid": pid,
+                "tid": tid,
+                "args": span["attrs"]
+            })
+        for thread_name, tid in threads.items():
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": thread_name}
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export_chrome(jsonl_path, output_path):
+    """
+    Convert a JSONL trace file to a Chrome trace file
+    
+    Args:
+        jsonl_path (str): JSONL file written by the tracer
+        output_path (str): Where to write the Chrome trace JSON
+    
+    Returns:
+        bool: True if the export succeeded, False otherwise
+    """
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(to_chrome_trace(read_traces(jsonl_path)), f)
+        return True
+    except Exception as e:
+        logger.error(f"Error exporting Chrome trace: {e}")
+        return False
+
+# Shared tracer used by every module
+tracer = Tracer()
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) != 3:
+        print("Usage: python -m assistant.modules.tracing <traces.jsonl> <chrome_trace.json>")
+        sys.exit(1)
+    sys.exit(0 if export_chrome(sys.argv[1], sys.argv[2]) else 1)
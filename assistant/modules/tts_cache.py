@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""
+Synthesized Phrase Cache for AI Desktop Assistant
+
+Most of what the assistant says is a fixed string ("Taking a screenshot",
+"Window minimized", "Locking your computer."), yet every one was
+synthesized from scratch each time. Rendered phrases are now kept on disk:
+
+- Entries are keyed by (text, voice, rate, volume), so changing the voice
+  or speed never plays stale audio
+- The cache directory is capped in size; the least recently played
+  phrases are evicted first
+- Recently played phrases are also kept in memory and play without
+  touching the disk
+- At startup the literal strings passed to speak() by the handlers are
+  found in the source and rendered in the background while the TTS worker
+  is idle
+
+Text that is not cached (anything with a query or a reading in it) is
+spoken live as before.
+"""
+
+import ast
+import collections
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Calls whose text is spoken, and the position of the text argument
+SPEECH_CALLS = {
+    "speak": 0,
+    "custom_speak": 0,
+    "speak_and_wait": 0,
+    "report_failure": 1
+}
+
+def phrase_key(text, voice, rate, volume):
+    """
+    Return the cache key of a phrase rendered with the given settings
+    
+    Args:
+        text (str): Text of the phrase
+        voice (str): Voice id
+        rate (int): Words per minute
+        volume (float): Volume from 0.0 to 1.0
+    
+    Returns:
+        str: Hex digest used as the file name
+    """
+    settings = json.dumps([text, voice, rate, volume])
+    return hashlib.sha1(settings.encode("utf-8")).hexdigest()
+
+def find_phrases(paths):
+    """
+    Find the literal strings handlers pass to speak()
+    
+    Only plain string constants are returned; f-strings and variables are
+    skipped because their text is not known ahead of time.
+    
+    Args:
+        paths (list): Python source files to scan
+    
+    Returns:
+        list: Unique phrases in the order they were found
+    """
+    phrases = []
+    seen = set()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"Could not scan {path} for phrases: {e}")
+            continue
+        
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            index = SPEECH_CALLS.get(name)
+            if index is None or len(node.args) <= index:
+                continue
+            arg = node.args[index]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and arg.value.strip():
+                if arg.value not in seen:
+                    seen.add(arg.value)
+                    phrases.append(arg.value)
+    return phrases
+
+def handler_sources(root):
+    """Return the source files whose speech is worth pre-rendering"""
+    return [os.path.join(root, "run.py")] + sorted(glob.glob(os.path.join(root, "assistant", "modules", "*.py")))
+
+class PhraseCache:
+    """Size-capped LRU cache of rendered phrases on disk"""
+    
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024, memory_items=32):
+        """Initialize the cache
+        
+        Args:
+            directory (str): Directory holding the rendered WAV files
+            max_bytes (int): Largest total size of the files on disk
+            memory_items (int): Recently played phrases kept in memory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._files = collections.OrderedDict()  # key -> size, least recent first
+        self._memory = collections.OrderedDict()  # key -> bytes, least recent first
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+    
+    def _load(self):
+        """Index the files already on disk, oldest first"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = glob.glob(os.path.join(self.directory, "*.wav"))
+        for path in sorted(files, key=os.path.getmtime):
+            size = os.path.getsize(path)
+            self._files[os.path.splitext(os.path.basename(path))[0]] = size
+            self.size += size
+        self._evict()
+    
+    def path(self, key):
+        """Return the file a phrase is stored in"""
+        return os.path.join(self.directory, f"{key}.wav")
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._files
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._files)
+    
+    def get(self, key):
+        """
+        Return the audio of a cached phrase and mark it as recently used
+        
+        Args:
+            key (str): Key from phrase_key()
+        
+        Returns:
+            bytes: WAV data, or None if the phrase is not cached
+        """
+        with self._lock:
+            if key not in self._files:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._files.move_to_end(key)
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+            os.utime(self.path(key))  # Keeps the LRU order across restarts
+        except OSError as e:
+            logger.error(f"Error reading cached phrase: {e}")
+            self._forget(key)
+            return None
+        
+        with self._lock:
+            self._remember(key, data)
+        return data
+    
+    def put(self, key, data):
+        """
+        Store the audio of a phrase, evicting old phrases past the size cap
+        
+        Args:
+            key (str): Key from phrase_key()
+            data (bytes): WAV data
+        
+        Returns:
+            bool: True if the phrase was stored, False otherwise
+        """
+        path = self.path(key)
+        try:
+            temp = f"{path}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError as e:
+            logger.error(f"Error caching phrase: {e}")
+            return False
+        
+        with self._lock:
+            self.size += len(data) - self._files.get(key, 0)
+            self._files[key] = len(data)
+            self._files.move_to_end(key)
+            self._evict()
+        return True
+    
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+    
+    def _forget(self, key):
+        with self._lock:
+            self.size -= self._files.pop(key, 0)
+            self._memory.pop(key, None)
+    
+    def _evict(self):
+        # Always keep the newest phrase, even if it alone is over the cap
+        while self.size > self.max_bytes and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            self._memory.pop(key, None)
+            self.size -= size
+            try:
+                os.remove(self.path(key))
+            except OSError as e:
+                logger.warning(f"Error removing cached phrase: {e}")
+    
+    def stats(self):
+        """Return cache statistics"""
+        with self._lock:
+            return {
+                "phrases": len(self._files),
+                "bytes": self.size,
+                "in_memory": len(self._memory),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+class CachedSpeaker:
+    """Speaker that plays cached phrases and speaks everything else live"""
+    
+    def __init__(self, speaker, cache, player):
+        """Initialize the speaker
+        
+        Args:
+            speaker (object): Live speaker with voice, rate and volume
+                attributes and render(text, path), e.g. a Pyttsx3Speaker
+            cache (PhraseCache): Rendered phrases
+            player (AudioPlayer): Plays the cached audio
+        """
+        self.speaker = speaker
+        self.cache = cache
+        self.player = player
+        self._stop_requested = False
+    
+    def key(self, text):
+        """Return the cache key of text in the current voice settings"""
+        return phrase_key(text, self.speaker.voice, self.speaker.rate, self.speaker.volume)
+    
+    def open(self):
+        """Open the live speaker"""
+        self.speaker.open()
+    
+    def speak(self, text):
+        """Play the phrase from the cache, or speak it live"""
+        self._stop_requested = False
+        data = self.cache.get(self.key(text))
+        if data is not None:
+            if self.player.play(data) or self._stop_requested:
+                return
+            logger.warning("Cached phrase could not be played; speaking it live")
+        self.speaker.speak(text)
+    
+    def render(self, text):
+        """
+        Render a phrase into the cache unless it is already there
+        
+        Must be called on the thread that owns the live speaker, e.g. with
+        TTSWorker.run_when_idle().
+        
+        Args:
+            text (str): Phrase to render
+        
+        Returns:
+            bool: True if the phrase is cached, False otherwise
+        """
+        key = self.key(text)
+        if key in self.cache:
+            return True
+        temp = os.path.join(self.cache.directory, "render.wav")
+        try:
+            self.speaker.render(text, temp)
+            with open(temp, "rb") as f:
+                data = f.read()
+            os.remove(temp)
+        except Exception as e:
+            logger.error(f"Error rendering phrase '{text}': {e}")
+            return False
+        if not data:
+            return False
+        return self.cache.put(key, data)
+    
+    def warm(self, worker, phrases):
+        """
+        Render phrases in the background while the worker has nothing to say
+        
+        Args:
+            worker (TTSWorker): Worker that owns this speaker
+            phrases (list): Phrases to render
+        """
+        for text in phrases:
+            worker.run_when_idle(lambda text=text: self.render(text))
+        logger.info(f"Warming the phrase cache with {len(phrases)} phrases")
+    
+    def stop(self):
+        """Cut off the current phrase"""
+        self._stop_requested = True
+        self.player.stop()
+        self.speaker.stop()
+    
+    def close(self):
+        """Release the live speaker and the audio output"""
+        self.player.close()
+        self.speaker.close()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python
+"""
+Text-to-Speech Worker for AI Desktop Assistant
+
+speak() used to hold a global lock and run the TTS engine in the caller's
+thread, so every handler that confirmed an action ("Window minimized")
+waited for the whole sentence before returning. Speech is now handed to a
+single worker thread that owns the one TTS engine:
+
+- speak() enqueues and returns immediately
+- The queue is bounded and ordered by priority, then by arrival
+- Messages with the same coalescing key replace each other while they are
+  still waiting, so "Increasing volume" said three times quickly is spoken once
+- interrupt() cuts off the current sentence and drops everything waiting,
+  which is what a new press of P does (barge-in)
+"""
+
+import collections
+import heapq
+import itertools
+import logging
+import threading
+
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Priority levels; lower values are spoken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+class Utterance:
+    """A message waiting for, or being spoken by, the TTS worker"""
+    
+    def __init__(self, text, priority, key, trace, seq):
+        """Initialize the utterance
+        
+        Args:
+            text (str): Text to speak
+            priority (int): PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+            key (str): Coalescing key
+            trace (Trace): Trace the "tts" span is recorded in
+            seq (int): Arrival order
+        """
+        self.text = text
+        self.priority = priority
+        self.key = key
+        self.trace = trace
+        self.seq = seq
+        self.status = "queued"
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+    
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+    
+    @property
+    def done(self):
+        """Whether the utterance was spoken, replaced or dropped"""
+        return self._done.is_set()
+    
+    def wait(self, timeout=None):
+        """
+        Wait until the utterance is finished
+        
+        Args:
+            timeout (float, optional): Seconds to wait
+        
+        Returns:
+            bool: True if it finished within the timeout
+        """
+        return self._done.wait(timeout)
+    
+    def add_done_callback(self, callback):
+        """
+        Call a function once the utterance is finished
+        
+        Args:
+            callback (callable): Called with no arguments; immediately if the
+                utterance is already finished
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def _finish(self, status):
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.status = status
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in speech callback: {e}")
+
+class Pyttsx3Speaker:
+    """Speaks through a single pyttsx3 engine owned by the worker thread"""
+    
+    def __init__(self, rate=150, volume=1.0):
+        """Initialize the speaker
+        
+        Args:
+            rate (int): Words per minute
+            volume (float): Volume from 0.0 to 1.0
+        """
+        self.rate = rate
+        self.volume = volume
+        self.voice = None
+        self.engine = None
+        self._stop_requested = False
+    
+    def open(self):
+        """Create the engine and pick a voice, once"""
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate', self.rate)
+        self.engine.setProperty('volume', self.volume)
+        
+        # Try to find an Indian English voice, otherwise use the first voice
+        voices = self.engine.getProperty('voices') or []
+        for voice in voices:
+            if "indian" in voice.name.lower() or "hindi" in voice.name.lower() or "en-in" in voice.id.lower():
+                self.engine.setProperty('voice', voice.id)
+                break
+        else:
+            if voices:
+                self.engine.setProperty('voice', voices[0].id)
+        self.voice = self.engine.getProperty('voice')
+        
+        # pyttsx3 can only be stopped from inside its own loop
+        self.engine.connect('started-word', self._on_word)
+    
+    def _on_word(self, name, location, length):
+        if self._stop_requested:
+            self.engine.stop()
+    
+    def speak(self, text):
+        """Speak text, blocking until it is finished or stopped"""
+        self._stop_requested = False
+        self.engine.say(text)
+        self.engine.runAndWait()
+    
+    def render(self, text, path):
+        """Synthesize text into an audio file instead of the speakers"""
+        self._stop_requested = False
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+    
+    def stop(self):
+        """Cut off the current sentence"""
+        self._stop_requested = True
+    
+    def close(self):
+        """Release the engine"""
+        self.engine = None
+
+class ConsoleSpeaker:
+    """Fallback when no TTS engine is available"""
+    
+    def open(self):
+        """Nothing to open"""
+    
+    def speak(self, text):
+        """The text is already printed by speak()"""
+    
+    def stop(self):
+        """Nothing to stop"""
+    
+    def close(self):
+        """Nothing to release"""
+
+class TTSWorker:
+    """Single thread that owns the TTS engine and speaks queued messages"""
+    
+    def __init__(self, speaker=None, max_queue=8):
+        """Initialize the worker
+        
+        Args:
+            speaker (object, optional): Object with open(), speak(text),
+                stop() and close(). Defaults to a Pyttsx3Speaker.
+            max_queue (int): Most messages that may wait at once
+        """
+        self.speaker = speaker or Pyttsx3Speaker()
+        self.max_queue = max(1, int(max_queue))
+        self._heap = []
+        self._pending = {}  # Coalescing key -> waiting utterance
+        self._idle_tasks = collections.deque()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._thread = None
+        self._running = False
+        
+        # Statistics
+        self.spoken = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.interrupted = 0
+    
+    # Lifecycle
+    
+    def start(self):
+        """Start the worker thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=5):
+        """
+        Speak what is already queued, then stop the worker thread
+        
+        Args:
+            timeout (float): Seconds to wait for the queue to drain
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def running(self):
+        """Whether the worker thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _open_speaker(self):
+        try:
+            self.speaker.open()
+        except Exception as e:
+            logger.error(f"Error initializing speech engine: {e}")
+            self.speaker = ConsoleSpeaker()
+    
+    def _run(self):
+        self._open_speaker()
+        while True:
+            with self._cond:
+                while not self._heap and not self._idle_tasks and self._running:
+                    self._cond.wait()
+                if self._heap:
+                    utterance = heapq.heappop(self._heap)
+                    if utterance.status != "queued":
+                        continue  # Replaced or dropped while waiting
+                    if self._pending.get(utterance.key) is utterance:
+                        del self._pending[utterance.key]
+                    utterance.status = "speaking"
+                    self._current = utterance
+                elif self._running:
+                    utterance = None
+                    task = self._idle_tasks.popleft()
+                else:
+                    break
+            
+            if utterance is None:
+                # Nothing to say; do one piece of background work
+                self._run_idle_task(task)
+                continue
+            
+            try:
+                with tracer.activate(utterance.trace), tracer.span("tts", chars=len(utterance.text)):
+                    self.speaker.speak(utterance.text)
+                self.spoken += 1
+            except Exception as e:
+                logger.error(f"Error in text-to-speech: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._cond.notify_all()
+                utterance._finish("spoken" if utterance.status == "speaking" else utterance.status)
+        
+        try:
+            self.speaker.close()
+        except Exception as e:
+            logger.error(f"Error closing speech engine: {e}")
+    
+    def _run_idle_task(self, task):
+        try:
+            task()
+        except Exception as e:
+            logger.error(f"Error in background speech task: {e}")
+    
+    # Producers
+    
+    def say(self, text, priority=PRIORITY_NORMAL, key=None):
+        """
+        Queue text to be spoken and return immediately
+        
+        Args:
+            text (str): Text to speak
+            priority (int): PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+            key (str, optional): Coalescing key; a waiting message with the
+                same key is replaced. Defaults to the text itself.
+        
+        Returns:
+            Utterance: Handle to wait on, already finished with status
+                "dropped" if the queue was full of more important messages
+        """
+        key = key if key is not None else text
+        utterance = Utterance(text, priority, key, tracer.current(), next(self._seq))
+        replaced = None
+        evicted = None
+        with self._cond:
+            previous = self._pending.get(key)
+            if previous is not None:
+                replaced = previous
+                replaced.status = "coalesced"
+                self.coalesced += 1
+            else:
+                waiting = [item for item in self._heap if item.status == "queued"]
+                if len(waiting) >= self.max_queue:
+                    # Make room by dropping the least important, oldest message
+                    worst = max(waiting, key=lambda item: (item.priority, -item.seq))
+                    if worst.priority < priority:
+                        self.dropped += 1
+                        utterance._finish("dropped")
+                        logger.warning(f"Speech queue full; dropping: {text}")
+                        return utterance
+                    evicted = worst
+                    evicted.status = "dropped"
+                    self._pending.pop(worst.key, None)
+                    self.dropped += 1
+            
+            self._pending[key] = utterance
+            heapq.heappush(self._heap, utterance)
+            self._cond.notify_all()
+        
+        # Finish outside the lock; callbacks may queue more speech
+        if replaced is not None:
+            replaced._finish(replaced.status)
+        if evicted is not None:
+            logger.warning(f"Speech queue full; dropping: {evicted.text}")
+            evicted._finish(evicted.status)
+        return utterance
+    
+    def run_when_idle(self, task):
+        """
+        Run a task on the worker thread when nothing is waiting to be spoken
+        
+        Tasks run one at a time between messages, so they can use the speech
+        engine (e.g. to pre-render phrases) without delaying speech by more
+        than one task.
+        
+        Args:
+            task (callable): Called with no arguments
+        """
+        with self._cond:
+            self._idle_tasks.append(task)
+            self._cond.notify_all()
+    
+    def interrupt(self):
+        """
+        Barge in: cut off the current sentence and drop waiting messages
+        
+        Returns:
+            int: Number of messages cut off or dropped
+        """
+        with self._cond:
+            waiting = [item for item in self._heap if item.status == "queued"]
+            for item in waiting:
+                item.status = "interrupted"
+            self._heap = []
+            self._pending.clear()
+            current = self._current
+            if current is not None:
+                current.status = "interrupted"
+        if current is not None:
+            self.speaker.stop()
+        for item in waiting:
+            item._finish(item.status)
+        count = len(waiting) + (1 if current is not None else 0)
+        self.interrupted += count
+        return count
+    
+    def wait_idle(self, timeout=None):
+        """
+        Wait until nothing is being spoken or waiting
+        
+        Args:
+            timeout (float, optional): Seconds to wait
+        
+        Returns:
+            bool: True if the worker became idle within the timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._current is None and not any(item.status == "queued" for item in self._heap),
+                timeout=timeout
+            )
+    
+    def stats(self):
+        """Return worker statistics"""
+        with self._cond:
+            depth = sum(1 for item in self._heap if item.status == "queued")
+        return {
+            "queue_depth": depth,
+            "spoken": self.spoken,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "interrupted": self.interrupted
+        }
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+"""
+Wake Word Listening for AI Desktop Assistant
+
+Holding P is the only way to start a command, and the global keyboard hook
+fires on every "p" typed in any application. Wake word mode listens for
+"Zenith" instead, reading from the stream the capture engine keeps open:
+
+- Each pass over new audio only computes frame energies and compares them
+  with the engine's speech threshold, which costs next to nothing
+- A burst of speech about as long as the wake word is compared with the
+  enrolled recordings (templates/*.wav) using band-energy features and
+  dynamic time warping. This is the only heavy step and it runs at most
+  once per burst.
+- Full speech recognition starts only after a detection, from the audio
+  right after the wake word, so "Zenith, check battery" works in one breath
+- The listener measures its own CPU time and processes audio less often
+  when it goes over `wake_word.cpu_budget` (percent of one core)
+
+Enroll the wake word by recording two or three WAV files of yourself
+saying it into the templates directory.
+"""
+
+import glob
+import logging
+import os
+import threading
+import time
+import wave
+
+import numpy as np
+
+from .config_handler import config
+from .endpointing import Endpointer
+
+logger = logging.getLogger(__name__)
+
+def band_features(samples, sample_rate=16000, frame_size=320, bands=16):
+    """
+    Return the spectral shape of each frame
+    
+    Args:
+        samples (np.ndarray): 16-bit mono samples
+        sample_rate (int): Samples per second
+        frame_size (int): Samples per frame
+        bands (int): Log-spaced frequency bands between 100 Hz and Nyquist
+    
+    Returns:
+        np.ndarray: (frames, bands) log band energies with each frame's mean
+            removed, so loudness does not matter
+    """
+    count = len(samples) // frame_size
+    if count == 0:
+        return np.zeros((0, bands), dtype=np.float32)
+    frames = samples[:count * frame_size].reshape(count, frame_size).astype(np.float32)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_size), axis=1)) ** 2
+    
+    edges = np.geomspace(100, sample_rate / 2, bands + 1) * frame_size / sample_rate
+    edges = np.clip(np.round(edges).astype(int), 1, spectrum.shape[1] - 1)
+    edges = np.maximum(edges, np.arange(len(edges)) + 1)  # At least one bin per band
+    energies = np.add.reduceat(spectrum, edges[:-1], axis=1)
+    features = np.log(energies + 1.0)
+    return features - features.mean(axis=1, keepdims=True)
+
+def open_end_dtw(template, candidate, min_ratio=0.6):
+    """
+    Align a template with the start of a candidate
+    
+    The end of the match is free, so a candidate that goes on into the
+    command after the wake word still matches.
+    
+    Args:
+        template (np.ndarray): (m, bands) features of an enrolled recording
+        candidate (np.ndarray): (n, bands) features of the heard audio
+        min_ratio (float): Shortest match as a fraction of the template
+    
+    Returns:
+        tuple: (distance, frames) - mean distance along the best path and
+            the number of candidate frames it covers; (inf, 0) if the
+            candidate is too short
+    """
+    n, m = len(candidate), len(template)
+    first = max(1, int(m * min_ratio))
+    if n < first or m == 0:
+        return float("inf"), 0
+    cost = np.sqrt(((candidate[:, None, :] - template[None, :, :]) ** 2).sum(axis=2))
+    
+    total = np.full((n + 1, m + 1), np.inf)
+    total[0, 0] = 0.0
+    for i in range(1, n + 1):
+        above = total[i - 1]
+        # Diagonal and vertical steps at once; horizontal steps in order
+        row = np.minimum(above[:-1], above[1:]) + cost[i - 1]
+        current = total[i]
+        for j in range(1, m + 1):
+            current[j] = min(row[j - 1], current[j - 1] + cost[i - 1, j - 1])
+    
+    ends = total[first:, m] / (np.arange(first, n + 1) + m)
+    best = int(np.argmin(ends))
+    return float(ends[best]), first + best
+
+class TemplateSpotter:
+    """Keyword spotter that matches audio against enrolled recordings"""
+    
+    def __init__(self, templates, sample_rate=16000, frame_ms=20, threshold=2.0):
+        """Initialize the spotter
+        
+        Args:
+            templates (list): 16-bit mono sample arrays of the wake word
+            sample_rate (int): Samples per second
+            frame_ms (int): Length of one frame in milliseconds
+            threshold (float): Largest DTW distance that counts as a match
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.threshold = threshold
+        trimmer = Endpointer(sample_rate=sample_rate, frame_ms=frame_ms, padding_ms=0)
+        self.templates = []
+        for samples in templates:
+            speech = trimmer.trim(np.asarray(samples, dtype=np.int16))
+            features = band_features(speech, sample_rate, self.frame_size)
+            if len(features):
+                self.templates.append(features)
+        if not self.templates:
+            raise ValueError("No usable wake word templates")
+    
+    @classmethod
+    def from_directory(cls, directory, **kwargs):
+        """
+        Load the templates from WAV files (16-bit mono at the sample rate)
+        
+        Args:
+            directory (str): Directory of enrolled recordings
+            **kwargs: Passed to the constructor
+        
+        Returns:
+            TemplateSpotter: The spotter
+        """
+        templates = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            with wave.open(path, "rb") as f:
+                templates.append(np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16))
+        return cls(templates, **kwargs)
+    
+    @property
+    def min_frames(self):
+        """Shortest burst of speech worth comparing"""
+        return int(min(len(t) for t in self.templates) * 0.6)
+    
+    @property
+    def max_frames(self):
+        """Longest part of a burst that is compared"""
+        return int(max(len(t) for t in self.templates) * 1.4)
+    
+    def match(self, samples):
+        """
+        Compare audio that starts with a burst of speech with the templates
+        
+        Args:
+            samples (np.ndarray): 16-bit samples from the start of the speech
+        
+        Returns:
+            tuple: (detected, distance, end) - end is the sample offset where
+                the wake word ends
+        """
+        candidate = band_features(samples, self.sample_rate, self.frame_size)[:self.max_frames]
+        best, frames = min(open_end_dtw(template, candidate) for template in self.templates)
+        return best <= self.threshold, best, frames * self.frame_size
+
+class WakeWordListener:
+    """Watches the capture engine's stream for the wake word"""
+    
+    def __init__(self, engine, spotter, on_detect, pause_ms=200, cooldown_ms=1500,
+                 interval_ms=100, cpu_budget=3.0):
+        """Initialize the listener
+        
+        Args:
+            engine (AudioCaptureEngine): Running capture engine to read from
+            spotter (TemplateSpotter): Decides whether a burst is the wake word
+            on_detect (callable): on_detect(start) is called on a detection,
+                where start is the position to pass to the engine's record()
+                so the recording begins right after the wake word
+            pause_ms (int): Silence that ends a burst of speech
+            cooldown_ms (int): Time after a detection in which audio is ignored
+            interval_ms (int): How often new audio is processed
+            cpu_budget (float): Percent of one core the listener may use
+        """
+        self.engine = engine
+        self.spotter = spotter
+        self.on_detect = on_detect
+        frame_ms = 1000 * engine.frame_size / engine.sample_rate
+        self.pause_frames = max(1, int(pause_ms / frame_ms))
+        self.cooldown = engine.sample_rate * cooldown_ms // 1000
+        self.interval = interval_ms / 1000
+        self.max_interval = self.interval * 8
+        self.cpu_budget = cpu_budget
+        
+        self._thread = None
+        self._stop = threading.Event()
+        self._position = 0
+        self._segment = None  # Stream position where the current burst started
+        self._silence = 0
+        self._checked = False
+        self._ignore_until = 0
+        
+        # Statistics
+        self.detections = 0
+        self.checks = 0
+        self.cpu_time = 0.0
+        self.last_latency = None
+        self.best_distance = None
+        self._started = None
+    
+    def start(self):
+        """Start listening from the current position in the stream"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._position = self.engine.mark()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self._thread.start()
+        logger.info("Listening for the wake word")
+    
+    def stop(self):
+        """Stop listening"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def _run(self):
+        window_cpu = time.thread_time()
+        window_start = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            cpu = time.thread_time()
+            try:
+                self.process()
+            except Exception as e:
+                logger.error(f"Error in wake word listener: {e}")
+            self.cpu_time += time.thread_time() - cpu
+            
+            # Keep within the CPU budget by waking up less often
+            elapsed = time.perf_counter() - window_start
+            if elapsed >= 2.0:
+                usage = (time.thread_time() - window_cpu) / elapsed * 100
+                if usage > self.cpu_budget and self.interval < self.max_interval:
+                    self.interval *= 2
+                    logger.warning(f"Wake word listener used {usage:.1f}% CPU; processing every {self.interval * 1000:.0f}ms")
+                elif usage < self.cpu_budget / 4 and self.interval > self.max_interval / 8:
+                    self.interval /= 2
+                window_cpu = time.thread_time()
+                window_start = time.perf_counter()
+            if not self.engine.running:
+                break
+    
+    def process(self):
+        """Classify the audio that arrived since the last call"""
+        frame = self.engine.frame_size
+        buffer = self.engine.buffer
+        # Audio that fell out of the ring while we were away is skipped
+        self._position = max(self._position, buffer.total - buffer.capacity)
+        count = (buffer.total - self._position) // frame
+        if count <= 0:
+            return
+        block = buffer.window(self._position, self._position + count * frame)
+        values = block.reshape(count, frame).astype(np.float32)
+        speech = np.sqrt(np.mean(values * values, axis=1)) > self.engine.speech_threshold()
+        
+        for i, is_speech in enumerate(speech):
+            position = self._position + i * frame
+            if position < self._ignore_until:
+                continue
+            if self._segment is None:
+                if is_speech:
+                    self._segment, self._silence, self._checked = position, 0, False
+                continue
+            
+            self._silence = 0 if is_speech else self._silence + 1
+            length = (position - self._segment) // frame
+            if self._silence >= self.pause_frames:
+                # The burst is over; check it unless it was checked already
+                if not self._checked and length - self._silence >= self.spotter.min_frames:
+                    self._check(self._segment, position)
+                self._segment = None
+            elif not self._checked and length >= self.spotter.max_frames:
+                # Still talking; the wake word may run straight into the command
+                self._check(self._segment, position)
+        self._position += count * frame
+    
+    def _check(self, start, end):
+        self._checked = True
+        self.checks += 1
+        detected, distance, offset = self.spotter.match(self.engine.buffer.window(start, end))
+        logger.debug(f"Wake word distance {distance:.2f} (threshold {self.spotter.threshold})")
+        if self.best_distance is None or distance < self.best_distance:
+            self.best_distance = distance
+        if not detected:
+            return
+        
+        self.detections += 1
+        word_end = start + offset
+        self.last_latency = max(0.0, (self.engine.buffer.total - word_end) / self.engine.sample_rate)
+        self._segment = None
+        self._ignore_until = word_end + self.cooldown
+        logger.info(f"Wake word detected (distance {distance:.2f})")
+        try:
+            # record() starts pre_roll before the position it is given
+            self.on_detect(word_end + self.engine.pre_roll)
+        except Exception as e:
+            logger.error(f"Error handling wake word: {e}")
+    
+    def stats(self):
+        """Return listener statistics"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "detections": self.detections,
+            "checks": self.checks,
+            "cpu_percent": round(self.cpu_time / elapsed * 100, 2) if elapsed else 0.0,
+            "interval_ms": round(self.interval * 1000)
+        }
+
+def create_wake_word_listener(engine, on_detect):
+    """
+    Create a listener from the `wake_word` section of the configuration
+    
+    Args:
+        engine (AudioCaptureEngine): Running capture engine
+        on_detect (callable): Called with the recording start position
+    
+    Returns:
+        WakeWordListener: The listener, or None if no templates are enrolled
+    """
+    directory = config.get_nested("wake_word.templates", "models/wake_word")
+    try:
+        spotter = TemplateSpotter.from_directory(
+            directory,
+            sample_rate=engine.sample_rate,
+            frame_ms=1000 * engine.frame_size // engine.sample_rate,
+            threshold=config.get_nested("wake_word.threshold", 2.0)
+        )
+    except (OSError, ValueError, wave.Error) as e:
+        logger.error(f"Wake word templates in {directory} could not be loaded: {e}")
+        return None
+    return WakeWordListener(
+        engine,
+        spotter,
+        on_detect,
+        pause_ms=config.get_nested("wake_word.pause_ms", 200),
+        cooldown_ms=config.get_nested("wake_word.cooldown_ms", 1500),
+        interval_ms=config.get_nested("wake_word.interval_ms", 100),
+        cpu_budget=config.get_nested("wake_word.cpu_budget", 3.0)
+    )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Wake Word Benchmark for AI Desktop Assistant
+
+Replays WAV fixtures through the capture engine and the wake word listener
+at real-time pace and reports, for each fixture:
+
+- detected: whether the wake word was heard (fixtures whose name starts
+  with "zenith" contain it, the others must not trigger)
+- latency_ms: from the end of the wake word in the fixture to the detection
+- cpu_percent: CPU time of the listener thread per second of audio, as a
+  percentage of one core
+- distance: the best template distance, for tuning wake_word.threshold
+
+Run it headless with the enrolled fixture templates:
+    
+    python -m assistant.modules.wake_word_benchmark tests/fixtures/audio/wake_word
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+from .audio_capture import create_capture_engine
+from .speech_benchmark import FixtureSource, format_results
+from .wake_word import TemplateSpotter, WakeWordListener
+
+def run_fixture(path, spotter, speed=1.0, interval_ms=100):
+    """
+    Replay one fixture through the wake word listener
+    
+    Args:
+        path (str): Fixture file
+        spotter (TemplateSpotter): Spotter with the enrolled templates
+        speed (float): Playback speed; 1.0 is real time
+        interval_ms (int): How often the listener processes new audio
+    
+    Returns:
+        dict: Detection result, latency and CPU use
+    """
+    engine = create_capture_engine()
+    source = FixtureSource(path, engine.sample_rate, engine.frame_size, speed)
+    detections = []
+    listener = WakeWordListener(engine, spotter, lambda start: detections.append((start, time.perf_counter())),
+                                interval_ms=interval_ms)
+    if not engine.start(source=source):
+        raise RuntimeError(f"Could not open fixture {path}")
+    try:
+        listener.start()
+        duration = len(source.samples) / engine.sample_rate
+        # Play the whole fixture, then give the listener one more pass
+        while source.delivered < len(source.samples):
+            time.sleep(0.05)
+        time.sleep(2 * interval_ms / 1000)
+    finally:
+        listener.stop()
+        engine.stop()
+    
+    latency = None
+    if detections:
+        start, detected_at = detections[0]
+        word_end = start - engine.pre_roll
+        delivered = source.delivered_at(word_end)
+        latency = round((detected_at - delivered) * 1000, 1) if delivered else None
+    
+    return {
+        "fixture": os.path.basename(path),
+        "expected": os.path.basename(path).startswith("zenith"),
+        "detected": bool(detections),
+        "latency_ms": latency,
+        "cpu_percent": round(listener.cpu_time / duration * 100 * speed, 2),
+        "distance": round(listener.best_distance, 2) if listener.best_distance is not None else None,
+        "checks": listener.checks,
+        "audio_s": round(duration, 2)
+    }
+
+def run_benchmark(paths, templates, speed=1.0, threshold=2.0):
+    """
+    Replay fixtures through the wake word listener
+    
+    Args:
+        paths (list): Fixture files
+        templates (str): Directory of enrolled wake word recordings
+        speed (float): Playback speed; 1.0 is real time
+        threshold (float): Largest template distance that counts as a match
+    
+    Returns:
+        list: One result dictionary per fixture
+    """
+    spotter = TemplateSpotter.from_directory(templates, threshold=threshold)
+    return [run_fixture(path, spotter, speed=speed) for path in paths]
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark wake word detection with recorded fixtures")
+    parser.add_argument("fixtures", nargs="?", default="tests/fixtures/audio/wake_word",
+                        help="Fixture file or directory of WAV files")
+    parser.add_argument("--templates", help="Directory of wake word recordings (default: <fixtures>/templates)")
+    parser.add_argument("--threshold", type=float, default=2.0, help="Largest template distance for a match")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (1.0 is real time)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    if os.path.isdir(args.fixtures):
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+        templates = args.templates or os.path.join(args.fixtures, "templates")
+    else:
+        paths = [args.fixtures]
+        templates = args.templates or os.path.join(os.path.dirname(args.fixtures), "templates")
+    if not paths:
+        print(f"No fixtures found in {args.fixtures}")
+        return 1
+    
+    results = run_benchmark(paths, templates, args.speed, args.threshold)
+    print(format_results(results, ("fixture", "expected", "detected", "latency_ms", "cpu_percent", "distance", "audio_s")))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(result["expected"] == result["detected"] for result in results) else 1
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
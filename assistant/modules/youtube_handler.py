@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 import time
 import pyautogui
 import urllib.parse
+from .tracing import tracer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -67,7 +68,8 @@ class YouTubeHandler:
                 self.video_state = 'playing'
                 
                 # Give the browser time to load
-                time.sleep(2)
+                with tracer.span("sleep", reason="browser load"):
+                    time.sleep(2)
                 
                 # Try to ensure video playback starts by sending a keyboard space press
                 # This works in most browsers to start video playback
@@ -89,7 +91,8 @@ class YouTubeHandler:
                 webbrowser.open(direct_play_url)
                 
                 # Give the browser time to load
-                time.sleep(2)
+                with tracer.span("sleep", reason="browser load"):
+                    time.sleep(2)
                 
                 # Try to ensure video playback starts
                 try:
@@ -22,12 +22,27 @@ import webbrowser
 import re
 from assistant.modules.nlp_learning import CommandLearner
 from assistant.modules.speech_recognition_engine import SpeechRecognizer
+from assistant.modules.audio_capture import create_capture_engine
+from assistant.modules.wake_word import create_wake_word_listener
 from assistant.modules.ai_orchestrator import AIOrchestrator
-from assistant.modules.speech_utils import speak
+from assistant.modules.speech_utils import (
+    PRIORITY_HIGH, get_tts_worker, interrupt_speech, redirect_speech, speak, speak_and_wait, warm_phrase_cache
+)
 from assistant.modules.system_controls import SystemControls
 from assistant.modules.media_controls import MediaControls
 from assistant.modules.web_search import WebSearch
 from assistant.modules.config_handler import config
+from assistant.modules.pipeline import CommandPipeline
+from assistant.modules.nbest import rank_hypotheses
+from assistant.modules.execution_planner import (
+    ExecutionPlanner, ALL_RESOURCES, AUDIO_OUTPUT, BROWSER, FOREGROUND_WINDOW, SCREEN
+)
+from assistant.modules.command_router import CommandRouter
+from assistant.modules.tracing import tracer
+from assistant.modules.telemetry import get_telemetry
+from assistant.modules.telemetry_store import get_telemetry_store
+from assistant.modules.screen_recorder import RECORDING_KEYWORDS
+from assistant.modules.screenshot_library import LIBRARY_KEYWORDS
 from assistant.gui import create_gui
 
 # Configure logging
@@ -44,12 +59,47 @@ logger = logging.getLogger(__name__)
 # Global instances
 gui = None
 web_search = None
+pipeline = None
+planner = None
+router = None
+capture_engine = None
+
+# Slots for the search query in YouTube commands
+YOUTUBE_SEARCH_QUERY = r"(?:search|find)(?:\s+(?:on|in))?(?:\s+youtube)?(?:\s+for)?\s+(?P<query>.+?)(?:\s+(?:on|in)\s+youtube)?$"
+YOUTUBE_PLAY_QUERY = r"play(?:\s+(?:on|in))?(?:\s+youtube)?\s+(?P<query>.+?)(?:\s+(?:on|in)\s+youtube)?$"
+YOUTUBE_VIDEO_QUERY = r"^(?:(?:watch|find|show|open)\s+)?(?:youtube\s+)?(?P<query>.+?)(?:\s+videos?)?(?:\s+(?:on|in)\s+youtube)?$"
+
+def custom_speak(text, **options):
+    """Wrapper for speak function that updates GUI
+    
+    Args:
+        text (str): Text to speak
+        **options: priority and key, passed on to speak()
+    """
+    if gui:
+        gui.speak(text, is_user=False)
+    speak(text, **options)
 
-def custom_speak(text):
-    """Wrapper for speak function that updates GUI"""
+def speak_before_exit(text, timeout=5.0):
+    """Speak a last message and wait until it and any earlier speech is done
+    
+    Speech is normally queued (to the pipeline speech stage or the TTS
+    worker), so os._exit() right after speak() would cut it off.
+    
+    Args:
+        text (str): Text to speak
+        timeout (float): Seconds to wait at most
+    """
     if gui:
         gui.speak(text, is_user=False)
-    speak(text)
+    deadline = time.monotonic() + timeout
+    # Straight to the TTS worker rather than the pipeline, which is about to die
+    with redirect_speech(None):
+        speak_and_wait(text, timeout=timeout)
+    try:
+        get_tts_worker().wait_idle(max(0.0, deadline - time.monotonic()))
+    except Exception as e:
+        logger.error(f"Error waiting for speech before exit: {e}")
 
 def check_environment():
     """Check if all required components are available"""
@@ -112,303 +162,333 @@ def split_compound_commands(command_text):
     logger.info(f"Split compound command into: {commands}")
     return commands
 
-def process_command(command_text):
-    """Process a voice command"""
+def classify_command(command_text):
+    """
+    Split a voice command into fragments, classify and route each of them.
+    
+    Given several recognizer alternatives, all of them are classified in
+    one batch and the one the classifier is most sure about is used.
+    
+    Args:
+        command_text (str or list): The recognized command text, or
+            (text, confidence) alternatives from recognize_nbest()
+    
+    Returns:
+        dict: Execution plan with the original text, a quit flag and the
+            classified steps (command, category, confidence, route)
+    """
+    hypotheses = [(command_text, 1.0)] if isinstance(command_text, str) else command_text
+    plan = {"text": hypotheses[0][0], "quit": False, "steps": []}
+    
+    # Check for exact quit commands
+    if plan["text"].strip().lower() in ["quit zenith", "quit ai", "exit ai"]:
+        plan["quit"] = True
+        return plan
+    
+    # Split into individual commands if it's a compound command, and
+    # classify the fragments of every alternative together
+    with tracer.span("nlp_classify", text=plan["text"], alternatives=len(hypotheses)) as span:
+        best = rank_hypotheses(hypotheses, orchestrator.preprocess_commands, split_compound_commands)[0]
+        span.set(fragments=len(best.fragments))
+    
+    plan["text"] = best.text
+    for cmd, result in zip(best.fragments, best.results):
+        command = result.get("command", "")
+        category = result.get("category", "web_search")
+        plan["steps"].append({
+            "text": cmd,
+            "command": command,
+            "category": category,
+            "confidence": result.get("confidence", 0.0),
+            "route": router.resolve(command, category)
+        })
+    
+    return plan
+
+def execute_plan(plan):
+    """Execute a plan produced by classify_command"""
     try:
-        # Check for exact quit commands
-        if command_text.strip().lower() in ["quit zenith", "quit ai", "exit ai"]:
-            custom_speak("Goodbye! Shutting down.")
+        if plan["quit"]:
+            speak_before_exit("Goodbye! Shutting down.")
             os._exit(0)  # Use os._exit(0) to ensure the program exits
         
-        # Split into individual commands if it's a compound command
-        individual_commands = split_compound_commands(command_text)
+        steps = plan["steps"]
         
         # If multiple commands were detected
-        if len(individual_commands) > 1:
-            custom_speak(f"Processing {len(individual_commands)} commands")
+        if len(steps) > 1:
+            custom_speak(f"Processing {len(steps)} commands")
             
-            # Process each command sequentially
-            for i, cmd in enumerate(individual_commands):
-                logger.info(f"Processing command {i+1}/{len(individual_commands)}: {cmd}")
-                
-                # Process this individual command
-                result = orchestrator.preprocess_command(cmd)
-                command = result.get("command", "")
-                category = result.get("category", "web_search")
-                confidence = result.get("confidence", 0.0)
-                
-                logger.info(f"Command {i+1} category: {category}, confidence: {confidence}")
-                
-                # Handle lock computer command directly with high confidence
-                if any(phrase in command.lower() for phrase in ["lock computer", "lock system", "lock pc"]):
-                    custom_speak("Locking your computer.")
-                    sys_controls.system_power_control(command)
-                    break  # Exit after locking
-                
-                # Only process commands with sufficient confidence
-                if confidence < 0.4:
-                    logger.warning(f"Low confidence ({confidence}) for command {i+1}: {command}")
-                    custom_speak(f"I'm not sure what you want me to do with '{cmd}'. Skipping this part.")
-                    continue
+            # Nothing after a lock command should run
+            for i, step in enumerate(steps):
+                if step["route"].intent == "lock_computer":
+                    steps = steps[:i + 1]
+                    break
                 
-                # Process the command with appropriate handlers
-                process_single_command(command, category, confidence)
+            # Run fragments that don't share resources at the same time
+            if planner:
+                planner.run(steps, execute_step)
+            else:
+                for step in steps:
+                    execute_step(step)
                 
             return
         
-        # If it's just a single command, process it normally
-        result = orchestrator.preprocess_command(command_text)
-        command = result.get("command", "")
-        category = result.get("category", "web_search")
-        confidence = result.get("confidence", 0.0)
+        if not steps:
+            return
         
-        logger.info(f"Command category: {category}, confidence: {confidence}")
+        # If it's just a single command, process it normally
+        step = steps[0]
+        logger.info(f"Command category: {step['category']}, confidence: {step['confidence']}")
         
-        # Handle lock computer command directly with high confidence
-        if any(phrase in command.lower() for phrase in ["lock computer", "lock system", "lock pc"]):
-            custom_speak("Locking your computer.")
-            sys_controls.system_power_control(command)
-            return
-            
-        # Only process commands with sufficient confidence
-        if confidence < 0.4:
-            logger.warning(f"Low confidence ({confidence}) for command: {command}")
+        # Only process commands with sufficient confidence (locking is always allowed)
+        if step["confidence"] < 0.4 and step["route"].intent != "lock_computer":
+            logger.warning(f"Low confidence ({step['confidence']}) for command: {step['command']}")
             custom_speak("I'm not sure what you want me to do. Could you please rephrase that?")
             return
             
-        # Process the command with appropriate handlers
-        process_single_command(command, category, confidence)
+        # Process the command with its routed handler
+        process_single_command(step["route"])
             
     except Exception as e:
         logger.error(f"Error processing command: {e}")
         custom_speak("Sorry, I encountered an error while processing your command")
 
-def process_single_command(command, category, confidence):
-    """Process a single command with determined category"""
-    try:
-        # Enhance YouTube command recognition
-        if "youtube" in command.lower():
-            if "search" in command.lower():
-                category = "youtube_search"
-            elif "play" in command.lower():
-                category = "youtube_play"
-        
-        # Handle different command categories
-        if category == "youtube_search":
-            # Only search YouTube without playing
-            search_query = command.lower().replace("search", "").replace("youtube", "").replace("for", "").replace("on", "").strip()
-            custom_speak(f"Searching YouTube for {search_query}")
-            web_search.search_youtube(search_query)
-            
-        elif category == "youtube_play":
-            # Search and play the first video
-            search_query = command.lower().replace("play", "").replace("youtube", "").replace("on", "").strip()
-            custom_speak(f"Playing {search_query} on YouTube")
-            web_search.play_youtube_video(search_query)
-                
-        elif category == "screenshot":
-            custom_speak("Taking a screenshot")
-            sys_controls.take_screenshot()
-            
-        elif category == "system_control":
-            handle_system_command(command)
-            
-        elif category == "media_control":
-            handle_media_command(command)
-            
-        elif category == "system_info":
-            handle_system_info_command(command)
-            
-        elif category == "video_control":
-            # For generic video commands, default to YouTube search without playing
-            if "youtube" in command.lower():
-                search_query = command.lower().replace("video", "").replace("youtube", "").replace("on", "").strip()
-                custom_speak(f"Searching YouTube for {search_query}")
-                web_search.search_youtube(search_query)
-            else:
-                handle_media_command(command)
-            
-        else:  # Default to web search
-            custom_speak(f"Searching the web for {command}")
-            web_search.search_web(command)
+def execute_step(step):
+    """Execute a single fragment of a compound command"""
+    logger.info(f"Processing command: {step['text']} (category: {step['category']}, "
+                f"confidence: {step['confidence']}, intent: {step['route'].intent})")
+    
+    # Only process commands with sufficient confidence (locking is always allowed)
+    if step["confidence"] < 0.4 and step["route"].intent != "lock_computer":
+        logger.warning(f"Low confidence ({step['confidence']}) for command: {step['command']}")
+        custom_speak(f"I'm not sure what you want me to do with '{step['text']}'. Skipping this part.")
+        return
     
+    process_single_command(step["route"])
+
+def process_command(command_text):
+    """Process a voice command"""
+    try:
+        execute_plan(classify_command(command_text))
     except Exception as e:
-        logger.error(f"Error processing single command: {e}")
-        custom_speak("Sorry, I encountered an error processing that part of your command")
+        logger.error(f"Error processing command: {e}")
+        custom_speak("Sorry, I encountered an error while processing your command")
 
-def handle_system_command(command):
+def process_single_command(match):
     """
-    Handle system control commands such as opening applications, adjusting volume, etc.
-
+    Run the handler the router selected for a single command
+    
     Args:
-        command (str): The command to process
-
-    Returns:
-        None
+        match (RouteMatch): Routing decision from router.resolve()
     """
     try:
-        command = command.lower()
-        
-        # Window control commands (minimize, maximize, restore)
-        if any(word in command for word in ["minimize", "maximise", "maximize", "restore"]):
-            result = sys_controls.control_window(command)
-            if not result:
-                custom_speak("I couldn't control the window. Please try again.")
-            return
-            
-        # Volume control commands
-        elif "volume" in command:
-            result = sys_controls.adjust_volume(command)
-            if not result:
-                custom_speak("I couldn't adjust the volume. Please try again.")
-            return
-            
-        # Brightness control commands
-        elif "brightness" in command:
-            result = sys_controls.adjust_brightness(command)
-            if not result:
-                custom_speak("I couldn't adjust the brightness. Please try again.")
-            return
-            
-        # Application launch commands
-        elif any(word in command for word in ["open", "launch", "start", "run"]):
-            result = sys_controls.launch_application(command)
-            if not result:
-                custom_speak("I couldn't launch the application. Please try again.")
-            return
-            
-        # System power commands
-        elif any(word in command for word in ["shutdown", "restart", "reboot", "log off", "sign out", "lock"]):
-            result = sys_controls.system_power_control(command)
-            if not result:
-                custom_speak("I couldn't perform the system power operation. Please try again.")
-            return
-            
-        # If none of the above matched, try the general control_system method
-        result = sys_controls.control_system(command)
-        if not result:
-            custom_speak("I couldn't process your system command. Please try again.")
-            
+        router.dispatch(match)
     except Exception as e:
-        logger.error(f"Error handling system command: {str(e)}")
-        custom_speak("Sorry, I encountered an error while processing the system command.")
+        logger.error(f"Error handling '{match.intent}' command: {e}")
+        custom_speak("Sorry, I encountered an error processing that part of your command")
 
-def handle_system_info_command(command):
+def report_failure(action, message):
     """
-    Handle system information commands such as time, date, battery, etc.
+    Build a route handler that runs an action on the command text and
+    speaks a message when the action reports failure
 
     Args:
-        command (str): The command to process
+        action (callable): action(command) -> truthy on success
+        message (str): Message spoken on failure
 
     Returns:
-        None
+        callable: Route handler
     """
-    try:
-        command = command.lower()
+    def handler(match):
+        result = action(match.text)
+        if not result:
+            custom_speak(message, priority=PRIORITY_HIGH)
+        return result
+    return handler
         
-        # Time and date commands
-        if "time" in command or "date" in command:
-            sys_controls.get_date_time(command)
-            return
+def youtube_search(match):
+    """Search YouTube without playing anything"""
+    query = match.slots["query"]
+    custom_speak(f"Searching YouTube for {query}")
+    return web_search.search_youtube(query)
             
-        # Battery commands
-        elif any(word in command for word in ["battery", "charge", "power"]):
-            # Get battery info and ensure it speaks the result
-            result = sys_controls.get_battery_info()
-            if not result:
-                custom_speak("I couldn't retrieve battery information")
-            return
+def youtube_play(match):
+    """Search YouTube and play the first video"""
+    query = match.slots["query"]
+    custom_speak(f"Playing {query} on YouTube")
+    return web_search.play_youtube_video(query)
             
-        # WiFi commands
-        elif any(word in command for word in ["wifi", "network", "internet", "connection"]):
-            result = sys_controls.get_wifi_info()
-            if not result:
-                custom_speak("I couldn't retrieve WiFi information")
-            return
+def take_screenshot(match):
+    """Take a screenshot"""
+    custom_speak("Taking a screenshot")
+    return sys_controls.take_screenshot(match.command)
             
-        # CPU, memory, disk commands
-        elif any(word in command for word in ["cpu", "processor", "memory", "ram", "disk", "storage", "drive"]):
-            result = sys_controls.get_system_info(command)
-            if not result:
-                custom_speak("I couldn't retrieve system information")
-            return
+def lock_computer(match):
+    """Lock the computer"""
+    custom_speak("Locking your computer.")
+    return sys_controls.system_power_control(match.text)
             
-        # Temperature commands
-        elif any(word in command for word in ["temperature", "temp", "hot"]):
-            result = sys_controls.get_temperature()
-            if not result:
-                custom_speak("I couldn't retrieve temperature information")
-            return
+def media_playback(match):
+    """Play, pause, stop or resume media"""
+    action = match.first_hit(["play", "pause", "stop", "resume"])
+    custom_speak(f"{action.capitalize()}ing media")
+    return media_controls.process_media_command(action)
             
-        # General system info command
-        else:
-            result = sys_controls.get_system_info(command)
-            if not result:
-                custom_speak("I couldn't retrieve system information")
+def media_track(match):
+    """Skip to the next or previous track"""
+    if match.first_hit(["next", "skip"]):
+        custom_speak("Playing next track")
+        return media_controls.process_media_command("next")
+    custom_speak("Playing previous track")
+    return media_controls.process_media_command("previous")
             
-    except Exception as e:
-        logger.error(f"Error handling system info command: {str(e)}")
-        custom_speak("Sorry, I encountered an error while retrieving system information.")
+def media_volume(match):
+    """Change the media volume"""
+    # The direction words are not route keywords, so look for them in the text
+    if match.first_word(["up", "increase", "louder", "raise"]):
+        custom_speak("Increasing volume", key="volume")
+        return media_controls.process_media_command("volume_up")
+    if match.first_word(["down", "decrease", "quieter", "lower"]):
+        custom_speak("Decreasing volume", key="volume")
+        return media_controls.process_media_command("volume_down")
+    if match.first_word(["mute"]):
+        custom_speak("Muting media", key="volume")
+        return media_controls.process_media_command("mute")
+    custom_speak("Should I turn the volume up or down?", priority=PRIORITY_HIGH)
+    return False
 
-def handle_media_command(command):
+def web_search_command(match):
+    """Search the web for the command text"""
+    custom_speak(f"Searching the web for {match.command}")
+    return web_search.search_web(match.command)
+
+def build_router():
     """
-    Handle media control commands such as play, pause, next, previous, etc.
+    Register every voice command handler with the command router
 
-    Args:
-        command (str): The command to process
+    Routes are tried in order: global overrides first, then the routes of
+    the predicted category, then the category defaults (no keywords).
 
     Returns:
-        None
+        CommandRouter: Compiled router
     """
-    try:
-        command = command.lower()
+    router = CommandRouter("voice command")
+    media = ["media_control", "video_control"]
         
-        # Basic media playback controls
-        if any(word in command for word in ["play", "pause", "stop", "resume"]):
-            action = next(word for word in ["play", "pause", "stop", "resume"] if word in command)
-            custom_speak(f"{action.capitalize()}ing media")
-            media_controls.process_media_command(action)
-            return
+    # Global overrides that apply whatever the predicted category is
+    router.register("lock_computer", lock_computer,
+                    keywords=["lock computer", "lock system", "lock pc"],
+                    resources=ALL_RESOURCES)
+    router.register("youtube_search", youtube_search,
+                    keywords=["youtube"], require_all=["search"],
+                    slots={"query": YOUTUBE_SEARCH_QUERY}, required_slots=["query"],
+                    resources=[BROWSER, FOREGROUND_WINDOW])
+    router.register("youtube_play", youtube_play,
+                    keywords=["youtube"], require_all=["play"],
+                    slots={"query": YOUTUBE_PLAY_QUERY}, required_slots=["query"],
+                    resources=[BROWSER, FOREGROUND_WINDOW, AUDIO_OUTPUT])
             
-        # Track navigation
-        elif any(word in command for word in ["next", "previous", "skip"]):
-            if "next" in command or "skip" in command:
-                custom_speak("Playing next track")
-                media_controls.process_media_command("next")
-            else:
-                custom_speak("Playing previous track")
-                media_controls.process_media_command("previous")
-            return
+    # YouTube categories from the classifier
+    router.register("youtube_search", youtube_search, categories=["youtube_search"],
+                    slots={"query": YOUTUBE_SEARCH_QUERY}, required_slots=["query"],
+                    resources=[BROWSER, FOREGROUND_WINDOW])
+    router.register("youtube_play", youtube_play, categories=["youtube_play"],
+                    slots={"query": YOUTUBE_PLAY_QUERY}, required_slots=["query"],
+                    resources=[BROWSER, FOREGROUND_WINDOW, AUDIO_OUTPUT])
+    # Generic video commands about YouTube search without playing
+    router.register("youtube_search", youtube_search, categories=["video_control"],
+                    keywords=["youtube"],
+                    slots={"query": YOUTUBE_VIDEO_QUERY}, required_slots=["query"],
+                    resources=[BROWSER, FOREGROUND_WINDOW])
             
-        # Volume control (this might overlap with system controls)
-        elif any(word in command for word in ["volume", "louder", "quieter"]):
-            if any(word in command for word in ["up", "increase", "louder"]):
-                custom_speak("Increasing volume")
-                media_controls.process_media_command("volume_up")
-            elif any(word in command for word in ["down", "decrease", "quieter"]):
-                custom_speak("Decreasing volume")
-                media_controls.process_media_command("volume_down")
-            elif "mute" in command:
-                custom_speak("Muting media")
-                media_controls.process_media_command("mute")
-            return
+    router.register("screen_recording", report_failure(
+                        sys_controls.screen_recording, "I couldn't record the screen"),
+                    categories=["screenshot"], keywords=RECORDING_KEYWORDS,
+                    resources=[SCREEN])
+    # The handler speaks its own failures ("no duplicates", "no screenshots yet")
+    router.register("screenshot_library", lambda match: sys_controls.screenshot_library(match.command),
+                    categories=["screenshot"], keywords=LIBRARY_KEYWORDS)
+    router.register("screenshot", take_screenshot, categories=["screenshot"],
+                    resources=[SCREEN])
             
-        # If none of the above matched, try the general process_media_command
-        result = media_controls.process_media_command(command)
-        if not result:
-            custom_speak("I couldn't process your media command. Please try again.")
+    # System control
+    router.register("window_control", report_failure(
+                        sys_controls.control_window, "I couldn't control the window. Please try again."),
+                    categories=["system_control"], keywords=["minimize", "maximise", "maximize", "restore"],
+                    resources=[FOREGROUND_WINDOW])
+    router.register("volume", report_failure(
+                        sys_controls.adjust_volume, "I couldn't adjust the volume. Please try again."),
+                    categories=["system_control"], keywords=["volume"],
+                    resources=[AUDIO_OUTPUT])
+    router.register("brightness", report_failure(
+                        sys_controls.adjust_brightness, "I couldn't adjust the brightness. Please try again."),
+                    categories=["system_control"], keywords=["brightness"],
+                    resources=[SCREEN])
+    router.register("launch_application", report_failure(
+                        sys_controls.launch_application, "I couldn't launch the application. Please try again."),
+                    categories=["system_control"], keywords=["open", "launch", "start", "run"],
+                    resources=[FOREGROUND_WINDOW])
+    router.register("system_power", report_failure(
+                        sys_controls.system_power_control,
+                        "I couldn't perform the system power operation. Please try again."),
+                    categories=["system_control"],
+                    keywords=["shutdown", "restart", "reboot", "log off", "sign out", "lock"],
+                    resources=ALL_RESOURCES)
+    router.register("system_control", report_failure(
+                        sys_controls.control_system, "I couldn't process your system command. Please try again."),
+                    categories=["system_control"],
+                    resources=[FOREGROUND_WINDOW])
             
-    except Exception as e:
-        logger.error(f"Error handling media command: {str(e)}")
-        custom_speak("Sorry, I encountered an error while processing the media command.")
+    # System information
+    router.register("date_time", lambda match: sys_controls.get_date_time(match.text),
+                    categories=["system_info"], keywords=["time", "date"])
+    router.register("battery", report_failure(
+                        lambda command: sys_controls.get_battery_info(), "I couldn't retrieve battery information"),
+                    categories=["system_info"], keywords=["battery", "charge", "power"])
+    router.register("wifi", report_failure(
+                        lambda command: sys_controls.get_wifi_info(), "I couldn't retrieve WiFi information"),
+                    categories=["system_info"], keywords=["wifi", "network", "internet", "connection"])
+    router.register("system_info", report_failure(
+                        sys_controls.get_system_info, "I couldn't retrieve system information"),
+                    categories=["system_info"],
+                    keywords=["cpu", "processor", "memory", "ram", "disk", "storage", "drive"])
+    router.register("temperature", report_failure(
+                        lambda command: sys_controls.get_temperature(), "I couldn't retrieve temperature information"),
+                    categories=["system_info"], keywords=["temperature", "temp", "hot"])
+    router.register("system_info", report_failure(
+                        sys_controls.get_system_info, "I couldn't retrieve system information"),
+                    categories=["system_info"])
+            
+    # Media control (generic video commands fall through to these too)
+    router.register("media_playback", media_playback, categories=media,
+                    keywords=["play", "pause", "stop", "resume"],
+                    resources=[AUDIO_OUTPUT, FOREGROUND_WINDOW])
+    router.register("media_track", media_track, categories=media,
+                    keywords=["next", "previous", "skip"],
+                    resources=[AUDIO_OUTPUT, FOREGROUND_WINDOW])
+    router.register("media_volume", media_volume, categories=media,
+                    keywords=["volume", "louder", "quieter"],
+                    resources=[AUDIO_OUTPUT])
+    router.register("media_control", report_failure(
+                        media_controls.process_media_command, "I couldn't process your media command. Please try again."),
+                    categories=media,
+                    resources=[AUDIO_OUTPUT, FOREGROUND_WINDOW])
+            
+    # Default to web search
+    router.register("web_search", web_search_command,
+                    resources=[BROWSER, FOREGROUND_WINDOW])
+
+    router.compile()
+    return router
 
 class KeyboardController:
     """Handles keyboard events and hotkey management"""
     
-    def __init__(self):
+    def __init__(self, speech_recognizer=None):
         """Initialize KeyboardController instance"""
         self.listening = False
-        self.speech_recognizer = SpeechRecognizer()
+        self.released = threading.Event()
+        self.speech_recognizer = speech_recognizer or SpeechRecognizer()
         # Set up P key events
         keyboard.on_press_key('p', self.start_listening)
         keyboard.on_release_key('p', self.stop_listening)
@@ -418,26 +498,42 @@ class KeyboardController:
         """Start listening for voice commands when P is pressed"""
         if not self.listening:
             self.listening = True
+            # Barge-in: a new command cuts off whatever is being said
+            interrupt_speech()
+            self.released = threading.Event()
+            start = self.speech_recognizer.mark()
             print("\n🎤 Listening... (Hold P and speak)")
-            threading.Thread(target=self._listen_thread, daemon=True).start()
+            # The trace for this command starts at the key press
+            trace = tracer.start_trace("voice_command", source="keyboard")
+            threading.Thread(target=self._listen_thread, args=(trace, start, self.released), daemon=True).start()
     
     def stop_listening(self, e):
         """Stop listening for voice commands when P is released"""
         if self.listening:
             self.listening = False
+            # Ends the recording without waiting for a pause
+            self.released.set()
             print("\n🛑 Stopped listening.")
     
-    def _listen_thread(self):
+    def _listen_thread(self, trace=None, start=None, released=None):
         """Background thread for voice recognition"""
         try:
-            # Use a shorter timeout since we're using hold-to-talk
-            recognized_text = self.speech_recognizer.listen(timeout=3)
+            # Hand the command to the pipeline when it is running
+            if pipeline and pipeline.running:
+                if not pipeline.submit(timeout=3, trace=trace, start=start, released=released):
+                    print("\n⏳ Still busy with the previous commands. Please try again.")
+                return
             
-            if recognized_text and len(recognized_text.strip()) > 0:
-                print(f"\n🎯 Recognized: {recognized_text}")
-                process_command(recognized_text)
-            else:
-                print("\n❌ No speech detected. Please try again.")
+            with tracer.activate(trace):
+                # Use a shorter timeout since we're using hold-to-talk
+                recognized_text = self.speech_recognizer.listen(timeout=3, start=start, released=released)
+            
+                if recognized_text and len(recognized_text.strip()) > 0:
+                    print(f"\n🎯 Recognized: {recognized_text}")
+                    process_command(recognized_text)
+                else:
+                    print("\n❌ No speech detected. Please try again.")
+            tracer.finish(trace)
                 
         except Exception as e:
             logger.error(f"Error in listening thread: {e}")
@@ -447,7 +543,25 @@ class KeyboardController:
 
 def main():
     """Main function to run the assistant"""
-    global gui, orchestrator, sys_controls, media_controls, web_search
+    global gui, orchestrator, sys_controls, media_controls, web_search, pipeline, planner, router, capture_engine
+    
+    # Configure per-command tracing before anything starts a trace
+    tracer.configure(
+        enabled=config.get_nested("tracing.enabled", False),
+        path=config.get_nested("tracing.file", "traces/commands.jsonl"),
+        max_bytes=config.get_nested("tracing.max_bytes", 5 * 1024 * 1024),
+        backup_count=config.get_nested("tracing.backup_count", 3)
+    )
+    
+    # Sample system metrics in the background so info queries don't block
+    telemetry = get_telemetry()
+    telemetry_store = None
+    if telemetry is not None:
+        # Keep a downsampled history on disk for questions about the past
+        telemetry_store = get_telemetry_store()
+        if telemetry_store is not None:
+            telemetry.add_listener(telemetry_store.record)
+        telemetry.start()
     
     # Initialize GUI
     gui = create_gui()
@@ -457,25 +571,67 @@ def main():
     sys_controls = SystemControls()
     media_controls = MediaControls()
     web_search = WebSearch()
+    router = build_router()
+    planner = ExecutionPlanner(
+        lambda step: step["route"].resources,
+        max_workers=config.get_nested("execution.max_workers", 4)
+    )
     
     # Check environment
     if not check_environment():
         custom_speak("Environment check failed. Please check the logs.")
         sys.exit(1)
     
+    # Keep the microphone open so recording starts the moment P is pressed
+    if config.get_nested("audio_capture.enabled", True):
+        capture_engine = create_capture_engine()
+        if not capture_engine.start():
+            logger.warning("Audio capture engine unavailable; opening the microphone per command")
+            capture_engine = None
+    
     # Initialize speech recognizer
-    recognizer = SpeechRecognizer()
+    recognizer = SpeechRecognizer(capture_engine=capture_engine)
+    
+    # Start the command pipeline: capture -> asr -> classify -> execute -> speech
+    pipeline = CommandPipeline(
+        capture=lambda timeout, **listen: recognizer.capture(timeout=timeout or 5, **listen),
+        recognize=lambda audio: recognizer.recognize_nbest(audio, config.get_nested("asr.nbest", 5)),
+        classify=classify_command,
+        execute=execute_plan,
+        queue_size=config.get_nested("pipeline.queue_size", 2)
+    )
+    pipeline.start()
+    
+    # Hands-free mode: saying the wake word starts a command like pressing P
+    wake_listener = None
+    if config.get_nested("wake_word.enabled", False) and capture_engine is not None:
+        def wake_callback(start):
+            """Start a command from the audio right after the wake word"""
+            trace = tracer.start_trace("voice_command", source="wake_word")
+            interrupt_speech()
+            if not pipeline.submit(trace=trace, start=start):
+                custom_speak("I'm still working on your previous commands.")
+        
+        wake_listener = create_wake_word_listener(capture_engine, wake_callback)
+        if wake_listener is not None:
+            wake_listener.start()
     
     # Introduce the AI
     print("Hello! I'm Zenith, your AI assistant. I can help you with various tasks like checking the weather, playing music, and more. Just ask!")
     speak("Hello! I'm Zenith, your AI assistant. I can help you with various tasks like checking the weather, playing music, and more. Just ask!")
     
+    # Set when P is released, so hold-to-talk recording ends right away
+    key_released = threading.Event()
+    
     def listen_callback():
         """Callback for the Listen button"""
+        nonlocal key_released
         try:
-            command = recognizer.listen()
-            if command:
-                process_command(command)
+            # Barge-in: a new command cuts off whatever is being said
+            interrupt_speech()
+            key_released = threading.Event()
+            if not pipeline.submit(start=recognizer.mark(), released=key_released):
+                custom_speak("I'm still working on your previous commands.")
         except Exception as e:
             logger.error(f"Error in listen callback: {e}")
             custom_speak("Sorry, I encountered an error while processing your command.")
@@ -483,7 +639,7 @@ def main():
     def stop_callback(silent=False):
         """Callback for the Stop button"""
         try:
-            # Add any cleanup code here
+            key_released.set()
             if not silent:
                 custom_speak("Stopping current operation")
         except Exception as e:
@@ -496,8 +652,25 @@ def main():
     # Welcome message
     custom_speak("AI Desktop Assistant is ready!")
     
+    # Render fixed responses in the background once the greeting is spoken
+    warm_phrase_cache()
+    
     # Start GUI main loop
     gui.root.mainloop()
 
+    # Let queued commands finish before exiting
+    if wake_listener is not None:
+        wake_listener.stop()
+    pipeline.stop()
+    get_tts_worker().stop()
+    if capture_engine is not None:
+        capture_engine.stop()
+    if telemetry is not None:
+        telemetry.stop()
+        logger.info(f"Telemetry: {telemetry.stats()}")
+    if telemetry_store is not None:
+        telemetry_store.close()
+    logger.info(f"Command handler metrics: {router.metrics()}")
+
 if __name__ == "__main__":
     main()
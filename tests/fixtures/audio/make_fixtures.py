@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Generate the WAV fixtures used by the speech front end tests
+
+The fixtures are synthetic so they can be regenerated exactly: "speech" is
+a harmonic tone with a syllable-rate envelope, fricatives are high-passed
+noise and the background is low-level room noise. All files are 16 kHz,
+16-bit mono. Run from the repository root:
+    
+    python tests/fixtures/audio/make_fixtures.py
+"""
+import os
+import wave
+
+import numpy as np
+
+RATE = 16000
+HERE = os.path.dirname(os.path.abspath(__file__))
+rng = np.random.default_rng(1234)
+
+def room(seconds, level=60):
+    return rng.normal(0, level, int(RATE * seconds))
+
+def voiced(seconds, level=3000, pitch=140):
+    t = np.arange(int(RATE * seconds)) / RATE
+    tone = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    # Roughly four syllables per second
+    envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 2 * t))
+    return level * envelope * tone / 2 + room(seconds)
+
+def fricative(seconds, level=125):
+    hiss = rng.normal(0, 1, int(RATE * seconds))
+    hiss = np.diff(hiss, prepend=0)  # High-pass: mostly energy above 4 kHz
+    return level * hiss / hiss.std()
+
+def wake_word(speed=1.0, level=3000):
+    """Stand-in for "Zenith": a high syllable, a hiss, then a falling low syllable"""
+    def glide(seconds, start, end):
+        t = np.arange(int(RATE * seconds / speed)) / RATE
+        pitch = np.linspace(start, end, len(t))
+        phase = 2 * np.pi * np.cumsum(pitch) / RATE
+        tone = sum(np.sin(phase * k) / k for k in range(1, 6))
+        return level * np.hanning(len(t)) ** 0.3 * tone / 2 + room(seconds / speed)
+    return np.concatenate([glide(0.22, 230, 210), fricative(0.08 / speed, level=900), glide(0.3, 170, 110)])
+
+def write(name, *parts):
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    path = os.path.join(HERE, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.tobytes())
+
+if __name__ == "__main__":
+    # "check battery": speech between leading and trailing room noise
+    write("check_battery.wav", room(0.5), voiced(0.9), room(1.5))
+    # "show system info": starts with a quiet fricative before the voiced part
+    write("show_system_info.wav", room(0.4), fricative(0.15), voiced(0.8), room(1.0))
+    # "open chrome": two words separated by a short gap that must not end the utterance
+    write("open_chrome.wav", room(0.3), voiced(0.4), room(0.2), voiced(0.4), room(1.2))
+    # Nothing said
+    write("silence.wav", room(2.0))
+
+    # Wake word: enrollment templates at slightly different speeds
+    write("wake_word/templates/zenith_1.wav", room(0.2), wake_word(0.95), room(0.2))
+    write("wake_word/templates/zenith_2.wav", room(0.2), wake_word(1.05), room(0.2))
+    # The wake word on its own, and followed by a command after a short pause
+    write("wake_word/zenith.wav", room(0.6), wake_word(1.0), room(1.0))
+    write("wake_word/zenith_check_battery.wav", room(0.5), wake_word(1.02), room(0.25), voiced(0.9), room(1.0))
+    # Speech that must not wake the assistant
+    write("wake_word/open_chrome.wav", room(0.3), voiced(0.4), room(0.2), voiced(0.4), room(1.0))
+    write("wake_word/show_system_info.wav", room(0.4), fricative(0.15), voiced(0.8), room(1.0))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Tests for the persistent application index
+"""
+import os
+import time
+
+from assistant.modules.app_index import AppIndex, edit_distance, launch_command, normalize_name
+
+def make_tree(root):
+    """A PATH directory and an applications directory with .desktop files"""
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    for name in ("google-chrome", "firefox", "code", "gnome-calculator"):
+        path = bin_dir / name
+        path.write_text("#!/bin/sh\n")
+        path.chmod(0o755)
+    (bin_dir / "README").write_text("not executable")
+    
+    apps = root / "applications"
+    (apps / "vendor").mkdir(parents=True)
+    (apps / "code.desktop").write_text(
+        "[Desktop Entry]\nType=Application\nName=Visual Studio Code\nExec=/usr/share/code/code --unity-launch %F\n")
+    (apps / "hidden.desktop").write_text("[Desktop Entry]\nName=Hidden Tool\nExec=hidden\nNoDisplay=true\n")
+    (apps / "vendor" / "spotify.desktop").write_text("[Desktop Entry]\nName=Spotify\nExec=spotify %U\n")
+    return [(str(bin_dir), "path", 0), (str(apps), "desktop", 1)]
+
+def test_names_are_normalized():
+    assert normalize_name("Google-Chrome.exe") == "google chrome"
+    assert normalize_name("  Visual Studio Code ") == "visual studio code"
+
+def test_resolves_exact_prefix_and_misheard_names(tmp_path):
+    index = AppIndex(str(tmp_path / "index.json"), sources=make_tree(tmp_path), aliases={"browser": "firefox"})
+    index.refresh()
+    
+    assert index.resolve("Firefox")[1].endswith("bin/firefox")
+    assert index.resolve("visual studio") == ("visual studio code", "/usr/share/code/code --unity-launch")
+    assert index.resolve("spotify")[1] == "spotify"
+    assert index.resolve("chrome")[0] == "google chrome"
+    assert index.resolve("calculater")[0] == "gnome calculator"
+    assert index.resolve("firefxo")[0] == "firefox"
+    assert index.resolve("browser")[1].endswith("bin/firefox")
+    assert index.resolve("hidden tool") is None
+    assert index.resolve("readme") is None
+    assert index.resolve("photoshop") is None
+
+def test_lookup_is_fast(tmp_path):
+    index = AppIndex(str(tmp_path / "index.json"), sources=make_tree(tmp_path))
+    index.refresh()
+    started = time.perf_counter()
+    for name in ("crome", "firefox", "visual studio", "no such app"):
+        index._resolved.clear()
+        index.resolve(name)
+    assert (time.perf_counter() - started) / 4 < 0.001
+
+def test_refresh_lists_only_changed_directories(tmp_path):
+    sources = make_tree(tmp_path)
+    index_file = str(tmp_path / "index.json")
+    index = AppIndex(index_file, sources=sources)
+    assert index.refresh() == 3
+    index.save()
+    
+    # A new process loads the saved index and lists nothing unchanged
+    reloaded = AppIndex(index_file, sources=sources)
+    assert reloaded.load() and reloaded.resolve("spotify")
+    assert reloaded.refresh() == 0
+    
+    new_app = tmp_path / "applications" / "vendor" / "gimp.desktop"
+    new_app.write_text("[Desktop Entry]\nName=GIMP\nExec=gimp %U\n")
+    later = time.time() + 5
+    os.utime(new_app.parent, (later, later))
+    assert reloaded.refresh() == 1
+    assert reloaded.resolve("gimp")[1] == "gimp"
+
+def test_helpers():
+    assert edit_distance("pyhton", "python") == 1
+    assert edit_distance("chrome", "crome") == 1
+    assert launch_command("spotify --minimized") == ["spotify", "--minimized"]
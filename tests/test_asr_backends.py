@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Tests for the pluggable speech recognition backends
+"""
+import os
+import sys
+
+import speech_recognition as sr
+
+from assistant.modules.asr_backends import GoogleBackend, StubBackend, VoskBackend, create_backend
+from assistant.modules.config_handler import config
+from assistant.modules.speech_recognition_engine import SpeechRecognizer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "audio", "check_battery.wav")
+
+def load_fixture():
+    with sr.AudioFile(FIXTURE) as source:
+        return sr.Recognizer().record(source)
+
+def test_speech_recognizer_uses_the_given_backend():
+    """Recognition goes through the backend instead of the Google API"""
+    backend = StubBackend(text="check battery")
+    recognizer = SpeechRecognizer(backend=backend)
+    assert recognizer.recognize(load_fixture()) == "check battery"
+    assert abs(backend.calls[0] - 2.9) < 0.01
+
+def test_empty_transcript_is_no_speech():
+    """A backend that understood nothing gives None"""
+    recognizer = SpeechRecognizer(backend=StubBackend(text=""))
+    assert recognizer.recognize(load_fixture()) is None
+
+def test_stub_streams_partial_results():
+    """Partial transcripts grow word by word and end with a final result"""
+    results = list(StubBackend(text="open the browser").stream([b"\0\0" * 160] * 3))
+    assert results == [("open", False), ("open the", False), ("open the browser", True)]
+
+def test_backend_is_selected_in_config(monkeypatch):
+    """asr.backend picks the backend"""
+    monkeypatch.setitem(config.config, "asr", {"backend": "stub", "stub": {"text": "hello"}})
+    backend = create_backend()
+    assert isinstance(backend, StubBackend) and backend.text == "hello"
+
+def test_unavailable_backend_falls_back(monkeypatch):
+    """A local model that cannot be loaded falls back to asr.fallback"""
+    monkeypatch.setitem(config.config, "asr", {"backend": "vosk", "fallback": "google"})
+    monkeypatch.setattr(VoskBackend, "load", lambda self: False)
+    assert isinstance(create_backend(), GoogleBackend)
+
+def test_vosk_model_is_loaded_once(monkeypatch):
+    """Backends sharing a model path share the resident model"""
+    loaded = []
+    
+    class FakeVosk:
+        @staticmethod
+        def SetLogLevel(level):
+            pass
+        
+        @staticmethod
+        def Model(path):
+            loaded.append(path)
+            return object()
+    
+    monkeypatch.setitem(sys.modules, "vosk", FakeVosk)
+    monkeypatch.setattr(VoskBackend, "_models", {})
+    first, second = VoskBackend("models/test"), VoskBackend("models/test")
+    assert first.load() and second.load()
+    assert first.model is second.model
+    assert loaded == ["models/test"]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Tests for the always-open audio capture engine
+"""
+import time
+
+import numpy as np
+
+from assistant.modules.audio_capture import AudioCaptureEngine, RingBuffer
+from assistant.modules.endpointing import Endpointer
+
+RATE = 16000
+FRAME = RATE // 50  # 20 ms
+
+def tone(seconds, amplitude):
+    """A 440 Hz tone"""
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+def noise(seconds, amplitude, seed=0):
+    """Quiet background noise"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, int(RATE * seconds)).astype(np.int16)
+
+def feed(engine, samples):
+    """Feed samples to the engine one frame at a time"""
+    for i in range(0, len(samples), FRAME):
+        engine.feed(samples[i:i + FRAME])
+
+class FakeSource:
+    """Frame source producing quiet noise in real time"""
+    
+    def __init__(self):
+        self.opened = False
+        self.closed = False
+    
+    def open(self):
+        self.opened = True
+    
+    def read(self):
+        time.sleep(0.005)
+        return noise(FRAME / RATE, 50).tobytes()
+    
+    def close(self):
+        self.closed = True
+
+def test_windows_across_the_wrap_are_zero_copy():
+    """A window that wraps around the end of the ring is still one view"""
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype=np.int16))
+    ring.write(np.arange(8, 14, dtype=np.int16))
+    
+    window = ring.window(6, 14)
+    assert window.tolist() == list(range(6, 14))
+    assert np.shares_memory(window, ring._data)
+    # Overwritten samples are clamped to the oldest one still kept
+    assert ring.window(0).tolist() == list(range(4, 14))
+
+def test_noise_floor_follows_background_level():
+    """The speech threshold rises with the background noise"""
+    quiet = AudioCaptureEngine(endpointer=Endpointer(min_energy=10))
+    feed(quiet, noise(2, 50))
+    loud = AudioCaptureEngine(endpointer=Endpointer(min_energy=10))
+    feed(loud, noise(2, 500))
+    assert 30 < quiet.noise_floor < 70
+    assert loud.speech_threshold() > quiet.speech_threshold() * 5
+
+def test_recording_keeps_speech_from_before_the_key_press():
+    """Words started just before P was pressed are not cut off"""
+    engine = AudioCaptureEngine(pre_roll_ms=300, endpointer=Endpointer(pause_ms=400, padding_ms=100))
+    feed(engine, noise(1, 50))
+    feed(engine, tone(0.2, 3000))
+    start = engine.mark()
+    feed(engine, tone(0.4, 3000))
+    feed(engine, noise(1, 50, seed=1))
+    
+    audio = engine.record(start=start, timeout=3)
+    assert audio is not None
+    assert np.shares_memory(audio, engine.buffer._data)
+    # 100 ms padding + 200 ms before the press + 400 ms after it + 100 ms padding
+    assert abs(len(audio) / RATE - 0.8) <= 0.05
+
+def test_silence_returns_nothing():
+    """No speech within the timeout gives no audio"""
+    engine = AudioCaptureEngine()
+    feed(engine, noise(1, 50))
+    start = engine.mark()
+    feed(engine, noise(2, 50, seed=2))
+    assert engine.record(start=start, timeout=1) is None
+
+def test_stream_runs_in_background():
+    """The engine keeps reading from its source until stopped"""
+    engine = AudioCaptureEngine()
+    source = FakeSource()
+    assert engine.start(source=source)
+    try:
+        deadline = time.time() + 2
+        while engine.buffer.total < FRAME * 5 and time.time() < deadline:
+            time.sleep(0.01)
+        assert engine.buffer.total >= FRAME * 5
+    finally:
+        engine.stop()
+    assert source.opened and source.closed
+    assert not engine.running
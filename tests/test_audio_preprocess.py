@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Tests for shrinking audio before cloud recognition
+"""
+import os
+
+import numpy as np
+import speech_recognition as sr
+
+from assistant.modules.asr_backends import GoogleBackend
+from assistant.modules.audio_preprocess import AudioPreprocessor, PreparedAudio, downmix, resample
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "audio", "check_battery.wav")
+
+def microphone_audio(rate=48000, silence=1.0):
+    """The fixture as sr.Microphone would record it: 48 kHz with silence padding"""
+    with sr.AudioFile(FIXTURE) as source:
+        audio = sr.Recognizer().record(source)
+    speech = resample(np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16), audio.sample_rate, rate)
+    noise = np.random.default_rng(0).normal(0, 20, int(rate * silence)).astype(np.int16)
+    samples = np.concatenate([noise, speech, noise])
+    return sr.AudioData(samples.tobytes(), rate, 2), len(speech) / rate
+
+def test_audio_is_trimmed_and_resampled():
+    audio, speech_seconds = microphone_audio()
+    prepared = AudioPreprocessor().process(audio)
+    assert prepared.sample_rate == 16000 and prepared.sample_width == 2
+    duration = len(prepared.get_raw_data()) / 2 / 16000
+    assert duration < speech_seconds + 0.5
+    assert prepared.input_bytes == len(audio.get_raw_data())
+
+def test_upload_is_a_fraction_of_the_recording():
+    """The FLAC upload is much smaller than the recording uploaded as is"""
+    audio, _ = microphone_audio()
+    prepared = AudioPreprocessor().process(audio)
+    assert len(prepared.get_flac_data()) < 0.4 * len(audio.get_flac_data())
+
+def test_flac_is_encoded_once():
+    audio, _ = microphone_audio()
+    prepared = AudioPreprocessor().process(audio)
+    assert prepared.get_flac_data() is prepared.get_flac_data(convert_rate=None, convert_width=2)
+
+def test_downsampling_does_not_alias():
+    """A tone above the new Nyquist frequency is filtered out"""
+    t = np.arange(48000) / 48000
+    tone = (10000 * np.sin(2 * np.pi * 20000 * t)).astype(np.int16)
+    resampled = resample(tone, 48000, 16000)
+    assert len(resampled) == 16000
+    assert np.sqrt(np.mean(resampled.astype(float) ** 2)) < 0.05 * 10000
+
+def test_stereo_is_downmixed():
+    stereo = np.array([100, 300, -200, 200, 50, 50], dtype=np.int16)
+    assert downmix(stereo, 2).tolist() == [200, 0, 50]
+    prepared = AudioPreprocessor(trim=False).process_samples(stereo, 16000, channels=2)
+    assert prepared.tolist() == [200, 0, 50]
+
+def test_google_backend_uploads_prepared_audio(monkeypatch):
+    """The backend uploads the small audio and records what it saved"""
+    uploaded = []
+    backend = GoogleBackend(preprocessor=AudioPreprocessor())
+    monkeypatch.setattr(backend.recognizer, "recognize_google",
+                        lambda audio, **kwargs: uploaded.append(audio) or "check battery")
+    audio, _ = microphone_audio()
+    assert backend.recognize(audio) == "check battery"
+    assert isinstance(uploaded[0], PreparedAudio) and uploaded[0].sample_rate == 16000
+    stats = backend.last_upload
+    assert stats["upload_bytes"] == len(uploaded[0].get_flac_data())
+    assert stats["bytes_saved"] == stats["input_bytes"] - stats["upload_bytes"] > 0
+    assert stats["upload_ms"] is not None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Tests for sentence-streamed Google TTS against a local stand-in server
+"""
+import io
+import time
+import wave
+from concurrent import futures
+
+import grpc
+import pytest
+from google.cloud import texttospeech
+
+from assistant.modules.cloud_tts import CloudSpeaker, get_client, split_sentences
+
+SYNTHESIS_TIME = 0.2
+
+def wav(text, sample_rate):
+    """A WAV clip carrying the text as its samples"""
+    data = text.encode("utf-8")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(data + b"\0" * (len(data) % 2))
+    return buffer.getvalue()
+
+def clip_text(clip):
+    with wave.open(io.BytesIO(clip), "rb") as f:
+        return f.readframes(f.getnframes()).rstrip(b"\0").decode("utf-8")
+
+class StandInServer:
+    """Answers SynthesizeSpeech like the Google API, slowly"""
+    
+    def __init__(self):
+        self.requests = []
+        handler = grpc.method_handlers_generic_handler("google.cloud.texttospeech.v1.TextToSpeech", {
+            "SynthesizeSpeech": grpc.unary_unary_rpc_method_handler(
+                self.synthesize,
+                request_deserializer=texttospeech.SynthesizeSpeechRequest.deserialize,
+                response_serializer=texttospeech.SynthesizeSpeechResponse.serialize
+            )
+        })
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+        self.server.add_generic_rpc_handlers((handler,))
+        self.port = self.server.add_insecure_port("127.0.0.1:0")
+    
+    def synthesize(self, request, context):
+        self.requests.append(request)
+        if "fail" in request.input.text:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "cannot synthesize")
+        time.sleep(SYNTHESIS_TIME)
+        audio = wav(request.input.text, request.audio_config.sample_rate_hertz)
+        return texttospeech.SynthesizeSpeechResponse(audio_content=audio)
+
+class FakePlayer:
+    """Records the text of each clip it plays"""
+    
+    def __init__(self, on_play=None):
+        self.played = []
+        self.on_play = on_play
+    
+    def play(self, source):
+        self.played.append(clip_text(source))
+        if self.on_play:
+            self.on_play()
+        return True
+    
+    def stop(self):
+        pass
+    
+    def close(self):
+        pass
+
+class FakeFallback:
+    """Local speaker used when the cloud fails"""
+    
+    def __init__(self):
+        self.spoken = []
+    
+    def open(self):
+        pass
+    
+    def speak(self, text):
+        self.spoken.append(text)
+    
+    def stop(self):
+        pass
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    stand_in.server.start()
+    yield stand_in
+    stand_in.server.stop(0)
+
+def open_speaker(server, player, **kwargs):
+    speaker = CloudSpeaker(player, endpoint=f"127.0.0.1:{server.port}", **kwargs)
+    speaker.open()
+    return speaker
+
+RESPONSE = "Your battery is at 80 percent. It is charging right now. About forty minutes are left until it is full."
+
+def test_split_sentences_joins_short_fragments():
+    """One-word sentences are sent with the next one"""
+    assert split_sentences("Okay. Opening Chrome for you now. Done!") == ["Okay. Opening Chrome for you now.", "Done!"]
+    assert split_sentences(RESPONSE) == [
+        "Your battery is at 80 percent.",
+        "It is charging right now.",
+        "About forty minutes are left until it is full."
+    ]
+
+def test_client_is_shared(server):
+    """Every speaker for an endpoint uses the same client and channel"""
+    endpoint = f"127.0.0.1:{server.port}"
+    assert get_client(endpoint) is get_client(endpoint)
+
+def test_first_audio_waits_for_first_sentence_only(server):
+    """Sentences are synthesized concurrently and played in order from memory"""
+    player = FakePlayer()
+    speaker = open_speaker(server, player)
+    start = time.perf_counter()
+    speaker.speak(RESPONSE)
+    elapsed = time.perf_counter() - start
+    speaker.close()
+    
+    assert player.played == split_sentences(RESPONSE)
+    assert speaker.first_audio_time < 2 * SYNTHESIS_TIME
+    assert elapsed < 3 * SYNTHESIS_TIME
+    assert server.requests[0].audio_config.audio_encoding == texttospeech.AudioEncoding.LINEAR16
+
+def test_stop_cuts_off_remaining_sentences(server):
+    """Barge-in after the first sentence skips the rest"""
+    speaker = None
+    player = FakePlayer(on_play=lambda: speaker.stop())
+    speaker = open_speaker(server, player)
+    speaker.speak(RESPONSE)
+    speaker.close()
+    assert player.played == ["Your battery is at 80 percent."]
+
+def test_failed_synthesis_falls_back_to_local_speech(server):
+    """Sentences the cloud cannot synthesize are spoken locally"""
+    player, fallback = FakePlayer(), FakeFallback()
+    speaker = open_speaker(server, player, fallback=fallback)
+    speaker.speak("This sentence is fine to say. This one will fail though.")
+    speaker.close()
+    assert player.played == ["This sentence is fine to say."]
+    assert fallback.spoken == ["This one will fail though."]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Tests for the table-driven command router
+"""
+import pytest
+
+from assistant.modules.command_router import CommandRouter
+
+def make_router(calls):
+    """Build a small router whose handlers record the intent they served"""
+    def handler(intent):
+        def run(match):
+            calls.append((intent, match.slots))
+            return True
+        return run
+    
+    router = CommandRouter()
+    router.register("lock", handler("lock"), keywords=["lock computer"], resources=["screen"])
+    router.register("youtube_search", handler("youtube_search"),
+                    keywords=["youtube"], require_all=["search"],
+                    slots={"query": r"search(?:\s+youtube)?(?:\s+for)?\s+(?P<query>.+)$"},
+                    required_slots=["query"])
+    router.register("temperature", handler("temperature"), categories=["system_info"], keywords=["temp"])
+    router.register("launch", handler("launch"), categories=["system_control"], keywords=["start", "open"])
+    router.register("power", handler("power"), categories=["system_control"], keywords=["restart"])
+    router.register("system_info", handler("system_info"), categories=["system_info"])
+    router.register("web_search", handler("web_search"))
+    router.compile()
+    return router
+
+def test_routes_by_category_then_default():
+    """Category routes are tried in order before the category default"""
+    router = make_router([])
+    assert router.resolve("what's the CPU temperature", "system_info").intent == "temperature"
+    assert router.resolve("how much memory", "system_info").intent == "system_info"
+    assert router.resolve("open chrome", "system_control").intent == "launch"
+    assert router.resolve("who won the match", "unknown_category").intent == "web_search"
+
+def test_keywords_match_at_word_start():
+    """'restart' is a power command, not a launch command containing 'start'"""
+    router = make_router([])
+    assert router.resolve("restart the computer", "system_control").intent == "power"
+
+def test_global_routes_override_category_and_extract_slots():
+    """Global routes win, and a route whose required slot is missing is skipped"""
+    calls = []
+    router = make_router(calls)
+    router.route("search youtube for lofi beats", "web_search")
+    assert calls == [("youtube_search", {"query": "lofi beats"})]
+    assert router.resolve("youtube search", "web_search").intent == "web_search"
+    assert router.resolve("lock computer now", "system_info").resources == frozenset(["screen"])
+
+def test_metrics_count_calls_errors_and_latency():
+    """Every intent tracks calls, errors and a latency histogram"""
+    router = CommandRouter()
+    router.register("ok", lambda match: True, keywords=["fine"])
+    router.register("fails", lambda match: False, keywords=["fail"])
+    router.register("boom", lambda match: 1 / 0, keywords=["boom"])
+    
+    router.route("fine")
+    router.route("fine")
+    router.route("fail")
+    with pytest.raises(ZeroDivisionError):
+        router.route("boom")
+    
+    metrics = router.metrics()
+    assert metrics["ok"]["calls"] == 2 and metrics["ok"]["errors"] == 0
+    assert metrics["fails"]["errors"] == 1
+    assert metrics["boom"]["errors"] == 1
+    assert sum(metrics["ok"]["histogram"].values()) == 2
+    assert router.route("nothing matches") is False
+
+@pytest.mark.parametrize("command, direction", [
+    ("volume up", "up"),
+    ("increase the volume", "increase"),
+    ("turn the volume down", "down"),
+    ("decrease volume", "decrease"),
+    ("make it louder", "louder"),
+    ("a bit quieter", "quieter"),
+    ("mute volume", "mute"),
+])
+def test_handlers_find_words_that_are_not_keywords(command, direction):
+    """The media volume route keys on "volume", its handler on the direction words"""
+    router = CommandRouter()
+    router.register("media_volume", lambda match: True, categories=["media_control"],
+                    keywords=["volume", "louder", "quieter"])
+    router.register("media_control", lambda match: True, categories=["media_control"])
+    router.compile()
+    match = router.resolve(command, "media_control")
+    assert match.intent == "media_volume"
+    words = ["up", "increase", "louder", "down", "decrease", "quieter", "mute"]
+    assert match.first_word(words) == direction
+    assert match.first_word(["own"]) is None  # Whole words only
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Tests for concurrent, timeout-bounded disk usage collection
+"""
+import threading
+import time
+from collections import namedtuple
+
+from assistant.modules.disk_usage import DiskUsageCollector
+
+Partition = namedtuple("Partition", "device mountpoint fstype opts")
+Usage = namedtuple("Usage", "total used free percent")
+
+class FakeMounts:
+    """Mounts whose usage calls can be made slow or stuck"""
+    
+    def __init__(self, count=3, delay=0.0):
+        self.partitions = [Partition(f"/dev/sd{chr(97 + i)}", f"/mnt/{i}", "ext4", "rw") for i in range(count)]
+        self.partitions.append(Partition("tmpfs", "/run/empty", "", "rw"))
+        self.delay = delay
+        self.stuck = set()
+        self.release = threading.Event()
+        self.calls = []
+    
+    def list(self):
+        return self.partitions
+    
+    def usage(self, mountpoint):
+        self.calls.append(mountpoint)
+        if mountpoint in self.stuck:
+            self.release.wait()
+        time.sleep(self.delay)
+        return Usage(100, 40, 60, 40.0)
+
+def collector(mounts, **kwargs):
+    return DiskUsageCollector(partitions=mounts.list, usage=mounts.usage, **kwargs)
+
+def test_mounts_are_measured_concurrently():
+    mounts = FakeMounts(count=4, delay=0.2)
+    disks = collector(mounts, workers=4)
+    started = time.monotonic()
+    results = disks.collect()
+    assert time.monotonic() - started < 0.5
+    assert [r.mountpoint for r in results] == ["/mnt/0", "/mnt/1", "/mnt/2", "/mnt/3"]
+    assert all(r.reachable and r.percent == 40.0 for r in results)
+    
+    # Fresh readings are reused
+    disks.collect()
+    assert len(mounts.calls) == 4
+
+def test_stuck_mount_is_marked_and_skipped():
+    mounts = FakeMounts()
+    mounts.stuck.add("/mnt/1")
+    disks = collector(mounts, workers=2, timeout=0.2, deadline=1.0)
+    try:
+        started = time.monotonic()
+        results = disks.collect()
+        assert time.monotonic() - started < 0.5
+        assert [r.reachable for r in results] == [True, False, True]
+        assert disks.stats()["unreachable"] == ["/mnt/1"]
+        
+        # Skipped later without another call, and the pool still has free workers
+        disks.ttl = 0
+        started = time.monotonic()
+        results = disks.collect()
+        assert time.monotonic() - started < 0.2
+        assert mounts.calls.count("/mnt/1") == 1 and not results[1].reachable
+        assert disks.stats()["workers"] == 3
+    finally:
+        mounts.release.set()
+
+def test_deadline_holds_for_many_mounts():
+    mounts = FakeMounts(count=40, delay=0.1)
+    disks = collector(mounts, workers=4, timeout=5.0, deadline=0.3)
+    started = time.monotonic()
+    results = disks.collect()
+    assert time.monotonic() - started < 0.5
+    assert len(results) == 40
+    # Slow but healthy mounts are not marked unreachable for missing the deadline
+    time.sleep(1.2)
+    assert all(r.reachable for r in disks.collect())
+    assert disks.stats()["unreachable"] == []
+
+def test_failing_mount_is_retried_later():
+    mounts = FakeMounts(count=1)
+    state = {"fail": True}
+    
+    def usage(mountpoint):
+        if state["fail"]:
+            raise PermissionError("denied")
+        return Usage(100, 10, 90, 10.0)
+    
+    disks = DiskUsageCollector(partitions=mounts.list, usage=usage, retry_after=0.1)
+    assert not disks.collect()[0].reachable
+    state["fail"] = False
+    time.sleep(0.15)
+    assert disks.collect()[0].percent == 10.0
+
+def test_concurrent_collections_share_one_call_per_mount():
+    mounts = FakeMounts(count=2)
+    mounts.stuck.add("/mnt/0")
+    disks = collector(mounts, workers=4, timeout=0.3, deadline=0.5)
+    submit = disks.pool.submit
+    
+    def slow_submit(function):
+        time.sleep(0.05)  # Widen the window between claiming a mount and submitting
+        return submit(function)
+    
+    disks.pool.submit = slow_submit
+    threads = [threading.Thread(target=disks.collect) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    try:
+        assert mounts.calls.count("/mnt/0") == 1
+        assert disks.pool.abandoned == 1
+    finally:
+        mounts.release.set()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Tests for voice activity endpointing against WAV fixtures
+"""
+import os
+import threading
+import wave
+
+import numpy as np
+
+from assistant.modules.audio_capture import AudioCaptureEngine
+from assistant.modules.endpointing import Endpointer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "audio")
+RATE = 16000
+FRAME = RATE // 50
+
+def load(name):
+    """Read a 16 kHz mono fixture"""
+    with wave.open(os.path.join(FIXTURES, name), "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+def seconds(samples):
+    return len(samples) / RATE
+
+def feed(engine, samples):
+    for i in range(0, len(samples), FRAME):
+        engine.feed(samples[i:i + FRAME])
+
+def test_trim_removes_leading_and_trailing_silence():
+    """Only the speech and its padding are kept"""
+    audio = load("check_battery.wav")  # 0.5 s noise, 0.9 s speech, 1.5 s noise
+    trimmed = Endpointer(padding_ms=100).trim(audio)
+    assert abs(seconds(trimmed) - 1.1) <= 0.04
+    assert np.shares_memory(trimmed, audio)
+
+def test_quiet_fricatives_count_as_speech():
+    """A soft 's' is found by its zero-crossing rate, not its energy"""
+    audio = load("show_system_info.wav")  # speech starts with a fricative at 0.4 s
+    endpointer = Endpointer(padding_ms=0)
+    energy, zcr = endpointer.features(audio)
+    onset = int(0.4 * 50) + 1
+    assert energy[onset] < endpointer.threshold(endpointer.estimate_noise_floor(energy))
+    assert zcr[onset] > endpointer.zcr_threshold
+    
+    first = np.flatnonzero(endpointer.speech_frames(audio))[0]
+    assert abs(first * FRAME / RATE - 0.4) <= 0.04
+
+def test_silence_has_no_speech():
+    """Room noise alone is never classified as speech"""
+    assert not Endpointer().speech_frames(load("silence.wav")).any()
+
+def test_short_gap_between_words_does_not_end_the_utterance():
+    """The pause between two words is shorter than pause_ms"""
+    audio = load("open_chrome.wav")  # 0.3 s noise, 0.4 s word, 0.2 s gap, 0.4 s word
+    engine = AudioCaptureEngine(pre_roll_ms=300, endpointer=Endpointer(pause_ms=400, padding_ms=100))
+    feed(engine, load("silence.wav"))
+    start = engine.mark()
+    feed(engine, audio)
+    
+    utterance = engine.record(start=start, timeout=3)
+    # Both words plus padding; the trailing second of noise is gone
+    assert abs(seconds(utterance) - (1.0 + 0.2)) <= 0.06
+
+def test_stream_ends_after_pause_not_at_timeout():
+    """Endpointing stops 400 ms after speech instead of waiting for the timeout"""
+    engine = AudioCaptureEngine(endpointer=Endpointer(pause_ms=400))
+    feed(engine, load("silence.wav"))
+    start = engine.mark()
+    feed(engine, load("check_battery.wav"))
+    
+    tracker = engine.endpointer.tracker(engine.noise_floor, timeout=5)
+    consumed = tracker.push(engine.buffer.window(start))
+    assert tracker.done
+    # 0.5 s noise + 0.9 s speech + 0.4 s pause
+    assert abs(consumed * FRAME / RATE - 1.8) <= 0.04
+
+def test_key_release_ends_recording_immediately():
+    """Releasing P stops a recording that is still hearing speech"""
+    engine = AudioCaptureEngine()
+    engine.running = True  # Frames are fed by the test instead of a stream
+    feed(engine, load("silence.wav"))
+    start = engine.mark()
+    feed(engine, load("check_battery.wav")[:int(1.2 * RATE)])  # Still speaking
+    
+    released = threading.Event()
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(audio=engine.record(start=start, timeout=5, released=released)))
+    thread.start()
+    released.set()
+    thread.join(timeout=1)
+    engine.running = False
+    
+    assert not thread.is_alive()
+    assert result["audio"] is not None
+    assert seconds(result["audio"]) < 1.0
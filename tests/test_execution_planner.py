@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Tests for dependency-aware execution of compound command fragments
+"""
+import time
+
+from assistant.modules.execution_planner import (
+    ExecutionPlanner, AUDIO_OUTPUT, BROWSER, FOREGROUND_WINDOW
+)
+from assistant.modules.speech_utils import redirect_speech, speak
+
+def step(text, category, resources=()):
+    return {"text": text, "command": text, "category": category, "confidence": 0.95,
+            "resources": frozenset(resources)}
+
+def claims(s):
+    return s["resources"]
+
+def test_plan_only_orders_conflicting_fragments():
+    """Fragments wait only for earlier fragments that share a resource"""
+    planner = ExecutionPlanner(claims)
+    steps = [
+        step("check battery", "system_info"),
+        step("open chrome", "system_control", [FOREGROUND_WINDOW]),
+        step("search youtube for lofi", "youtube_search", [BROWSER, FOREGROUND_WINDOW]),
+        step("cpu usage", "system_info")
+    ]
+    assert planner.plan(steps) == [[], [], [1], []]
+
+def test_independent_fragments_run_concurrently_in_spoken_order():
+    """Slow independent fragments overlap, but speech keeps the user's order"""
+    planner = ExecutionPlanner(claims, max_workers=4)
+    steps = [
+        step("check battery", "system_info"),
+        step("cpu usage", "system_info"),
+        step("memory usage", "system_info")
+    ]
+    delays = {"check battery": 0.3, "cpu usage": 0.2, "memory usage": 0.1}
+    
+    def execute_step(s):
+        time.sleep(delays[s["text"]])
+        speak(s["text"])
+    
+    spoken = []
+    start = time.perf_counter()
+    with redirect_speech(spoken.append):
+        planner.run(steps, execute_step)
+    elapsed = time.perf_counter() - start
+    
+    assert spoken == ["check battery", "cpu usage", "memory usage"]
+    assert elapsed < 0.5
+
+def test_conflicting_fragments_run_in_sequence():
+    """Fragments that share a resource never overlap"""
+    planner = ExecutionPlanner(claims, max_workers=4)
+    steps = [step("volume up", "system_control", [AUDIO_OUTPUT]), step("mute", "system_control", [AUDIO_OUTPUT])]
+    running = []
+    overlaps = []
+    
+    def execute_step(s):
+        if running:
+            overlaps.append(s["text"])
+        running.append(s["text"])
+        time.sleep(0.05)
+        running.remove(s["text"])
+    
+    with redirect_speech(lambda text: None):
+        planner.run(steps, execute_step)
+    assert overlaps == []
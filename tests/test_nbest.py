@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Tests for n-best recognition and classifier rescoring
+"""
+import os
+import re
+import threading
+
+import speech_recognition as sr
+
+from assistant.modules.asr_backends import GoogleBackend, StubBackend
+from assistant.modules.nbest import rank_hypotheses
+from assistant.modules.pipeline import CommandPipeline
+from assistant.modules.speech_recognition_engine import SpeechRecognizer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "audio", "check_battery.wav")
+
+KNOWN = {"open chrome": 0.95, "check battery": 0.95}
+
+def load_fixture():
+    with sr.AudioFile(FIXTURE) as source:
+        return sr.Recognizer().record(source)
+
+def classifier(calls):
+    """A batch classifier that is sure about known commands only"""
+    def classify_batch(commands):
+        calls.append(list(commands))
+        return [{"command": command, "confidence": KNOWN.get(command, 0.3)} for command in commands]
+    return classify_batch
+
+def split(text):
+    return [part.strip() for part in re.split(r"\band\b", text) if part.strip()]
+
+def test_classifier_overrules_a_near_miss():
+    """A slightly less likely transcript wins if it is a known command"""
+    calls = []
+    ranked = rank_hypotheses([("open crow", 0.9), ("open chrome", 0.8)], classifier(calls))
+    assert [hypothesis.text for hypothesis in ranked] == ["open chrome", "open crow"]
+    assert ranked[0].results == [{"command": "open chrome", "confidence": 0.95}]
+
+def test_all_fragments_are_classified_in_one_call():
+    """Compound alternatives are split and classified in a single batch"""
+    calls = []
+    ranked = rank_hypotheses([("open crow and check battery", 0.9), ("open chrome and check battery", 0.85)],
+                             classifier(calls), split)
+    assert calls == [["open crow", "check battery", "open chrome", "check battery"]]
+    assert ranked[0].text == "open chrome and check battery"
+    assert ranked[0].fragments == ["open chrome", "check battery"]
+
+def test_ties_keep_the_recognizer_order():
+    ranked = rank_hypotheses([("search cats", 0.9), ("search cat", 0.9)], classifier([]))
+    assert ranked[0].text == "search cats"
+
+def test_google_alternatives_are_ranked(monkeypatch):
+    """Google scores only its first alternative; the rest are decayed"""
+    backend = GoogleBackend()
+    result = {"alternative": [{"transcript": "open crow", "confidence": 0.9},
+                              {"transcript": "open chrome"}, {"transcript": "Open Crow"},
+                              {"transcript": "open grow"}]}
+    monkeypatch.setattr(backend.recognizer, "recognize_google", lambda audio, **kwargs: result)
+    alternatives = backend.recognize_nbest(load_fixture(), n=5)
+    assert [text for text, _ in alternatives] == ["open crow", "open chrome", "open grow"]
+    assert [round(confidence, 3) for _, confidence in alternatives] == [0.9, 0.72, 0.461]
+    
+    monkeypatch.setattr(backend.recognizer, "recognize_google", lambda audio, **kwargs: [])
+    assert backend.recognize_nbest(load_fixture()) == []
+
+def test_speech_recognizer_returns_alternatives():
+    backend = StubBackend(text="open crow", alternatives=[("open crow", 0.9), ("open chrome", 0.8)])
+    recognizer = SpeechRecognizer(backend=backend)
+    assert recognizer.recognize_nbest(load_fixture(), n=1) == [("open crow", 0.9)]
+    assert SpeechRecognizer(backend=StubBackend(text="")).recognize_nbest(load_fixture()) == []
+
+def test_pipeline_passes_alternatives_to_classify():
+    classified = []
+    done = threading.Event()
+    
+    def classify(hypotheses):
+        classified.append(hypotheses)
+        return {"text": hypotheses[0][0]}
+    
+    pipeline = CommandPipeline(
+        capture=lambda timeout: b"audio",
+        recognize=lambda audio: [("open crow", 0.9), ("open chrome", 0.8)],
+        classify=classify,
+        execute=lambda plan: done.set(),
+        speak_func=lambda text: None
+    )
+    pipeline.start()
+    try:
+        assert pipeline.submit()
+        assert done.wait(5)
+    finally:
+        pipeline.stop()
+    assert classified == [[("open crow", 0.9), ("open chrome", 0.8)]]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Tests for the native network status provider
+"""
+import socket
+import time
+from collections import namedtuple
+
+import psutil
+
+from assistant.modules.network_status import NetworkStatus, parse_proc_wireless
+
+PROC_WIRELESS = (
+    "Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE\n"
+    " face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22\n"
+    " wlan0: 0000   56.  -54.  -256        0      0      0      0      0        0\n"
+)
+
+Address = namedtuple("Address", "family address netmask broadcast ptp")
+
+def make_tree(root, operstate="up"):
+    """A fake sysfs with one wireless and one wired interface, and procfs"""
+    net = root / "sys" / "class" / "net"
+    (net / "wlan0" / "wireless").mkdir(parents=True)
+    (net / "wlan0" / "operstate").write_text(operstate + "\n")
+    (net / "eth0").mkdir()
+    (net / "eth0" / "operstate").write_text("up\n")
+    (root / "proc" / "net").mkdir(parents=True)
+    (root / "proc" / "net" / "wireless").write_text(PROC_WIRELESS if operstate == "up" else PROC_WIRELESS[:160])
+    return str(root / "sys"), str(root / "proc")
+
+def fake_addresses(monkeypatch):
+    monkeypatch.setattr(psutil, "net_if_addrs", lambda: {
+        "wlan0": [Address(socket.AF_INET, "192.168.1.23", None, None, None)]
+    })
+
+def test_reads_the_link_from_the_tree(tmp_path, monkeypatch):
+    fake_addresses(monkeypatch)
+    sys_root, proc_root = make_tree(tmp_path)
+    status = NetworkStatus(sys_root, proc_root, ssid_reader=lambda name: "HomeNet")
+    assert status.wireless_interfaces() == ["wlan0"]
+    link = status.read()
+    assert link.connected and link.interface == "wlan0" and link.ssid == "HomeNet"
+    assert link.quality == 80 and link.signal_dbm == -54.0
+    assert link.addresses == ("192.168.1.23",)
+
+def test_disconnected_link(tmp_path, monkeypatch):
+    fake_addresses(monkeypatch)
+    sys_root, proc_root = make_tree(tmp_path, operstate="dormant")
+    link = NetworkStatus(sys_root, proc_root, ssid_reader=lambda name: "").read()
+    assert not link.connected and link.ssid is None and link.addresses == ()
+
+def test_no_wireless_interface(tmp_path):
+    (tmp_path / "sys" / "class" / "net" / "eth0").mkdir(parents=True)
+    status = NetworkStatus(str(tmp_path / "sys"), str(tmp_path / "proc"))
+    assert status.available and status.read() is None
+    assert not NetworkStatus(str(tmp_path / "missing")).available
+
+def test_readings_are_cached_until_a_change(tmp_path, monkeypatch):
+    fake_addresses(monkeypatch)
+    sys_root, proc_root = make_tree(tmp_path)
+    calls = []
+    status = NetworkStatus(sys_root, proc_root, ttl=60, ssid_reader=lambda name: calls.append(name) or "HomeNet")
+    invalidated = []
+    status.add_listener(lambda: invalidated.append(True))
+    
+    started = time.perf_counter()
+    for _ in range(100):
+        status.read()
+    assert (time.perf_counter() - started) / 100 < 0.001
+    assert len(calls) == 1 and status.stats()["hits"] == 99
+    
+    (tmp_path / "sys" / "class" / "net" / "wlan0" / "operstate").write_text("down\n")
+    assert status.read().connected
+    status.invalidate()  # What the netlink thread does on RTM_NEWLINK
+    assert not status.read().connected and invalidated == [True]
+
+def test_ssid_falls_back_to_a_command(tmp_path, monkeypatch):
+    fake_addresses(monkeypatch)
+    sys_root, proc_root = make_tree(tmp_path)
+    status = NetworkStatus(sys_root, proc_root, subprocess_timeout=0.5, ssid_reader=lambda name: None)
+    monkeypatch.setattr(status, "_ssid_from_command", lambda name: "FromCommand")
+    assert status.read().ssid == "FromCommand"
+
+def test_parse_proc_wireless():
+    assert parse_proc_wireless(PROC_WIRELESS) == {"wlan0": (80, -54.0)}
+    assert parse_proc_wireless("") == {}
+
+def test_change_during_a_read_is_not_cached(tmp_path, monkeypatch):
+    fake_addresses(monkeypatch)
+    sys_root, proc_root = make_tree(tmp_path)
+    status = None
+    
+    def ssid_reader(name):
+        # The link drops while this read is in flight
+        (tmp_path / "sys" / "class" / "net" / "wlan0" / "operstate").write_text("down\n")
+        status.invalidate()
+        return "HomeNet"
+    
+    status = NetworkStatus(sys_root, proc_root, ttl=60, ssid_reader=ssid_reader)
+    assert status.read().connected
+    assert not status.read().connected
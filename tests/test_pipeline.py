@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Tests for the asyncio command pipeline
+"""
+import threading
+import time
+
+from assistant.modules.pipeline import CommandPipeline
+from assistant.modules.speech_utils import speak
+
+STAGE_DELAY = 0.1
+
+def make_pipeline(spoken, executed, queue_size=2, capture_gate=None):
+    """Build a pipeline whose stages each sleep for STAGE_DELAY"""
+    def capture(timeout):
+        if capture_gate is not None:
+            capture_gate.wait()
+        time.sleep(STAGE_DELAY)
+        return b"audio"
+    
+    def recognize(audio):
+        time.sleep(STAGE_DELAY)
+        return "check battery"
+    
+    def classify(text):
+        time.sleep(STAGE_DELAY)
+        return {"text": text}
+    
+    def execute(plan):
+        time.sleep(STAGE_DELAY)
+        executed.append(plan["text"])
+        # Handlers call speak() inline; the pipeline routes it to the speech stage
+        speak(f"result {len(executed)}")
+    
+    def speak_func(text):
+        time.sleep(STAGE_DELAY)
+        spoken.append(text)
+    
+    return CommandPipeline(capture, recognize, classify, execute, speak_func, queue_size=queue_size)
+
+def test_stage_graph():
+    """The pipeline exposes its stages as an explicit graph"""
+    pipeline = make_pipeline([], [])
+    assert pipeline.describe() == [
+        ("capture", "asr"),
+        ("asr", "classify"),
+        ("classify", "execute"),
+        ("execute", "speech")
+    ]
+
+def test_commands_overlap_and_keep_order():
+    """Back-to-back commands overlap, so turnaround tracks the slowest stage"""
+    spoken, executed = [], []
+    pipeline = make_pipeline(spoken, executed)
+    pipeline.start()
+    try:
+        start = time.perf_counter()
+        for _ in range(4):
+            assert pipeline.submit()
+            time.sleep(STAGE_DELAY)
+        deadline = time.time() + 5
+        while len(spoken) < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        pipeline.stop()
+    
+    assert spoken == ["result 1", "result 2", "result 3", "result 4"]
+    # Sequential processing would take 4 commands x 5 stages x STAGE_DELAY
+    assert elapsed < 4 * 5 * STAGE_DELAY * 0.6
+
+def test_full_capture_queue_rejects_new_commands():
+    """A full capture queue pushes back on new key presses"""
+    gate = threading.Event()
+    pipeline = make_pipeline([], [], queue_size=1, capture_gate=gate)
+    pipeline.start()
+    try:
+        assert pipeline.submit()  # Taken by the capture stage, blocked on the gate
+        time.sleep(0.05)
+        assert pipeline.submit()  # Waits in the capture queue
+        assert not pipeline.submit()  # Queue full
+        assert pipeline.stats()["rejected"] == 1
+        assert pipeline.stats()["capture"]["queue_depth"] == 1
+    finally:
+        gate.set()
+        pipeline.stop()
+
+def test_speak_outside_pipeline_is_not_redirected():
+    """say() falls back to speaking directly when the pipeline is stopped"""
+    spoken = []
+    pipeline = make_pipeline(spoken, [])
+    pipeline.say("hello")
+    assert spoken == ["hello"]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Tests for the top-processes inspector
+"""
+import multiprocessing
+import time
+
+from assistant.modules.process_inspector import ProcessInspector, describe_bytes, parse_process_query
+
+def spin(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+def test_busy_process_ranks_first_without_sleeping():
+    inspector = ProcessInspector(min_interval=0)
+    worker = multiprocessing.Process(target=spin, args=(5,))
+    worker.start()
+    try:
+        inspector.snapshot()
+        time.sleep(0.5)  # Only so the worker has something to show
+        started = time.perf_counter()
+        top = inspector.top("cpu", 3, group=False)
+        assert time.perf_counter() - started < 0.5
+        assert top[0].pids == (worker.pid,)
+        assert top[0].cpu_percent > 50 / inspector.cores
+    finally:
+        worker.terminate()
+        worker.join()
+
+def test_snapshots_are_reused_within_the_interval():
+    inspector = ProcessInspector(min_interval=60)
+    first = inspector.top("memory", 5)
+    assert len(first) == 5 and first[0].rss >= first[-1].rss
+    inspector.top("io", 5)
+    assert inspector.is_running("python", max_age=60)
+    assert not inspector.is_running("no-such-process-name", max_age=60)
+    assert inspector.scans == 1
+
+def test_is_running_after_idle_does_not_make_an_old_baseline():
+    """A media check after an hour idle, then a question, must not average over the hour"""
+    inspector = ProcessInspector(min_interval=60, max_baseline_age=10.0)
+    (taken, samples), _ = inspector.snapshot()
+    # Pretend the last snapshots are an hour old
+    inspector._previous = (taken - 3700, samples)
+    inspector._current = (taken - 3600, samples)
+    worker = multiprocessing.Process(target=spin, args=(10,))
+    worker.start()
+    try:
+        time.sleep(1.0)
+        assert inspector.is_running("python", max_age=1.0)
+        started = time.perf_counter()
+        top = inspector.top("cpu", 3, group=False)
+        assert time.perf_counter() - started < 0.5
+        current, previous = inspector.snapshot()
+        assert previous is None and inspector.scans == 2
+        # Averages since start: the worker has been spinning all its life
+        assert top[0].pids == (worker.pid,)
+        assert top[0].cpu_percent > 50 / inspector.cores
+    finally:
+        worker.terminate()
+        worker.join()
+
+def test_background_refresh_keeps_a_recent_baseline():
+    inspector = ProcessInspector(min_interval=0, max_baseline_age=1.0)
+    inspector.start(interval=0.2)
+    try:
+        time.sleep(0.7)
+        current, previous = inspector.snapshot(max_age=60)
+        assert previous is not None and current[0] - previous[0] < 1.0
+    finally:
+        inspector.stop()
+
+def test_scan_is_fast():
+    inspector = ProcessInspector(min_interval=0)
+    for _ in range(3):
+        inspector.snapshot()
+    stats = inspector.stats()
+    assert stats["processes"] > 0 and stats["mean_scan_ms"] < 200
+
+def test_queries():
+    assert parse_process_query("what's eating my cpu") == ("cpu", 3)
+    assert parse_process_query("which app uses the most memory") == ("memory", 3)
+    assert parse_process_query("show the top five processes") == ("cpu", 5)
+    assert parse_process_query("what is using the most disk") == ("io", 3)
+    assert parse_process_query("what is the cpu usage") is None
+    assert describe_bytes(1536 * 1024) == "1.5 MB"
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Tests for the TTL result cache
+"""
+import threading
+import time
+
+import pytest
+
+from assistant.modules.result_cache import ResultCache
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def make_cache(clock):
+    cache = ResultCache(clock=clock)
+    cache.set_policy("cpu", ttl=3, max_stale=30)
+    return cache
+
+def test_fresh_readings_are_served_from_cache():
+    """A second query within the ttl doesn't fetch again"""
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+    
+    assert cache.get("cpu", loader) == 1
+    clock.now = 2
+    assert cache.get("cpu", loader) == 1
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_stale_reading_is_served_while_refreshing():
+    """A stale reading comes back instantly and is replaced in the background"""
+    clock = FakeClock()
+    cache = make_cache(clock)
+    release = threading.Event()
+    values = iter([10, 20])
+    
+    def loader():
+        value = next(values)
+        if value == 20:
+            release.wait(2)
+        return value
+    
+    assert cache.get("cpu", loader) == 10
+    clock.now = 5
+    start = time.perf_counter()
+    assert cache.get("cpu", loader) == 10
+    assert time.perf_counter() - start < 0.5
+    
+    release.set()
+    deadline = time.time() + 2
+    while cache.stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("cpu", loader) == 20
+
+def test_expired_readings_are_fetched_again():
+    """Past ttl + max_stale the caller waits for a new reading"""
+    clock = FakeClock()
+    cache = make_cache(clock)
+    values = iter([1, 2])
+    cache.get("cpu", lambda: next(values))
+    clock.now = 40
+    assert cache.get("cpu", lambda: next(values)) == 2
+
+def test_concurrent_misses_share_one_fetch():
+    """Callers asking for the same key at once trigger a single fetch"""
+    cache = ResultCache()
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return "reading"
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(("weather", "london"), loader)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["reading"] * 4
+    assert len(calls) == 1
+
+def test_errors_are_not_cached():
+    """A failing fetch raises to the caller and the next call tries again"""
+    cache = ResultCache()
+    
+    def failing():
+        raise RuntimeError("service down")
+    
+    with pytest.raises(RuntimeError):
+        cache.get("weather", failing)
+    assert cache.get("weather", lambda: "sunny") == "sunny"
+
+def test_fetch_running_during_invalidate_is_not_cached():
+    """A reading from before an invalidation is not stored as fresh"""
+    clock = FakeClock()
+    cache = make_cache(clock)
+    started, release = threading.Event(), threading.Event()
+    values = iter(["old", "before change", "after change"])
+    
+    def loader():
+        value = next(values)
+        if value == "before change":
+            started.set()
+            release.wait(2)
+        return value
+    
+    assert cache.get("cpu", loader) == "old"
+    clock.now = 5
+    assert cache.get("cpu", loader) == "old"  # Starts a background refresh
+    assert started.wait(2)
+    cache.invalidate("cpu")
+    release.set()
+    deadline = time.time() + 2
+    while cache.stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("cpu", loader) == "after change"
+
+def test_miss_running_during_invalidate_is_not_cached():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    started, release = threading.Event(), threading.Event()
+    values = iter(["before change", "after change"])
+    
+    def loader():
+        value = next(values)
+        if value == "before change":
+            started.set()
+            release.wait(2)
+        return value
+    
+    results = []
+    worker = threading.Thread(target=lambda: results.append(cache.get("cpu", loader)))
+    worker.start()
+    assert started.wait(2)
+    cache.invalidate()
+    release.set()
+    worker.join(2)
+    assert results == ["before change"]
+    assert cache.get("cpu", loader) == "after change"
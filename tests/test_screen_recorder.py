@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Tests for the tile-diffing screen recorder
+"""
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from assistant.modules.screen_recorder import (
+    FRAME, HEADER, MAGIC, VERSION, ScreenRecorder, TileHasher, assemble_recording, read_spool
+)
+
+class FakeGrabber:
+    """A static 320x200 screen with a small square that can be moved"""
+    
+    def __init__(self):
+        self.screen = np.random.default_rng(0).integers(0, 255, (200, 320, 3), dtype=np.uint8)
+    
+    def bounds(self, monitor=None, region=None):
+        return (0, 0, 320, 200)
+    
+    def grab(self, bounds=None):
+        return Image.fromarray(self.screen.copy())
+
+class FakeService:
+    def __init__(self, directory):
+        self.grabber = FakeGrabber()
+        self.directory = directory
+
+def record(directory, frames, fmt):
+    """Record the given frames with a fast recorder and wait for the result"""
+    service = FakeService(directory)
+    recorder = ScreenRecorder(service, fps=50, tile=32, fmt=fmt)
+    done = threading.Event()
+    saved = []
+    
+    def on_done(path):
+        saved.append(path)
+        done.set()
+    
+    path = recorder.start(on_done=on_done)
+    for frame in frames:
+        service.grabber.screen = frame
+        threading.Event().wait(0.05)
+    assert recorder.stop() == path
+    assert done.wait(30)
+    return recorder, saved[0]
+
+def write_spool(path, frames, width, height, interval=1.0):
+    """Write frames to a spool the way the recorder does"""
+    hasher = TileHasher(width, height, 32)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, height, 32, 5.0))
+        for number, frame in enumerate(frames):
+            indices, tiles = hasher.changed(frame)
+            f.write(FRAME.pack(number * interval, len(indices)))
+            f.write(indices.tobytes())
+            f.write(tiles.tobytes())
+
+def test_only_changed_tiles_are_reported():
+    frame = np.zeros((100, 130, 3), dtype=np.uint8)
+    hasher = TileHasher(130, 100, tile=32)
+    indices, tiles = hasher.changed(frame)
+    assert len(indices) == hasher.rows * hasher.cols == 4 * 5
+    assert tiles.shape == (20, 32, 32, 3)
+    
+    assert len(hasher.changed(frame)[0]) == 0
+    frame[40, 70] = (1, 2, 3)  # Row 1, column 2
+    frame[99, 129] = (9, 9, 9)  # The padded corner tile
+    indices, tiles = hasher.changed(frame)
+    assert list(indices) == [1 * 5 + 2, 3 * 5 + 4]
+    assert tuple(tiles[0][40 - 32, 70 - 64]) == (1, 2, 3)
+
+def test_spool_rebuilds_frames(tmp_path):
+    grabber = FakeGrabber()
+    first = grabber.screen.copy()
+    second = first.copy()
+    second[10:20, 300:310] = 0
+    spool = str(tmp_path / "screen.spool")
+    write_spool(spool, [first, first, second], 320, 200)
+    rebuilt = [(stamp, frame.copy(), count) for stamp, frame, count in read_spool(spool)]
+    assert [count for _, _, count in rebuilt] == [70, 0, 1]
+    assert np.array_equal(rebuilt[1][1], first)
+    assert np.array_equal(rebuilt[2][1], second)
+
+def test_assemble_merges_static_frames(tmp_path):
+    spool = str(tmp_path / "clip.spool")
+    frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(4)]
+    frames[3][:] = 255
+    write_spool(spool, frames, 64, 64, interval=0.2)
+    
+    output = assemble_recording(spool, str(tmp_path / "clip.gif"), "gif")
+    assert not os.path.exists(spool)
+    with Image.open(output) as image:
+        assert image.n_frames == 2
+        assert image.info["duration"] >= 500  # The black frame covers three captures
+
+def test_recording_saves_a_webp(tmp_path):
+    moving = FakeGrabber().screen.copy()
+    frames = []
+    for step in range(4):
+        moving[10:20, step * 40:step * 40 + 10] = 0
+        frames.append(moving.copy())
+    recorder, path = record(str(tmp_path), frames, "webp")
+    assert path.endswith(".webp")
+    with Image.open(path) as image:
+        assert image.size == (320, 200) and image.n_frames >= 2
+
+def test_static_screen_records_few_tiles(tmp_path):
+    static = FakeGrabber().screen
+    recorder, path = record(str(tmp_path), [static] * 6, "gif")
+    stats = recorder.stats()
+    assert path.endswith(".gif") and os.path.exists(path)
+    assert stats["frames"] >= 5
+    assert stats["changed_tiles_percent"] < 30
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith((".spool", ".part"))]
+
+def test_new_recording_can_start_while_the_last_one_encodes(tmp_path):
+    service = FakeService(str(tmp_path))
+    recorder = ScreenRecorder(service, fps=50, tile=32, fmt="gif")
+    release = threading.Event()
+    assemble = recorder._assemble
+    
+    def slow_assemble(recording):
+        release.wait(10)
+        assemble(recording)
+    
+    recorder._assemble = slow_assemble
+    saved = []
+    first = recorder.start(on_done=saved.append)
+    threading.Event().wait(0.1)
+    assert recorder.stop() == first
+    assert not recorder.recording
+    assert recorder.stop() is None
+    threading.Event().wait(0.1)
+    assert recorder.encoding
+    
+    second = recorder.start(on_done=saved.append)
+    assert second is not None and second != first and recorder.recording
+    threading.Event().wait(0.1)
+    assert recorder.stop() == second
+    release.set()
+    recorder.wait(30)
+    assert sorted(saved) == sorted([first, second])
+    assert not recorder.encoding
+    assert all(os.path.exists(path) for path in saved)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Tests for the screenshot index
+"""
+import os
+import sqlite3
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from assistant.modules.screenshot_library import ScreenshotLibrary, _signed, hamming, perceptual_hash
+
+def screen(seed, size=(640, 400)):
+    """A blocky desktop, different for every seed"""
+    blocks = np.random.default_rng(seed).integers(0, 255, (8, 10, 3), dtype=np.uint8)
+    return Image.fromarray(blocks).resize(size, Image.NEAREST)
+
+def editor(lines):
+    """A 1920x1080 editor window showing some lines of text"""
+    image = Image.new("RGB", (1920, 1080), (30, 30, 30))
+    draw = ImageDraw.Draw(image)
+    for row, line in enumerate(lines):
+        draw.text((40, 40 + row * 18), line, fill=(220, 220, 220))
+    return image
+
+def save(directory, name, image, when, **options):
+    path = os.path.join(str(directory), name)
+    image.save(path, **options)
+    os.utime(path, (when, when))
+    return path
+
+def test_hash_survives_reencoding_and_scaling(tmp_path):
+    image = screen(1)
+    jpeg = save(tmp_path, "screenshot_a.jpg", image, 1000, quality=70)
+    with Image.open(jpeg) as decoded:
+        assert hamming(perceptual_hash(decoded), perceptual_hash(image)) <= 2
+    assert hamming(perceptual_hash(image.resize((320, 200))), perceptual_hash(image)) <= 2
+    assert hamming(perceptual_hash(screen(2)), perceptual_hash(image)) > 10
+
+def test_listener_indexes_without_decoding(tmp_path):
+    library = ScreenshotLibrary(str(tmp_path), thumbnail_size=128)
+    image = screen(1)
+    path = save(tmp_path, "screenshot_1.png", image, 1000)
+    entry = library.add(path, image)
+    assert (entry.width, entry.height) == (640, 400)
+    with Image.open(entry.thumbnail) as thumbnail:
+        assert thumbnail.size == (128, 80)
+    assert library.latest()[0] == entry
+    library.close()
+
+def test_sync_picks_up_outside_changes(tmp_path):
+    for number in range(3):
+        save(tmp_path, f"screenshot_{number}.png", screen(number), 1000 + number)
+    save(tmp_path, "notes.png", screen(9), 2000)
+    library = ScreenshotLibrary(str(tmp_path))
+    assert library.sync() == {"updated": 3, "removed": 0}
+    assert library.sync() == {"updated": 0, "removed": 0}
+    
+    os.remove(os.path.join(str(tmp_path), "screenshot_2.png"))
+    save(tmp_path, "screenshot_3.webp", screen(3), 1003)
+    assert library.sync() == {"updated": 1, "removed": 1}
+    assert [os.path.basename(e.path) for e in library.latest(5)] == [
+        "screenshot_3.webp", "screenshot_1.png", "screenshot_0.png"]
+    assert not os.path.exists(library._thumbnail_path("screenshot_2.png"))
+    
+    # A file deleted between syncs is skipped by latest()
+    os.remove(os.path.join(str(tmp_path), "screenshot_3.webp"))
+    assert os.path.basename(library.latest()[0].path) == "screenshot_1.png"
+    library.close()
+
+def test_duplicates_are_moved_to_trash(tmp_path):
+    library = ScreenshotLibrary(str(tmp_path))
+    same = screen(1)
+    original = save(tmp_path, "screenshot_1.png", same, 1000)
+    save(tmp_path, "screenshot_2.png", same, 1001)
+    save(tmp_path, "screenshot_3.webp", same, 1002, lossless=True)
+    save(tmp_path, "screenshot_4.jpg", same, 1003, quality=90)  # Same hash, different pixels
+    save(tmp_path, "screenshot_5.png", screen(2), 1004)
+    library.sync()
+    
+    groups = library.duplicates()
+    assert len(groups) == 1 and groups[0][0].path == original and len(groups[0]) == 3
+    moved, freed = library.remove_duplicates()
+    assert moved == 2 and freed > 0
+    assert sorted(os.listdir(str(tmp_path))) == [
+        ".library", "screenshot_1.png", "screenshot_4.jpg", "screenshot_5.png"]
+    assert sorted(os.listdir(library.trash)) == ["screenshot_2.png", "screenshot_3.webp"]
+    assert library.duplicates() == []
+    assert library.stats()["screenshots"] == 3
+    library.close()
+
+def test_screens_differing_in_text_are_kept(tmp_path):
+    code = [f"    value_{n} = compute(value_{n - 1}, {n})" for n in range(1, 40)]
+    edited = list(code)
+    edited[20] = "    value_20 = compute(value_19, 20) + correction"
+    first, second = editor(code), editor(edited)
+    library = ScreenshotLibrary(str(tmp_path))
+    a = library.add(save(tmp_path, "screenshot_1.png", first, 1000), first)
+    b = library.add(save(tmp_path, "screenshot_2.png", second, 1001), second)
+    assert a.hash == b.hash and a.digest != b.digest
+    
+    assert library.remove_duplicates() == (0, 0)
+    assert os.path.exists(str(tmp_path / "screenshot_1.png")) and os.path.exists(str(tmp_path / "screenshot_2.png"))
+    library.close()
+
+def test_files_changed_after_indexing_are_kept(tmp_path):
+    library = ScreenshotLibrary(str(tmp_path))
+    same = screen(1)
+    save(tmp_path, "screenshot_1.png", same, 1000)
+    save(tmp_path, "screenshot_2.png", same, 1001)
+    library.sync()
+    save(tmp_path, "screenshot_2.png", screen(3), 1001)  # Replaced behind the index's back
+    assert library.remove_duplicates() == (0, 0)
+    library.close()
+
+def test_queries_stay_fast_with_many_screenshots(tmp_path):
+    library = ScreenshotLibrary(str(tmp_path))
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 63, 20000, dtype=np.uint64) * 2
+    hashes[1::1000] = hashes[::1000]  # 20 exact duplicates
+    with library._lock:
+        db = library._connection()
+        db.executemany("INSERT INTO screenshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       [(f"screenshot_{i}.png", 1000.0 + i, 1, 1, 1, _signed(int(h)), f"{int(h):x}")
+                        for i, h in enumerate(hashes)])
+        db.commit()
+    save(tmp_path, "screenshot_19999.png", screen(0), 1000 + 19999)
+    
+    started = time.perf_counter()
+    assert os.path.basename(library.latest()[0].path) == "screenshot_19999.png"
+    assert len(library.duplicates()) == 20
+    assert time.perf_counter() - started < 2.0
+    
+    plan = " ".join(row[-1] for row in sqlite3.connect(library.database).execute(
+        "EXPLAIN QUERY PLAN SELECT name FROM screenshots ORDER BY taken DESC LIMIT 1"))
+    assert "screenshots_taken" in plan
+    library.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Tests for the background screenshot service
+"""
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from assistant.modules.screenshot_service import ScreenshotService, encode_options, parse_screenshot_command
+
+class FakeGrabber:
+    """A noisy 1600x900 desktop made of two monitors side by side"""
+    
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.screen = Image.fromarray(rng.integers(0, 255, (900, 1600, 3), dtype=np.uint8))
+        self.grabbed = []
+    
+    def monitors(self):
+        return [(0, 0, 800, 900), (800, 0, 800, 900)]
+    
+    def bounds(self, monitor=None, region=None):
+        from assistant.modules.screenshot_service import ScreenGrabber
+        return ScreenGrabber.bounds(self, monitor, region)
+    
+    def grab(self, bounds=None):
+        self.grabbed.append(bounds)
+        if bounds is None:
+            return self.screen.copy()
+        left, top, width, height = bounds
+        return self.screen.crop((left, top, left + width, top + height))
+
+def test_capture_returns_before_encoding(tmp_path):
+    release = threading.Event()
+    service = ScreenshotService(str(tmp_path), workers=2, grabber=FakeGrabber(), opener=None)
+    service.add_listener(lambda path, image: release.wait(2))
+    
+    started = time.perf_counter()
+    shots = [service.take() for _ in range(3)]
+    assert time.perf_counter() - started < 0.5
+    assert len({shot.path for shot in shots}) == 3
+    assert not shots[-1].future.done()
+    release.set()
+    for shot in shots:
+        assert shot.future.result(5) == shot.path and os.path.exists(shot.path)
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".part")]
+    assert service.stats()["saved"] == 3
+
+def test_formats_monitors_and_regions(tmp_path):
+    grabber = FakeGrabber()
+    service = ScreenshotService(str(tmp_path), grabber=grabber, opener=None)
+    jpeg = service.take(monitor=2, fmt="jpeg").future.result(5)
+    webp = service.take(region=(0.0, 0.0, 0.5, 1.0), fmt="webp").future.result(5)
+    assert jpeg.endswith(".jpg") and Image.open(jpeg).size == (800, 900)
+    assert webp.endswith(".webp") and Image.open(webp).size == (400, 900)
+    assert grabber.grabbed == [(800, 0, 800, 900), (0, 0, 400, 900)]
+    try:
+        service.take(monitor=3)
+        assert False, "expected an error for a missing monitor"
+    except ValueError:
+        pass
+
+def test_burst(tmp_path):
+    service = ScreenshotService(str(tmp_path), grabber=FakeGrabber(), opener=None)
+    started = time.perf_counter()
+    burst = service.burst(3, interval=0.05)
+    assert time.perf_counter() - started < 0.1
+    paths = burst.result(10)
+    assert len(paths) == 3 and all(os.path.exists(path) for path in paths)
+
+def test_commands_and_options():
+    assert parse_screenshot_command("take a screenshot") == {"region": None, "monitor": None, "count": 1, "fmt": None}
+    options = parse_screenshot_command("take three screenshots of the second monitor as jpeg")
+    assert (options["count"], options["monitor"], options["fmt"]) == (3, 2, "jpeg")
+    assert parse_screenshot_command("screenshot the left half of screen 1")["region"] == (0.0, 0.0, 0.5, 1.0)
+    assert encode_options("png", png_level=3) == {"format": "PNG", "compress_level": 3}
+    assert encode_options("jpeg", jpeg_quality=70)["quality"] == 70
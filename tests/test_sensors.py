@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Tests for the temperature sensor provider
+"""
+import time
+
+from assistant.modules.sensors import HwmonSource, SensorProvider, ThermalZoneSource, categorize, parse_mac_temperatures
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+def make_tree(root):
+    """A fake sysfs with a CPU, a GPU and an NVMe drive, plus thermal zones"""
+    hwmon = root / "class" / "hwmon"
+    write(hwmon / "hwmon0" / "name", "coretemp")
+    write(hwmon / "hwmon0" / "temp1_input", "55000")
+    write(hwmon / "hwmon0" / "temp1_label", "Package id 0")
+    write(hwmon / "hwmon0" / "temp2_input", "52000")
+    write(hwmon / "hwmon0" / "temp2_label", "Core 0")
+    write(hwmon / "hwmon1" / "name", "amdgpu")
+    write(hwmon / "hwmon1" / "temp1_input", "61000")
+    write(hwmon / "hwmon1" / "temp1_label", "edge")
+    write(hwmon / "hwmon2" / "name", "nvme")
+    write(hwmon / "hwmon2" / "temp1_input", "38850")
+    thermal = root / "class" / "thermal"
+    write(thermal / "thermal_zone0" / "type", "acpitz")
+    write(thermal / "thermal_zone0" / "temp", "27800")
+    write(thermal / "thermal_zone1" / "type", "x86_pkg_temp")
+    write(thermal / "thermal_zone1" / "temp", "56000")
+    return str(root)
+
+def test_hwmon_readings_are_grouped(tmp_path):
+    provider = SensorProvider(sources=[[HwmonSource(make_tree(tmp_path)), ThermalZoneSource(str(tmp_path))]])
+    assert provider.probe() == ["hwmon"]
+    groups = provider.by_category()
+    assert [(r.name, r.celsius) for r in groups["CPU"]] == [("coretemp Package id 0", 55.0), ("coretemp Core 0", 52.0)]
+    assert [r.name for r in groups["GPU"]] == ["amdgpu edge"]
+    assert [(r.name, r.celsius) for r in groups["System"]] == [("nvme temp1", 38.85)]
+    assert provider.hottest("CPU").celsius == 55.0
+    assert provider.hottest().name == "amdgpu edge"
+    provider.stop()
+
+def test_files_are_opened_once_and_reread(tmp_path):
+    root = make_tree(tmp_path)
+    source = HwmonSource(root)
+    provider = SensorProvider(sources=[source], interval=60)
+    provider.sample()
+    handles = list(source._sensors)
+    (tmp_path / "class" / "hwmon" / "hwmon0" / "temp1_input").write_text("71000\n")
+    assert provider.sample()[0].celsius == 71.0
+    assert source._sensors == handles
+    # Within the interval queries reuse the sample
+    started = time.perf_counter()
+    for _ in range(1000):
+        provider.latest()
+    assert (time.perf_counter() - started) / 1000 < 0.001 and provider.samples == 2
+    provider.stop()
+
+def test_thermal_zones_when_hwmon_is_missing(tmp_path):
+    make_tree(tmp_path)
+    root = str(tmp_path)
+    for path in sorted((tmp_path / "class" / "hwmon").rglob("*"), reverse=True):
+        path.unlink() if path.is_file() else path.rmdir()
+    provider = SensorProvider(sources=[[HwmonSource(root), ThermalZoneSource(root)]])
+    assert provider.probe() == ["thermal"]
+    assert [(r.name, r.category) for r in provider.latest()] == [("acpitz", "System"), ("x86_pkg_temp", "CPU")]
+    provider.stop()
+
+def test_no_sensors(tmp_path):
+    provider = SensorProvider(sources=[[HwmonSource(str(tmp_path)), ThermalZoneSource(str(tmp_path))]])
+    assert not provider.available
+    assert provider.hottest() is None
+
+def test_background_sampling(tmp_path):
+    provider = SensorProvider(sources=[HwmonSource(make_tree(tmp_path))], interval=0.05)
+    provider.start()
+    try:
+        assert provider.ready.wait(2)
+        assert provider.available and len(provider.latest()) == 4
+        deadline = time.time() + 2
+        while provider.samples < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert provider.samples >= 3
+    finally:
+        provider.stop()
+    assert not provider.running and provider.sources is None
+
+def test_categorize():
+    assert categorize("k10temp", "Tctl") == "CPU"
+    assert categorize("nouveau", "temp1") == "GPU"
+    assert categorize("acpitz") == "System"
+
+def test_parse_mac_temperatures():
+    assert parse_mac_temperatures("61.8°C\n") == [("CPU", 61.8)]
+    output = "--- CPU Stats ---\nCPU temp:               45.25°C     ▁▂▃▅▆▇\nBattery health: Good\n"
+    assert parse_mac_temperatures(output) == [("CPU temp", 45.25)]
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Tests for the replayable speech front end benchmark
+"""
+import json
+import os
+
+from assistant.modules.speech_benchmark import main, run_benchmark
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "audio")
+SPEED = 10.0
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+def test_fixture_is_recognized_with_timings():
+    """A replayed command reaches the stand-in backend with every timing"""
+    result = run_benchmark([fixture("check_battery.wav")], "stub", speed=SPEED, stub_latency=0.05)[0]
+    assert result["text"] == "check battery"
+    assert result["ttfb_ms"] < 50
+    assert result["asr_ms"] >= 50
+    # The pause that ends the utterance is 400 ms of audio, 40 ms at 10x speed
+    assert 0 < result["endpoint_ms"] < 200
+    # Leading and trailing silence is trimmed before recognition
+    assert result["audio_ms"] < 1300
+    assert result["total_ms"] >= result["asr_ms"]
+
+def test_silence_is_not_sent_to_the_recognizer():
+    """A fixture without speech times out without recognition"""
+    result = run_benchmark([fixture("silence.wav")], "stub", speed=SPEED)[0]
+    assert result["text"] is None
+    assert result["endpoint_ms"] is None
+    assert result["audio_ms"] == 0.0
+
+def test_command_line_writes_json(tmp_path, capsys):
+    """The CLI prints a table and writes machine-readable results"""
+    output = tmp_path / "results.json"
+    assert main([fixture("open_chrome.wav"), "--speed", str(SPEED), "--json", str(output)]) == 0
+    assert "open_chrome.wav" in capsys.readouterr().out
+    assert json.loads(output.read_text())[0]["text"] == "open chrome"
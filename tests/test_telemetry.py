@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Tests for the background telemetry sampler
+"""
+import time
+
+import numpy as np
+
+from assistant.modules.telemetry import METRICS, TelemetrySampler, describe_duration, parse_duration
+
+def test_sample_has_every_metric():
+    sampler = TelemetrySampler(length=4)
+    sample = sampler.sample()
+    assert set(METRICS) <= set(sample)
+    assert len(sample["per_core"]) == sampler.cores
+    assert 0 <= sample["memory_percent"] <= 100
+    # Throughput needs a previous sample
+    assert np.isnan(sample["disk_read_bps"]) or sample["disk_read_bps"] >= 0
+
+def test_ring_keeps_the_newest_samples():
+    sampler = TelemetrySampler(length=3)
+    for _ in range(5):
+        sampler.sample()
+    times, values = sampler.window("memory_percent", 60)
+    assert len(values) == 3 and sampler.count == 5
+    assert list(times) == sorted(times)
+    assert sampler.latest()["time"] == times[-1]
+
+def test_trends_cover_only_the_requested_window():
+    sampler = TelemetrySampler(length=10)
+    now = time.time()
+    # Samples from ten minutes ago and from just now
+    for age, cpu in ((600, 90.0), (590, 90.0), (20, 10.0), (10, 20.0)):
+        sampler._times[sampler.count] = now - age
+        sampler._data[sampler.count, METRICS.index("cpu_percent")] = cpu
+        sampler.count += 1
+    assert sampler.average("cpu_percent", 300) == 15.0
+    assert sampler.maximum("cpu_percent", 900) == 90.0
+    assert sampler.average("battery_percent", 300) is None
+
+def test_latest_reads_without_blocking():
+    """Info queries read the latest sample instead of waiting for a measurement"""
+    sampler = TelemetrySampler(interval=0.05)
+    sampler.start()
+    try:
+        deadline = time.time() + 2
+        while sampler.count < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        started = time.perf_counter()
+        for _ in range(1000):
+            sample = sampler.latest(max_age=1)
+        assert (time.perf_counter() - started) / 1000 < 0.001
+        assert sample is not None and 0 <= sample["cpu_percent"] <= 100
+    finally:
+        sampler.stop()
+    assert not sampler.running
+
+def test_durations_in_commands():
+    assert parse_duration("average cpu over the last five minutes") == 300
+    assert parse_duration("peak memory in the past hour") == 3600
+    assert parse_duration("cpu over the last 30 seconds") == 30
+    assert parse_duration("what is the cpu usage") is None
+    assert describe_duration(300) == "5 minutes"
+    assert describe_duration(3600) == "1 hour"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Tests for the on-disk telemetry history
+"""
+import datetime
+import glob
+import os
+
+import numpy as np
+
+from assistant.modules.telemetry_store import RECORD, TelemetryStore, parse_period
+
+START = 1_699_999_200.0  # On a whole hour
+
+def fill(store, seconds, start=START):
+    """One sample per second; CPU climbs 0..99 and repeats, memory is steady"""
+    for i in range(seconds):
+        store.record({"time": start + i, "cpu_percent": float(i % 100), "memory_percent": 50.0})
+
+def test_samples_are_rolled_up(tmp_path):
+    store = TelemetryStore(str(tmp_path), segment_kb=64)
+    fill(store, 2 * 3600 + 30)
+    stats = store.stats()
+    assert stats["1s"]["rows"] == 2 * 3600 + 30
+    assert stats["1m"]["rows"] == 120  # The running minute is not rolled up yet
+    assert stats["1h"]["rows"] == 1
+    
+    times, values, resolution = store.query("cpu_percent", START, START + 120)
+    assert resolution == 1 and len(values) == 120
+    hour = store.tiers[2].last()[0]
+    assert hour["time"] == START and hour["cpu_percent_peak"] == 99.0
+    assert abs(hour["cpu_percent"] - 49.5) < 0.1
+    store.close()
+
+def test_disk_use_is_bounded_by_rotation(tmp_path):
+    store = TelemetryStore(str(tmp_path), segment_kb=4, max_segments=3)
+    fill(store, 3600)
+    records = 4 * 1024 // RECORD.itemsize
+    assert len(glob.glob(os.path.join(str(tmp_path), "1s-*.tlm"))) == 3
+    assert store.stats()["1s"]["rows"] <= 3 * records
+    # The oldest seconds are gone, so an older range is answered per minute
+    summary = store.summary("cpu_percent", START, START + 600)
+    assert summary["resolution"] == 60 and summary["peak"] == 99.0
+    assert summary["rows"] == 10
+    store.close()
+
+def test_history_survives_a_restart(tmp_path):
+    store = TelemetryStore(str(tmp_path), segment_kb=64)
+    fill(store, 90)
+    store.close()
+    
+    # The half-finished minute is picked up again after the restart
+    store = TelemetryStore(str(tmp_path), segment_kb=64)
+    assert store.stats()["1s"]["rows"] == 90
+    fill(store, 60, start=START + 90)
+    times, values, _ = store.query("memory_percent", START, START + 150)
+    assert len(values) == 150 and np.all(np.diff(times) > 0)
+    minutes = store.tiers[1].last(2)
+    assert list(minutes["time"]) == [START, START + 60]
+    assert abs(minutes["cpu_percent"][1] - np.mean(list(range(60, 90)) + list(range(30)))) < 0.01
+    store.close()
+
+def test_out_of_order_samples_are_ignored(tmp_path):
+    store = TelemetryStore(str(tmp_path))
+    fill(store, 10)
+    store.record({"time": START + 5, "cpu_percent": 100.0})
+    assert store.stats()["1s"]["rows"] == 10
+    store.close()
+
+def test_named_periods():
+    now = datetime.datetime(2024, 5, 14, 15, 30)
+    start, end, label = parse_period("was memory high this morning", now)
+    assert (datetime.datetime.fromtimestamp(start), datetime.datetime.fromtimestamp(end)) == (
+        datetime.datetime(2024, 5, 14, 6), datetime.datetime(2024, 5, 14, 12))
+    assert label == "this morning"
+    start, end, _ = parse_period("cpu this afternoon", now)
+    assert datetime.datetime.fromtimestamp(end) == now
+    start, _, _ = parse_period("average cpu yesterday", now)
+    assert datetime.datetime.fromtimestamp(start) == datetime.datetime(2024, 5, 13)
+    assert parse_period("what is the cpu usage", now) is None
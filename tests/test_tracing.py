@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Tests for per-command tracing
+"""
+import json
+import threading
+import time
+
+from assistant.modules.pipeline import CommandPipeline
+from assistant.modules.speech_utils import speak
+from assistant.modules.tracing import NOOP_SPAN, Tracer, read_traces, to_chrome_trace, tracer
+
+def test_disabled_span_costs_under_a_microsecond():
+    """An unused span returns the shared no-op object and is very cheap"""
+    local = Tracer()
+    assert local.span("anything") is NOOP_SPAN
+    
+    runs = 100000
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(runs):
+            with local.span("noop"):
+                pass
+        elapsed = (time.perf_counter() - start) / runs
+        best = elapsed if best is None else min(best, elapsed)
+    assert best < 1e-6
+
+def test_spans_follow_the_trace_into_other_threads(tmp_path):
+    """Spans are recorded in the active trace, including re-activated threads"""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer()
+    local.configure(enabled=True, path=str(path))
+    try:
+        trace = local.start_trace("voice_command", source="test")
+        with local.span("calibrate"):
+            time.sleep(0.01)
+        
+        def worker():
+            assert local.current() is None
+            with local.activate(trace), local.span("google_asr", attempt=1):
+                time.sleep(0.01)
+        
+        thread = threading.Thread(target=worker, name="asr-worker")
+        thread.start()
+        thread.join()
+        local.finish(trace)
+        local.finish(trace)  # Finishing twice writes the trace once
+    finally:
+        local.configure(enabled=False)
+    
+    traces = read_traces(str(path))
+    assert len(traces) == 1
+    spans = {span["name"]: span for span in traces[0]["spans"]}
+    assert spans["calibrate"]["dur_us"] >= 10000
+    assert spans["google_asr"]["thread"] == "asr-worker"
+    assert spans["google_asr"]["attrs"] == {"attempt": 1}
+
+def test_chrome_export_has_one_process_per_command():
+    """Each trace becomes a process row with complete events per span"""
+    traces = [{
+        "trace_id": "abc", "name": "voice_command", "start": 100.0, "duration_us": 50, "attrs": {},
+        "spans": [{"name": "asr", "start_us": 10, "dur_us": 30, "thread": "main", "attrs": {}}]
+    }]
+    events = to_chrome_trace(traces)["traceEvents"]
+    span = next(event for event in events if event["ph"] == "X")
+    assert span["ts"] == 100_000_010 and span["dur"] == 30 and span["pid"] == 1
+    json.dumps(events)
+
+def test_pipeline_traces_every_stage(tmp_path):
+    """A command submitted with a trace records every stage and finishes after speech"""
+    path = tmp_path / "pipeline.jsonl"
+    tracer.configure(enabled=True, path=str(path))
+    pipeline = CommandPipeline(
+        capture=lambda timeout: b"audio",
+        recognize=lambda audio: "check battery",
+        classify=lambda text: {"text": text},
+        execute=lambda plan: speak("battery is full"),
+        speak_func=lambda text: None
+    )
+    pipeline.start()
+    try:
+        trace = tracer.start_trace("voice_command")
+        assert pipeline.submit(trace=trace)
+        deadline = time.time() + 5
+        while not trace.finished and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        pipeline.stop()
+        tracer.configure(enabled=False)
+    
+    # Speech overlaps with the end of the execute stage, so order by start time
+    spans = sorted(read_traces(str(path))[0]["spans"], key=lambda span: span["start_us"])
+    names = [span["name"] for span in spans]
+    assert names == ["capture", "asr", "classify", "execute", "speech"]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Tests for the synthesized phrase cache
+"""
+import io
+import textwrap
+import time
+import wave
+
+from assistant.modules.tts_cache import CachedSpeaker, PhraseCache, find_phrases, phrase_key
+from assistant.modules.tts_worker import TTSWorker
+
+def wav(text):
+    """A short WAV clip whose length depends on the text"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(b"\0\0" * 100 * len(text))
+    return buffer.getvalue()
+
+class FakeSpeaker:
+    """Live speaker that records what it speaks and renders fake WAVs"""
+    
+    voice = "en-in"
+    rate = 150
+    volume = 1.0
+    
+    def __init__(self):
+        self.spoken = []
+        self.rendered = []
+    
+    def open(self):
+        pass
+    
+    def speak(self, text):
+        self.spoken.append(text)
+    
+    def render(self, text, path):
+        self.rendered.append(text)
+        with open(path, "wb") as f:
+            f.write(wav(text))
+    
+    def stop(self):
+        pass
+    
+    def close(self):
+        pass
+
+class FakePlayer:
+    """Records the clips it is asked to play"""
+    
+    def __init__(self):
+        self.played = []
+    
+    def play(self, source):
+        self.played.append(source)
+        return True
+    
+    def stop(self):
+        pass
+    
+    def close(self):
+        pass
+
+def test_key_depends_on_voice_settings():
+    """The same text in another voice, rate or volume is another entry"""
+    base = phrase_key("Taking a screenshot", "en-in", 150, 1.0)
+    assert base == phrase_key("Taking a screenshot", "en-in", 150, 1.0)
+    assert base != phrase_key("Taking a screenshot", "en-us", 150, 1.0)
+    assert base != phrase_key("Taking a screenshot", "en-in", 180, 1.0)
+    assert base != phrase_key("Taking a screenshot", "en-in", 150, 0.5)
+
+def test_least_recently_played_is_evicted(tmp_path):
+    """The size cap evicts the phrase that was played longest ago"""
+    cache = PhraseCache(str(tmp_path), max_bytes=250, memory_items=0)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    assert cache.get("a") == b"a" * 100  # "b" is now the oldest
+    cache.put("c", b"c" * 100)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert not (tmp_path / "b.wav").exists()
+    assert cache.size == 200
+
+def test_cache_survives_restart(tmp_path):
+    """Rendered phrases are found again by a new process"""
+    PhraseCache(str(tmp_path)).put("a", b"audio")
+    cache = PhraseCache(str(tmp_path))
+    assert cache.get("a") == b"audio"
+    assert cache.stats()["hits"] == 1
+
+def test_find_phrases_takes_literal_strings_only(tmp_path):
+    """f-strings and variables are left to be spoken live"""
+    source = tmp_path / "handlers.py"
+    source.write_text(textwrap.dedent('''
+        def handler(match):
+            custom_speak("Taking a screenshot")
+            speak(f"Searching for {match.text}")
+            speak(match.text)
+            self.speak("Taking a screenshot")
+            router.register("battery", report_failure(action, "I couldn't retrieve battery information"))
+    '''))
+    assert find_phrases([str(source)]) == ["Taking a screenshot", "I couldn't retrieve battery information"]
+
+def test_cached_phrase_is_played_instead_of_synthesized(tmp_path):
+    """Hits play the stored audio; misses are spoken live"""
+    live, player = FakeSpeaker(), FakePlayer()
+    speaker = CachedSpeaker(live, PhraseCache(str(tmp_path)), player)
+    assert speaker.render("Window minimized")
+    
+    speaker.speak("Window minimized")
+    speaker.speak("Searching the web for cats")
+    assert player.played == [wav("Window minimized")]
+    assert live.spoken == ["Searching the web for cats"]
+
+def test_warming_renders_phrases_on_the_worker(tmp_path):
+    """Phrases are rendered once each while the worker has nothing to say"""
+    live, player = FakeSpeaker(), FakePlayer()
+    speaker = CachedSpeaker(live, PhraseCache(str(tmp_path)), player)
+    worker = TTSWorker(speaker=speaker)
+    worker.start()
+    speaker.warm(worker, ["Taking a screenshot", "Locking your computer.", "Taking a screenshot"])
+    deadline = time.monotonic() + 2
+    while len(speaker.cache) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker.say("Locking your computer.").wait(2)
+    worker.stop()
+    
+    assert sorted(live.rendered) == ["Locking your computer.", "Taking a screenshot"]
+    assert player.played == [wav("Locking your computer.")] and not live.spoken
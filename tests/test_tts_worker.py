@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Tests for the TTS worker queue: priorities, coalescing and barge-in
+"""
+import threading
+import time
+
+from assistant.modules.tts_worker import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, TTSWorker
+
+class FakeSpeaker:
+    """Records what is spoken; each sentence lasts until released or stopped"""
+    
+    def __init__(self, duration=0.0, hold=False):
+        self.duration = duration
+        self.spoken = []
+        self.stops = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+        self._stopped = threading.Event()
+    
+    def open(self):
+        pass
+    
+    def speak(self, text):
+        self._stopped.clear()
+        self.started.set()
+        self.release.wait(5)
+        self._stopped.wait(self.duration)
+        self.spoken.append(text)
+    
+    def stop(self):
+        self.stops += 1
+        self._stopped.set()
+        self.release.set()
+    
+    def close(self):
+        pass
+
+def busy_worker(max_queue=8):
+    """A worker whose speaker is stuck in a first sentence until released"""
+    speaker = FakeSpeaker(hold=True)
+    worker = TTSWorker(speaker=speaker, max_queue=max_queue)
+    worker.start()
+    worker.say("first")
+    assert speaker.started.wait(1)
+    return worker, speaker
+
+def test_say_returns_before_speech_finishes():
+    """Handlers are not held up by the length of the sentence"""
+    worker = TTSWorker(speaker=FakeSpeaker(duration=0.5))
+    worker.start()
+    start = time.perf_counter()
+    utterance = worker.say("Window minimized")
+    assert time.perf_counter() - start < 0.05
+    assert not utterance.done
+    assert utterance.wait(2) and utterance.status == "spoken"
+    worker.stop()
+
+def test_higher_priority_is_spoken_first():
+    """Waiting messages are ordered by priority, then by arrival"""
+    worker, speaker = busy_worker()
+    worker.say("low", priority=PRIORITY_LOW)
+    worker.say("normal one")
+    worker.say("error", priority=PRIORITY_HIGH)
+    worker.say("normal two")
+    speaker.release.set()
+    assert worker.wait_idle(2)
+    assert speaker.spoken == ["first", "error", "normal one", "normal two", "low"]
+    worker.stop()
+
+def test_same_key_replaces_waiting_message():
+    """Repeated volume changes are spoken once, with the latest text"""
+    worker, speaker = busy_worker()
+    up = worker.say("Increasing volume", key="volume")
+    worker.say("Increasing volume", key="volume")
+    down = worker.say("Decreasing volume", key="volume")
+    speaker.release.set()
+    assert worker.wait_idle(2)
+    assert speaker.spoken == ["first", "Decreasing volume"]
+    assert up.status == "coalesced" and down.status == "spoken"
+    assert worker.stats()["coalesced"] == 2
+    worker.stop()
+
+def test_full_queue_drops_least_important():
+    """A bounded queue makes room for important messages only"""
+    worker, speaker = busy_worker(max_queue=2)
+    chatter = worker.say("chatter", priority=PRIORITY_LOW)
+    worker.say("normal")
+    error = worker.say("error", priority=PRIORITY_HIGH)
+    late = worker.say("more chatter", priority=PRIORITY_LOW)
+    assert chatter.status == "dropped" and late.status == "dropped"
+    speaker.release.set()
+    assert worker.wait_idle(2)
+    assert speaker.spoken == ["first", "error", "normal"]
+    assert error.status == "spoken"
+    worker.stop()
+
+def test_interrupt_cuts_off_speech_and_drops_queue():
+    """A new key press stops the current sentence and what is waiting"""
+    worker, speaker = busy_worker()
+    waiting = worker.say("still to say", priority=PRIORITY_NORMAL)
+    assert worker.interrupt() == 2
+    assert speaker.stops == 1
+    assert waiting.status == "interrupted"
+    assert worker.wait_idle(2)
+    assert speaker.spoken == ["first"]
+    
+    # The worker keeps going after a barge-in
+    assert worker.say("next answer").wait(2)
+    assert speaker.spoken[-1] == "next answer"
+    worker.stop()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Tests for wake word spotting against WAV fixtures
+"""
+import os
+import time
+import wave
+
+import numpy as np
+
+from assistant.modules.audio_capture import AudioCaptureEngine
+from assistant.modules.endpointing import Endpointer
+from assistant.modules.wake_word import TemplateSpotter, WakeWordListener
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "audio", "wake_word")
+RATE = 16000
+FRAME = RATE // 50
+
+def load(name):
+    """Read a 16 kHz mono fixture"""
+    with wave.open(os.path.join(FIXTURES, name), "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+def spotter():
+    return TemplateSpotter.from_directory(os.path.join(FIXTURES, "templates"))
+
+def from_speech(samples):
+    """The audio from the first speech frame on"""
+    first = np.flatnonzero(Endpointer().speech_frames(samples))[0]
+    return samples[first * FRAME:]
+
+def listen(name, chunk_seconds=0.1):
+    """Feed a fixture to a listener in chunks, as the capture thread would"""
+    engine = AudioCaptureEngine()
+    detections = []
+    listener = WakeWordListener(engine, spotter(), detections.append)
+    samples = load(name)
+    chunk = int(RATE * chunk_seconds)
+    cpu = time.thread_time()
+    for i in range(0, len(samples), chunk):
+        for j in range(i, min(i + chunk, len(samples)), FRAME):
+            engine.feed(samples[j:j + FRAME])
+        listener.process()
+    return engine, listener, detections, time.thread_time() - cpu
+
+def test_wake_word_matches_and_other_speech_does_not():
+    """Only the enrolled word is within the distance threshold"""
+    wake = spotter()
+    assert wake.match(from_speech(load("zenith.wav")))[0]
+    for name in ("open_chrome.wav", "show_system_info.wav"):
+        detected, distance, _ = wake.match(from_speech(load(name)))
+        assert not detected and distance > 2 * wake.threshold
+
+def test_match_ends_where_the_wake_word_ends():
+    """A command straight after the wake word is not part of the match"""
+    detected, _, end = spotter().match(from_speech(load("zenith_check_battery.wav")))
+    assert detected
+    assert abs(end / RATE - 0.59) <= 0.06
+
+def test_listener_starts_recording_after_the_wake_word():
+    """The recording start handed to record() skips the wake word"""
+    engine, listener, detections, _ = listen("zenith_check_battery.wav")
+    assert listener.detections == 1
+    # 0.5 s of room noise, then 0.59 s of wake word
+    word_end = detections[0] - engine.pre_roll
+    assert abs(word_end / RATE - 1.09) <= 0.06
+
+def test_listener_ignores_other_speech():
+    """Commands without the wake word never start recognition"""
+    for name in ("open_chrome.wav", "show_system_info.wav"):
+        _, listener, detections, _ = listen(name)
+        assert detections == [] and listener.checks >= 1
+
+def test_listener_stays_within_cpu_budget():
+    """A few percent of one core per second of audio"""
+    samples = load("zenith_check_battery.wav")
+    _, _, _, cpu = listen("zenith_check_battery.wav")
+    assert cpu / (len(samples) / RATE) * 100 < 3.0